@@ -0,0 +1,121 @@
+"""
+Time index of schedules for conflict detection.
+
+Every conflict rule applies to schedules less than an hour apart, and each schedule
+occupies a fixed-length slot, so interval overlap reduces to a range query on start
+times. Schedules are kept sorted by start time: a full sweep finds every pair within
+the window in O(n log n + k) for k pairs, and adding, removing or probing a single
+schedule only looks at its neighbours.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from itertools import count
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Widest window of the conflict rules (time overlap and priority separation)
+DEFAULT_CONFLICT_WINDOW = timedelta(hours=1)
+
+
+def schedule_platforms(schedule: Any) -> frozenset:
+    """Platforms a schedule publishes to, or an empty set when it does not say."""
+    platforms = getattr(schedule, 'platforms', None)
+    if platforms is None:
+        platform = getattr(schedule, 'platform', None)
+        platforms = [platform] if platform is not None else []
+    return frozenset(getattr(platform, 'value', platform) for platform in platforms)
+
+
+def share_platform(schedule_1: Any, schedule_2: Any) -> bool:
+    """Whether two schedules compete for the same platform.
+
+    Schedules without platform information are assumed to share one.
+    """
+    platforms_1 = schedule_platforms(schedule_1)
+    platforms_2 = schedule_platforms(schedule_2)
+    if not platforms_1 or not platforms_2:
+        return True
+    return not platforms_1.isdisjoint(platforms_2)
+
+
+class ScheduleTimeIndex:
+    """Schedules sorted by scheduled time, with window queries around any time."""
+
+    def __init__(self, schedules: Optional[List[Any]] = None, window: timedelta = DEFAULT_CONFLICT_WINDOW):
+        """Initialize the index.
+
+        Args:
+            schedules: Schedules to index
+            window: Schedules closer than this are candidate conflicts
+        """
+        self.window = window
+        self._sequence = count()
+        # Sorted (scheduled_time, insertion sequence) keys and the schedules they belong to
+        self._keys: List[Tuple[datetime, int]] = []
+        self._schedules: List[Any] = []
+        self._key_by_schedule: Dict[int, Tuple[datetime, int]] = {}
+
+        if schedules:
+            # Stable sort: schedules at the same time keep their input order
+            for schedule in sorted(schedules, key=lambda x: x.scheduled_time):
+                key = (schedule.scheduled_time, next(self._sequence))
+                self._keys.append(key)
+                self._schedules.append(schedule)
+                self._key_by_schedule[id(schedule)] = key
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    def __contains__(self, schedule: Any) -> bool:
+        return id(schedule) in self._key_by_schedule
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._schedules)
+
+    def add(self, schedule: Any) -> None:
+        """Index a schedule; it sorts after schedules already indexed at the same time."""
+        if schedule in self:
+            raise ValueError("Schedule is already indexed")
+        key = (schedule.scheduled_time, next(self._sequence))
+        position = bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._schedules.insert(position, schedule)
+        self._key_by_schedule[id(schedule)] = key
+
+    def remove(self, schedule: Any) -> None:
+        """Remove an indexed schedule."""
+        key = self._key_by_schedule.pop(id(schedule), None)
+        if key is None:
+            raise ValueError("Schedule is not indexed")
+        position = bisect_left(self._keys, key)
+        del self._keys[position]
+        del self._schedules[position]
+
+    def update(self, schedule: Any) -> None:
+        """Re-index a schedule after its scheduled time changed."""
+        self.remove(schedule)
+        self.add(schedule)
+
+    def pairs(self) -> Iterator[Tuple[Any, Any]]:
+        """All pairs less than the window apart, as (earlier, later) in sweep order."""
+        schedules = self._schedules
+        times = [key[0] for key in self._keys]
+        for i, schedule in enumerate(schedules):
+            end = bisect_left(times, times[i] + self.window, lo=i + 1)
+            for j in range(i + 1, end):
+                yield schedule, schedules[j]
+
+    def neighbours(self, schedule: Any) -> Iterator[Tuple[Any, Any]]:
+        """Pairs of a (possibly unindexed) schedule with indexed schedules less than the window away.
+
+        Pairs are (earlier, later); an unindexed schedule sorts after indexed ones at
+        the same time, as if it had just been added.
+        """
+        scheduled_time = schedule.scheduled_time
+        start = bisect_right(self._keys, (scheduled_time - self.window, float('inf')))
+        end = bisect_left(self._keys, (scheduled_time + self.window, -1))
+        own_key = self._key_by_schedule.get(id(schedule), (scheduled_time, float('inf')))
+        for key, other in zip(self._keys[start:end], self._schedules[start:end]):
+            if other is schedule:
+                continue
+            yield (other, schedule) if key < own_key else (schedule, other)
@@ -10,6 +10,8 @@ from dataclasses import dataclass
 # Use unified database models
 from lib.database.models import ContentItem, Schedule, ScheduleStatus
 
+from .conflict_index import ScheduleTimeIndex, share_platform
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -38,6 +40,9 @@ class ConflictResolver:
     def detect_conflicts(self, schedules: List[Schedule]) -> List[ConflictInfo]:
         """Detect conflicts between schedules.
         
+        Only schedules less than an hour apart can conflict, so a sweep over the
+        time-sorted schedules checks just those pairs instead of every pair.
+        
         Args:
             schedules: List of Schedule objects to check
             
@@ -47,25 +52,33 @@ class ConflictResolver:
         try:
             conflicts = []
             
-            # Sort schedules by time
-            sorted_schedules = sorted(schedules, key=lambda x: x.scheduled_time)
+            for schedule_1, schedule_2 in ScheduleTimeIndex(schedules).pairs():
+                conflicts.extend(self._check_pair(schedule_1, schedule_2))
             
-            for i in range(len(sorted_schedules)):
-                for j in range(i + 1, len(sorted_schedules)):
-                    schedule_1 = sorted_schedules[i]
-                    schedule_2 = sorted_schedules[j]
-                    
-                    # Check for time overlap conflicts
-                    time_conflicts = self._check_time_overlap(schedule_1, schedule_2)
-                    conflicts.extend(time_conflicts)
-                    
-                    # Check for platform conflicts
-                    platform_conflicts = self._check_platform_conflict(schedule_1, schedule_2)
-                    conflicts.extend(platform_conflicts)
-                    
-                    # Check for priority conflicts
-                    priority_conflicts = self._check_priority_conflict(schedule_1, schedule_2)
-                    conflicts.extend(priority_conflicts)
+            return conflicts
+            
+        except Exception as e:
+            self.logger.error(f"Error detecting conflicts: {str(e)}")
+            return []
+    
+    def detect_conflicts_for(self, schedule: Schedule, index: ScheduleTimeIndex) -> List[ConflictInfo]:
+        """Detect conflicts between one schedule and the schedules of an index.
+        
+        Used when a single schedule is added or moved: only its neighbours in the
+        index are checked.
+        
+        Args:
+            schedule: Schedule to check, indexed or not
+            index: Index of the other schedules
+            
+        Returns:
+            List of conflicts involving the schedule
+        """
+        try:
+            conflicts = []
+            
+            for schedule_1, schedule_2 in index.neighbours(schedule):
+                conflicts.extend(self._check_pair(schedule_1, schedule_2))
             
             return conflicts
             
@@ -73,6 +86,21 @@ class ConflictResolver:
             self.logger.error(f"Error detecting conflicts: {str(e)}")
             return []
     
+    def _check_pair(self, schedule_1: Schedule, schedule_2: Schedule) -> List[ConflictInfo]:
+        """Run all conflict checks on a pair of schedules, the earlier one first."""
+        conflicts = []
+        
+        # Check for time overlap conflicts
+        conflicts.extend(self._check_time_overlap(schedule_1, schedule_2))
+        
+        # Check for platform conflicts
+        conflicts.extend(self._check_platform_conflict(schedule_1, schedule_2))
+        
+        # Check for priority conflicts
+        conflicts.extend(self._check_priority_conflict(schedule_1, schedule_2))
+        
+        return conflicts
+    
     def _check_time_overlap(self, schedule_1: Schedule, schedule_2: Schedule) -> List[ConflictInfo]:
         """Check for time overlap conflicts."""
         conflicts = []
@@ -109,8 +137,10 @@ class ConflictResolver:
         conflicts = []
         
         try:
-            # This is a placeholder - platform conflicts would depend on specific platform limitations
+            # Platform conflicts would depend on specific platform limitations
             # For now, we'll check if schedules are too close on the same platform
+            if not share_platform(schedule_1, schedule_2):
+                return conflicts
             
             time_diff = abs((schedule_2.scheduled_time - schedule_1.scheduled_time).total_seconds() / 60)
             
@@ -341,11 +371,13 @@ class ConflictResolver:
             Dictionary containing optimization suggestions
         """
         try:
-            suggestions = []
+            # Index the existing schedules once; each candidate time is a neighbour query
+            index = ScheduleTimeIndex(existing_schedules)
+            # Conflicts among the existing schedules count against every candidate time
+            existing_conflicts = self.detect_conflicts(existing_schedules)
             
             # Check for conflicts with proposed time
-            all_schedules = existing_schedules + [new_schedule]
-            conflicts = self.detect_conflicts(all_schedules)
+            conflicts = existing_conflicts + self.detect_conflicts_for(new_schedule, index)
             
             if not conflicts:
                 return {
@@ -370,7 +402,7 @@ class ConflictResolver:
                 )
                 
                 # Check conflicts for this alternative
-                alt_conflicts = self.detect_conflicts(existing_schedules + [alt_schedule])
+                alt_conflicts = existing_conflicts + self.detect_conflicts_for(alt_schedule, index)
                 
                 alternative_times.append({
                     'time': alt_time,
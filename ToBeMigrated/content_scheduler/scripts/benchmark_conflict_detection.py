@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark the schedule time index against checking every pair of schedules.
+
+Generates a year of schedules across several platforms and compares the pairs
+examined by the old all-pairs loop with the index sweep, then times adding and
+probing single schedules against re-running a full detection.
+
+Usage:
+    python scripts/benchmark_conflict_detection.py [--days 365] [--per-day 3] [--platforms 4]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add the content_scheduler directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.conflict_index import DEFAULT_CONFLICT_WINDOW, ScheduleTimeIndex
+
+PLATFORMS = ["twitter", "facebook", "linkedin", "instagram", "youtube", "wordpress", "wix"]
+
+
+def generate_schedules(days: int, per_day: int, platforms: int, seed: int = 42) -> list:
+    """Schedules spread over the year at business hours, some of them close together."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    schedules = []
+    for day in range(days):
+        for platform in PLATFORMS[:platforms]:
+            for _ in range(per_day):
+                minute = rng.randint(8 * 60, 20 * 60)
+                schedules.append(SimpleNamespace(
+                    id=len(schedules),
+                    scheduled_time=start + timedelta(days=day, minutes=minute),
+                    priority=rng.randint(1, 10),
+                    platforms=[platform]
+                ))
+    return schedules
+
+
+def is_conflict(schedule_1, schedule_2) -> bool:
+    """Time overlap of one-hour slots, the widest of the resolver's conflict rules."""
+    minutes = abs((schedule_2.scheduled_time - schedule_1.scheduled_time).total_seconds()) / 60
+    return minutes < 60
+
+
+def all_pairs(schedules: list) -> tuple:
+    sorted_schedules = sorted(schedules, key=lambda x: x.scheduled_time)
+    examined = conflicts = 0
+    for i in range(len(sorted_schedules)):
+        for j in range(i + 1, len(sorted_schedules)):
+            examined += 1
+            conflicts += is_conflict(sorted_schedules[i], sorted_schedules[j])
+    return examined, conflicts
+
+
+def index_sweep(schedules: list) -> tuple:
+    examined = conflicts = 0
+    for schedule_1, schedule_2 in ScheduleTimeIndex(schedules).pairs():
+        examined += 1
+        conflicts += is_conflict(schedule_1, schedule_2)
+    return examined, conflicts
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--per-day", type=int, default=3, help="Schedules per platform per day")
+    parser.add_argument("--platforms", type=int, default=4, choices=range(1, len(PLATFORMS) + 1))
+    parser.add_argument("--changes", type=int, default=200, help="Single-schedule changes to time")
+    parser.add_argument("--skip-all-pairs", action="store_true", help="Skip the quadratic baseline")
+    args = parser.parse_args()
+
+    schedules = generate_schedules(args.days, args.per_day, args.platforms)
+    print(f"{len(schedules)} schedules over {args.days} days on {args.platforms} platforms")
+
+    (swept, swept_conflicts), sweep_time = timed(index_sweep, schedules)
+    print(f"index sweep : {swept:>12,} pairs examined, {swept_conflicts:,} conflicts, {sweep_time:.3f}s")
+
+    if not args.skip_all_pairs:
+        (examined, conflicts), pairs_time = timed(all_pairs, schedules)
+        assert conflicts == swept_conflicts, "index sweep missed conflicts"
+        print(f"all pairs   : {examined:>12,} pairs examined, {conflicts:,} conflicts, {pairs_time:.3f}s "
+              f"({pairs_time / sweep_time:.0f}x slower)")
+
+    # Single-schedule changes: move one schedule and probe its neighbours
+    rng = random.Random(7)
+    index = ScheduleTimeIndex(schedules)
+    start = time.perf_counter()
+    probed = 0
+    for _ in range(args.changes):
+        schedule = rng.choice(schedules)
+        schedule.scheduled_time += timedelta(minutes=rng.randint(-90, 90))
+        index.update(schedule)
+        probed += sum(1 for _ in index.neighbours(schedule))
+    change_time = (time.perf_counter() - start) / args.changes
+    print(f"incremental : {change_time * 1e6:.1f}us per moved schedule "
+          f"({probed / args.changes:.1f} neighbours within {DEFAULT_CONFLICT_WINDOW}), "
+          f"vs {sweep_time * 1e3:.1f}ms for a full sweep")
+
+
+if __name__ == "__main__":
+    main()
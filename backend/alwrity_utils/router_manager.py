@@ -3,9 +3,38 @@ Router Manager Module
 Handles FastAPI router inclusion and management.
 """
 
-from fastapi import FastAPI
+import asyncio
+import importlib
+import os
+from fastapi import FastAPI, Request
 from loguru import logger
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple
+
+# Heavy routers are mounted on the first request under their prefix, or by the
+# background warm-up shortly after startup. Set ALWRITY_LAZY_ROUTERS=false to mount
+# everything while the app module is imported.
+LAZY_ROUTERS_ENABLED = os.getenv("ALWRITY_LAZY_ROUTERS", "true").lower() == "true"
+ROUTER_WARMUP_DELAY_SECONDS = float(os.getenv("ALWRITY_ROUTER_WARMUP_DELAY_SECONDS", "2"))
+
+# prefix -> [(router name, module path, router attribute)], mounted together
+LAZY_ROUTER_GROUPS: Dict[str, List[Tuple[str, str, str]]] = {
+    "/api/seo-dashboard": [("seo_dashboard", "api.seo_dashboard_routes", "router")],
+    "/api/seo": [("seo_tools", "routers.seo_tools", "router")],
+    "/api/facebook-writer": [("facebook_writer", "api.facebook_writer.routers", "facebook_router")],
+    "/api/linkedin": [
+        ("linkedin", "routers.linkedin", "router"),
+        ("linkedin_image", "api.linkedin_image_generation", "router"),
+    ],
+    "/api/content-planning": [("content_planning", "api.content_planning.api.router", "router")],
+    "/api/personas": [("persona", "api.persona_routes", "router")],
+    "/api/blog": [("blog_writer", "api.blog_writer.router", "router")],
+    "/api/blog-writer/seo": [("blog_seo_analysis", "api.blog_writer.seo_analysis", "router")],
+    "/api/stability": [
+        ("stability", "routers.stability", "router"),
+        ("stability_advanced", "routers.stability_advanced", "router"),
+        ("stability_admin", "routers.stability_admin", "router"),
+    ],
+}
 
 
 class RouterManager:
@@ -15,6 +44,9 @@ class RouterManager:
         self.app = app
         self.included_routers = []
         self.failed_routers = []
+        self.pending_lazy_routers: Dict[str, List[Tuple[str, str, str]]] = {}
+        self._lazy_prefixes: Tuple[str, ...] = ()
+        self._lazy_lock: Optional[asyncio.Lock] = None
     
     def include_router_safely(self, router, router_name: str = None) -> bool:
         """Include a router safely with error handling."""
@@ -76,21 +108,6 @@ class RouterManager:
             from routers.bing_analytics_storage import router as bing_analytics_storage_router
             self.include_router_safely(bing_analytics_storage_router, "bing_analytics_storage")
             
-            # SEO tools router
-            from routers.seo_tools import router as seo_tools_router
-            self.include_router_safely(seo_tools_router, "seo_tools")
-            
-            # Facebook Writer router
-            from api.facebook_writer.routers import facebook_router
-            self.include_router_safely(facebook_router, "facebook_writer")
-            
-            # LinkedIn routers
-            from routers.linkedin import router as linkedin_router
-            self.include_router_safely(linkedin_router, "linkedin")
-            
-            from api.linkedin_image_generation import router as linkedin_image_router
-            self.include_router_safely(linkedin_image_router, "linkedin_image")
-            
             # Brainstorm router
             from api.brainstorm import router as brainstorm_router
             self.include_router_safely(brainstorm_router, "brainstorm")
@@ -102,10 +119,7 @@ class RouterManager:
             from api.writing_assistant import router as writing_assistant_router
             self.include_router_safely(writing_assistant_router, "writing_assistant")
             
-            # Content planning and user data
-            from api.content_planning.api.router import router as content_planning_router
-            self.include_router_safely(content_planning_router, "content_planning")
-            
+            # User data
             from api.user_data import router as user_data_router
             self.include_router_safely(user_data_router, "user_data")
             
@@ -163,13 +177,6 @@ class RouterManager:
         try:
             logger.info("Including optional routers...")
             
-            # AI Blog Writer router
-            try:
-                from api.blog_writer.router import router as blog_writer_router
-                self.include_router_safely(blog_writer_router, "blog_writer")
-            except Exception as e:
-                logger.warning(f"AI Blog Writer router not mounted: {e}")
-            
             # Wix Integration router
             try:
                 from api.wix_routes import router as wix_router
@@ -177,34 +184,6 @@ class RouterManager:
             except Exception as e:
                 logger.warning(f"Wix Integration router not mounted: {e}")
             
-            # Blog Writer SEO Analysis router
-            try:
-                from api.blog_writer.seo_analysis import router as blog_seo_analysis_router
-                self.include_router_safely(blog_seo_analysis_router, "blog_seo_analysis")
-            except Exception as e:
-                logger.warning(f"Blog Writer SEO Analysis router not mounted: {e}")
-            
-            # Persona router
-            try:
-                from api.persona_routes import router as persona_router
-                self.include_router_safely(persona_router, "persona")
-            except Exception as e:
-                logger.warning(f"Persona router not mounted: {e}")
-            
-            # Stability AI routers
-            try:
-                from routers.stability import router as stability_router
-                self.include_router_safely(stability_router, "stability")
-                
-                from routers.stability_advanced import router as stability_advanced_router
-                self.include_router_safely(stability_advanced_router, "stability_advanced")
-                
-                from routers.stability_admin import router as stability_admin_router
-                self.include_router_safely(stability_admin_router, "stability_admin")
-            except Exception as e:
-                logger.warning(f"Stability AI routers not mounted: {e}")
-            
-            
             logger.info("✅ Optional routers processed")
             return True
             
@@ -212,11 +191,89 @@ class RouterManager:
             logger.error(f"❌ Error including optional routers: {e}")
             return False
     
+    def include_lazy_routers(self, groups: Dict[str, List[Tuple[str, str, str]]] = None) -> bool:
+        """Register heavy routers to be mounted on first use (or mount them now if lazy loading is off)."""
+        groups = LAZY_ROUTER_GROUPS if groups is None else groups
+        if not LAZY_ROUTERS_ENABLED:
+            for prefix in list(groups):
+                self._mount_group(prefix, groups[prefix])
+            return True
+        
+        self.pending_lazy_routers.update(groups)
+        self._refresh_lazy_prefixes()
+        logger.info(f"✅ {sum(len(g) for g in groups.values())} routers registered for lazy mounting")
+        return True
+    
+    def _refresh_lazy_prefixes(self):
+        # Longest prefixes first so e.g. /api/seo-dashboard is not claimed by /api/seo
+        self._lazy_prefixes = tuple(sorted(self.pending_lazy_routers, key=len, reverse=True))
+    
+    def _mount_group(self, prefix: str, routers: List[Tuple[str, str, str]]):
+        """Import and include every router of a lazy group."""
+        for name, module_path, attr in routers:
+            try:
+                module = importlib.import_module(module_path)
+                self.include_router_safely(getattr(module, attr), name)
+            except Exception as e:
+                self.failed_routers.append({"name": name, "error": str(e)})
+                logger.warning(f"{name} router not mounted: {e}")
+        # New routes must show up in the OpenAPI schema
+        self.app.openapi_schema = None
+    
+    async def mount_lazy_group(self, prefix: str) -> bool:
+        """Mount a pending lazy group off the event loop; safe to call concurrently."""
+        if prefix not in self.pending_lazy_routers:
+            return False
+        if self._lazy_lock is None:
+            self._lazy_lock = asyncio.Lock()
+        async with self._lazy_lock:
+            routers = self.pending_lazy_routers.get(prefix)
+            if routers is None:
+                return False
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._mount_group, prefix, routers)
+            del self.pending_lazy_routers[prefix]
+            self._refresh_lazy_prefixes()
+            logger.info(f"Mounted lazy routers for {prefix}: {[name for name, _, _ in routers]}")
+            return True
+    
+    def _match_lazy_prefix(self, path: str) -> Optional[str]:
+        for prefix in self._lazy_prefixes:
+            if path == prefix or path.startswith(prefix + "/"):
+                return prefix
+        return None
+    
+    async def lazy_router_middleware(self, request: Request, call_next):
+        """Mount the lazy router group serving this path before it is routed."""
+        if self._lazy_prefixes:
+            prefix = self._match_lazy_prefix(request.url.path)
+            if prefix:
+                await self.mount_lazy_group(prefix)
+        return await call_next(request)
+    
+    async def warm_up_lazy_routers(self, delay_seconds: float = ROUTER_WARMUP_DELAY_SECONDS,
+                                   warmups: Optional[List[Callable[[], Any]]] = None):
+        """Mount pending routers and run warm-up callables once the server is listening."""
+        await asyncio.sleep(delay_seconds)
+        for prefix in list(self.pending_lazy_routers):
+            try:
+                await self.mount_lazy_group(prefix)
+            except Exception as e:
+                logger.warning(f"Lazy router warm-up failed for {prefix}: {e}")
+        
+        loop = asyncio.get_running_loop()
+        for warmup in warmups or []:
+            try:
+                await loop.run_in_executor(None, warmup)
+            except Exception as e:
+                logger.warning(f"Warm-up {getattr(warmup, '__name__', warmup)} failed: {e}")
+    
     def get_router_status(self) -> Dict[str, Any]:
         """Get the status of router inclusion."""
         return {
             "included_routers": self.included_routers,
             "failed_routers": self.failed_routers,
+            "pending_lazy_routers": [name for group in self.pending_lazy_routers.values() for name, _, _ in group],
             "total_included": len(self.included_routers),
             "total_failed": len(self.failed_routers)
         }
@@ -5,8 +5,10 @@ Main router for blog writing operations including research, outline generation,
 content creation, SEO analysis, and publishing.
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import Any, Dict, List
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Dict, List, Optional
 from loguru import logger
 
 from models.blog_models import (
@@ -38,6 +40,16 @@ router = APIRouter(prefix="/api/blog", tags=["AI Blog Writer"])
 
 service = BlogWriterService()
 
+# Upper bound for long-poll status requests (seconds)
+MAX_STATUS_WAIT_SECONDS = 25.0
+
+
+async def _get_task_status(task_id: str, wait: float, since_version: Optional[int]) -> Optional[Dict[str, Any]]:
+    """Read task status, long-polling until it changes when the client supplies since_version."""
+    if wait > 0 and since_version is not None:
+        return await task_manager.wait_for_task_status(task_id, since_version, min(wait, MAX_STATUS_WAIT_SECONDS))
+    return await task_manager.get_task_status(task_id)
+
 
 @router.get("/health")
 async def health() -> Dict[str, Any]:
@@ -50,7 +62,7 @@ async def health() -> Dict[str, Any]:
 async def start_research(request: BlogResearchRequest) -> Dict[str, Any]:
     """Start a research operation and return a task ID for polling."""
     try:
-        task_id = task_manager.start_research_task(request)
+        task_id = await task_manager.start_research_task(request)
         return {"task_id": task_id, "status": "started"}
     except Exception as e:
         logger.error(f"Failed to start research: {e}")
@@ -58,10 +70,14 @@ async def start_research(request: BlogResearchRequest) -> Dict[str, Any]:
 
 
 @router.get("/research/status/{task_id}")
-async def get_research_status(task_id: str) -> Dict[str, Any]:
+async def get_research_status(
+    task_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for a change (long-poll)"),
+    since_version: Optional[int] = Query(None, description="Last task version seen by the client")
+) -> Dict[str, Any]:
     """Get the status of a research operation."""
     try:
-        status = task_manager.get_task_status(task_id)
+        status = await _get_task_status(task_id, wait, since_version)
         if status is None:
             raise HTTPException(status_code=404, detail="Task not found")
         
@@ -79,7 +95,7 @@ async def get_research_status(task_id: str) -> Dict[str, Any]:
 async def start_outline_generation(request: BlogOutlineRequest) -> Dict[str, Any]:
     """Start an outline generation operation and return a task ID for polling."""
     try:
-        task_id = task_manager.start_outline_task(request)
+        task_id = await task_manager.start_outline_task(request)
         return {"task_id": task_id, "status": "started"}
     except Exception as e:
         logger.error(f"Failed to start outline generation: {e}")
@@ -87,10 +103,14 @@ async def start_outline_generation(request: BlogOutlineRequest) -> Dict[str, Any
 
 
 @router.get("/outline/status/{task_id}")
-async def get_outline_status(task_id: str) -> Dict[str, Any]:
+async def get_outline_status(
+    task_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for a change (long-poll)"),
+    since_version: Optional[int] = Query(None, description="Last task version seen by the client")
+) -> Dict[str, Any]:
     """Get the status of an outline generation operation."""
     try:
-        status = task_manager.get_task_status(task_id)
+        status = await _get_task_status(task_id, wait, since_version)
         if status is None:
             raise HTTPException(status_code=404, detail="Task not found")
         
@@ -327,7 +347,7 @@ async def start_medium_generation(request: MediumBlogGenerateRequest):
         if (request.globalTargetWords or 1000) > 1000:
             raise HTTPException(status_code=400, detail="Global target words exceed 1000; use per-section generation")
 
-        task_id = task_manager.start_medium_generation_task(request)
+        task_id = await task_manager.start_medium_generation_task(request)
         return {"task_id": task_id, "status": "started"}
     except HTTPException:
         raise
@@ -337,10 +357,14 @@ async def start_medium_generation(request: MediumBlogGenerateRequest):
 
 
 @router.get("/generate/medium/status/{task_id}")
-async def medium_generation_status(task_id: str):
+async def medium_generation_status(
+    task_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for a change (long-poll)"),
+    since_version: Optional[int] = Query(None, description="Last task version seen by the client")
+):
     """Poll status for medium blog generation task."""
     try:
-        status = task_manager.get_task_status(task_id)
+        status = await _get_task_status(task_id, wait, since_version)
         if status is None:
             raise HTTPException(status_code=404, detail="Task not found")
         return status
@@ -364,7 +388,7 @@ async def start_blog_rewrite(request: Dict[str, Any]) -> Dict[str, Any]:
 async def rewrite_status(task_id: str):
     """Poll status for blog rewrite task."""
     try:
-        status = service.task_manager.get_task_status(task_id)
+        status = await asyncio.to_thread(service.task_manager.get_task_status, task_id)
         if status is None:
             raise HTTPException(status_code=404, detail="Task not found")
         return status
@@ -8,7 +8,7 @@ for research and outline generation operations.
 import asyncio
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from loguru import logger
 
 from models.blog_models import (
@@ -18,55 +18,46 @@ from models.blog_models import (
     MediumBlogGenerateResult,
 )
 from services.blog_writer.blog_service import BlogWriterService
+from services.blog_writer.core.task_store import TaskStore, task_store
 
 
 class TaskManager:
     """Manages background tasks for research and outline generation."""
     
-    def __init__(self):
-        self.task_storage: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, store: Optional[TaskStore] = None):
+        self.store = store or task_store
         self.service = BlogWriterService()
     
     def cleanup_old_tasks(self):
-        """Remove tasks older than 1 hour to prevent memory leaks."""
-        current_time = datetime.now()
-        tasks_to_remove = []
-        
-        for task_id, task_data in self.task_storage.items():
-            if (current_time - task_data["created_at"]).total_seconds() > 3600:  # 1 hour
-                tasks_to_remove.append(task_id)
-        
-        for task_id in tasks_to_remove:
-            del self.task_storage[task_id]
+        """Remove expired tasks using the store's expiry index."""
+        self.store.purge_expired()
     
-    def create_task(self, task_type: str = "general") -> str:
+    async def create_task(self, task_type: str = "general") -> str:
         """Create a new task and return its ID."""
         task_id = str(uuid.uuid4())
-        
-        self.task_storage[task_id] = {
-            "status": "pending",
-            "created_at": datetime.now(),
-            "result": None,
-            "error": None,
-            "progress_messages": [],
-            "task_type": task_type
-        }
-        
+        await self.store.acreate(task_id, task_type=task_type)
         return task_id
     
-    def get_task_status(self, task_id: str) -> Dict[str, Any]:
+    async def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get the status of a task."""
-        self.cleanup_old_tasks()
-        
-        if task_id not in self.task_storage:
+        return self._format_status(await self.store.aget(task_id))
+    
+    async def wait_for_task_status(self, task_id: str, since_version: Optional[int], timeout: float) -> Optional[Dict[str, Any]]:
+        """Long-poll a task, returning once it changes past since_version or timeout elapses."""
+        task = await self.store.wait_for_change(task_id, since_version, timeout)
+        return self._format_status(task)
+    
+    def _format_status(self, task: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Build the polling response for a stored task."""
+        if task is None:
             return None
         
-        task = self.task_storage[task_id]
         response = {
-            "task_id": task_id,
+            "task_id": task["task_id"],
             "status": task["status"],
-            "created_at": task["created_at"].isoformat(),
-            "progress_messages": task.get("progress_messages", [])
+            "created_at": datetime.fromtimestamp(task["created_at"]).isoformat(),
+            "progress_messages": task.get("progress_messages", []),
+            "version": task["version"]
         }
         
         if task["status"] == "completed":
@@ -78,43 +69,36 @@ class TaskManager:
     
     async def update_progress(self, task_id: str, message: str):
         """Update progress message for a task."""
-        if task_id in self.task_storage:
-            if "progress_messages" not in self.task_storage[task_id]:
-                self.task_storage[task_id]["progress_messages"] = []
-            
-            progress_entry = {
-                "timestamp": datetime.now().isoformat(),
-                "message": message
-            }
-            self.task_storage[task_id]["progress_messages"].append(progress_entry)
-            
-            # Keep only last 10 progress messages to prevent memory bloat
-            if len(self.task_storage[task_id]["progress_messages"]) > 10:
-                self.task_storage[task_id]["progress_messages"] = self.task_storage[task_id]["progress_messages"][-10:]
-            
+        # The store keeps only the most recent messages to prevent memory bloat
+        if await self.store.aappend_progress(task_id, message):
             logger.info(f"Progress update for task {task_id}: {message}")
     
-    def start_research_task(self, request: BlogResearchRequest) -> str:
+    async def _start_running(self, task_id: str):
+        """Mark a task as running and reset its progress messages."""
+        await self.store.aupdate(task_id, status="running")
+        await self.store.aclear_progress(task_id)
+    
+    async def start_research_task(self, request: BlogResearchRequest) -> str:
         """Start a research operation and return a task ID."""
-        task_id = self.create_task("research")
+        task_id = await self.create_task("research")
         
         # Start the research operation in the background
         asyncio.create_task(self._run_research_task(task_id, request))
         
         return task_id
     
-    def start_outline_task(self, request: BlogOutlineRequest) -> str:
+    async def start_outline_task(self, request: BlogOutlineRequest) -> str:
         """Start an outline generation operation and return a task ID."""
-        task_id = self.create_task("outline")
+        task_id = await self.create_task("outline")
         
         # Start the outline generation operation in the background
         asyncio.create_task(self._run_outline_generation_task(task_id, request))
         
         return task_id
 
-    def start_medium_generation_task(self, request: MediumBlogGenerateRequest) -> str:
+    async def start_medium_generation_task(self, request: MediumBlogGenerateRequest) -> str:
         """Start a medium (≤1000 words) full-blog generation task."""
-        task_id = self.create_task("medium_generation")
+        task_id = await self.create_task("medium_generation")
         asyncio.create_task(self._run_medium_generation_task(task_id, request))
         return task_id
     
@@ -122,8 +106,7 @@ class TaskManager:
         """Background task to run research and update status with progress messages."""
         try:
             # Update status to running
-            self.task_storage[task_id]["status"] = "running"
-            self.task_storage[task_id]["progress_messages"] = []
+            await self._start_running(task_id)
             
             # Send initial progress message
             await self.update_progress(task_id, "🔍 Starting research operation...")
@@ -137,36 +120,31 @@ class TaskManager:
             # Check if research failed gracefully
             if not result.success:
                 await self.update_progress(task_id, f"❌ Research failed: {result.error_message or 'Unknown error'}")
-                self.task_storage[task_id]["status"] = "failed"
-                self.task_storage[task_id]["error"] = result.error_message or "Research failed"
+                await self.store.aupdate(task_id, status="failed", error=result.error_message or "Research failed")
             else:
                 await self.update_progress(task_id, f"✅ Research completed successfully! Found {len(result.sources)} sources and {len(result.search_queries or [])} search queries.")
                 # Update status to completed
-                self.task_storage[task_id]["status"] = "completed"
-                self.task_storage[task_id]["result"] = result.dict()
+                await self.store.aupdate(task_id, status="completed", result=result.dict())
             
         except Exception as e:
             await self.update_progress(task_id, f"❌ Research failed with error: {str(e)}")
             # Update status to failed
-            self.task_storage[task_id]["status"] = "failed"
-            self.task_storage[task_id]["error"] = str(e)
+            await self.store.aupdate(task_id, status="failed", error=str(e))
         
         # Ensure we always send a final completion message
         finally:
-            if task_id in self.task_storage:
-                current_status = self.task_storage[task_id]["status"]
-                if current_status not in ["completed", "failed"]:
+            task = await self.store.aget(task_id)
+            if task is not None:
+                if task["status"] not in ["completed", "failed"]:
                     # Force completion if somehow we didn't set a final status
                     await self.update_progress(task_id, "⚠️ Research operation completed with unknown status")
-                    self.task_storage[task_id]["status"] = "failed"
-                    self.task_storage[task_id]["error"] = "Research completed with unknown status"
+                    await self.store.aupdate(task_id, status="failed", error="Research completed with unknown status")
     
     async def _run_outline_generation_task(self, task_id: str, request: BlogOutlineRequest):
         """Background task to run outline generation and update status with progress messages."""
         try:
             # Update status to running
-            self.task_storage[task_id]["status"] = "running"
-            self.task_storage[task_id]["progress_messages"] = []
+            await self._start_running(task_id)
             
             # Send initial progress message
             await self.update_progress(task_id, "🧩 Starting outline generation...")
@@ -176,20 +154,17 @@ class TaskManager:
             
             # Update status to completed
             await self.update_progress(task_id, f"✅ Outline generated successfully! Created {len(result.outline)} sections with {len(result.title_options)} title options.")
-            self.task_storage[task_id]["status"] = "completed"
-            self.task_storage[task_id]["result"] = result.dict()
+            await self.store.aupdate(task_id, status="completed", result=result.dict())
             
         except Exception as e:
             await self.update_progress(task_id, f"❌ Outline generation failed: {str(e)}")
             # Update status to failed
-            self.task_storage[task_id]["status"] = "failed"
-            self.task_storage[task_id]["error"] = str(e)
+            await self.store.aupdate(task_id, status="failed", error=str(e))
 
     async def _run_medium_generation_task(self, task_id: str, request: MediumBlogGenerateRequest):
         """Background task to generate a medium blog using a single structured JSON call."""
         try:
-            self.task_storage[task_id]["status"] = "running"
-            self.task_storage[task_id]["progress_messages"] = []
+            await self._start_running(task_id)
 
             await self.update_progress(task_id, "📦 Packaging outline and metadata...")
 
@@ -215,14 +190,12 @@ class TaskManager:
                 await self.update_progress(task_id, "✨ Post-processing and assembling sections...")
 
             # Mark completed
-            self.task_storage[task_id]["status"] = "completed"
-            self.task_storage[task_id]["result"] = result.dict()
+            await self.store.aupdate(task_id, status="completed", result=result.dict())
             await self.update_progress(task_id, f"✅ Generated {len(result.sections)} sections successfully.")
 
         except Exception as e:
             await self.update_progress(task_id, f"❌ Medium generation failed: {str(e)}")
-            self.task_storage[task_id]["status"] = "failed"
-            self.task_storage[task_id]["error"] = str(e)
+            await self.store.aupdate(task_id, status="failed", error=str(e))
 
 
 # Global task manager instance
@@ -13,12 +13,7 @@ import traceback
 from models.enhanced_strategy_models import (
     OnboardingDataIntegration
 )
-from models.onboarding import (
-    OnboardingSession,
-    WebsiteAnalysis,
-    ResearchPreferences,
-    APIKey
-)
+from services.onboarding_context import OnboardingContext, get_onboarding_context
 
 logger = logging.getLogger(__name__)
 
@@ -34,11 +29,12 @@ class OnboardingDataIntegrationService:
         try:
             logger.info(f"Processing onboarding data for user: {user_id}")
 
-            # Get all onboarding data sources
-            website_analysis = self._get_website_analysis(user_id, db)
-            research_preferences = self._get_research_preferences(user_id, db)
-            api_keys_data = self._get_api_keys_data(user_id, db)
-            onboarding_session = self._get_onboarding_session(user_id, db)
+            # Get all onboarding data sources from one snapshot of the user's rows
+            context = get_onboarding_context(user_id, db)
+            website_analysis = self._get_website_analysis(context)
+            research_preferences = self._get_research_preferences(context)
+            api_keys_data = self._get_api_keys_data(context)
+            onboarding_session = self._get_onboarding_session(context)
 
             # Log data source status
             logger.info(f"Data source status for user {user_id}:")
@@ -76,63 +72,46 @@ class OnboardingDataIntegrationService:
             logger.error("Traceback:\n%s", traceback.format_exc())
             return self._get_fallback_data()
 
-    def _get_website_analysis(self, user_id: int, db: Session) -> Dict[str, Any]:
+    def _get_website_analysis(self, context: OnboardingContext) -> Dict[str, Any]:
         """Get website analysis data for the user."""
+        user_id = context.user_id
         try:
-            # Get the latest onboarding session for the user
-            session = db.query(OnboardingSession).filter(
-                OnboardingSession.user_id == user_id
-            ).order_by(OnboardingSession.updated_at.desc()).first()
-            
-            if not session:
+            if not context.session:
                 logger.warning(f"No onboarding session found for user {user_id}")
                 return {}
             
-            # Get the latest website analysis for this session
-            website_analysis = db.query(WebsiteAnalysis).filter(
-                WebsiteAnalysis.session_id == session.id
-            ).order_by(WebsiteAnalysis.updated_at.desc()).first()
-            
-            if not website_analysis:
+            # The latest website analysis for the session
+            if not context.website_analysis:
                 logger.warning(f"No website analysis found for user {user_id}")
                 return {}
             
-            # Convert to dictionary and add metadata
-            analysis_data = website_analysis.to_dict()
-            analysis_data['data_freshness'] = self._calculate_freshness(website_analysis.updated_at)
-            analysis_data['confidence_level'] = 0.9 if website_analysis.status == 'completed' else 0.5
+            # Copy the snapshot's dictionary and add metadata
+            analysis_data = dict(context.website_analysis)
+            analysis_data['data_freshness'] = self._calculate_freshness(context.website_analysis_updated_at)
+            analysis_data['confidence_level'] = 0.9 if analysis_data.get('status') == 'completed' else 0.5
             
-            logger.info(f"Retrieved website analysis for user {user_id}: {website_analysis.website_url}")
+            logger.info(f"Retrieved website analysis for user {user_id}: {analysis_data.get('website_url')}")
             return analysis_data
 
         except Exception as e:
             logger.error(f"Error getting website analysis for user {user_id}: {str(e)}")
             return {}
 
-    def _get_research_preferences(self, user_id: int, db: Session) -> Dict[str, Any]:
+    def _get_research_preferences(self, context: OnboardingContext) -> Dict[str, Any]:
         """Get research preferences data for the user."""
+        user_id = context.user_id
         try:
-            # Get the latest onboarding session for the user
-            session = db.query(OnboardingSession).filter(
-                OnboardingSession.user_id == user_id
-            ).order_by(OnboardingSession.updated_at.desc()).first()
-            
-            if not session:
+            if not context.session:
                 logger.warning(f"No onboarding session found for user {user_id}")
                 return {}
             
-            # Get research preferences for this session
-            research_prefs = db.query(ResearchPreferences).filter(
-                ResearchPreferences.session_id == session.id
-            ).first()
-            
-            if not research_prefs:
+            if not context.research_preferences:
                 logger.warning(f"No research preferences found for user {user_id}")
                 return {}
             
-            # Convert to dictionary and add metadata
-            prefs_data = research_prefs.to_dict()
-            prefs_data['data_freshness'] = self._calculate_freshness(research_prefs.updated_at)
+            # Copy the snapshot's dictionary and add metadata
+            prefs_data = dict(context.research_preferences)
+            prefs_data['data_freshness'] = self._calculate_freshness(context.research_preferences_updated_at)
             prefs_data['confidence_level'] = 0.9
             
             logger.info(f"Retrieved research preferences for user {user_id}")
@@ -142,33 +121,25 @@ class OnboardingDataIntegrationService:
             logger.error(f"Error getting research preferences for user {user_id}: {str(e)}")
             return {}
 
-    def _get_api_keys_data(self, user_id: int, db: Session) -> Dict[str, Any]:
+    def _get_api_keys_data(self, context: OnboardingContext) -> Dict[str, Any]:
         """Get API keys data for the user."""
+        user_id = context.user_id
         try:
-            # Get the latest onboarding session for the user
-            session = db.query(OnboardingSession).filter(
-                OnboardingSession.user_id == user_id
-            ).order_by(OnboardingSession.updated_at.desc()).first()
-            
-            if not session:
+            if not context.session:
                 logger.warning(f"No onboarding session found for user {user_id}")
                 return {}
             
-            # Get all API keys for this session
-            api_keys = db.query(APIKey).filter(
-                APIKey.session_id == session.id
-            ).all()
-            
+            api_keys = context.api_keys
             if not api_keys:
                 logger.warning(f"No API keys found for user {user_id}")
                 return {}
             
             # Convert to dictionary format
             api_data = {
-                'api_keys': [key.to_dict() for key in api_keys],
+                'api_keys': list(api_keys),
                 'total_keys': len(api_keys),
-                'providers': [key.provider for key in api_keys],
-                'data_freshness': self._calculate_freshness(session.updated_at),
+                'providers': [key['provider'] for key in api_keys],
+                'data_freshness': self._calculate_freshness(context.session_updated_at),
                 'confidence_level': 0.8
             }
             
@@ -179,31 +150,21 @@ class OnboardingDataIntegrationService:
             logger.error(f"Error getting API keys data for user {user_id}: {str(e)}")
             return {}
 
-    def _get_onboarding_session(self, user_id: int, db: Session) -> Dict[str, Any]:
+    def _get_onboarding_session(self, context: OnboardingContext) -> Dict[str, Any]:
         """Get onboarding session data for the user."""
+        user_id = context.user_id
         try:
-            # Get the latest onboarding session for the user
-            session = db.query(OnboardingSession).filter(
-                OnboardingSession.user_id == user_id
-            ).order_by(OnboardingSession.updated_at.desc()).first()
-            
+            session = context.session
             if not session:
                 logger.warning(f"No onboarding session found for user {user_id}")
                 return {}
             
-            # Convert to dictionary
-            session_data = {
-                'id': session.id,
-                'user_id': session.user_id,
-                'current_step': session.current_step,
-                'progress': session.progress,
-                'started_at': session.started_at.isoformat() if session.started_at else None,
-                'updated_at': session.updated_at.isoformat() if session.updated_at else None,
-                'data_freshness': self._calculate_freshness(session.updated_at),
-                'confidence_level': 0.9
-            }
+            # Copy the snapshot's dictionary and add metadata
+            session_data = dict(session)
+            session_data['data_freshness'] = self._calculate_freshness(context.session_updated_at)
+            session_data['confidence_level'] = 0.9
             
-            logger.info(f"Retrieved onboarding session for user {user_id}: step {session.current_step}, progress {session.progress}%")
+            logger.info(f"Retrieved onboarding session for user {user_id}: step {session['current_step']}, progress {session['progress']}%")
             return session_data
 
         except Exception as e:
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import json
@@ -8,6 +8,7 @@ import logging
 from services.linkedin.image_generation import LinkedInImageGenerator, LinkedInImageStorage
 from services.linkedin.image_prompts import LinkedInPromptGenerator
 from services.api_key_manager import APIKeyManager
+from middleware.auth_middleware import get_optional_user
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -76,7 +77,10 @@ async def generate_image_prompts(request: ImagePromptRequest):
         raise HTTPException(status_code=500, detail=f"Failed to generate image prompts: {str(e)}")
 
 @router.post("/generate-image", response_model=ImageGenerationResponse)
-async def generate_linkedin_image(request: ImageGenerationRequest):
+async def generate_linkedin_image(
+    request: ImageGenerationRequest,
+    current_user: Optional[Dict[str, Any]] = Depends(get_optional_user)
+):
     """
     Generate LinkedIn-optimized image from selected prompt
     """
@@ -100,7 +104,8 @@ async def generate_linkedin_image(request: ImageGenerationRequest):
                     'content_type': request.content_context.get('content_type'),
                     'topic': request.content_context.get('topic'),
                     'industry': request.content_context.get('industry')
-                }
+                },
+                user_id=current_user.get('id') if current_user else None
             )
             
             logger.info(f"Image generated and stored successfully with ID: {image_id}")
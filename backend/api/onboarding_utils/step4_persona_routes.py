@@ -18,8 +18,7 @@ import uuid
 from datetime import datetime, timedelta
 
 from services.persona.core_persona.core_persona_service import CorePersonaService
-from services.persona.enhanced_linguistic_analyzer import EnhancedLinguisticAnalyzer
-from services.persona.persona_quality_improver import PersonaQualityImprover
+from services.persona.nlp_models import get_quality_improver
 from middleware.auth_middleware import get_current_user
 from services.user_api_key_context import user_api_keys
 
@@ -32,10 +31,8 @@ PERSONA_CACHE_TTL_HOURS = 24
 
 router = APIRouter()
 
-# Initialize services
+# Initialize services (NLP models are loaded on first use, see services.persona.nlp_models)
 core_persona_service = CorePersonaService()
-linguistic_analyzer = EnhancedLinguisticAnalyzer()
-quality_improver = PersonaQualityImprover()
 
 
 def _extract_user_id(user: Dict[str, Any]) -> str:
@@ -689,10 +686,8 @@ async def assess_persona_quality_internal(
     Internal function to assess persona quality using comprehensive metrics.
     """
     try:
-        from services.persona.persona_quality_improver import PersonaQualityImprover
-        
-        # Initialize quality improver
-        quality_improver = PersonaQualityImprover()
+        # Shared quality improver; the first call loads the NLP models, so keep it off the event loop
+        quality_improver = await asyncio.get_event_loop().run_in_executor(None, get_quality_improver)
         
         # Use mock linguistic analysis if not available
         linguistic_analysis = {
@@ -10,17 +10,14 @@ from pydantic import BaseModel
 from loguru import logger
 
 from services.persona.core_persona.core_persona_service import CorePersonaService
-from services.persona.enhanced_linguistic_analyzer import EnhancedLinguisticAnalyzer
-from services.persona.persona_quality_improver import PersonaQualityImprover
+from services.persona.nlp_models import get_linguistic_analyzer
 from middleware.auth_middleware import get_current_user
 from services.llm_providers.gemini_provider import gemini_structured_json_response
 
 router = APIRouter()
 
-# Initialize services
+# Initialize services (NLP models are loaded on first use, see services.persona.nlp_models)
 core_persona_service = CorePersonaService()
-linguistic_analyzer = EnhancedLinguisticAnalyzer()
-quality_improver = PersonaQualityImprover()
 
 class OptimizedPersonaGenerationRequest(BaseModel):
     """Optimized request model for persona generation."""
@@ -357,10 +354,12 @@ def generate_quality_recommendations(
 async def analyze_linguistic_patterns_async(onboarding_data: Dict[str, Any]) -> Dict[str, Any]:
     """Async linguistic analysis if spaCy is available."""
     try:
-        if linguistic_analyzer.spacy_available:
-            # Extract text samples from onboarding data
-            text_samples = extract_text_samples(onboarding_data)
-            if text_samples:
+        # Extract text samples from onboarding data
+        text_samples = extract_text_samples(onboarding_data)
+        if text_samples:
+            # First use loads the spaCy model; keep that off the event loop
+            linguistic_analyzer = await asyncio.get_event_loop().run_in_executor(None, get_linguistic_analyzer)
+            if linguistic_analyzer.spacy_available:
                 return await asyncio.get_event_loop().run_in_executor(
                     None,
                     linguistic_analyzer.analyze_writing_style,
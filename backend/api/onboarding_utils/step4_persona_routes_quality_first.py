@@ -11,16 +11,13 @@ from pydantic import BaseModel
 from loguru import logger
 
 from services.persona.core_persona.core_persona_service import CorePersonaService
-from services.persona.enhanced_linguistic_analyzer import EnhancedLinguisticAnalyzer
-from services.persona.persona_quality_improver import PersonaQualityImprover
+from services.persona.nlp_models import get_linguistic_analyzer, get_quality_improver
 from middleware.auth_middleware import get_current_user
 
 router = APIRouter()
 
-# Initialize services
+# Initialize services (NLP models are loaded on first use, see services.persona.nlp_models)
 core_persona_service = CorePersonaService()
-linguistic_analyzer = EnhancedLinguisticAnalyzer()  # Will fail if spaCy not available
-quality_improver = PersonaQualityImprover()
 
 class QualityFirstPersonaRequest(BaseModel):
     """Quality-first request model for persona generation."""
@@ -73,6 +70,8 @@ async def generate_writing_personas_quality_first(
         logger.info("Step 1: Enhanced linguistic analysis...")
         text_samples = extract_text_samples_for_analysis(request.onboarding_data)
         if text_samples:
+            # First use loads the spaCy model; keep that off the event loop
+            linguistic_analyzer = await asyncio.get_event_loop().run_in_executor(None, get_linguistic_analyzer)
             linguistic_analysis = await asyncio.get_event_loop().run_in_executor(
                 None,
                 linguistic_analyzer.analyze_writing_style,
@@ -257,6 +256,7 @@ async def assess_persona_quality_ai_based(
     """
     try:
         # Use the actual PersonaQualityImprover for AI-based assessment
+        quality_improver = await asyncio.get_event_loop().run_in_executor(None, get_quality_improver)
         assessment_result = await asyncio.get_event_loop().run_in_executor(
             None,
             quality_improver.assess_persona_quality_comprehensive,
@@ -451,6 +451,7 @@ async def attempt_quality_improvement(
         logger.info("🔄 Attempting persona quality improvement...")
         
         # Use PersonaQualityImprover for actual improvement
+        quality_improver = await asyncio.get_event_loop().run_in_executor(None, get_quality_improver)
         improvement_result = await asyncio.get_event_loop().run_in_executor(
             None,
             quality_improver.improve_persona_quality,
@@ -0,0 +1,77 @@
+"""SEO Dashboard routes for ALwrity (mounted lazily by RouterManager)."""
+
+from fastapi import APIRouter
+
+from api.seo_dashboard import (
+    get_seo_dashboard_data,
+    get_seo_health_score,
+    get_seo_metrics,
+    get_platform_status,
+    get_ai_insights,
+    seo_dashboard_health_check,
+    analyze_seo_comprehensive,
+    analyze_seo_full,
+    get_seo_metrics_detailed,
+    get_analysis_summary,
+    batch_analyze_urls,
+    SEOAnalysisRequest
+)
+
+router = APIRouter(prefix="/api/seo-dashboard")
+
+# SEO Dashboard endpoints
+@router.get("/data")
+async def seo_dashboard_data():
+    """Get complete SEO dashboard data."""
+    return await get_seo_dashboard_data()
+
+@router.get("/health-score")
+async def seo_health_score():
+    """Get SEO health score."""
+    return await get_seo_health_score()
+
+@router.get("/metrics")
+async def seo_metrics():
+    """Get SEO metrics."""
+    return await get_seo_metrics()
+
+@router.get("/platforms")
+async def seo_platforms():
+    """Get platform status."""
+    return await get_platform_status()
+
+@router.get("/insights")
+async def seo_insights():
+    """Get AI insights."""
+    return await get_ai_insights()
+
+@router.get("/health")
+async def seo_dashboard_health():
+    """Health check for SEO dashboard."""
+    return await seo_dashboard_health_check()
+
+# Comprehensive SEO Analysis endpoints
+@router.post("/analyze-comprehensive")
+async def analyze_seo_comprehensive_endpoint(request: SEOAnalysisRequest):
+    """Analyze a URL for comprehensive SEO performance."""
+    return await analyze_seo_comprehensive(request)
+
+@router.post("/analyze-full")
+async def analyze_seo_full_endpoint(request: SEOAnalysisRequest):
+    """Analyze a URL for comprehensive SEO performance."""
+    return await analyze_seo_full(request)
+
+@router.get("/metrics-detailed")
+async def seo_metrics_detailed(url: str):
+    """Get detailed SEO metrics for a URL."""
+    return await get_seo_metrics_detailed(url)
+
+@router.get("/analysis-summary")
+async def seo_analysis_summary(url: str):
+    """Get a quick summary of SEO analysis for a URL."""
+    return await get_analysis_summary(url)
+
+@router.post("/batch-analyze")
+async def batch_analyze_urls_endpoint(urls: list[str]):
+    """Analyze multiple URLs in batch."""
+    return await batch_analyze_urls(urls)
@@ -483,35 +483,34 @@ async def test_publish_real(payload: Dict[str, Any]) -> Dict[str, Any]:
     TEST ENDPOINT: Perform a real publish to Wix using a provided access token.
 
     Notes:
-      - Expects request.access_token from the frontend's Wix SDK tokens
+      - Expects request.access_token from the frontend's Wix SDK tokens, or a
+        refresh_token to obtain (and cache) one server-side
       - Derives member_id server-side (required by Wix for third-party apps)
+      - Optional image_urls, categories and tags (labels) are imported and
+        resolved concurrently before the draft is created
     """
     try:
         access_token = payload.get("access_token")
+        if not access_token and payload.get("refresh_token"):
+            access_token = await wix_service.get_access_token(payload["refresh_token"])
         if not access_token:
             raise HTTPException(status_code=400, detail="Missing access_token")
 
-        # Derive current member id from token (try local decode first, then API fallback)
-        member_id = wix_service.extract_member_id_from_access_token(access_token)
-        if not member_id:
-            member_info = wix_service.get_current_member(access_token)
-            member_id = (
-                (member_info.get("member") or {}).get("id")
-                or member_info.get("id")
+        try:
+            result = await wix_service.publish_blog_post(
+                access_token=access_token,
+                title=payload.get("title") or "Untitled",
+                content=payload.get("content") or "",
+                cover_image_url=payload.get("cover_image_url"),
+                image_urls=payload.get("image_urls") or None,
+                category_ids=payload.get("category_ids") or None,
+                tag_ids=payload.get("tag_ids") or None,
+                categories=payload.get("categories") or None,
+                tags=payload.get("tags") or None,
+                publish=bool(payload.get("publish", True)),
             )
-        if not member_id:
-            raise HTTPException(status_code=400, detail="Unable to resolve member_id from token")
-
-        result = wix_service.create_blog_post(
-            access_token=access_token,
-            title=payload.get("title") or "Untitled",
-            content=payload.get("content") or "",
-            cover_image_url=payload.get("cover_image_url"),
-            category_ids=payload.get("category_ids") or None,
-            tag_ids=payload.get("tag_ids") or None,
-            publish=bool(payload.get("publish", True)),
-            member_id=member_id,
-        )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
         return {
             "success": True,
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional
 from loguru import logger
 
+from middleware.auth_middleware import get_current_user, get_optional_user
 from services.writing_assistant import WritingAssistantService
 
 
@@ -14,6 +18,12 @@ class SuggestRequest(BaseModel):
     max_results: int | None = 1
 
 
+class IncrementalSuggestRequest(BaseModel):
+    text: str
+    session_id: str
+    max_results: int | None = 1
+
+
 class SourceModel(BaseModel):
     title: str
     url: str
@@ -32,30 +42,74 @@ class SuggestionModel(BaseModel):
 class SuggestResponse(BaseModel):
     success: bool
     suggestions: List[SuggestionModel]
+    superseded: bool = False
 
 
 assistant_service = WritingAssistantService()
 
 
+def _to_response(suggestions) -> SuggestResponse:
+    return SuggestResponse(
+        success=True,
+        suggestions=[
+            SuggestionModel(
+                text=s.text,
+                confidence=s.confidence,
+                sources=[
+                    SourceModel(**src) for src in s.sources
+                ],
+            )
+            for s in suggestions
+        ],
+    )
+
+
 @router.post("/suggest", response_model=SuggestResponse)
-async def suggest_endpoint(req: SuggestRequest) -> SuggestResponse:
+async def suggest_endpoint(
+    req: SuggestRequest, current_user: Optional[Dict[str, Any]] = Depends(get_optional_user)
+) -> SuggestResponse:
+    """Suggest a continuation; cached suggestions are only reused for signed-in users."""
     try:
-        suggestions = await assistant_service.suggest(req.text, req.max_results or 1)
-        return SuggestResponse(
-            success=True,
-            suggestions=[
-                SuggestionModel(
-                    text=s.text,
-                    confidence=s.confidence,
-                    sources=[
-                        SourceModel(**src) for src in s.sources
-                    ],
-                )
-                for s in suggestions
-            ],
+        user_id = str(current_user.get('id')) if current_user else None
+        suggestions = await assistant_service.suggest(req.text, req.max_results or 1, user_id=user_id)
+        return _to_response(suggestions)
+    except Exception as e:
+        logger.error(f"Writing assistant error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/suggest/incremental", response_model=SuggestResponse)
+async def suggest_incremental_endpoint(
+    req: IncrementalSuggestRequest, current_user: Dict[str, Any] = Depends(get_current_user)
+) -> SuggestResponse:
+    """Debounced suggest for typing; superseded is set when a newer request for the session replaced this one."""
+    try:
+        suggestions = await assistant_service.suggest_incremental(
+            str(current_user.get('id')), req.session_id, req.text, req.max_results or 1
         )
+        if suggestions is None:
+            return SuggestResponse(success=True, suggestions=[], superseded=True)
+        return _to_response(suggestions)
     except Exception as e:
         logger.error(f"Writing assistant error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/suggest/stream")
+async def suggest_stream_endpoint(
+    req: IncrementalSuggestRequest, current_user: Dict[str, Any] = Depends(get_current_user)
+) -> StreamingResponse:
+    """Debounced suggest streamed as server-sent events while the continuation is generated."""
+    user_id = str(current_user.get('id'))
+
+    async def suggestion_events():
+        async for event in assistant_service.stream_suggestion(user_id, req.session_id, req.text):
+            yield f"data: {json.dumps(event, default=str)}\n\n"
+
+    return StreamingResponse(
+        suggestion_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"}
+    )
+
+
@@ -24,59 +24,12 @@ setup_clean_logging()
 # Import middleware
 from middleware.auth_middleware import get_current_user
 
-# Import component logic endpoints
-from api.component_logic import router as component_logic_router
-
-# Import subscription API endpoints
-from api.subscription_api import router as subscription_router
-
-# Import Step 3 onboarding routes
-from api.onboarding_utils.step3_routes import router as step3_routes
-
-# Import SEO tools router
-from routers.seo_tools import router as seo_tools_router
-# Import Facebook Writer endpoints
-from api.facebook_writer.routers import facebook_router
-# Import LinkedIn content generation router
-from routers.linkedin import router as linkedin_router
-# Import LinkedIn image generation router
-from api.linkedin_image_generation import router as linkedin_image_router
-from api.brainstorm import router as brainstorm_router
-
-# Import hallucination detector router
-from api.hallucination_detector import router as hallucination_detector_router
-from api.writing_assistant import router as writing_assistant_router
-
-# Import user data endpoints
-# Import content planning endpoints
-from api.content_planning.api.router import router as content_planning_router
-from api.user_data import router as user_data_router
-
-# Import user environment endpoints
-from api.user_environment import router as user_environment_router
-
-# Import strategy copilot endpoints
-from api.content_planning.strategy_copilot import router as strategy_copilot_router
+# Routers are included (core) or registered for lazy mounting (heavy) by RouterManager
+# below; importing them here would load every router at module import.
 
 # Import database service
 from services.database import init_database, close_database
 
-# Import SEO Dashboard endpoints
-from api.seo_dashboard import (
-    get_seo_dashboard_data,
-    get_seo_health_score,
-    get_seo_metrics,
-    get_platform_status,
-    get_ai_insights,
-    seo_dashboard_health_check,
-    analyze_seo_comprehensive,
-    analyze_seo_full,
-    get_seo_metrics_detailed,
-    get_analysis_summary,
-    batch_analyze_urls,
-    SEOAnalysisRequest
-)
-
 # Initialize FastAPI app
 app = FastAPI(
     title="ALwrity Backend API",
@@ -106,20 +59,42 @@ frontend_serving = FrontendServing(app)
 router_manager = RouterManager(app)
 onboarding_manager = OnboardingManager(app)
 
+# Long-running tasks started at startup; referenced so they are not garbage-collected, cancelled on shutdown
+background_tasks = []
+
+
+def _log_background_task_result(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task {task.get_name()} failed: {task.exception()}")
+
+
+def start_background_task(coro, name: str) -> asyncio.Task:
+    task = asyncio.create_task(coro, name=name)
+    task.add_done_callback(_log_background_task_result)
+    background_tasks.append(task)
+    return task
+
 # Middleware Order (FastAPI executes in REVERSE order of registration - LIFO):
-# Registration order:  1. Monitoring  2. Rate Limit  3. API Key Injection
-# Execution order:     1. API Key Injection (sets user_id)  2. Rate Limit  3. Monitoring (uses user_id)
+# Registration order:  0. Lazy Routers  1. Monitoring  2. Stability Result Cache  3. Rate Limit  4. API Key Injection
+# Execution order:     1. API Key Injection (sets user_id)  2. Rate Limit  3. Stability Result Cache  4. Monitoring (uses user_id)  5. Lazy Routers
+
+# 0. Mounts heavy routers on the first request under their prefix, right before routing
+app.middleware("http")(router_manager.lazy_router_middleware)
 
 # 1. FIRST REGISTERED (runs LAST) - Monitoring middleware
 app.middleware("http")(monitoring_middleware)
 
-# 2. SECOND REGISTERED (runs SECOND) - Rate limiting
+# 2. Serves repeated deterministic Stability operations from disk (cache hits are not billed)
+from middleware.stability_middleware import caching as stability_result_caching
+app.middleware("http")(stability_result_caching)
+
+# 3. Rate limiting
 @app.middleware("http")
 async def rate_limit_middleware(request: Request, call_next):
     """Rate limiting middleware using modular utilities."""
     return await rate_limiter.rate_limit_middleware(request, call_next)
 
-# 3. LAST REGISTERED (runs FIRST) - API key injection
+# 4. LAST REGISTERED (runs FIRST) - API key injection
 from middleware.api_key_injection_middleware import api_key_injection_middleware
 app.middleware("http")(api_key_injection_middleware)
 
@@ -174,63 +149,7 @@ async def onboarding_status():
 # Include routers using modular utilities
 router_manager.include_core_routers()
 router_manager.include_optional_routers()
-
-# SEO Dashboard endpoints
-@app.get("/api/seo-dashboard/data")
-async def seo_dashboard_data():
-    """Get complete SEO dashboard data."""
-    return await get_seo_dashboard_data()
-
-@app.get("/api/seo-dashboard/health-score")
-async def seo_health_score():
-    """Get SEO health score."""
-    return await get_seo_health_score()
-
-@app.get("/api/seo-dashboard/metrics")
-async def seo_metrics():
-    """Get SEO metrics."""
-    return await get_seo_metrics()
-
-@app.get("/api/seo-dashboard/platforms")
-async def seo_platforms():
-    """Get platform status."""
-    return await get_platform_status()
-
-@app.get("/api/seo-dashboard/insights")
-async def seo_insights():
-    """Get AI insights."""
-    return await get_ai_insights()
-
-@app.get("/api/seo-dashboard/health")
-async def seo_dashboard_health():
-    """Health check for SEO dashboard."""
-    return await seo_dashboard_health_check()
-
-# Comprehensive SEO Analysis endpoints
-@app.post("/api/seo-dashboard/analyze-comprehensive")
-async def analyze_seo_comprehensive_endpoint(request: SEOAnalysisRequest):
-    """Analyze a URL for comprehensive SEO performance."""
-    return await analyze_seo_comprehensive(request)
-
-@app.post("/api/seo-dashboard/analyze-full")
-async def analyze_seo_full_endpoint(request: SEOAnalysisRequest):
-    """Analyze a URL for comprehensive SEO performance."""
-    return await analyze_seo_full(request)
-
-@app.get("/api/seo-dashboard/metrics-detailed")
-async def seo_metrics_detailed(url: str):
-    """Get detailed SEO metrics for a URL."""
-    return await get_seo_metrics_detailed(url)
-
-@app.get("/api/seo-dashboard/analysis-summary")
-async def seo_analysis_summary(url: str):
-    """Get a quick summary of SEO analysis for a URL."""
-    return await get_analysis_summary(url)
-
-@app.post("/api/seo-dashboard/batch-analyze")
-async def batch_analyze_urls_endpoint(urls: list[str]):
-    """Analyze multiple URLs in batch."""
-    return await batch_analyze_urls(urls)
+router_manager.include_lazy_routers()
 
 # Setup frontend serving using modular utilities
 frontend_serving.setup_frontend_serving()
@@ -248,6 +167,23 @@ async def startup_event():
     try:
         # Initialize database
         init_database()
+        # Prune raw API monitoring rows and expired rollups in the background
+        from services.api_monitoring_service import run_retention_scheduler
+        start_background_task(run_retention_scheduler(), "api_monitoring_retention")
+        # Drop expired rows from the SQLite result caches
+        from utils.sqlite_utils import run_purge_scheduler
+        from services.content_gap_analyzer.competitor_crawler import CompetitorCrawlCache
+        from services.seo_tools.pagespeed_cache import PageSpeedCache
+        from services.hallucination_claim_cache import ClaimVerificationCache
+        start_background_task(
+            run_purge_scheduler([CompetitorCrawlCache, PageSpeedCache, ClaimVerificationCache]), "sqlite_cache_purge"
+        )
+        # Pick up Stability batch items left unfinished by a previous run
+        from services.stability_batch_engine import stability_batch_engine
+        start_background_task(stability_batch_engine.resume_unfinished(), "stability_batch_resume")
+        # Mount lazy routers and load persona NLP models once the server is listening
+        from services.persona.nlp_models import warm_up_persona_models
+        start_background_task(router_manager.warm_up_lazy_routers(warmups=[warm_up_persona_models]), "lazy_router_warm_up")
         logger.info("ALwrity backend started successfully")
     except Exception as e:
         logger.error(f"Error during startup: {e}")
@@ -257,8 +193,31 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     try:
+        # Stop the startup background tasks (retention and cache purges, batch resume, warm-up)
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        background_tasks.clear()
         # Close database connections
         close_database()
+        # Stop image analysis worker processes
+        from utils.stability_utils import shutdown_image_analysis_pool
+        shutdown_image_analysis_pool()
+        # Stop competitor crawl worker processes
+        from services.content_gap_analyzer.competitor_crawler import shutdown_crawl_pool
+        shutdown_crawl_pool()
+        # Close the shared PageSpeed Insights session
+        from services.seo_tools.pagespeed_service import close_pagespeed_session
+        await close_pagespeed_session()
+        # Close the shared Exa search session
+        from services.research.exa_search_client import exa_search_client
+        await exa_search_client.close()
+        # Close the shared Wix API session
+        from services.integrations.wix.client import wix_client
+        await wix_client.close()
+        # Stop Stability batches (unfinished items resume on the next start) and close their client
+        from services.stability_batch_engine import stability_batch_engine
+        await stability_batch_engine.close()
         logger.info("ALwrity backend shutdown successfully")
     except Exception as e:
         logger.error(f"Error during shutdown: {e}") 
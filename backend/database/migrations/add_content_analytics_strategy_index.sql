@@ -0,0 +1,5 @@
+-- Migration: Add composite index on content_analytics(strategy_id, recorded_at)
+-- Description: Supports per-strategy time-range aggregations in AIAnalyticsService
+-- Date: 2026-10-18
+
+CREATE INDEX IF NOT EXISTS idx_content_analytics_strategy_recorded ON content_analytics(strategy_id, recorded_at);
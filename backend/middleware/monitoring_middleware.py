@@ -20,8 +20,13 @@ import re
 from models.api_monitoring import APIRequest, APIEndpointStats, SystemHealth, CachePerformance
 from models.subscription_models import APIProvider
 from services.database import get_db
+from services.api_monitoring_service import api_monitoring_rollups
 from services.usage_tracking_service import UsageTrackingService
 from services.pricing_service import PricingService
+from services.usage_quota_ledger import usage_quota_ledger
+
+# Internal route families that must never accrue or check provider usage
+PROVIDER_IGNORED_PREFIXES = ('/api/onboarding/', '/api/subscription/')
 
 class DatabaseAPIMonitor:
     """Database-backed API monitoring with usage tracking and subscription management."""
@@ -45,6 +50,11 @@ class DatabaseAPIMonitor:
             APIProvider.METAPHOR: [r'metaphor', r'/exa'],
             APIProvider.FIRECRAWL: [r'firecrawl']
         }
+        # One precompiled alternation per provider, checked in declaration order
+        self._provider_router = [
+            (provider, re.compile('|'.join(f'(?:{pattern})' for pattern in patterns)))
+            for provider, patterns in self.provider_patterns.items()
+        ]
     
     def detect_api_provider(self, path: str, user_agent: str = None) -> Optional[APIProvider]:
         """Detect which API provider is being used based on request details."""
@@ -52,13 +62,12 @@ class DatabaseAPIMonitor:
         user_agent_lower = (user_agent or '').lower()
 
         # Permanently ignore internal route families that must not accrue or check provider usage
-        if path_lower.startswith('/api/onboarding/') or path_lower.startswith('/api/subscription/'):
+        if path_lower.startswith(PROVIDER_IGNORED_PREFIXES):
             return None
         
-        for provider, patterns in self.provider_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, path_lower) or re.search(pattern, user_agent_lower):
-                    return provider
+        for provider, pattern in self._provider_router:
+            if pattern.search(path_lower) or pattern.search(user_agent_lower):
+                return provider
         
         return None
     
@@ -224,6 +233,9 @@ class DatabaseAPIMonitor:
             if endpoint_stats.max_duration is None or duration > endpoint_stats.max_duration:
                 endpoint_stats.max_duration = duration
             
+            # Update time-bucketed rollups used by the dashboards
+            api_monitoring_rollups.record(db, endpoint_key, status_code, duration)
+            
             db.commit()
             
             # Update cache stats
@@ -247,23 +259,18 @@ class DatabaseAPIMonitor:
             now = datetime.utcnow()
             since = now - timedelta(minutes=minutes)
             
-            # Recent requests
-            recent_requests = db.query(APIRequest).filter(
-                APIRequest.timestamp >= since
-            ).count()
-            
-            # Recent errors
-            recent_errors = db.query(APIRequest).filter(
-                and_(
-                    APIRequest.timestamp >= since,
-                    APIRequest.status_code >= 400
-                )
-            ).count()
+            # Recent counts and latency come from the rollups
+            window = api_monitoring_rollups.get_window_summary(db, minutes, now=now)
+            recent_requests = window['requests']
+            recent_errors = window['errors']
             
             # Top endpoints
             top_endpoints = db.query(APIEndpointStats).order_by(
                 APIEndpointStats.total_requests.desc()
             ).limit(10).all()
+            endpoint_windows = api_monitoring_rollups.get_endpoint_summaries(
+                db, minutes, [endpoint.endpoint for endpoint in top_endpoints], now=now
+            )
             
             # Recent errors details
             recent_error_details = db.query(APIRequest).filter(
@@ -273,9 +280,11 @@ class DatabaseAPIMonitor:
                 )
             ).order_by(APIRequest.timestamp.desc()).limit(10).all()
             
-            # Overall stats
-            total_requests = db.query(APIRequest).count()
-            total_errors = db.query(APIRequest).filter(APIRequest.status_code >= 400).count()
+            # Overall stats from the cumulative per-endpoint counters (raw rows are pruned)
+            total_requests, total_errors = db.query(
+                func.coalesce(func.sum(APIEndpointStats.total_requests), 0),
+                func.coalesce(func.sum(APIEndpointStats.total_errors), 0)
+            ).one()
             
             # Calculate error rate
             error_rate = (recent_errors / max(recent_requests, 1)) * 100
@@ -288,6 +297,11 @@ class DatabaseAPIMonitor:
                     'recent_requests': recent_requests,
                     'recent_errors': recent_errors
                 },
+                'latency': {
+                    'avg': window['avg_duration'],
+                    'p50': window['p50_duration'],
+                    'p95': window['p95_duration']
+                },
                 'cache_performance': self.cache_stats,
                 'top_endpoints': [
                     {
@@ -296,7 +310,10 @@ class DatabaseAPIMonitor:
                         'avg_time': round(endpoint.avg_duration or 0.0, 3),
                         'errors': endpoint.total_errors or 0,
                         'last_called': endpoint.last_called.isoformat() if endpoint.last_called else None,
-                        'cache_hit_rate': round(endpoint.cache_hit_rate or 0.0, 2)
+                        'cache_hit_rate': round(endpoint.cache_hit_rate or 0.0, 2),
+                        'recent_count': endpoint_windows[endpoint.endpoint]['requests'],
+                        'recent_p50': endpoint_windows[endpoint.endpoint]['p50_duration'],
+                        'recent_p95': endpoint_windows[endpoint.endpoint]['p95_duration']
                     }
                     for endpoint in top_endpoints
                 ],
@@ -329,19 +346,11 @@ class DatabaseAPIMonitor:
         """Get lightweight stats for dashboard header."""
         try:
             now = datetime.utcnow()
-            since = now - timedelta(minutes=5)
             
             # Quick stats for dashboard
-            recent_requests = db.query(APIRequest).filter(
-                APIRequest.timestamp >= since
-            ).count()
-            
-            recent_errors = db.query(APIRequest).filter(
-                and_(
-                    APIRequest.timestamp >= since,
-                    APIRequest.status_code >= 400
-                )
-            ).count()
+            window = api_monitoring_rollups.get_window_summary(db, 5, now=now)
+            recent_requests = window['requests']
+            recent_errors = window['errors']
             
             # Determine status
             if recent_errors == 0:
@@ -399,45 +408,38 @@ async def check_usage_limits_middleware(request: Request, user_id: str, request_
         return None
     
     # No special whitelist; onboarding/subscription are ignored by provider detection
+    db = None
     try:
-        path = request.url.path
-    except Exception:
-        pass
-    
-    try:
-        db = next(get_db())
-        api_monitor = DatabaseAPIMonitor()
-        
         # Detect if this is an API call that should be rate limited
         api_provider = api_monitor.detect_api_provider(request.url.path, request.headers.get('user-agent'))
         if not api_provider:
             return None
         
-        # Use provided request body or read it if not provided
-        if request_body is None:
-            try:
-                if hasattr(request, '_body'):
-                    request_body = request._body
-                else:
-                    # Try to read body (this might not work in all cases)
-                    body = await request.body()
-                    request_body = body.decode('utf-8') if body else None
-            except:
-                pass
-        
-        # Estimate tokens needed
+        # Estimate tokens needed, only when a token limit applies to this provider
         tokens_requested = 0
-        if request_body:
-            usage_metrics = api_monitor.extract_usage_metrics(request_body)
-            tokens_requested = usage_metrics.get('tokens_input', 0)
+        if usage_quota_ledger.needs_token_estimate(user_id, api_provider):
+            # Use provided request body or read it if not provided
+            if request_body is None:
+                try:
+                    if hasattr(request, '_body'):
+                        request_body = request._body
+                    else:
+                        # Try to read body (this might not work in all cases)
+                        body = await request.body()
+                        request_body = body.decode('utf-8') if body else None
+                except:
+                    pass
+            if request_body:
+                usage_metrics = api_monitor.extract_usage_metrics(request_body)
+                tokens_requested = usage_metrics.get('tokens_input', 0)
         
-        # Check limits
-        usage_service = UsageTrackingService(db)
-        can_proceed, message, usage_info = await usage_service.enforce_usage_limits(
-            user_id=user_id,
-            provider=api_provider,
-            tokens_requested=tokens_requested
-        )
+        # Check limits against the in-memory ledger; seed it from the database on a miss
+        result = usage_quota_ledger.check(user_id, api_provider, tokens_requested)
+        if result is None:
+            db = next(get_db())
+            usage_quota_ledger.load(db, user_id)
+            result = usage_quota_ledger.check(user_id, api_provider, tokens_requested)
+        can_proceed, message, usage_info = result
         
         if not can_proceed:
             logger.warning(f"Usage limit exceeded for {user_id}: {message}")
@@ -462,7 +464,8 @@ async def check_usage_limits_middleware(request: Request, user_id: str, request_
         # Don't block requests if usage checking fails
         return None
     finally:
-        db.close()
+        if db is not None:
+            db.close()
 
 async def monitoring_middleware(request: Request, call_next):
     """Enhanced FastAPI middleware for monitoring API calls with usage tracking."""
@@ -2,15 +2,19 @@
 
 import time
 import asyncio
+import hashlib
 import os
 from typing import Dict, Any, Optional, List
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.datastructures import UploadFile as StarletteUploadFile
 import json
 from loguru import logger
 from datetime import datetime, timedelta
 
+CACHE_HASH_CHUNK_SIZE = 64 * 1024
+
 
 class RateLimitMiddleware:
     """Rate limiting middleware for Stability AI API calls."""
@@ -383,18 +387,41 @@ class ContentModerationMiddleware:
         ]
 
 
+# Deterministic Stability operations whose results are cached on disk, by path.
+# The flag marks operations that are only deterministic with an explicit (non-zero) seed.
+DETERMINISTIC_OPERATIONS = {
+    "/api/stability/upscale/fast": ("upscale_fast", False),
+    "/api/stability/edit/remove-background": ("remove_background", False),
+    "/api/stability/upscale/conservative": ("upscale_conservative", True),
+    "/api/stability/generate/core": ("generate_core", True),
+    "/api/stability/generate/sd3": ("generate_sd3", True),
+}
+
+
 class CachingMiddleware:
     """Caching middleware for Stability AI responses."""
     
-    def __init__(self, cache_duration: int = 3600):
+    def __init__(self, cache_duration: int = 3600, max_entries: int = 256, result_cache=None):
         """Initialize caching middleware.
         
         Args:
             cache_duration: Cache duration in seconds
+            max_entries: Maximum number of in-memory (JSON) entries
+            result_cache: On-disk cache for deterministic operation results;
+                created on first use when not given
         """
         self.cache_duration = cache_duration
-        self.cache: Dict[str, Dict[str, Any]] = {}
+        self.max_entries = max_entries
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self.cache_times: Dict[str, float] = {}
+        self._result_cache = result_cache
+    
+    @property
+    def result_cache(self):
+        if self._result_cache is None:
+            from services.cache.stability_result_cache import StabilityResultCache
+            self._result_cache = StabilityResultCache()
+        return self._result_cache
     
     async def __call__(self, request: Request, call_next):
         """Process request with caching.
@@ -406,6 +433,14 @@ class CachingMiddleware:
         Returns:
             Response (cached or fresh)
         """
+        # Skip non-Stability endpoints
+        if not request.url.path.startswith("/api/stability"):
+            return await call_next(request)
+        
+        # Deterministic operations are served from the on-disk result cache
+        if request.method == "POST" and request.url.path in DETERMINISTIC_OPERATIONS:
+            return await self._call_with_result_cache(request, call_next)
+        
         # Skip caching for non-cacheable endpoints
         if not self._should_cache(request):
             return await call_next(request)
@@ -416,6 +451,7 @@ class CachingMiddleware:
         # Check cache
         if self._is_cached(cache_key):
             logger.info(f"Returning cached result for {cache_key}")
+            self.cache.move_to_end(cache_key)
             cached_data = self.cache[cache_key]
             
             return JSONResponse(
@@ -428,10 +464,102 @@ class CachingMiddleware:
         
         # Cache successful responses
         if response.status_code == 200 and self._should_cache_response(response):
-            await self._cache_response(cache_key, response)
+            response = await self._cache_response(cache_key, response)
         
         return response
     
+    async def _result_cache_key(self, request: Request) -> Optional[str]:
+        """Build the result cache key from the multipart form, or None if not cacheable.
+        
+        Args:
+            request: FastAPI request
+            
+        Returns:
+            Cache key
+        """
+        operation, needs_seed = DETERMINISTIC_OPERATIONS[request.url.path]
+        # The body is cached on the request and replayed to the endpoint
+        await request.body()
+        form = await request.form()
+        try:
+            params: Dict[str, Any] = {}
+            input_hashes: Dict[str, str] = {}
+            for name, value in form.multi_items():
+                if isinstance(value, StarletteUploadFile):
+                    digest = hashlib.sha256()
+                    while chunk := await value.read(CACHE_HASH_CHUNK_SIZE):
+                        digest.update(chunk)
+                    input_hashes[name] = digest.hexdigest()
+                else:
+                    params[name] = value
+        finally:
+            await form.close()
+        
+        seed = None
+        if needs_seed:
+            try:
+                seed = int(params.get("seed") or 0)
+            except ValueError:
+                return None
+            # Seed 0 asks Stability for a random seed
+            if seed == 0:
+                return None
+        
+        from services.cache.stability_result_cache import StabilityResultCache
+        return StabilityResultCache.build_key(operation, params, input_hashes, seed)
+    
+    async def _call_with_result_cache(self, request: Request, call_next):
+        """Serve a deterministic operation from the result cache, or cache its result.
+        
+        Args:
+            request: FastAPI request
+            call_next: Next middleware/endpoint
+            
+        Returns:
+            Response (streamed from the cache or fresh)
+        """
+        try:
+            cache_key = await self._result_cache_key(request)
+            cached = self.result_cache.open(cache_key) if cache_key else None
+        except Exception as e:
+            logger.warning(f"Stability result cache unavailable: {e}")
+            cache_key, cached = None, None
+        
+        if cached is not None:
+            from services.cache.stability_result_cache import iter_file
+            file_obj, size, media_type = cached
+            logger.info(f"Returning cached Stability result for {cache_key[:12]}")
+            return StreamingResponse(
+                iter_file(file_obj),
+                media_type=media_type,
+                headers={"Content-Length": str(size), "X-Cache-Hit": "true"}
+            )
+        
+        response = await call_next(request)
+        
+        # Only binary results are deterministic; JSON bodies carry async generation ids
+        media_type = response.headers.get("content-type", "")
+        if cache_key is None or response.status_code != 200 or not media_type.startswith(("image/", "model/", "audio/")):
+            return response
+        
+        operation = DETERMINISTIC_OPERATIONS[request.url.path][0]
+        writer = self.result_cache.writer(cache_key, operation, media_type)
+        body_iterator = response.body_iterator
+        
+        async def tee_to_cache():
+            # Write the result to the cache as it streams to the client
+            try:
+                async for chunk in body_iterator:
+                    writer.write(chunk)
+                    yield chunk
+            except BaseException:
+                writer.abort()
+                raise
+            writer.commit()
+        
+        response.body_iterator = tee_to_cache()
+        return response
+    
     def _should_cache(self, request: Request) -> bool:
         """Check if request should be cached.
         
@@ -506,29 +634,57 @@ class CachingMiddleware:
         cache_time = self.cache_times.get(cache_key, 0)
         return time.time() - cache_time < self.cache_duration
     
-    async def _cache_response(self, cache_key: str, response) -> None:
+    async def _cache_response(self, cache_key: str, response):
         """Cache response data.
         
         Args:
             cache_key: Cache key
             response: Response to cache
+            
+        Returns:
+            Response to send, rebuilt if its body had to be read from the stream
         """
+        # Only cache JSON responses for now
+        if not response.headers.get("content-type", "").startswith("application/json"):
+            return response
+        
+        body = getattr(response, "body", None)
+        if body is None:
+            # call_next returns a streaming response; drain it and send the buffered body instead
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            response = Response(
+                content=body,
+                status_code=response.status_code,
+                headers=dict(response.headers),
+                background=response.background
+            )
+        
         try:
-            # Only cache JSON responses for now
-            if response.headers.get("content-type", "").startswith("application/json"):
-                self.cache[cache_key] = {
-                    "content": json.loads(response.body),
-                    "headers": dict(response.headers)
-                }
-                self.cache_times[cache_key] = time.time()
-        except:
+            content = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
             # Ignore cache errors
-            pass
+            return response
+        
+        self.cache[cache_key] = {
+            "content": content,
+            "headers": {
+                name: value for name, value in response.headers.items()
+                if name not in ("content-length", "content-type")
+            }
+        }
+        self.cache_times[cache_key] = time.time()
+        self.cache.move_to_end(cache_key)
+        # Bounded: drop least recently used entries
+        while len(self.cache) > self.max_entries:
+            evicted_key, _ = self.cache.popitem(last=False)
+            self.cache_times.pop(evicted_key, None)
+        return response
     
     def clear_cache(self) -> None:
-        """Clear all cached data."""
+        """Clear all cached data, including cached operation results."""
         self.cache.clear()
         self.cache_times.clear()
+        self.result_cache.clear()
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics.
@@ -546,7 +702,8 @@ class CachingMiddleware:
             "total_entries": len(self.cache),
             "expired_entries": len(expired_keys),
             "cache_hit_rate": "N/A",  # Would need request tracking
-            "memory_usage": sum(len(str(data)) for data in self.cache.values())
+            "memory_usage": sum(len(str(data)) for data in self.cache.values()),
+            "result_cache": self.result_cache.get_stats()
         }
 
 
@@ -3,7 +3,7 @@ API Monitoring Database Models
 Persistent storage for API monitoring statistics.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, JSON, Index, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, JSON, Index, Text, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import json
@@ -61,6 +61,43 @@ class APIEndpointStats(Base):
         Index('idx_avg_duration', 'avg_duration'),
     )
 
+class APIRequestRollup(Base):
+    """Time-bucketed request aggregates per endpoint (endpoint "*" covers all endpoints)."""
+    
+    __tablename__ = "api_request_rollups"
+    
+    id = Column(Integer, primary_key=True)
+    granularity = Column(String(10), nullable=False)  # "minute" or "hour"
+    bucket_start = Column(DateTime, nullable=False)
+    endpoint = Column(String(500), nullable=False)  # "GET /api/endpoint" or "*"
+    request_count = Column(Integer, default=0)
+    error_count = Column(Integer, default=0)
+    total_duration = Column(Float, default=0.0)
+    min_duration = Column(Float, nullable=True)
+    max_duration = Column(Float, nullable=True)
+    
+    __table_args__ = (
+        UniqueConstraint('granularity', 'bucket_start', 'endpoint', name='uq_rollup_bucket_endpoint'),
+        Index('idx_rollup_endpoint_bucket', 'granularity', 'endpoint', 'bucket_start'),
+    )
+
+class APIRequestRollupLatency(Base):
+    """Latency histogram counters of a rollup row, one row per log-scale bucket."""
+    
+    __tablename__ = "api_request_rollup_latencies"
+    
+    id = Column(Integer, primary_key=True)
+    granularity = Column(String(10), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    endpoint = Column(String(500), nullable=False)
+    latency_bucket = Column(Integer, nullable=False)  # Log-scale bucket index
+    request_count = Column(Integer, default=0)
+    
+    __table_args__ = (
+        UniqueConstraint('granularity', 'bucket_start', 'endpoint', 'latency_bucket',
+                         name='uq_rollup_latency_bucket'),
+    )
+
 class SystemHealth(Base):
     """System health snapshots."""
     
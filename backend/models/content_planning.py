@@ -3,7 +3,7 @@ Content Planning Database Models
 Defines the database schema for content strategy, calendar events, and analytics.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -103,6 +103,11 @@ class ContentAnalytics(Base):
     event = relationship("CalendarEvent", back_populates="analytics")
     strategy = relationship("ContentStrategy", back_populates="analytics")
     
+    # Index for per-strategy time-range aggregations
+    __table_args__ = (
+        Index('idx_content_analytics_strategy_recorded', 'strategy_id', 'recorded_at'),
+    )
+    
     def __repr__(self):
         return f"<ContentAnalytics(id={self.id}, platform='{self.platform}', score={self.performance_score})>"
     
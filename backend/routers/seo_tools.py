@@ -6,7 +6,7 @@ Includes intelligent logging, exception handling, and structured responses.
 """
 
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, HttpUrl, Field, validator
 from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
@@ -68,7 +68,7 @@ class MetaDescriptionRequest(BaseModel):
 class PageSpeedRequest(BaseModel):
     """Request model for PageSpeed Insights analysis"""
     url: HttpUrl = Field(..., description="URL to analyze")
-    strategy: str = Field(default="DESKTOP", description="Analysis strategy (DESKTOP/MOBILE)")
+    strategy: str = Field(default="DESKTOP", description="Analysis strategy (DESKTOP/MOBILE, or BOTH to run them concurrently)")
     locale: str = Field(default="en", description="Locale for analysis")
     categories: List[str] = Field(default=["performance", "accessibility", "best-practices", "seo"])
 
@@ -209,12 +209,19 @@ async def analyze_pagespeed(
     
     try:
         service = PageSpeedService()
-        result = await service.analyze_pagespeed(
-            url=str(request.url),
-            strategy=request.strategy,
-            locale=request.locale,
-            categories=request.categories
-        )
+        if request.strategy.upper() == "BOTH":
+            result = await service.analyze_pagespeed_strategies(
+                url=str(request.url),
+                locale=request.locale,
+                categories=request.categories
+            )
+        else:
+            result = await service.analyze_pagespeed(
+                url=str(request.url),
+                strategy=request.strategy,
+                locale=request.locale,
+                categories=request.categories
+            )
         
         execution_time = (datetime.utcnow() - start_time).total_seconds()
         
@@ -534,6 +541,48 @@ async def execute_website_audit(
     except Exception as e:
         return await handle_seo_tool_exception("execute_website_audit", e, request.dict())
 
+@router.post("/workflow/website-audit/stream")
+async def stream_website_audit(request: WorkflowRequest):
+    """
+    Complete website SEO audit workflow, streamed as server-sent events
+    
+    Emits one event per audit tool as soon as it finishes, then the
+    aggregated audit once every tool has finished or the deadline passed.
+    """
+    website_url = str(request.website_url)
+    competitors = [str(comp) for comp in request.competitors] if request.competitors else []
+
+    async def audit_events():
+        start_time = datetime.utcnow()
+        try:
+            service = EnterpriseSEOService()
+            async for event in service.stream_audit(
+                website_url=website_url,
+                competitors=competitors,
+                target_keywords=request.target_keywords or []
+            ):
+                if event["type"] == "audit_complete":
+                    log_data = {
+                        "operation": "website_audit_workflow",
+                        "website_url": website_url,
+                        "competitors_count": len(competitors),
+                        "overall_score": event["result"].get("overall_score", 0),
+                        "execution_time": (datetime.utcnow() - start_time).total_seconds(),
+                        "streamed": True,
+                        "success": True
+                    }
+                    await save_to_file(f"{LOG_DIR}/workflows.jsonl", log_data)
+                yield f"data: {json.dumps(event, default=str)}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming website audit for {website_url}: {e}")
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e), 'timestamp': datetime.utcnow().isoformat()})}\n\n"
+
+    return StreamingResponse(
+        audit_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"}
+    )
+
 @router.post("/workflow/content-analysis", response_model=BaseResponse)
 @log_api_call
 async def execute_content_analysis(
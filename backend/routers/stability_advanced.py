@@ -10,6 +10,7 @@ import json
 from datetime import datetime, timedelta
 
 from services.stability_service import get_stability_service, StabilityAIService
+from services.stability_batch_engine import BATCH_OPERATIONS, stability_batch_engine
 
 router = APIRouter(prefix="/api/stability/advanced", tags=["Stability AI Advanced"])
 
@@ -483,14 +484,12 @@ async def optimize_prompt(
 async def batch_process_folder(
     images: List[UploadFile] = File(..., description="Multiple images to process"),
     operation: str = Form(..., description="Operation to perform on all images"),
-    operation_params: str = Form("{}", description="JSON parameters for operation"),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
-    stability_service: StabilityAIService = Depends(get_stability_service)
+    operation_params: str = Form("{}", description="JSON parameters for operation")
 ):
     """Process multiple images with the same operation in batch.
     
-    This endpoint allows you to apply the same operation to multiple images
-    efficiently.
+    Images are processed concurrently within the account rate limit. Progress and
+    results are persisted per image and reported by the batch status endpoint.
     """
     try:
         params = json.loads(operation_params)
@@ -498,33 +497,24 @@ async def batch_process_folder(
         raise HTTPException(status_code=400, detail="Invalid JSON in operation_params")
     
     # Validate operation
-    supported_operations = [
-        "upscale_fast", "remove_background", "erase", "generate_ultra", "generate_core"
-    ]
+    supported_operations = list(BATCH_OPERATIONS)
     if operation not in supported_operations:
         raise HTTPException(
             status_code=400, 
             detail=f"Unsupported operation. Supported: {supported_operations}"
         )
     
-    # Start batch processing in background
-    batch_id = f"batch_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-    
-    background_tasks.add_task(
-        _process_batch_images,
-        batch_id,
-        images,
-        operation,
-        params,
-        stability_service
-    )
+    # Uploads are closed once the request ends, so read them before handing off
+    contents = [(image.filename, await image.read()) for image in images]
+    batch_id = await stability_batch_engine.submit(operation, params, contents)
+    status = await asyncio.to_thread(stability_batch_engine.get_status, batch_id)
     
     return {
         "batch_id": batch_id,
         "status": "started",
         "image_count": len(images),
         "operation": operation,
-        "estimated_completion": (datetime.utcnow() + timedelta(minutes=len(images) * 2)).isoformat()
+        "estimated_completion": status["estimated_completion"]
     }
 
 
@@ -532,20 +522,13 @@ async def batch_process_folder(
 async def get_batch_status(batch_id: str):
     """Get the status of a batch processing operation.
     
-    Returns the current status and progress of a batch operation.
+    Returns the current status and progress of a batch operation, with the
+    status and result location of every image.
     """
-    # In a real implementation, you'd store batch status in a database
-    # For now, return a mock response
-    return {
-        "batch_id": batch_id,
-        "status": "processing",
-        "progress": {
-            "completed": 2,
-            "total": 5,
-            "percentage": 40
-        },
-        "estimated_completion": (datetime.utcnow() + timedelta(minutes=5)).isoformat()
-    }
+    status = await asyncio.to_thread(stability_batch_engine.get_status, batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    return status
 
 
 # ==================== HELPER FUNCTIONS ====================
@@ -708,33 +691,6 @@ def _check_model_compatibility(prompt: str, model: str) -> Dict[str, Any]:
     return compatibility
 
 
-async def _process_batch_images(
-    batch_id: str,
-    images: List[UploadFile],
-    operation: str,
-    params: Dict[str, Any],
-    stability_service: StabilityAIService
-):
-    """Background task for processing multiple images."""
-    # In a real implementation, you'd store progress in a database
-    # This is a simplified version for demonstration
-    
-    async with stability_service:
-        for i, image in enumerate(images):
-            try:
-                if operation == "upscale_fast":
-                    await stability_service.upscale_fast(image=image, **params)
-                elif operation == "remove_background":
-                    await stability_service.remove_background(image=image, **params)
-                # Add other operations as needed
-                
-                # Log progress (in real implementation, update database)
-                logger.info(f"Batch {batch_id}: Completed image {i+1}/{len(images)}")
-                
-            except Exception as e:
-                logger.error(f"Batch {batch_id}: Error processing image {i+1}: {str(e)}")
-
-
 # ==================== EXPERIMENTAL ENDPOINTS ====================
 
 @router.post("/experimental/ai-director", summary="AI Director Mode")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark vectorized source-to-section scoring against the per-pair implementation.
+
+Usage:
+    python scripts/benchmark_source_mapper.py [--sections 12] [--sources 60] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from loguru import logger
+
+from models.blog_models import BlogOutlineSection, ResearchSource, BlogResearchResponse
+from services.blog_writer.outline.source_mapper import SourceToSectionMapper
+
+VOCABULARY = (
+    "artificial intelligence machine learning enterprise implementation strategy ethics bias "
+    "transparency neural networks deep tutorial guide automation adoption governance data "
+    "pipeline model training evaluation deployment monitoring security privacy compliance "
+    "customer marketing content search ranking analytics growth revenue cost benchmark"
+).split()
+
+
+SYLLABLES = ["ka", "lo", "mi", "ter", "van", "dis", "pro", "ment", "ul", "ra", "sen", "tiv"]
+
+
+def _build_vocabulary(rng: random.Random, size: int = 600) -> list:
+    """Domain words plus generated words so overlap rates resemble real text."""
+    words = set(VOCABULARY)
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _sentence(rng: random.Random, vocabulary: list, length: int) -> str:
+    return " ".join(rng.choice(vocabulary) for _ in range(length)).capitalize()
+
+
+def build_fixture(n_sections: int, n_sources: int, seed: int = 42):
+    """Build synthetic outline sections and research data."""
+    rng = random.Random(seed)
+    vocabulary = _build_vocabulary(rng)
+    sections = [
+        BlogOutlineSection(
+            id=f"s{i + 1}",
+            heading=_sentence(rng, vocabulary, 6),
+            subheadings=[_sentence(rng, vocabulary, 4) for _ in range(3)],
+            key_points=[_sentence(rng, vocabulary, 6) for _ in range(4)],
+            keywords=[_sentence(rng, vocabulary, 2).lower() for _ in range(4)],
+        )
+        for i in range(n_sections)
+    ]
+    sources = [
+        ResearchSource(
+            title=_sentence(rng, vocabulary, 8),
+            url=f"https://example.com/source-{i}",
+            excerpt=_sentence(rng, vocabulary, 40),
+            credibility_score=0.8,
+            index=i,
+        )
+        for i in range(n_sources)
+    ]
+    research = BlogResearchResponse(
+        sources=sources,
+        keyword_analysis={
+            'primary': [_sentence(rng, vocabulary, 2).lower() for _ in range(3)],
+            'secondary': [rng.choice(VOCABULARY) for _ in range(5)],
+            'semantic_keywords': [rng.choice(VOCABULARY) for _ in range(5)],
+            'search_intent': 'informational',
+        },
+        suggested_angles=[_sentence(rng, vocabulary, 4) for _ in range(5)],
+    )
+    return sections, research
+
+
+def pairwise_scores(mapper: SourceToSectionMapper, sections, research) -> np.ndarray:
+    """Score all pairs with the per-pair methods (the previous implementation)."""
+    scores = np.zeros((len(sections), len(research.sources)))
+    for i, section in enumerate(sections):
+        for j, source in enumerate(research.sources):
+            scores[i, j] = (
+                mapper._calculate_semantic_similarity(section, source) * mapper.weights['semantic'] +
+                mapper._calculate_keyword_relevance(section, source, research) * mapper.weights['keyword'] +
+                mapper._calculate_contextual_relevance(section, source, research) * mapper.weights['contextual']
+            )
+    return scores
+
+
+def _best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, default=12)
+    parser.add_argument("--sources", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    mapper = SourceToSectionMapper()
+    sections, research = build_fixture(args.sections, args.sources)
+
+    expected = pairwise_scores(mapper, sections, research)
+    actual = mapper._compute_score_matrix(sections, research.sources, research)
+    max_diff = float(np.max(np.abs(expected - actual)))
+
+    pairwise_time = _best_of(lambda: pairwise_scores(mapper, sections, research), args.repeat)
+    vectorized_time = _best_of(lambda: mapper._algorithmic_source_mapping(sections, research), args.repeat)
+
+    logger.info(f"{args.sections} sections x {args.sources} sources ({args.sections * args.sources} pairs)")
+    logger.info(f"Per-pair scoring:   {pairwise_time * 1000:.1f} ms")
+    logger.info(f"Vectorized mapping: {vectorized_time * 1000:.1f} ms")
+    logger.info(f"Speedup: {pairwise_time / vectorized_time:.1f}x, max score difference: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
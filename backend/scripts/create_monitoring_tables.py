@@ -85,6 +85,31 @@ def create_monitoring_tables():
                 avg_response_time FLOAT DEFAULT 0.0,
                 total_requests INTEGER DEFAULT 0
             );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS api_request_rollups (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                granularity VARCHAR(10) NOT NULL,
+                bucket_start DATETIME NOT NULL,
+                endpoint VARCHAR(500) NOT NULL,
+                request_count INTEGER DEFAULT 0,
+                error_count INTEGER DEFAULT 0,
+                total_duration FLOAT DEFAULT 0.0,
+                min_duration FLOAT,
+                max_duration FLOAT,
+                CONSTRAINT uq_rollup_bucket_endpoint UNIQUE (granularity, bucket_start, endpoint)
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS api_request_rollup_latencies (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                granularity VARCHAR(10) NOT NULL,
+                bucket_start DATETIME NOT NULL,
+                endpoint VARCHAR(500) NOT NULL,
+                latency_bucket INTEGER NOT NULL,
+                request_count INTEGER DEFAULT 0,
+                CONSTRAINT uq_rollup_latency_bucket UNIQUE (granularity, bucket_start, endpoint, latency_bucket)
+            );
             """
         ]
         
@@ -100,7 +125,8 @@ def create_monitoring_tables():
             "CREATE INDEX IF NOT EXISTS idx_system_health_timestamp ON system_health(timestamp);",
             "CREATE INDEX IF NOT EXISTS idx_system_health_status ON system_health(status);",
             "CREATE INDEX IF NOT EXISTS idx_cache_performance_timestamp ON cache_performance(timestamp);",
-            "CREATE INDEX IF NOT EXISTS idx_cache_performance_cache_type ON cache_performance(cache_type);"
+            "CREATE INDEX IF NOT EXISTS idx_cache_performance_cache_type ON cache_performance(cache_type);",
+            "CREATE INDEX IF NOT EXISTS idx_rollup_endpoint_bucket ON api_request_rollups(granularity, endpoint, bucket_start);"
         ]
         
         # Execute table creation
@@ -117,7 +143,8 @@ def create_monitoring_tables():
         db.commit()
         
         # Verify table creation
-        tables_to_check = ['api_requests', 'api_endpoint_stats', 'system_health', 'cache_performance']
+        tables_to_check = ['api_requests', 'api_endpoint_stats', 'system_health', 'cache_performance', 'api_request_rollups',
+                           'api_request_rollup_latencies']
         for table_name in tables_to_check:
             result = db.execute(text(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}';"))
             table_exists = result.fetchone()
@@ -152,7 +179,8 @@ def drop_monitoring_tables():
         db = SessionLocal()
         
         # Drop tables
-        tables_to_drop = ['api_requests', 'api_endpoint_stats', 'system_health', 'cache_performance']
+        tables_to_drop = ['api_requests', 'api_endpoint_stats', 'system_health', 'cache_performance', 'api_request_rollups',
+                          'api_request_rollup_latencies']
         logger.info("Dropping API monitoring tables...")
         
         for table_name in tables_to_drop:
@@ -16,6 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.database import get_db
 from models.api_monitoring import APIRequest, APIEndpointStats
+from services.api_monitoring_service import api_monitoring_rollups
 from loguru import logger
 
 def generate_test_monitoring_data():
@@ -79,6 +80,7 @@ def generate_test_monitoring_data():
                 timestamp=timestamp
             )
             db.add(api_request)
+            api_monitoring_rollups.record(db, f"{method} {path}", status_code, duration, timestamp)
         
         # Generate endpoint stats
         for method, path in endpoints:
@@ -0,0 +1,41 @@
+"""
+Rebuild the LinkedIn image metadata index from the metadata files on disk.
+Run this script after upgrading an existing image store, or if the index was lost.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+
+from services.linkedin.image_generation import LinkedInImageStorage
+
+
+def rebuild_linkedin_image_index(storage_path=None):
+    """Rebuild the index of the LinkedIn image store at storage_path."""
+    try:
+        storage = LinkedInImageStorage(storage_path=storage_path)
+        result = storage.rebuild_index()
+        logger.info(
+            f"✅ Indexed {result['indexed_count']} images "
+            f"({result['skipped_count']} skipped) in {storage.index.db_path}"
+        )
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Error rebuilding LinkedIn image index: {str(e)}")
+        return False
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild the LinkedIn image metadata index")
+    parser.add_argument("--storage-path", default=None,
+                        help="Image store directory (defaults to the service's linkedin_images directory)")
+
+    args = parser.parse_args()
+
+    if not rebuild_linkedin_image_index(args.storage_path):
+        sys.exit(1)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Startup import report: imports the FastAPI app under `python -X importtime` and lists
+the slowest imports, so cold-start regressions show up before deploying.
+
+Usage:
+    python scripts/startup_import_report.py [--module app] [--top 25] [--budget 5.0]
+
+Exits with status 1 when the total import time exceeds the budget (seconds).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET_SECONDS = float(os.getenv("STARTUP_IMPORT_BUDGET_SECONDS", "5.0"))
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int, int]]:
+    """Parse `-X importtime` lines into (module, self_us, cumulative_us, depth)."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            depth = (len(name) - len(name.lstrip(" "))) // 2
+            imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+        except ValueError:
+            continue
+    return imports
+
+
+def run_import(module: str) -> Tuple[int, str]:
+    """Import a module in a fresh interpreter and return (exit code, stderr)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": BACKEND_DIR},
+    )
+    return result.returncode, result.stderr
+
+
+def build_report(imports: List[Tuple[str, int, int, int]], module: str, top: int) -> Dict[str, object]:
+    """Total import time of the module plus the slowest imports by cumulative and self time."""
+    total_us = next((cumulative for name, _, cumulative, depth in imports if name == module and depth == 0), 0)
+    # Package-level modules (depth <= 1 below the app) show which router/service pulled the time in
+    first_party = [entry for entry in imports if entry[3] >= 1 and not entry[0].startswith("_")]
+    return {
+        "total_seconds": total_us / 1e6,
+        "slowest_cumulative": sorted(first_party, key=lambda entry: entry[2], reverse=True)[:top],
+        "slowest_self": sorted(imports, key=lambda entry: entry[1], reverse=True)[:top],
+    }
+
+
+def print_report(report: Dict[str, object], module: str, budget: float):
+    print(f"\nImport time for '{module}': {report['total_seconds']:.2f}s (budget {budget:.2f}s)")
+    print("\nSlowest imports (cumulative, includes sub-imports):")
+    for name, _, cumulative_us, depth in report["slowest_cumulative"]:
+        print(f"  {cumulative_us / 1e6:8.3f}s  {'  ' * (depth - 1)}{name}")
+    print("\nSlowest imports (self time):")
+    for name, self_us, _, _ in report["slowest_self"]:
+        print(f"  {self_us / 1e6:8.3f}s  {name}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report the slowest imports at backend startup")
+    parser.add_argument("--module", default="app", help="Module to import (default: app)")
+    parser.add_argument("--top", type=int, default=25, help="Number of imports to list")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="Fail when the total import time exceeds this many seconds")
+    args = parser.parse_args()
+
+    returncode, stderr = run_import(args.module)
+    imports = parse_importtime(stderr)
+    if returncode != 0:
+        errors = [line for line in stderr.splitlines() if not line.startswith("import time:")]
+        print(f"Importing '{args.module}' failed:\n" + "\n".join(errors[-15:]))
+    if not imports:
+        return 1
+
+    report = build_report(imports, args.module, args.top)
+    print_report(report, args.module, args.budget)
+    if returncode != 0 or report["total_seconds"] > args.budget:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
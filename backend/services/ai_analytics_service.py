@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 import json
 from loguru import logger
 import asyncio
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
 from services.database import get_db_session
@@ -41,17 +42,17 @@ class AIAnalyticsService:
         try:
             logger.info(f"Analyzing content evolution for strategy {strategy_id}")
             
-            # Get analytics data for the strategy
-            analytics_data = await self._get_analytics_data(strategy_id, time_period)
+            # Get aggregated analytics for the strategy
+            analytics_summary = await self._get_analytics_summary(strategy_id, time_period)
             
             # Analyze content performance trends
-            performance_trends = await self._analyze_performance_trends(analytics_data)
+            performance_trends = await self._analyze_performance_trends(analytics_summary)
             
             # Analyze content type evolution
-            content_evolution = await self._analyze_content_type_evolution(analytics_data)
+            content_evolution = await self._analyze_content_type_evolution(analytics_summary)
             
             # Analyze audience engagement patterns
-            engagement_patterns = await self._analyze_engagement_patterns(analytics_data)
+            engagement_patterns = await self._analyze_engagement_patterns(analytics_summary)
             
             evolution_analysis = {
                 'strategy_id': strategy_id,
@@ -89,13 +90,13 @@ class AIAnalyticsService:
             if not metrics:
                 metrics = ['engagement_rate', 'reach', 'conversion_rate', 'click_through_rate']
             
-            # Get performance data
-            performance_data = await self._get_performance_data(strategy_id, metrics)
+            # Get aggregated performance data
+            metric_summaries = await self._get_performance_data(strategy_id, metrics)
             
             # Analyze trends for each metric
             trend_analysis = {}
             for metric in metrics:
-                trend_analysis[metric] = await self._analyze_metric_trend(performance_data, metric)
+                trend_analysis[metric] = await self._analyze_metric_trend(metric_summaries.get(metric, {}), metric)
             
             # Generate predictive insights
             predictive_insights = await self._generate_predictive_insights(trend_analysis)
@@ -213,46 +214,93 @@ class AIAnalyticsService:
             raise
     
     # Helper methods for data retrieval and analysis
-    async def _get_analytics_data(self, strategy_id: int, time_period: str) -> List[Dict[str, Any]]:
-        """Get analytics data for the specified strategy and time period."""
+    def _get_period_range(self, time_period: str) -> Tuple[datetime, datetime]:
+        """Calculate the date range for an analysis period."""
+        end_date = datetime.utcnow()
+        if time_period == "7d":
+            start_date = end_date - timedelta(days=7)
+        elif time_period == "30d":
+            start_date = end_date - timedelta(days=30)
+        elif time_period == "90d":
+            start_date = end_date - timedelta(days=90)
+        elif time_period == "1y":
+            start_date = end_date - timedelta(days=365)
+        else:
+            start_date = end_date - timedelta(days=30)
+        return start_date, end_date
+    
+    async def _get_analytics_summary(self, strategy_id: int, time_period: str) -> Dict[str, Any]:
+        """
+        Get aggregated analytics for the specified strategy and time period.
+        
+        Aggregates are computed in SQL (using the strategy_id/recorded_at index),
+        so only one summary row per platform and content type is loaded.
+        """
         try:
             session = self._get_db_session()
+            start_date, end_date = self._get_period_range(time_period)
             
-            # Calculate date range
-            end_date = datetime.utcnow()
-            if time_period == "7d":
-                start_date = end_date - timedelta(days=7)
-            elif time_period == "30d":
-                start_date = end_date - timedelta(days=30)
-            elif time_period == "90d":
-                start_date = end_date - timedelta(days=90)
-            elif time_period == "1y":
-                start_date = end_date - timedelta(days=365)
-            else:
-                start_date = end_date - timedelta(days=30)
-            
-            # Query analytics data
-            analytics = session.query(ContentAnalytics).filter(
+            period_filter = (
                 ContentAnalytics.strategy_id == strategy_id,
                 ContentAnalytics.recorded_at >= start_date,
                 ContentAnalytics.recorded_at <= end_date
-            ).all()
+            )
+            performance = func.coalesce(ContentAnalytics.performance_score, 0.0)
+            engagement = func.coalesce(ContentAnalytics.metrics['engagement_rate'].as_float(), 0.0)
+            
+            # Per-platform counts, performance and engagement totals
+            platform_rows = session.query(
+                ContentAnalytics.platform,
+                func.count(ContentAnalytics.id),
+                func.sum(performance),
+                func.sum(engagement)
+            ).filter(*period_filter).group_by(ContentAnalytics.platform).all()
+            
+            # Per-content-type counts and performance totals (content type comes from the calendar event)
+            content_type = func.coalesce(CalendarEvent.content_type, 'unknown')
+            content_type_rows = session.query(
+                content_type,
+                func.count(ContentAnalytics.id),
+                func.sum(performance)
+            ).outerjoin(
+                CalendarEvent, ContentAnalytics.event_id == CalendarEvent.id
+            ).filter(*period_filter).group_by(content_type).all()
+            
+            platforms = {}
+            for platform, count, total_performance, total_engagement in platform_rows:
+                platforms[platform or 'unknown'] = {
+                    'count': count,
+                    'total_performance': float(total_performance or 0),
+                    'total_engagement': float(total_engagement or 0)
+                }
             
-            return [analytics.to_dict() for analytics in analytics]
+            content_types = {}
+            for type_name, count, total_performance in content_type_rows:
+                content_types[type_name] = {
+                    'count': count,
+                    'total_performance': float(total_performance or 0)
+                }
+            
+            return {
+                'total_analytics': sum(row['count'] for row in platforms.values()),
+                'total_performance': sum(row['total_performance'] for row in platforms.values()),
+                'platforms': platforms,
+                'content_types': content_types
+            }
             
         except Exception as e:
             logger.error(f"Error getting analytics data: {str(e)}")
-            return []
+            return {}
     
-    async def _analyze_performance_trends(self, analytics_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze performance trends from analytics data."""
+    async def _analyze_performance_trends(self, analytics_summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze performance trends from aggregated analytics."""
         try:
-            if not analytics_data:
+            total_analytics = analytics_summary.get('total_analytics', 0)
+            if not total_analytics:
                 return {'trend': 'stable', 'growth_rate': 0, 'insights': 'No data available'}
             
             # Calculate trend metrics
-            total_analytics = len(analytics_data)
-            avg_performance = sum(item.get('performance_score', 0) for item in analytics_data) / total_analytics
+            avg_performance = analytics_summary['total_performance'] / total_analytics
             
             # Determine trend direction
             if avg_performance > 0.7:
@@ -273,29 +321,16 @@ class AIAnalyticsService:
             logger.error(f"Error analyzing performance trends: {str(e)}")
             return {'trend': 'unknown', 'error': str(e)}
     
-    async def _analyze_content_type_evolution(self, analytics_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def _analyze_content_type_evolution(self, analytics_summary: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze how content types have evolved over time."""
         try:
             content_types = {}
-            for data in analytics_data:
-                content_type = data.get('content_type', 'unknown')
-                if content_type not in content_types:
-                    content_types[content_type] = {
-                        'count': 0,
-                        'total_performance': 0,
-                        'avg_performance': 0
-                    }
-                
-                content_types[content_type]['count'] += 1
-                content_types[content_type]['total_performance'] += data.get('performance_score', 0)
-            
-            # Calculate averages
-            for content_type in content_types:
-                if content_types[content_type]['count'] > 0:
-                    content_types[content_type]['avg_performance'] = (
-                        content_types[content_type]['total_performance'] / 
-                        content_types[content_type]['count']
-                    )
+            for content_type, totals in analytics_summary.get('content_types', {}).items():
+                content_types[content_type] = {
+                    'count': totals['count'],
+                    'total_performance': totals['total_performance'],
+                    'avg_performance': totals['total_performance'] / totals['count'] if totals['count'] > 0 else 0
+                }
             
             return {
                 'content_types': content_types,
@@ -307,35 +342,20 @@ class AIAnalyticsService:
             logger.error(f"Error analyzing content type evolution: {str(e)}")
             return {'error': str(e)}
     
-    async def _analyze_engagement_patterns(self, analytics_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def _analyze_engagement_patterns(self, analytics_summary: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze audience engagement patterns."""
         try:
-            if not analytics_data:
+            if not analytics_summary.get('total_analytics'):
                 return {'patterns': {}, 'insights': 'No engagement data available'}
             
-            # Analyze engagement by platform
+            # Engagement by platform
             platform_engagement = {}
-            for data in analytics_data:
-                platform = data.get('platform', 'unknown')
-                if platform not in platform_engagement:
-                    platform_engagement[platform] = {
-                        'total_engagement': 0,
-                        'count': 0,
-                        'avg_engagement': 0
-                    }
-                
-                metrics = data.get('metrics', {})
-                engagement = metrics.get('engagement_rate', 0)
-                platform_engagement[platform]['total_engagement'] += engagement
-                platform_engagement[platform]['count'] += 1
-            
-            # Calculate averages
-            for platform in platform_engagement:
-                if platform_engagement[platform]['count'] > 0:
-                    platform_engagement[platform]['avg_engagement'] = (
-                        platform_engagement[platform]['total_engagement'] / 
-                        platform_engagement[platform]['count']
-                    )
+            for platform, totals in analytics_summary.get('platforms', {}).items():
+                platform_engagement[platform] = {
+                    'total_engagement': totals['total_engagement'],
+                    'count': totals['count'],
+                    'avg_engagement': totals['total_engagement'] / totals['count'] if totals['count'] > 0 else 0
+                }
             
             return {
                 'platform_engagement': platform_engagement,
@@ -404,45 +424,68 @@ class AIAnalyticsService:
             logger.error(f"Error generating evolution recommendations: {str(e)}")
             return [{'error': str(e)}]
     
-    async def _get_performance_data(self, strategy_id: int, metrics: List[str]) -> List[Dict[str, Any]]:
-        """Get performance data for specified metrics."""
+    async def _get_performance_data(self, strategy_id: int, metrics: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get aggregated performance data for specified metrics.
+        
+        For each metric, rows are numbered by recorded_at with a window function and
+        reduced in SQL to the count, overall sum and the sums of the older and more
+        recent halves used for trend detection.
+        """
         try:
             session = self._get_db_session()
+            summaries = {}
             
-            # Get analytics data for the strategy
-            analytics = session.query(ContentAnalytics).filter(
-                ContentAnalytics.strategy_id == strategy_id
-            ).all()
+            for metric in metrics:
+                value = ContentAnalytics.metrics[metric].as_float()
+                ranked = session.query(
+                    value.label('value'),
+                    func.row_number().over(
+                        order_by=(ContentAnalytics.recorded_at, ContentAnalytics.id)
+                    ).label('position'),
+                    func.count(ContentAnalytics.id).over().label('total')
+                ).filter(
+                    ContentAnalytics.strategy_id == strategy_id,
+                    value.isnot(None)
+                ).subquery()
+                
+                # Integer half, as in _analyze_metric_trend; with an odd count the middle row is in neither half
+                half = ranked.c.total // 2
+                data_points, total, older_total, recent_total = session.query(
+                    func.count(),
+                    func.sum(ranked.c.value),
+                    func.sum(case((ranked.c.position <= half, ranked.c.value), else_=0.0)),
+                    func.sum(case((ranked.c.position > ranked.c.total - half, ranked.c.value), else_=0.0))
+                ).one()
+                
+                summaries[metric] = {
+                    'data_points': data_points or 0,
+                    'total': float(total or 0),
+                    'older_total': float(older_total or 0),
+                    'recent_total': float(recent_total or 0)
+                }
             
-            return [analytics.to_dict() for analytics in analytics]
+            return summaries
             
         except Exception as e:
             logger.error(f"Error getting performance data: {str(e)}")
-            return []
+            return {}
     
-    async def _analyze_metric_trend(self, performance_data: List[Dict[str, Any]], metric: str) -> Dict[str, Any]:
+    async def _analyze_metric_trend(self, metric_summary: Dict[str, Any], metric: str) -> Dict[str, Any]:
         """Analyze trend for a specific metric."""
         try:
-            if not performance_data:
-                return {'trend': 'no_data', 'value': 0, 'change': 0}
-            
-            # Extract metric values
-            metric_values = []
-            for data in performance_data:
-                metrics = data.get('metrics', {})
-                if metric in metrics:
-                    metric_values.append(metrics[metric])
-            
-            if not metric_values:
+            data_points = metric_summary.get('data_points', 0)
+            if not data_points:
                 return {'trend': 'no_data', 'value': 0, 'change': 0}
             
             # Calculate trend
-            avg_value = sum(metric_values) / len(metric_values)
+            avg_value = metric_summary['total'] / data_points
             
-            # Simple trend calculation
-            if len(metric_values) >= 2:
-                recent_avg = sum(metric_values[-len(metric_values)//2:]) / (len(metric_values)//2)
-                older_avg = sum(metric_values[:len(metric_values)//2]) / (len(metric_values)//2)
+            # Simple trend calculation: compare the most recent half with the oldest half
+            if data_points >= 2:
+                half = data_points // 2
+                recent_avg = metric_summary['recent_total'] / half
+                older_avg = metric_summary['older_total'] / half
                 change = ((recent_avg - older_avg) / older_avg * 100) if older_avg > 0 else 0
             else:
                 change = 0
@@ -459,7 +502,7 @@ class AIAnalyticsService:
                 'trend': trend,
                 'value': avg_value,
                 'change_percent': change,
-                'data_points': len(metric_values)
+                'data_points': data_points
             }
             
         except Exception as e:
@@ -695,20 +738,23 @@ class AIAnalyticsService:
             logger.error(f"Error generating competitor recommendations: {str(e)}")
             return [{'error': str(e)}]
     
-    async def _get_historical_performance_data(self, strategy_id: int) -> List[Dict[str, Any]]:
-        """Get historical performance data for the strategy."""
+    async def _get_historical_performance_data(self, strategy_id: int) -> Dict[str, Any]:
+        """Get aggregated historical performance for the strategy."""
         try:
             session = self._get_db_session()
             
-            analytics = session.query(ContentAnalytics).filter(
+            count, avg_performance = session.query(
+                func.count(ContentAnalytics.id),
+                func.avg(func.coalesce(ContentAnalytics.performance_score, 0.0))
+            ).filter(
                 ContentAnalytics.strategy_id == strategy_id
-            ).all()
+            ).one()
             
-            return [analytics.to_dict() for analytics in analytics]
+            return {'count': count or 0, 'average_performance': float(avg_performance or 0)}
             
         except Exception as e:
             logger.error(f"Error getting historical performance data: {str(e)}")
-            return []
+            return {}
     
     async def _analyze_content_characteristics(self, content_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze content characteristics for performance prediction."""
@@ -737,16 +783,14 @@ class AIAnalyticsService:
             return {'error': str(e)}
     
     async def _calculate_success_probability(self, performance_prediction: Dict[str, Any], 
-                                          historical_data: List[Dict[str, Any]]) -> float:
+                                          historical_data: Dict[str, Any]) -> float:
         """Calculate success probability based on prediction and historical data."""
         try:
             base_probability = 0.5
             
             # Adjust based on historical performance
-            if historical_data:
-                avg_historical_performance = sum(
-                    data.get('performance_score', 0) for data in historical_data
-                ) / len(historical_data)
+            if historical_data.get('count'):
+                avg_historical_performance = historical_data['average_performance']
                 
                 if avg_historical_performance > 0.7:
                     base_probability += 0.1
@@ -0,0 +1,297 @@
+"""
+API Monitoring Rollup Service
+Time-bucketed request rollups and retention for API monitoring data.
+
+Every monitored request updates per-minute and per-hour rollup rows, both for its
+endpoint and for the "*" row covering all endpoints. The counters are incremented
+with INSERT ... ON CONFLICT DO UPDATE, so concurrent workers never overwrite each
+other's updates. Dashboards read a bounded number of rollup rows instead of
+counting the raw api_requests table, which is pruned in bounded batches by the
+retention job.
+"""
+
+import asyncio
+import gzip
+import json
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import case, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models.api_monitoring import APIRequest, APIRequestRollup, APIRequestRollupLatency
+
+# Endpoint key of the rollup rows that aggregate every endpoint
+ALL_ENDPOINTS = "*"
+
+# Latency histogram buckets grow geometrically; estimates are within ~10% of the true value
+LATENCY_BUCKET_GROWTH = 1.1
+
+# Windows up to this long are served from minute rollups, longer ones from hour rollups
+MINUTE_ROLLUP_RETENTION_HOURS = int(os.getenv("MONITORING_MINUTE_ROLLUP_RETENTION_HOURS", "48"))
+HOUR_ROLLUP_RETENTION_DAYS = int(os.getenv("MONITORING_HOUR_ROLLUP_RETENTION_DAYS", "90"))
+RAW_REQUEST_RETENTION_DAYS = int(os.getenv("MONITORING_RAW_RETENTION_DAYS", "7"))
+RETENTION_BATCH_SIZE = int(os.getenv("MONITORING_RETENTION_BATCH_SIZE", "1000"))
+RETENTION_MAX_BATCHES = int(os.getenv("MONITORING_RETENTION_MAX_BATCHES", "100"))
+RETENTION_INTERVAL_MINUTES = int(os.getenv("MONITORING_RETENTION_INTERVAL_MINUTES", "60"))
+# When set, pruned raw requests are appended to gzipped JSON-lines files in this directory
+ARCHIVE_DIR = os.getenv("MONITORING_ARCHIVE_DIR")
+
+
+def latency_bucket(duration: float) -> int:
+    """Histogram bucket index for a duration in seconds."""
+    milliseconds = duration * 1000
+    if milliseconds <= 1:
+        return 0
+    return math.ceil(math.log(milliseconds, LATENCY_BUCKET_GROWTH))
+
+
+def estimate_percentile(histogram: Dict[str, int], percentile: float) -> Optional[float]:
+    """Estimate a latency percentile (0-100) in seconds from a histogram."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = percentile / 100 * total
+    seen = 0
+    for bucket in sorted(histogram, key=int):
+        seen += histogram[bucket]
+        if seen >= rank:
+            return (LATENCY_BUCKET_GROWTH ** int(bucket)) / 1000
+    return (LATENCY_BUCKET_GROWTH ** max(int(b) for b in histogram)) / 1000
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its minute or hour bucket."""
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+class APIMonitoringRollupService:
+    """Maintains request rollups and prunes raw monitoring rows."""
+
+    GRANULARITIES = ("minute", "hour")
+
+    def record(self, db: Session, endpoint: str, status_code: int, duration: float,
+               timestamp: Optional[datetime] = None):
+        """Add one request to the minute and hour rollups; the caller commits."""
+        timestamp = timestamp or datetime.utcnow()
+        keys = [
+            {'granularity': granularity, 'bucket_start': bucket_start(timestamp, granularity), 'endpoint': key}
+            for granularity in self.GRANULARITIES
+            for key in (endpoint, ALL_ENDPOINTS)
+        ]
+        insert = self._insert_for(db)
+
+        rollups = insert(APIRequestRollup).values([
+            dict(key, request_count=1, error_count=1 if status_code >= 400 else 0,
+                 total_duration=duration, min_duration=duration, max_duration=duration)
+            for key in keys
+        ])
+        new = rollups.excluded
+        db.execute(rollups.on_conflict_do_update(
+            index_elements=['granularity', 'bucket_start', 'endpoint'],
+            set_={
+                'request_count': APIRequestRollup.request_count + new.request_count,
+                'error_count': APIRequestRollup.error_count + new.error_count,
+                'total_duration': APIRequestRollup.total_duration + new.total_duration,
+                'min_duration': case(
+                    (APIRequestRollup.min_duration <= new.min_duration, APIRequestRollup.min_duration),
+                    else_=new.min_duration
+                ),
+                'max_duration': case(
+                    (APIRequestRollup.max_duration >= new.max_duration, APIRequestRollup.max_duration),
+                    else_=new.max_duration
+                )
+            }
+        ))
+
+        latencies = insert(APIRequestRollupLatency).values([
+            dict(key, latency_bucket=latency_bucket(duration), request_count=1) for key in keys
+        ])
+        db.execute(latencies.on_conflict_do_update(
+            index_elements=['granularity', 'bucket_start', 'endpoint', 'latency_bucket'],
+            set_={'request_count': APIRequestRollupLatency.request_count + latencies.excluded.request_count}
+        ))
+
+    @staticmethod
+    def _insert_for(db: Session):
+        """The dialect insert construct that supports ON CONFLICT for the session's database."""
+        return postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+    def _window_granularity(self, minutes: int) -> str:
+        return "minute" if minutes <= MINUTE_ROLLUP_RETENTION_HOURS * 60 else "hour"
+
+    def _window_filter(self, model, minutes: int, endpoints: List[str], now: Optional[datetime] = None) -> list:
+        """Filter criteria selecting the window's rows of a rollup table."""
+        now = now or datetime.utcnow()
+        granularity = self._window_granularity(minutes)
+        since = bucket_start(now - timedelta(minutes=minutes), granularity)
+        return [
+            model.granularity == granularity,
+            model.endpoint.in_(endpoints),
+            model.bucket_start >= since
+        ]
+
+    def _window_histograms(self, db: Session, minutes: int, endpoints: List[str],
+                           now: Optional[datetime] = None) -> Dict[str, Dict[int, int]]:
+        """Latency histograms summed over the window, per endpoint."""
+        model = APIRequestRollupLatency
+        histograms: Dict[str, Dict[int, int]] = {endpoint: {} for endpoint in endpoints}
+        rows = db.query(model.endpoint, model.latency_bucket, func.sum(model.request_count)).filter(
+            *self._window_filter(model, minutes, endpoints, now)
+        ).group_by(model.endpoint, model.latency_bucket).all()
+        for endpoint, bucket, count in rows:
+            histograms[endpoint][bucket] = count
+        return histograms
+
+    @staticmethod
+    def _summarize(rows: List[APIRequestRollup], histogram: Dict[int, int]) -> Dict[str, Any]:
+        requests = sum(row.request_count or 0 for row in rows)
+        total_duration = sum(row.total_duration or 0.0 for row in rows)
+        p50 = estimate_percentile(histogram, 50)
+        p95 = estimate_percentile(histogram, 95)
+        return {
+            'requests': requests,
+            'errors': sum(row.error_count or 0 for row in rows),
+            'avg_duration': round(total_duration / requests, 3) if requests else 0.0,
+            'p50_duration': round(p50, 3) if p50 is not None else None,
+            'p95_duration': round(p95, 3) if p95 is not None else None
+        }
+
+    def get_window_summary(self, db: Session, minutes: int, endpoint: str = ALL_ENDPOINTS,
+                           now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Request/error counts and latency estimates for the last `minutes` minutes."""
+        return self.get_endpoint_summaries(db, minutes, [endpoint], now)[endpoint]
+
+    def get_endpoint_summaries(self, db: Session, minutes: int, endpoints: List[str],
+                               now: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+        """Window summaries for several endpoints using one query per table."""
+        rows_by_endpoint: Dict[str, List[APIRequestRollup]] = {endpoint: [] for endpoint in endpoints}
+        histograms: Dict[str, Dict[int, int]] = {endpoint: {} for endpoint in endpoints}
+        if endpoints:
+            for row in db.query(APIRequestRollup).filter(
+                *self._window_filter(APIRequestRollup, minutes, endpoints, now)
+            ).all():
+                rows_by_endpoint[row.endpoint].append(row)
+            histograms = self._window_histograms(db, minutes, endpoints, now)
+        return {
+            endpoint: self._summarize(rows, histograms[endpoint])
+            for endpoint, rows in rows_by_endpoint.items()
+        }
+
+    def prune_raw_requests(self, db: Session, cutoff: Optional[datetime] = None,
+                           batch_size: int = RETENTION_BATCH_SIZE,
+                           max_batches: int = RETENTION_MAX_BATCHES,
+                           archive_dir: Optional[str] = ARCHIVE_DIR) -> int:
+        """Delete (and optionally archive) raw requests older than cutoff in bounded batches."""
+        cutoff = cutoff or datetime.utcnow() - timedelta(days=RAW_REQUEST_RETENTION_DAYS)
+        deleted = 0
+        for _ in range(max_batches):
+            rows = db.query(APIRequest).filter(
+                APIRequest.timestamp < cutoff
+            ).order_by(APIRequest.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            if archive_dir:
+                self._archive_requests(rows, archive_dir)
+
+            db.query(APIRequest).filter(
+                APIRequest.id.in_([row.id for row in rows])
+            ).delete(synchronize_session=False)
+            db.commit()
+            deleted += len(rows)
+
+            if len(rows) < batch_size:
+                break
+        return deleted
+
+    def prune_rollups(self, db: Session, now: Optional[datetime] = None,
+                      batch_size: int = RETENTION_BATCH_SIZE,
+                      max_batches: int = RETENTION_MAX_BATCHES) -> Dict[str, int]:
+        """Delete minute and hour rollups past their retention windows."""
+        now = now or datetime.utcnow()
+        cutoffs = {
+            'minute': now - timedelta(hours=MINUTE_ROLLUP_RETENTION_HOURS),
+            'hour': now - timedelta(days=HOUR_ROLLUP_RETENTION_DAYS)
+        }
+        deleted = {}
+        for granularity, cutoff in cutoffs.items():
+            deleted[granularity] = 0
+            for model in (APIRequestRollup, APIRequestRollupLatency):
+                for _ in range(max_batches):
+                    ids = [row_id for (row_id,) in db.query(model.id).filter(
+                        model.granularity == granularity,
+                        model.bucket_start < cutoff
+                    ).limit(batch_size).all()]
+                    if not ids:
+                        break
+                    db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+                    db.commit()
+                    if model is APIRequestRollup:
+                        deleted[granularity] += len(ids)
+                    if len(ids) < batch_size:
+                        break
+        return deleted
+
+    def run_retention(self) -> Dict[str, Any]:
+        """Run one retention pass with its own database session."""
+        from services.database import get_db_session
+
+        db = get_db_session()
+        if db is None:
+            return {'error': 'Database unavailable'}
+        try:
+            raw_deleted = self.prune_raw_requests(db)
+            rollups_deleted = self.prune_rollups(db)
+            if raw_deleted or any(rollups_deleted.values()):
+                logger.info(f"API monitoring retention pruned {raw_deleted} requests, rollups: {rollups_deleted}")
+            return {'raw_requests': raw_deleted, 'rollups': rollups_deleted}
+        except Exception as e:
+            logger.error(f"Error running API monitoring retention: {e}")
+            db.rollback()
+            return {'error': str(e)}
+        finally:
+            db.close()
+
+    @staticmethod
+    def _archive_requests(rows: List[APIRequest], archive_dir: str):
+        """Append requests to gzipped JSON-lines files, one per request day."""
+        os.makedirs(archive_dir, exist_ok=True)
+        by_day: Dict[str, List[str]] = {}
+        for row in rows:
+            by_day.setdefault(row.timestamp.strftime('%Y-%m-%d'), []).append(json.dumps({
+                'id': row.id,
+                'timestamp': row.timestamp.isoformat(),
+                'path': row.path,
+                'method': row.method,
+                'status_code': row.status_code,
+                'duration': row.duration,
+                'user_id': row.user_id,
+                'cache_hit': row.cache_hit,
+                'request_size': row.request_size,
+                'response_size': row.response_size,
+                'user_agent': row.user_agent,
+                'ip_address': row.ip_address
+            }))
+        for day, lines in by_day.items():
+            path = os.path.join(archive_dir, f"api_requests_{day}.jsonl.gz")
+            with gzip.open(path, 'at', encoding='utf-8') as archive:
+                archive.write('\n'.join(lines) + '\n')
+
+
+async def run_retention_scheduler(interval_minutes: int = RETENTION_INTERVAL_MINUTES):
+    """Run the retention job periodically off the event loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await loop.run_in_executor(None, api_monitoring_rollups.run_retention)
+        await asyncio.sleep(interval_minutes * 60)
+
+
+# Global rollup service instance
+api_monitoring_rollups = APIMonitoringRollupService()
@@ -57,6 +57,7 @@ class BackgroundJobService:
         self.job_handlers = {
             'bing_comprehensive_insights': self._handle_bing_comprehensive_insights,
             'bing_data_collection': self._handle_bing_data_collection,
+            'gsc_data_sync': self._handle_gsc_data_sync,
             'analytics_refresh': self._handle_analytics_refresh,
         }
     
@@ -325,6 +326,43 @@ class BackgroundJobService:
             logger.error(f"Error collecting Bing data: {e}")
             raise
     
+    def _handle_gsc_data_sync(self, job: BackgroundJob) -> Dict[str, Any]:
+        """Handle incremental Google Search Console sync into the local store"""
+        try:
+            user_id = job.user_id
+            site_url = job.data.get('site_url')
+            
+            # Import here to avoid circular imports
+            from services.gsc_service import GSCService
+            
+            gsc_service = GSCService()
+            
+            job.progress = 10
+            job.message = "Resolving GSC sites..."
+            
+            site_urls = [site_url] if site_url else [site['siteUrl'] for site in gsc_service.get_site_list(user_id)]
+            
+            synced = {}
+            for index, url in enumerate(site_urls):
+                job.message = f"Syncing GSC data for {url}..."
+                synced[url] = gsc_service.sync_search_analytics(
+                    user_id, url, job.data.get('start_date'), job.data.get('end_date')
+                )['rows']
+                job.progress = 10 + int(90 * (index + 1) / len(site_urls))
+            
+            job.progress = 100
+            job.message = "GSC sync completed successfully"
+            
+            return {
+                'success': True,
+                'synced_rows': synced,
+                'synced_at': datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error syncing GSC data: {e}")
+            raise
+    
     def _handle_analytics_refresh(self, job: BackgroundJob) -> Dict[str, Any]:
         """Handle analytics refresh for all platforms"""
         try:
@@ -7,9 +7,10 @@ Provides methods for data persistence, trend analysis, and alert management.
 
 import json
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Tuple
-from sqlalchemy import create_engine, func, desc, and_, or_
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import create_engine, func, desc, and_, or_, case, insert
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -21,6 +22,22 @@ from services.integrations.bing_oauth import BingOAuthService
 
 logger = logging.getLogger(__name__)
 
+# Rows per executemany/IN-list chunk when bulk ingesting query stats
+BULK_CHUNK_SIZE = 500
+
+# Query categories in priority order; a query gets the first category with a matching keyword
+QUERY_CATEGORY_PATTERNS = [
+    (category, re.compile('|'.join(re.escape(term) for term in terms)))
+    for category, terms in (
+        ('ai', ['ai', 'artificial intelligence', 'machine learning']),
+        ('story_writing', ['story', 'narrative', 'tale', 'fiction']),
+        ('business', ['business', 'plan', 'strategy', 'company']),
+        ('letter_writing', ['letter', 'email', 'correspondence']),
+        ('content_writing', ['blog', 'article', 'content', 'post']),
+        ('tools', ['free', 'generator', 'tool', 'online']),
+    )
+]
+
 
 class BingAnalyticsStorageService:
     """Service for managing Bing analytics data storage and analysis"""
@@ -80,62 +97,87 @@ class BingAnalyticsStorageService:
         Returns:
             bool: True if successful, False otherwise
         """
+        return self.ingest_query_data(user_id, site_url, query_data) is not None
+    
+    def ingest_query_data(self, user_id: str, site_url: str, query_data: List[Dict[str, Any]]) -> Optional[Set[date]]:
+        """
+        Bulk insert raw query statistics, replacing rows already stored for the same query and date
+        
+        Rows are deduplicated on (query, query_date) within the batch (last one wins) and any
+        existing rows for those keys are deleted before a single executemany insert.
+        
+        Args:
+            user_id: User identifier
+            site_url: Site URL
+            query_data: List of query statistics from Bing API
+            
+        Returns:
+            Set of days touched by the batch, or None if the batch could not be stored
+        """
+        brand_terms = self._get_brand_terms(site_url)
+        rows_by_key: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+        
+        for query_item in query_data:
+            try:
+                query = query_item.get('Query', '') or ''
+                query_date = self._parse_bing_date(query_item.get('Date', ''))
+                clicks = query_item.get('Clicks', 0)
+                impressions = query_item.get('Impressions', 0)
+                query_lower = query.lower()
+                
+                rows_by_key[(query, query_date)] = {
+                    'user_id': user_id,
+                    'site_url': site_url,
+                    'query': query,
+                    'clicks': clicks,
+                    'impressions': impressions,
+                    'avg_click_position': query_item.get('AvgClickPosition', -1),
+                    'avg_impression_position': query_item.get('AvgImpressionPosition', -1),
+                    'ctr': (clicks / impressions * 100) if impressions > 0 else 0,
+                    'query_date': query_date,
+                    'query_length': len(query),
+                    'is_brand_query': any(term in query_lower for term in brand_terms),
+                    'category': self._categorize_lowered_query(query_lower)
+                }
+            except Exception as e:
+                logger.error(f"Error processing individual query: {e}")
+                continue
+        
+        db = None
         try:
             db = self._get_db_session()
             
-            # Process and store each query
-            stored_count = 0
-            for query_item in query_data:
-                try:
-                    # Parse date from Bing format
-                    query_date = self._parse_bing_date(query_item.get('Date', ''))
-                    
-                    # Calculate CTR
-                    clicks = query_item.get('Clicks', 0)
-                    impressions = query_item.get('Impressions', 0)
-                    ctr = (clicks / impressions * 100) if impressions > 0 else 0
-                    
-                    # Determine if brand query
-                    is_brand = self._is_brand_query(query_item.get('Query', ''), site_url)
-                    
-                    # Categorize query
-                    category = self._categorize_query(query_item.get('Query', ''))
-                    
-                    # Create query stats record
-                    query_stats = BingQueryStats(
-                        user_id=user_id,
-                        site_url=site_url,
-                        query=query_item.get('Query', ''),
-                        clicks=clicks,
-                        impressions=impressions,
-                        avg_click_position=query_item.get('AvgClickPosition', -1),
-                        avg_impression_position=query_item.get('AvgImpressionPosition', -1),
-                        ctr=ctr,
-                        query_date=query_date,
-                        query_length=len(query_item.get('Query', '')),
-                        is_brand_query=is_brand,
-                        category=category
-                    )
-                    
-                    db.add(query_stats)
-                    stored_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error processing individual query: {e}")
-                    continue
+            # Replace previously stored rows for the same (query, date) keys
+            queries_by_date: Dict[datetime, List[str]] = {}
+            for query, query_date in rows_by_key:
+                queries_by_date.setdefault(query_date, []).append(query)
+            
+            for query_date, queries in queries_by_date.items():
+                for offset in range(0, len(queries), BULK_CHUNK_SIZE):
+                    db.query(BingQueryStats).filter(
+                        BingQueryStats.user_id == user_id,
+                        BingQueryStats.site_url == site_url,
+                        BingQueryStats.query_date == query_date,
+                        BingQueryStats.query.in_(queries[offset:offset + BULK_CHUNK_SIZE])
+                    ).delete(synchronize_session=False)
+            
+            rows = list(rows_by_key.values())
+            for offset in range(0, len(rows), BULK_CHUNK_SIZE):
+                db.execute(insert(BingQueryStats), rows[offset:offset + BULK_CHUNK_SIZE])
             
             db.commit()
-            db.close()
             
-            logger.info(f"Successfully stored {stored_count} Bing query records for {site_url}")
-            return True
+            logger.info(f"Successfully stored {len(rows)} Bing query records for {site_url}")
+            return {query_date.date() for query_date in queries_by_date}
             
         except Exception as e:
             logger.error(f"Error storing Bing query data: {e}")
-            if 'db' in locals():
+            if db:
                 db.rollback()
+            return None
+        finally:
+            if db:
                 db.close()
-            return False
     
     def generate_daily_metrics(self, user_id: str, site_url: str, target_date: datetime = None) -> bool:
         """
@@ -149,43 +191,45 @@ class BingAnalyticsStorageService:
         Returns:
             bool: True if successful, False otherwise
         """
+        db = None
         try:
             if target_date is None:
                 target_date = datetime.now() - timedelta(days=1)
             
             # Get date range for the day
-            start_date = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
+            start_date = self._day_start(target_date)
             end_date = start_date + timedelta(days=1)
             
             db = self._get_db_session()
             
-            # Get raw data for the day
-            daily_queries = db.query(BingQueryStats).filter(
-                and_(
-                    BingQueryStats.user_id == user_id,
-                    BingQueryStats.site_url == site_url,
-                    BingQueryStats.query_date >= start_date,
-                    BingQueryStats.query_date < end_date
-                )
-            ).all()
+            day_filter = and_(
+                BingQueryStats.user_id == user_id,
+                BingQueryStats.site_url == site_url,
+                BingQueryStats.query_date >= start_date,
+                BingQueryStats.query_date < end_date
+            )
+            
+            # Aggregate the day's raw rows in the database
+            totals = db.query(
+                func.count(BingQueryStats.id),
+                func.coalesce(func.sum(BingQueryStats.clicks), 0),
+                func.coalesce(func.sum(BingQueryStats.impressions), 0),
+                func.avg(case((BingQueryStats.avg_click_position > 0, BingQueryStats.avg_click_position)))
+            ).filter(day_filter).one()
+            total_queries, total_clicks, total_impressions, avg_position = totals
             
-            if not daily_queries:
+            if not total_queries:
                 logger.warning(f"No query data found for {site_url} on {target_date.date()}")
-                db.close()
                 return False
             
-            # Calculate aggregated metrics
-            total_clicks = sum(q.clicks for q in daily_queries)
-            total_impressions = sum(q.impressions for q in daily_queries)
-            total_queries = len(daily_queries)
+            total_clicks = int(total_clicks)
+            total_impressions = int(total_impressions)
             avg_ctr = (total_clicks / total_impressions * 100) if total_impressions > 0 else 0
-            avg_position = sum(q.avg_click_position for q in daily_queries if q.avg_click_position > 0) / len([q for q in daily_queries if q.avg_click_position > 0]) if any(q.avg_click_position > 0 for q in daily_queries) else 0
+            avg_position = float(avg_position) if avg_position is not None else 0
             
             # Get top performing queries
-            top_queries = sorted(daily_queries, key=lambda x: x.clicks, reverse=True)[:10]
-            top_clicks = [{'query': q.query, 'clicks': q.clicks, 'impressions': q.impressions, 'ctr': q.ctr} for q in top_queries]
-            top_impressions = sorted(daily_queries, key=lambda x: x.impressions, reverse=True)[:10]
-            top_impressions_data = [{'query': q.query, 'clicks': q.clicks, 'impressions': q.impressions, 'ctr': q.ctr} for q in top_impressions]
+            top_clicks = self._get_top_rows(db, day_filter, BingQueryStats.clicks)
+            top_impressions_data = self._get_top_rows(db, day_filter, BingQueryStats.impressions)
             
             # Calculate changes from previous day
             prev_day_metrics = self._get_previous_day_metrics(db, user_id, site_url, target_date)
@@ -193,54 +237,181 @@ class BingAnalyticsStorageService:
             impressions_change = self._calculate_percentage_change(total_impressions, prev_day_metrics.get('total_impressions', 0))
             ctr_change = self._calculate_percentage_change(avg_ctr, prev_day_metrics.get('avg_ctr', 0))
             
-            # Create daily metrics record
-            daily_metrics = BingDailyMetrics(
-                user_id=user_id,
-                site_url=site_url,
-                metric_date=start_date,
-                total_clicks=total_clicks,
-                total_impressions=total_impressions,
-                total_queries=total_queries,
-                avg_ctr=avg_ctr,
-                avg_position=avg_position,
-                top_queries=json.dumps(top_clicks),
-                top_clicks=json.dumps(top_clicks),
-                top_impressions=json.dumps(top_impressions_data),
-                clicks_change=clicks_change,
-                impressions_change=impressions_change,
-                ctr_change=ctr_change
-            )
-            
-            # Check if record already exists and update or create
-            existing = db.query(BingDailyMetrics).filter(
-                and_(
-                    BingDailyMetrics.user_id == user_id,
-                    BingDailyMetrics.site_url == site_url,
-                    BingDailyMetrics.metric_date == start_date
-                )
-            ).first()
-            
-            if existing:
-                # Update existing record
-                for key, value in daily_metrics.__dict__.items():
-                    if not key.startswith('_') and key != 'id':
-                        setattr(existing, key, value)
-            else:
-                # Create new record
-                db.add(daily_metrics)
+            self._upsert(db, BingDailyMetrics, {
+                'user_id': user_id,
+                'site_url': site_url,
+                'metric_date': start_date
+            }, {
+                'total_clicks': total_clicks,
+                'total_impressions': total_impressions,
+                'total_queries': total_queries,
+                'avg_ctr': avg_ctr,
+                'avg_position': avg_position,
+                'top_queries': json.dumps(top_clicks),
+                'top_clicks': json.dumps(top_clicks),
+                'top_impressions': json.dumps(top_impressions_data),
+                'clicks_change': clicks_change,
+                'impressions_change': impressions_change,
+                'ctr_change': ctr_change
+            })
             
             db.commit()
-            db.close()
             
             logger.info(f"Successfully generated daily metrics for {site_url} on {target_date.date()}")
             return True
             
         except Exception as e:
             logger.error(f"Error generating daily metrics: {e}")
-            if 'db' in locals():
+            if db:
                 db.rollback()
+            return False
+        finally:
+            if db:
                 db.close()
+    
+    def generate_weekly_metrics(self, user_id: str, site_url: str, target_date: datetime = None) -> bool:
+        """
+        Generate and store the weekly rollup for the Monday-based week containing target_date
+        
+        Totals are summed from the daily rollups; category performance is aggregated
+        from the raw query rows of the week.
+        
+        Args:
+            user_id: User identifier
+            site_url: Site URL
+            target_date: Any date within the week (defaults to yesterday)
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        db = None
+        try:
+            if target_date is None:
+                target_date = datetime.now() - timedelta(days=1)
+            
+            period_start = self._week_start(target_date)
+            period_end = period_start + timedelta(days=7)
+            
+            db = self._get_db_session()
+            
+            totals = db.query(
+                func.count(BingDailyMetrics.id),
+                func.coalesce(func.sum(BingDailyMetrics.total_clicks), 0),
+                func.coalesce(func.sum(BingDailyMetrics.total_impressions), 0),
+                func.coalesce(func.sum(BingDailyMetrics.total_queries), 0),
+                func.avg(case((BingDailyMetrics.avg_position > 0, BingDailyMetrics.avg_position)))
+            ).filter(
+                BingDailyMetrics.user_id == user_id,
+                BingDailyMetrics.site_url == site_url,
+                BingDailyMetrics.metric_date >= period_start,
+                BingDailyMetrics.metric_date < period_end
+            ).one()
+            days_count, total_clicks, total_impressions, total_queries, avg_position = totals
+            
+            if not days_count:
+                logger.warning(f"No daily metrics found for {site_url} in week of {period_start.date()}")
+                return False
+            
+            total_clicks = int(total_clicks)
+            total_impressions = int(total_impressions)
+            avg_ctr = (total_clicks / total_impressions * 100) if total_impressions > 0 else 0
+            
+            category_rows = db.query(
+                BingQueryStats.category,
+                func.sum(BingQueryStats.clicks),
+                func.sum(BingQueryStats.impressions),
+                func.count(BingQueryStats.id)
+            ).filter(
+                BingQueryStats.user_id == user_id,
+                BingQueryStats.site_url == site_url,
+                BingQueryStats.query_date >= period_start,
+                BingQueryStats.query_date < period_end
+            ).group_by(BingQueryStats.category).order_by(desc(func.sum(BingQueryStats.clicks))).all()
+            top_categories = [
+                {'category': category, 'clicks': int(clicks or 0), 'impressions': int(impressions or 0), 'queries': count}
+                for category, clicks, impressions, count in category_rows
+            ]
+            
+            previous = db.query(BingTrendAnalysis).filter(
+                BingTrendAnalysis.user_id == user_id,
+                BingTrendAnalysis.site_url == site_url,
+                BingTrendAnalysis.period_type == 'weekly',
+                BingTrendAnalysis.period_start == period_start - timedelta(days=7)
+            ).first()
+            
+            self._upsert(db, BingTrendAnalysis, {
+                'user_id': user_id,
+                'site_url': site_url,
+                'period_type': 'weekly',
+                'period_start': period_start
+            }, {
+                'period_end': period_end,
+                'total_clicks': total_clicks,
+                'total_impressions': total_impressions,
+                'total_queries': int(total_queries),
+                'avg_ctr': avg_ctr,
+                'avg_position': float(avg_position) if avg_position is not None else 0,
+                'clicks_growth': self._calculate_percentage_change(total_clicks, previous.total_clicks if previous else 0),
+                'impressions_growth': self._calculate_percentage_change(total_impressions, previous.total_impressions if previous else 0),
+                'ctr_growth': self._calculate_percentage_change(avg_ctr, previous.avg_ctr if previous else 0),
+                'top_categories': json.dumps(top_categories)
+            })
+            
+            db.commit()
+            
+            logger.info(f"Successfully generated weekly metrics for {site_url} for week of {period_start.date()}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error generating weekly metrics: {e}")
+            if db:
+                db.rollback()
             return False
+        finally:
+            if db:
+                db.close()
+    
+    def refresh_rollups(self, user_id: str, site_url: str, touched_days: Iterable[date]) -> int:
+        """
+        Recompute the daily and weekly rollups affected by new raw data
+        
+        Besides the touched days this refreshes the day after each one when it already has a
+        rollup, since its day-over-day changes are computed against the touched day.
+        
+        Args:
+            user_id: User identifier
+            site_url: Site URL
+            touched_days: Days that received new raw rows
+            
+        Returns:
+            int: Number of daily rollups regenerated
+        """
+        days = set(touched_days)
+        if not days:
+            return 0
+        
+        following_days = {day + timedelta(days=1) for day in days} - days
+        db = self._get_db_session()
+        try:
+            existing = db.query(BingDailyMetrics.metric_date).filter(
+                BingDailyMetrics.user_id == user_id,
+                BingDailyMetrics.site_url == site_url,
+                BingDailyMetrics.metric_date.in_([self._day_start(day) for day in following_days])
+            ).all() if following_days else []
+        finally:
+            db.close()
+        days.update(metric_date.date() for (metric_date,) in existing)
+        
+        # Days are processed in order so each day's changes see the refreshed previous day
+        regenerated = 0
+        for day in sorted(days):
+            if self.generate_daily_metrics(user_id, site_url, self._day_start(day)):
+                regenerated += 1
+        
+        for week_start in sorted({self._week_start(day) for day in days}):
+            self.generate_weekly_metrics(user_id, site_url, week_start)
+        
+        return regenerated
     
     def get_analytics_summary(self, user_id: str, site_url: str, days: int = 30) -> Dict[str, Any]:
         """
@@ -261,44 +432,50 @@ class BingAnalyticsStorageService:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
             
-            # Get daily metrics for the period
-            daily_metrics = db.query(BingDailyMetrics).filter(
-                and_(
-                    BingDailyMetrics.user_id == user_id,
-                    BingDailyMetrics.site_url == site_url,
-                    BingDailyMetrics.metric_date >= start_date,
-                    BingDailyMetrics.metric_date <= end_date
-                )
-            ).order_by(BingDailyMetrics.metric_date).all()
+            period_filter = and_(
+                BingDailyMetrics.user_id == user_id,
+                BingDailyMetrics.site_url == site_url,
+                BingDailyMetrics.metric_date >= start_date,
+                BingDailyMetrics.metric_date <= end_date
+            )
             
-            if not daily_metrics:
+            # Summary totals come straight from the precomputed daily rollups
+            metrics_count, total_clicks, total_impressions, total_queries = db.query(
+                func.count(BingDailyMetrics.id),
+                func.coalesce(func.sum(BingDailyMetrics.total_clicks), 0),
+                func.coalesce(func.sum(BingDailyMetrics.total_impressions), 0),
+                func.coalesce(func.sum(BingDailyMetrics.total_queries), 0)
+            ).filter(period_filter).one()
+            
+            if not metrics_count:
+                db.close()
                 return {'error': 'No analytics data found for the specified period'}
             
-            # Calculate summary statistics
-            total_clicks = sum(m.total_clicks for m in daily_metrics)
-            total_impressions = sum(m.total_impressions for m in daily_metrics)
-            total_queries = sum(m.total_queries for m in daily_metrics)
+            total_clicks = int(total_clicks)
+            total_impressions = int(total_impressions)
+            total_queries = int(total_queries)
             avg_ctr = (total_clicks / total_impressions * 100) if total_impressions > 0 else 0
             
-            # Get top performing queries for the period
-            top_queries = []
-            for metric in daily_metrics:
-                if metric.top_queries:
-                    try:
-                        queries = json.loads(metric.top_queries)
-                        top_queries.extend(queries)
-                    except:
-                        continue
-            
-            # Aggregate and sort top queries
+            daily_rows = db.query(
+                BingDailyMetrics.avg_ctr, BingDailyMetrics.top_queries
+            ).filter(period_filter).order_by(BingDailyMetrics.metric_date).all()
+            
+            # Aggregate the stored per-day top queries for the period
             query_aggregates = {}
-            for query in top_queries:
-                q = query['query']
-                if q not in query_aggregates:
-                    query_aggregates[q] = {'clicks': 0, 'impressions': 0, 'count': 0}
-                query_aggregates[q]['clicks'] += query['clicks']
-                query_aggregates[q]['impressions'] += query['impressions']
-                query_aggregates[q]['count'] += 1
+            for _, top_queries_json in daily_rows:
+                if not top_queries_json:
+                    continue
+                try:
+                    queries = json.loads(top_queries_json)
+                except (TypeError, ValueError):
+                    continue
+                for query in queries:
+                    q = query['query']
+                    if q not in query_aggregates:
+                        query_aggregates[q] = {'clicks': 0, 'impressions': 0, 'count': 0}
+                    query_aggregates[q]['clicks'] += query['clicks']
+                    query_aggregates[q]['impressions'] += query['impressions']
+                    query_aggregates[q]['count'] += 1
             
             # Sort by clicks and get top 10
             top_performing = sorted(
@@ -308,13 +485,31 @@ class BingAnalyticsStorageService:
             )[:10]
             
             # Calculate trends
-            recent_metrics = daily_metrics[-7:] if len(daily_metrics) >= 7 else daily_metrics
-            older_metrics = daily_metrics[:-7] if len(daily_metrics) >= 14 else daily_metrics
+            daily_ctrs = [row.avg_ctr for row in daily_rows]
+            recent_metrics = daily_ctrs[-7:] if len(daily_ctrs) >= 7 else daily_ctrs
+            older_metrics = daily_ctrs[:-7] if len(daily_ctrs) >= 14 else daily_ctrs
             
-            recent_avg_ctr = sum(m.avg_ctr for m in recent_metrics) / len(recent_metrics) if recent_metrics else 0
-            older_avg_ctr = sum(m.avg_ctr for m in older_metrics) / len(older_metrics) if older_metrics else 0
+            recent_avg_ctr = sum(recent_metrics) / len(recent_metrics) if recent_metrics else 0
+            older_avg_ctr = sum(older_metrics) / len(older_metrics) if older_metrics else 0
             ctr_trend = self._calculate_percentage_change(recent_avg_ctr, older_avg_ctr)
             
+            weekly_metrics = [
+                {
+                    'week_start': week.period_start.isoformat(),
+                    'total_clicks': week.total_clicks,
+                    'total_impressions': week.total_impressions,
+                    'avg_ctr': round(week.avg_ctr, 2),
+                    'clicks_growth': round(week.clicks_growth, 2)
+                }
+                for week in db.query(BingTrendAnalysis).filter(
+                    BingTrendAnalysis.user_id == user_id,
+                    BingTrendAnalysis.site_url == site_url,
+                    BingTrendAnalysis.period_type == 'weekly',
+                    BingTrendAnalysis.period_start >= self._week_start(start_date),
+                    BingTrendAnalysis.period_start <= end_date
+                ).order_by(BingTrendAnalysis.period_start).all()
+            ]
+            
             db.close()
             
             return {
@@ -325,8 +520,9 @@ class BingAnalyticsStorageService:
                 'avg_ctr': round(avg_ctr, 2),
                 'ctr_trend': round(ctr_trend, 2),
                 'top_queries': top_performing,
-                'daily_metrics_count': len(daily_metrics),
-                'data_quality': 'good' if len(daily_metrics) >= days * 0.8 else 'partial'
+                'weekly_metrics': weekly_metrics,
+                'daily_metrics_count': metrics_count,
+                'data_quality': 'good' if metrics_count >= days * 0.8 else 'partial'
             }
             
         except Exception as e:
@@ -424,7 +620,7 @@ class BingAnalyticsStorageService:
                 db.close()
             return []
     
-    def collect_and_store_data(self, user_id: str, site_url: str, days_back: int = 30) -> bool:
+    def collect_and_store_data(self, user_id: str, site_url: str, days_back: int = 30, incremental: bool = True) -> bool:
         """
         Collect fresh data from Bing API and store it
         
@@ -432,6 +628,8 @@ class BingAnalyticsStorageService:
             user_id: User identifier
             site_url: Site URL
             days_back: How many days back to collect data for
+            incremental: Only recompute rollups for days touched by the new data;
+                when False every day in the range is regenerated
             
         Returns:
             bool: True if successful, False otherwise
@@ -461,16 +659,19 @@ class BingAnalyticsStorageService:
                 return False
             
             # Store raw data
-            if not self.store_raw_query_data(user_id, site_url, queries):
+            touched_days = self.ingest_query_data(user_id, site_url, queries)
+            if touched_days is None:
                 logger.error("Failed to store raw query data")
                 return False
             
-            # Generate daily metrics for each day
-            current_date = start_date
-            while current_date < end_date:
-                if not self.generate_daily_metrics(user_id, site_url, current_date):
-                    logger.warning(f"Failed to generate daily metrics for {current_date.date()}")
-                current_date += timedelta(days=1)
+            if not incremental:
+                current_date = start_date
+                while current_date < end_date:
+                    touched_days.add(current_date.date())
+                    current_date += timedelta(days=1)
+            
+            regenerated = self.refresh_rollups(user_id, site_url, touched_days)
+            logger.info(f"Regenerated {regenerated} daily rollups for {site_url}")
             
             logger.info(f"Successfully collected and stored Bing data for {site_url}")
             return True
@@ -492,37 +693,55 @@ class BingAnalyticsStorageService:
         except:
             return datetime.now()
     
+    def _get_brand_terms(self, site_url: str) -> List[str]:
+        """Extract the brand terms (domain labels longer than 3 chars) from a site URL"""
+        domain = site_url.replace('https://', '').replace('http://', '').split('/')[0]
+        return [term for term in domain.split('.') if len(term) > 3]
+    
     def _is_brand_query(self, query: str, site_url: str) -> bool:
         """Determine if a query is a brand query"""
-        # Extract domain from site URL
-        domain = site_url.replace('https://', '').replace('http://', '').split('/')[0]
-        brand_terms = domain.split('.')
-        
-        # Check if query contains brand terms
         query_lower = query.lower()
-        for term in brand_terms:
-            if len(term) > 3 and term in query_lower:
-                return True
-        return False
+        return any(term in query_lower for term in self._get_brand_terms(site_url))
     
     def _categorize_query(self, query: str) -> str:
         """Categorize a query based on keywords"""
-        query_lower = query.lower()
-        
-        if any(term in query_lower for term in ['ai', 'artificial intelligence', 'machine learning']):
-            return 'ai'
-        elif any(term in query_lower for term in ['story', 'narrative', 'tale', 'fiction']):
-            return 'story_writing'
-        elif any(term in query_lower for term in ['business', 'plan', 'strategy', 'company']):
-            return 'business'
-        elif any(term in query_lower for term in ['letter', 'email', 'correspondence']):
-            return 'letter_writing'
-        elif any(term in query_lower for term in ['blog', 'article', 'content', 'post']):
-            return 'content_writing'
-        elif any(term in query_lower for term in ['free', 'generator', 'tool', 'online']):
-            return 'tools'
+        return self._categorize_lowered_query(query.lower())
+    
+    def _categorize_lowered_query(self, query_lower: str) -> str:
+        """Categorize an already lower-cased query using the precompiled keyword patterns"""
+        for category, pattern in QUERY_CATEGORY_PATTERNS:
+            if pattern.search(query_lower):
+                return category
+        return 'general'
+    
+    def _get_top_rows(self, db: Session, day_filter, order_column, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the top query rows for a day ordered by the given column"""
+        rows = db.query(
+            BingQueryStats.query, BingQueryStats.clicks, BingQueryStats.impressions, BingQueryStats.ctr
+        ).filter(day_filter).order_by(desc(order_column), BingQueryStats.id).limit(limit).all()
+        return [{'query': q, 'clicks': clicks, 'impressions': impressions, 'ctr': ctr} for q, clicks, impressions, ctr in rows]
+    
+    def _upsert(self, db: Session, model, keys: Dict[str, Any], values: Dict[str, Any]):
+        """Update the row matching keys with values, or insert it if missing"""
+        existing = db.query(model).filter_by(**keys).first()
+        if existing:
+            for key, value in values.items():
+                setattr(existing, key, value)
         else:
-            return 'general'
+            db.add(model(**keys, **values))
+    
+    @staticmethod
+    def _day_start(value) -> datetime:
+        """Normalize a date or datetime to midnight"""
+        if not isinstance(value, datetime):
+            value = datetime.combine(value, datetime.min.time())
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    @classmethod
+    def _week_start(cls, value) -> datetime:
+        """Midnight of the Monday starting the week containing value"""
+        day = cls._day_start(value)
+        return day - timedelta(days=day.weekday())
     
     def _extract_queries_from_response(self, response_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract queries from Bing API response"""
@@ -4,7 +4,7 @@ Blog Writer Service - Main orchestrator for AI Blog Writer.
 Coordinates research, outline generation, content creation, and optimization.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import time
 import uuid
 from loguru import logger
@@ -42,22 +42,20 @@ from models.blog_models import (
     MediumGeneratedSection,
 )
 
-# Import task manager - we'll create a simple one for this service
+from .task_store import TaskStore, task_store
+
+
 class SimpleTaskManager:
-    """Simple task manager for BlogWriterService."""
+    """Simple task manager for BlogWriterService, backed by the shared task store."""
     
-    def __init__(self):
-        self.tasks = {}
+    def __init__(self, store: Optional[TaskStore] = None):
+        self.store = store or task_store
     
     def start_task(self, task_id: str, func, **kwargs):
         """Start a task with the given function and arguments."""
         import asyncio
-        self.tasks[task_id] = {
-            "status": "running",
-            "progress": "Starting...",
-            "result": None,
-            "error": None
-        }
+        self.store.create(task_id, task_type="rewrite", status="running")
+        self.store.append_progress(task_id, "Starting...")
         # Start the task in the background
         asyncio.create_task(self._run_task(task_id, func, **kwargs))
     
@@ -66,22 +64,33 @@ class SimpleTaskManager:
         try:
             await func(task_id, **kwargs)
         except Exception as e:
-            self.tasks[task_id]["status"] = "failed"
-            self.tasks[task_id]["error"] = str(e)
+            await self.store.aupdate(task_id, status="failed", error=str(e))
             logger.error(f"Task {task_id} failed: {e}")
     
     def update_task_status(self, task_id: str, status: str, progress: str = None, result=None):
         """Update task status."""
-        if task_id in self.tasks:
-            self.tasks[task_id]["status"] = status
-            if progress:
-                self.tasks[task_id]["progress"] = progress
-            if result:
-                self.tasks[task_id]["result"] = result
+        fields = {"status": status}
+        if result:
+            fields["result"] = result
+        self.store.update(task_id, **fields)
+        if progress:
+            self.store.append_progress(task_id, progress)
     
     def get_task_status(self, task_id: str):
         """Get task status."""
-        return self.tasks.get(task_id, {"status": "not_found"})
+        task = self.store.get(task_id)
+        if task is None:
+            return {"status": "not_found"}
+        
+        progress_messages = task.get("progress_messages", [])
+        return {
+            "status": task["status"],
+            "progress": progress_messages[-1]["message"] if progress_messages else None,
+            "progress_messages": progress_messages,
+            "result": task["result"],
+            "error": task["error"],
+            "version": task["version"]
+        }
 
 
 class BlogWriterService:
@@ -0,0 +1,483 @@
+"""
+Task Store for Blog Writer background tasks.
+
+Provides pluggable storage for task status, results and progress messages so that
+task state survives restarts and is visible to every uvicorn worker.
+
+Two implementations are available:
+- InMemoryTaskStore: per-process storage (single worker / tests)
+- SQLiteTaskStore: shared SQLite database in WAL mode (default)
+
+Both keep an expiry index so expired tasks are purged without scanning every task
+on read, cap progress messages per task, and support long-poll reads that return
+as soon as a task changes. Async callers use the a-prefixed methods, which run the
+store I/O in a worker thread and notify waiters on the event loop.
+"""
+
+import asyncio
+import heapq
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from loguru import logger
+
+from utils.sqlite_utils import connect, init_database
+
+
+DEFAULT_TASK_TTL_SECONDS = 3600
+DEFAULT_MAX_PROGRESS_MESSAGES = 10
+
+# Fields callers may update on a task record
+_UPDATABLE_FIELDS = ("status", "result", "error")
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+def _json_default(value: Any) -> str:
+    """Serialize datetimes in task results the same way FastAPI would."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class TaskStore(ABC):
+    """Abstract task store used by the blog writer task managers."""
+
+    def __init__(
+        self,
+        ttl_seconds: int = DEFAULT_TASK_TTL_SECONDS,
+        max_progress_messages: int = DEFAULT_MAX_PROGRESS_MESSAGES,
+        poll_interval: float = 0.5,
+    ):
+        """
+        Args:
+            ttl_seconds: Seconds after creation before a task expires
+            max_progress_messages: Number of most recent progress messages kept per task
+            poll_interval: Seconds between re-checks while long-polling a task
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_progress_messages = max_progress_messages
+        self.poll_interval = poll_interval
+        # Local change notifications; wakes same-process waiters immediately
+        self._change_events: Dict[str, asyncio.Event] = {}
+
+    @abstractmethod
+    def create(self, task_id: str, task_type: str = "general", status: str = "pending") -> None:
+        """Create a new task record."""
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return the task record, or None if it does not exist or has expired."""
+
+    @abstractmethod
+    def _update(self, task_id: str, fields: Dict[str, Any]) -> bool:
+        """Apply field updates and bump the task version. Returns False if the task is missing."""
+
+    @abstractmethod
+    def _append_progress(self, task_id: str, entry: Dict[str, str]) -> bool:
+        """Append a progress entry, dropping the oldest beyond the cap. Returns False if missing."""
+
+    @abstractmethod
+    def _clear_progress(self, task_id: str) -> bool:
+        """Remove all progress entries for a task. Returns False if missing."""
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Delete expired tasks using the expiry index. Returns the number removed."""
+
+    def update(self, task_id: str, **fields: Any) -> bool:
+        """Update status/result/error for a task and notify waiters."""
+        self._check_fields(fields)
+        updated = self._update(task_id, fields)
+        if updated:
+            self._notify(task_id)
+        return updated
+
+    def append_progress(self, task_id: str, message: str) -> bool:
+        """Record a progress message for a task and notify waiters."""
+        entry = {"timestamp": datetime.now().isoformat(), "message": message}
+        appended = self._append_progress(task_id, entry)
+        if appended:
+            self._notify(task_id)
+        return appended
+
+    def clear_progress(self, task_id: str) -> bool:
+        """Reset progress messages for a task."""
+        cleared = self._clear_progress(task_id)
+        if cleared:
+            self._notify(task_id)
+        return cleared
+
+    async def acreate(self, task_id: str, task_type: str = "general", status: str = "pending") -> None:
+        """Async variant of create()."""
+        await asyncio.to_thread(self.create, task_id, task_type, status)
+
+    async def aget(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get()."""
+        return await asyncio.to_thread(self.get, task_id)
+
+    async def aupdate(self, task_id: str, **fields: Any) -> bool:
+        """Async variant of update()."""
+        self._check_fields(fields)
+        updated = await asyncio.to_thread(self._update, task_id, fields)
+        if updated:
+            self._notify(task_id)
+        return updated
+
+    async def aappend_progress(self, task_id: str, message: str) -> bool:
+        """Async variant of append_progress()."""
+        entry = {"timestamp": datetime.now().isoformat(), "message": message}
+        appended = await asyncio.to_thread(self._append_progress, task_id, entry)
+        if appended:
+            self._notify(task_id)
+        return appended
+
+    async def aclear_progress(self, task_id: str) -> bool:
+        """Async variant of clear_progress()."""
+        cleared = await asyncio.to_thread(self._clear_progress, task_id)
+        if cleared:
+            self._notify(task_id)
+        return cleared
+
+    async def wait_for_change(
+        self, task_id: str, since_version: Optional[int], timeout: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Long-poll a task until its version differs from since_version or timeout elapses.
+
+        Args:
+            task_id: Task to watch
+            since_version: Version the caller already has (None returns immediately)
+            timeout: Maximum seconds to wait
+
+        Returns:
+            The current task record, or None if the task does not exist
+        """
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            task = await self.aget(task_id)
+            if task is None or task["status"] in TERMINAL_STATUSES:
+                # Nothing more will happen to this task
+                self._change_events.pop(task_id, None)
+                return task
+            if since_version is None or task["version"] != since_version:
+                return task
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return task
+
+            # Wake on local notification, or re-check periodically for updates made
+            # by other workers sharing the same store.
+            event = self._change_events.setdefault(task_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), timeout=min(self.poll_interval, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    @staticmethod
+    def _check_fields(fields: Dict[str, Any]) -> None:
+        """Reject fields that are not part of a task record."""
+        unknown = set(fields) - set(_UPDATABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported task fields: {sorted(unknown)}")
+
+    def _notify(self, task_id: str) -> None:
+        """Wake local waiters for a task."""
+        event = self._change_events.pop(task_id, None)
+        if event is not None:
+            event.set()
+
+
+class InMemoryTaskStore(TaskStore):
+    """Per-process task store backed by a dict, a min-heap expiry index and capped deques."""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._progress: Dict[str, Deque[Dict[str, str]]] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+
+    def create(self, task_id: str, task_type: str = "general", status: str = "pending") -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        self._tasks[task_id] = {
+            "task_id": task_id,
+            "task_type": task_type,
+            "status": status,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "expires_at": expires_at,
+            "version": 0,
+        }
+        self._progress[task_id] = deque(maxlen=self.max_progress_messages)
+        heapq.heappush(self._expiry_heap, (expires_at, task_id))
+        self.purge_expired()
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        task = self._tasks.get(task_id)
+        if task is None:
+            return None
+        if task["expires_at"] <= time.time():
+            self.purge_expired()
+            return None
+        record = dict(task)
+        record["progress_messages"] = list(self._progress.get(task_id, ()))
+        return record
+
+    def _update(self, task_id: str, fields: Dict[str, Any]) -> bool:
+        task = self._tasks.get(task_id)
+        if task is None:
+            return False
+        task.update(fields)
+        self._touch(task)
+        return True
+
+    def _append_progress(self, task_id: str, entry: Dict[str, str]) -> bool:
+        task = self._tasks.get(task_id)
+        if task is None:
+            return False
+        self._progress[task_id].append(entry)
+        self._touch(task)
+        return True
+
+    def _clear_progress(self, task_id: str) -> bool:
+        task = self._tasks.get(task_id)
+        if task is None:
+            return False
+        self._progress[task_id].clear()
+        self._touch(task)
+        return True
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, task_id = heapq.heappop(self._expiry_heap)
+            task = self._tasks.get(task_id)
+            # Skip stale heap entries for tasks that were re-created with a new expiry
+            if task is not None and task["expires_at"] == expires_at:
+                del self._tasks[task_id]
+                self._progress.pop(task_id, None)
+                removed += 1
+        if removed:
+            logger.debug(f"Purged {removed} expired blog writer tasks")
+        return removed
+
+    @staticmethod
+    def _touch(task: Dict[str, Any]) -> None:
+        task["updated_at"] = time.time()
+        task["version"] += 1
+
+
+class SQLiteTaskStore(TaskStore):
+    """Task store shared across workers through a SQLite database in WAL mode."""
+
+    def __init__(self, db_path: str = "blog_writer_tasks.db", purge_interval_seconds: float = 60.0, **kwargs: Any):
+        """
+        Args:
+            db_path: Path to SQLite database file
+            purge_interval_seconds: Minimum seconds between expiry purges
+        """
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self.purge_interval_seconds = purge_interval_seconds
+        self._last_purge = 0.0
+
+        # Ensure database directory exists
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect(self.db_path)
+
+    def _init_database(self):
+        """Initialize the SQLite database with required tables."""
+        init_database(
+            self.db_path,
+            """
+                CREATE TABLE IF NOT EXISTS blog_writer_tasks (
+                    task_id TEXT PRIMARY KEY,
+                    task_type TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result_data TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    version INTEGER NOT NULL DEFAULT 0
+                )
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS blog_writer_task_progress (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_id TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    message TEXT NOT NULL
+                )
+            """,
+            # Expiry index replaces full scans when purging
+            "CREATE INDEX IF NOT EXISTS idx_blog_writer_tasks_expires_at ON blog_writer_tasks(expires_at)",
+            "CREATE INDEX IF NOT EXISTS idx_blog_writer_task_progress_task ON blog_writer_task_progress(task_id, id)"
+        )
+
+    def create(self, task_id: str, task_type: str = "general", status: str = "pending") -> None:
+        self._maybe_purge()
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM blog_writer_task_progress WHERE task_id = ?", (task_id,))
+            conn.execute("""
+                INSERT OR REPLACE INTO blog_writer_tasks
+                (task_id, task_type, status, result_data, error, created_at, updated_at, expires_at, version)
+                VALUES (?, ?, ?, NULL, NULL, ?, ?, ?, 0)
+            """, (task_id, task_type, status, now, now, now + self.ttl_seconds))
+            conn.commit()
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        self._maybe_purge()
+        with self._connect() as conn:
+            row = conn.execute("""
+                SELECT task_type, status, result_data, error, created_at, updated_at, expires_at, version
+                FROM blog_writer_tasks
+                WHERE task_id = ? AND expires_at > ?
+            """, (task_id, time.time())).fetchone()
+            if row is None:
+                return None
+
+            progress_rows = conn.execute("""
+                SELECT timestamp, message FROM blog_writer_task_progress
+                WHERE task_id = ? ORDER BY id ASC
+            """, (task_id,)).fetchall()
+
+        result = None
+        if row[2] is not None:
+            try:
+                result = json.loads(row[2])
+            except json.JSONDecodeError:
+                logger.error(f"Invalid JSON result stored for task {task_id}")
+
+        return {
+            "task_id": task_id,
+            "task_type": row[0],
+            "status": row[1],
+            "result": result,
+            "error": row[3],
+            "created_at": row[4],
+            "updated_at": row[5],
+            "expires_at": row[6],
+            "version": row[7],
+            "progress_messages": [{"timestamp": ts, "message": msg} for ts, msg in progress_rows],
+        }
+
+    def _update(self, task_id: str, fields: Dict[str, Any]) -> bool:
+        assignments = []
+        params: List[Any] = []
+        for field, value in fields.items():
+            if field == "result":
+                assignments.append("result_data = ?")
+                params.append(json.dumps(value, default=_json_default) if value is not None else None)
+            else:
+                assignments.append(f"{field} = ?")
+                params.append(value)
+        assignments.append("updated_at = ?")
+        assignments.append("version = version + 1")
+        params.extend([time.time(), task_id])
+
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE blog_writer_tasks SET {', '.join(assignments)} WHERE task_id = ?",
+                params,
+            )
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def _append_progress(self, task_id: str, entry: Dict[str, str]) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE blog_writer_tasks SET updated_at = ?, version = version + 1 WHERE task_id = ?",
+                (time.time(), task_id),
+            )
+            if cursor.rowcount == 0:
+                return False
+            conn.execute(
+                "INSERT INTO blog_writer_task_progress (task_id, timestamp, message) VALUES (?, ?, ?)",
+                (task_id, entry["timestamp"], entry["message"]),
+            )
+            # Ring buffer: keep only the most recent messages for this task
+            conn.execute("""
+                DELETE FROM blog_writer_task_progress
+                WHERE task_id = ? AND id <= (
+                    SELECT id FROM blog_writer_task_progress
+                    WHERE task_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?
+                )
+            """, (task_id, task_id, self.max_progress_messages))
+            conn.commit()
+            return True
+
+    def _clear_progress(self, task_id: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE blog_writer_tasks SET updated_at = ?, version = version + 1 WHERE task_id = ?",
+                (time.time(), task_id),
+            )
+            if cursor.rowcount == 0:
+                return False
+            conn.execute("DELETE FROM blog_writer_task_progress WHERE task_id = ?", (task_id,))
+            conn.commit()
+            return True
+
+    def purge_expired(self) -> int:
+        self._last_purge = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                DELETE FROM blog_writer_task_progress WHERE task_id IN (
+                    SELECT task_id FROM blog_writer_tasks WHERE expires_at <= ?
+                )
+            """, (self._last_purge,))
+            cursor = conn.execute("DELETE FROM blog_writer_tasks WHERE expires_at <= ?", (self._last_purge,))
+            removed = cursor.rowcount
+            conn.commit()
+        if removed > 0:
+            logger.debug(f"Purged {removed} expired blog writer tasks")
+        return removed
+
+    def _maybe_purge(self) -> None:
+        """Purge expired tasks at most once per purge interval."""
+        if time.time() - self._last_purge >= self.purge_interval_seconds:
+            try:
+                self.purge_expired()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to purge expired blog writer tasks: {e}")
+
+
+def create_task_store() -> TaskStore:
+    """
+    Create the configured task store.
+
+    BLOG_WRITER_TASK_STORE selects the backend ("sqlite" by default, or "memory");
+    BLOG_WRITER_TASK_DB sets the SQLite database path.
+    """
+    backend = os.getenv("BLOG_WRITER_TASK_STORE", "sqlite").strip().lower()
+    if backend == "memory":
+        return InMemoryTaskStore()
+    if backend != "sqlite":
+        logger.warning(f"Unknown BLOG_WRITER_TASK_STORE '{backend}', falling back to sqlite")
+
+    db_path = os.getenv("BLOG_WRITER_TASK_DB", "blog_writer_tasks.db")
+    try:
+        return SQLiteTaskStore(db_path=db_path)
+    except sqlite3.Error as e:
+        logger.error(f"Failed to initialize SQLite task store at {db_path}, using in-memory store: {e}")
+        return InMemoryTaskStore()
+
+
+# Global task store instance shared by the blog writer task managers
+task_store = create_task_store()
@@ -8,9 +8,17 @@ approach of algorithmic scoring followed by AI validation for optimal results.
 
 from typing import Dict, Any, List, Tuple, Optional
 import re
+from bisect import bisect_left
 from collections import Counter
+import numpy as np
 from loguru import logger
 
+try:
+    from scipy import sparse
+    SCIPY_AVAILABLE = True
+except Exception:
+    SCIPY_AVAILABLE = False
+
 from models.blog_models import (
     BlogOutlineSection,
     ResearchSource,
@@ -98,30 +106,21 @@ class SourceToSectionMapper:
             Dictionary mapping section IDs to list of (source, score) tuples
         """
         mapping_results = {}
+        sources = research_data.sources
         
-        for section in sections:
-            section_scores = []
-            
-            for source in research_data.sources:
-                # Calculate multi-dimensional relevance score
-                semantic_score = self._calculate_semantic_similarity(section, source)
-                keyword_score = self._calculate_keyword_relevance(section, source, research_data)
-                contextual_score = self._calculate_contextual_relevance(section, source, research_data)
-                
-                # Weighted total score
-                total_score = (
-                    semantic_score * self.weights['semantic'] +
-                    keyword_score * self.weights['keyword'] +
-                    contextual_score * self.weights['contextual']
-                )
-                
-                # Only include sources that meet minimum threshold
-                if total_score >= self.min_total_score:
-                    section_scores.append((source, total_score))
+        # Score every section x source pair in one pass over precomputed features
+        score_matrix = self._compute_score_matrix(sections, sources, research_data)
+        
+        for row, section in enumerate(sections):
+            section_row = score_matrix[row]
             
-            # Sort by score and limit to max sources per section
-            section_scores.sort(key=lambda x: x[1], reverse=True)
-            section_scores = section_scores[:self.max_sources_per_section]
+            # Only include sources that meet minimum threshold, sorted by score (stable on ties)
+            candidates = np.flatnonzero(section_row >= self.min_total_score)
+            ranked = candidates[np.argsort(-section_row[candidates], kind='stable')]
+            section_scores = [
+                (sources[col], float(section_row[col]))
+                for col in ranked[:self.max_sources_per_section]
+            ]
             
             mapping_results[section.id] = section_scores
             
@@ -129,6 +128,247 @@ class SourceToSectionMapper:
         
         return mapping_results
     
+    def _compute_score_matrix(
+        self,
+        sections: List[BlogOutlineSection],
+        sources: List[ResearchSource],
+        research_data: BlogResearchResponse
+    ) -> np.ndarray:
+        """
+        Compute weighted relevance scores for all section x source pairs.
+        
+        Text is tokenized once per section and per source into binary term-incidence
+        matrices, and pair overlaps are computed with sparse matrix products. Produces
+        the same scores as the per-pair _calculate_* methods.
+        
+        Args:
+            sections: List of outline sections
+            sources: List of research sources
+            research_data: Research data with keyword analysis and content angles
+            
+        Returns:
+            Array of shape (len(sections), len(sources)) with total scores
+        """
+        n_sections, n_sources = len(sections), len(sources)
+        if n_sections == 0 or n_sources == 0:
+            return np.zeros((n_sections, n_sources))
+        
+        # Per-section and per-source text, extracted once
+        section_texts = [self._extract_section_text(section) for section in sections]
+        section_texts_lower = [text.lower() for text in section_texts]
+        source_texts_lower = [self._extract_source_text(source).lower() for source in sources]
+        
+        section_words = [set(self._extract_meaningful_words(text)) for text in section_texts]
+        source_words = [set(self._extract_meaningful_words(text)) for text in source_texts_lower]
+        section_keywords = [
+            set(section.keywords) if section.keywords else section_words[i]
+            for i, section in enumerate(sections)
+        ]
+        
+        research_keywords = set()
+        for category in ['primary', 'secondary', 'long_tail', 'semantic_keywords']:
+            research_keywords.update(research_data.keyword_analysis.get(category, []))
+        
+        # Shared vocabulary of source tokens; section tokens outside it can never overlap
+        vocabulary: Dict[str, int] = {}
+        for words in source_words:
+            for word in words:
+                vocabulary.setdefault(word, len(vocabulary))
+        n_terms = len(vocabulary)
+        
+        source_matrix = self._incidence_matrix(
+            [[vocabulary[w] for w in words] for words in source_words], n_terms
+        )
+        section_word_matrix = self._incidence_matrix(
+            [[vocabulary[w] for w in words if w in vocabulary] for words in section_words], n_terms
+        )
+        section_keyword_matrix = self._incidence_matrix(
+            [[vocabulary[w] for w in keywords if w in vocabulary] for keywords in section_keywords], n_terms
+        )
+        
+        section_word_counts = np.array([len(words) for words in section_words], dtype=float)
+        source_word_counts = np.array([len(words) for words in source_words], dtype=float)
+        section_keyword_counts = np.array([len(keywords) for keywords in section_keywords], dtype=float)
+        
+        # 1. Semantic: Jaccard over meaningful words plus phrase boost
+        intersection = self._to_dense(section_word_matrix @ source_matrix.T)
+        union = section_word_counts[:, None] + source_word_counts[None, :] - intersection
+        jaccard = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+        phrase_boost = self._phrase_boost_matrix(section_texts, source_texts_lower)
+        semantic = np.minimum(1.0, jaccard + phrase_boost)
+        has_words = (section_word_counts[:, None] > 0) & (source_word_counts[None, :] > 0)
+        semantic = np.where(has_words, semantic, 0.0)
+        
+        # 2. Keyword: section keyword overlap and research keyword overlap
+        keyword_intersection = self._to_dense(section_keyword_matrix @ source_matrix.T)
+        section_overlap = np.divide(
+            keyword_intersection, section_keyword_counts[:, None],
+            out=np.zeros_like(keyword_intersection), where=section_keyword_counts[:, None] > 0
+        )
+        if research_keywords:
+            research_vector = np.zeros(n_terms)
+            research_vector[[vocabulary[w] for w in research_keywords if w in vocabulary]] = 1.0
+            research_overlap = self._to_dense(source_matrix @ research_vector).ravel() / len(research_keywords)
+        else:
+            research_overlap = np.zeros(n_sources)
+        keyword = np.minimum(1.0, section_overlap * 0.7 + research_overlap[None, :] * 0.3)
+        
+        # 3. Contextual: content angles, search intent and industry relevance
+        contextual = self._contextual_score_matrix(section_texts_lower, source_texts_lower, research_data)
+        
+        return (
+            semantic * self.weights['semantic'] +
+            keyword * self.weights['keyword'] +
+            contextual * self.weights['contextual']
+        )
+    
+    def _phrase_boost_matrix(self, section_texts: List[str], source_texts_lower: List[str]) -> np.ndarray:
+        """Vectorized _calculate_phrase_similarity for all section x source pairs."""
+        # Collect each distinct 2/3-word phrase once, with per-section occurrence counts
+        phrase_index: Dict[str, int] = {}
+        phrase_weights: List[float] = []
+        section_phrase_counts: List[Counter] = []
+        for text in section_texts:
+            words = text.lower().split()
+            counts: Counter = Counter()
+            for size, weight in ((2, 0.1), (3, 0.15)):
+                for i in range(len(words) - size + 1):
+                    phrase = " ".join(words[i:i + size])
+                    if phrase not in phrase_index:
+                        phrase_index[phrase] = len(phrase_index)
+                        phrase_weights.append(weight)
+                    counts[phrase_index[phrase]] += 1
+            section_phrase_counts.append(counts)
+        
+        if not phrase_index:
+            return np.zeros((len(section_texts), len(source_texts_lower)))
+        
+        # Weighted phrase counts per section, and phrase hits per source (substring match)
+        weights = np.array(phrase_weights)
+        section_phrases = np.zeros((len(section_texts), len(phrase_index)))
+        for row, counts in enumerate(section_phrase_counts):
+            for col, count in counts.items():
+                section_phrases[row, col] = count * weights[col]
+        
+        source_hits = self._phrase_hits(list(phrase_index), source_texts_lower)
+        
+        return np.minimum(0.3, section_phrases @ source_hits.T)
+    
+    @staticmethod
+    def _phrase_hits(phrases: List[str], source_texts_lower: List[str]) -> np.ndarray:
+        """
+        Mark which phrases occur as substrings of which sources.
+        
+        Phrase words contain no whitespace, so "w1 w2" occurs in a text exactly when two
+        adjacent space-separated chunks satisfy: the first ends with w1 and the second
+        starts with w2 (for "w1 w2 w3", the middle chunk equals w2 and the next starts
+        with w3). Chunks are indexed once, and chunks starting with w2 are found by
+        bisecting the sorted chunk list, so no phrase is scanned against every source.
+        
+        Returns:
+            Array of shape (len(source_texts_lower), len(phrases)) with 1.0 for hits
+        """
+        source_chunks = [text.split(' ') for text in source_texts_lower]
+        chunk_positions: Dict[str, List[Tuple[int, int]]] = {}
+        for row, chunks in enumerate(source_chunks):
+            for position in range(1, len(chunks)):
+                chunk_positions.setdefault(chunks[position], []).append((row, position))
+        ordered_chunks = sorted(chunk_positions)
+        
+        hits = np.zeros((len(source_texts_lower), len(phrases)))
+        for col, phrase in enumerate(phrases):
+            words = phrase.split(' ')
+            is_trigram = len(words) == 3
+            index = bisect_left(ordered_chunks, words[1])
+            while index < len(ordered_chunks) and ordered_chunks[index].startswith(words[1]):
+                chunk = ordered_chunks[index]
+                index += 1
+                if is_trigram and chunk != words[1]:
+                    continue
+                for row, position in chunk_positions[chunk]:
+                    chunks = source_chunks[row]
+                    if hits[row, col] or not chunks[position - 1].endswith(words[0]):
+                        continue
+                    if is_trigram and not (position + 1 < len(chunks) and chunks[position + 1].startswith(words[2])):
+                        continue
+                    hits[row, col] = 1.0
+        return hits
+    
+    def _contextual_score_matrix(
+        self,
+        section_texts_lower: List[str],
+        source_texts_lower: List[str],
+        research_data: BlogResearchResponse
+    ) -> np.ndarray:
+        """Vectorized _calculate_contextual_relevance for all section x source pairs."""
+        # Content angles contribute independently from the section and the source side
+        angle_word_lists = [
+            words for words in (self._extract_meaningful_words(angle.lower()) for angle in research_data.suggested_angles)
+            if words
+        ]
+        
+        def angle_score(text: str) -> float:
+            return sum(
+                sum(1 for word in words if word in text) / len(words) * 0.3
+                for words in angle_word_lists
+            )
+        
+        section_angle = np.array([angle_score(text) for text in section_texts_lower])
+        source_angle = np.array([angle_score(text) for text in source_texts_lower])
+        
+        # Search intent: keyword counts once if it appears in either text
+        search_intent = research_data.keyword_analysis.get('search_intent', 'informational')
+        intent_keywords = self._get_intent_keywords(search_intent)
+        if intent_keywords:
+            section_intent = np.array(
+                [[keyword in text for keyword in intent_keywords] for text in section_texts_lower], dtype=float
+            )
+            source_intent = np.array(
+                [[keyword in text for keyword in intent_keywords] for text in source_texts_lower], dtype=float
+            )
+            either = (
+                section_intent.sum(axis=1)[:, None] + source_intent.sum(axis=1)[None, :]
+                - section_intent @ source_intent.T
+            )
+            intent = np.minimum(0.3, either * 0.1)
+        else:
+            intent = np.zeros((len(section_texts_lower), len(source_texts_lower)))
+        
+        # Industry relevance depends on the source only
+        industry_score = np.zeros(len(source_texts_lower))
+        industry = getattr(research_data, 'industry', None)
+        if industry:
+            industry_words = self._extract_meaningful_words(industry.lower())
+            if industry_words:
+                industry_score = np.array([
+                    sum(1 for word in industry_words if word in text) / len(industry_words)
+                    for text in source_texts_lower
+                ]) * 0.2
+        
+        contextual = section_angle[:, None] + source_angle[None, :] + intent + industry_score[None, :]
+        return np.minimum(1.0, contextual)
+    
+    @staticmethod
+    def _incidence_matrix(rows: List[List[int]], n_cols: int):
+        """Build a binary row x term incidence matrix (sparse when SciPy is available)."""
+        if SCIPY_AVAILABLE:
+            indptr = np.cumsum([0] + [len(cols) for cols in rows])
+            indices = np.fromiter((col for cols in rows for col in cols), dtype=np.int64, count=int(indptr[-1]))
+            data = np.ones(len(indices))
+            return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), n_cols))
+        
+        matrix = np.zeros((len(rows), n_cols))
+        for row, cols in enumerate(rows):
+            matrix[row, cols] = 1.0
+        return matrix
+    
+    @staticmethod
+    def _to_dense(matrix) -> np.ndarray:
+        """Convert a sparse or dense matrix product to a dense float array."""
+        if SCIPY_AVAILABLE and sparse.issparse(matrix):
+            return matrix.toarray()
+        return np.asarray(matrix, dtype=float)
+    
     def _calculate_semantic_similarity(self, section: BlogOutlineSection, source: ResearchSource) -> float:
         """
         Calculate semantic similarity between section and source.
@@ -0,0 +1,262 @@
+"""
+Stability Result Cache
+
+On-disk, content-addressed cache for deterministic Stability AI results (fast upscale,
+background removal, seeded generations). Entries are keyed by operation, normalized
+parameters, the hashes of the uploaded inputs and the seed, so retrying the same
+request is served from disk instead of being billed again.
+
+Result files live under the cache directory; a SQLite index tracks their size and last
+access so the cache is trimmed least-recently-used first once it exceeds its limits.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+from loguru import logger
+
+from utils.sqlite_utils import connect, init_database
+from utils.stability_utils import FileManager
+
+STABILITY_RESULT_CACHE_DIR = os.getenv("STABILITY_RESULT_CACHE_DIR", "stability_result_cache")
+STABILITY_RESULT_CACHE_MAX_MB = int(os.getenv("STABILITY_RESULT_CACHE_MAX_MB", "512"))
+STABILITY_RESULT_CACHE_MAX_ENTRIES = int(os.getenv("STABILITY_RESULT_CACHE_MAX_ENTRIES", "5000"))
+CACHE_READ_CHUNK_SIZE = 64 * 1024
+
+
+def hash_bytes(content: bytes) -> str:
+    """Content hash of an input file."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def iter_file(file_obj: BinaryIO, chunk_size: int = CACHE_READ_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a file in chunks and close it, so cached results are streamed."""
+    try:
+        while True:
+            chunk = file_obj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file_obj.close()
+
+
+class CacheWriter:
+    """Writes a result to a temporary file and publishes it on commit."""
+
+    def __init__(self, cache: "StabilityResultCache", key: str, operation: str, media_type: str):
+        self.cache = cache
+        self.key = key
+        self.operation = operation
+        self.media_type = media_type
+        self.size = 0
+        handle, self.temp_path = tempfile.mkstemp(dir=cache.cache_dir, prefix=".tmp_")
+        self._file = os.fdopen(handle, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> None:
+        self._file.close()
+        try:
+            self.cache._publish(self.key, self.temp_path, self.size, self.operation, self.media_type)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Failed to store Stability result {self.key[:12]}: {e}")
+            self._remove_temp()
+
+    def abort(self) -> None:
+        self._file.close()
+        self._remove_temp()
+
+    def _remove_temp(self) -> None:
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+
+class StabilityResultCache:
+    """Size-bounded LRU cache of Stability result files."""
+
+    def __init__(self, cache_dir: str = STABILITY_RESULT_CACHE_DIR,
+                 max_bytes: int = STABILITY_RESULT_CACHE_MAX_MB * 1024 * 1024,
+                 max_entries: int = STABILITY_RESULT_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            cache_dir: Directory holding result files and the index database
+            max_bytes: Maximum total size of cached results
+            max_entries: Maximum number of cached results
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.db_path = str(self.cache_dir / "index.db")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect(self.db_path)
+
+    def _init_database(self):
+        """Initialize the SQLite index."""
+        init_database(
+            self.db_path,
+            """
+                CREATE TABLE IF NOT EXISTS stability_result_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    operation TEXT NOT NULL,
+                    media_type TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_stability_result_cache_accessed ON stability_result_cache(last_accessed)"
+        )
+
+    @staticmethod
+    def build_key(operation: str, params: Dict[str, Any], input_hashes: Dict[str, str],
+                  seed: Optional[int] = None) -> str:
+        """
+        Cache key for a request.
+
+        Args:
+            operation: Operation name, e.g. "upscale_fast"
+            params: Form parameters (non-file fields)
+            input_hashes: Content hash of each uploaded file by field name
+            seed: Generation seed, if the operation takes one
+        """
+        normalized = {}
+        for name, value in params.items():
+            if isinstance(value, str):
+                value = value.strip()
+            if value is None or value == "" or name == "seed":
+                continue
+            normalized[name] = value.lower() if name == "output_format" else value
+        return FileManager.generate_cache_key(operation, {
+            "params": normalized,
+            "inputs": input_hashes,
+            "seed": seed,
+        })
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def open(self, key: str) -> Optional[Tuple[BinaryIO, int, str]]:
+        """Open a cached result as (file, size, media_type), or None on a miss."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT media_type, size_bytes FROM stability_result_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            try:
+                # Opened before returning so eviction cannot remove it mid-response
+                file_obj = open(self._path_for(key), "rb")
+            except FileNotFoundError:
+                conn.execute("DELETE FROM stability_result_cache WHERE cache_key = ?", (key,))
+                conn.commit()
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE stability_result_cache SET last_accessed = ? WHERE cache_key = ?", (time.time(), key)
+            )
+            conn.commit()
+        self.hits += 1
+        return file_obj, row[1], row[0]
+
+    def writer(self, key: str, operation: str, media_type: str) -> CacheWriter:
+        """Start writing a result; call commit() once the whole body was written."""
+        return CacheWriter(self, key, operation, media_type)
+
+    def put(self, key: str, operation: str, content: bytes, media_type: str) -> None:
+        """Store a complete result."""
+        writer = self.writer(key, operation, media_type)
+        writer.write(content)
+        writer.commit()
+
+    def _publish(self, key: str, temp_path: str, size: int, operation: str, media_type: str) -> None:
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp_path, path)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO stability_result_cache
+                (cache_key, operation, media_type, size_bytes, created_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (key, operation, media_type, size, now, now))
+            conn.commit()
+        self._evict()
+
+    def _evict(self) -> int:
+        """Delete least recently used results until the cache is within its limits."""
+        removed = 0
+        with self._lock, self._connect() as conn:
+            count, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM stability_result_cache"
+            ).fetchone()
+            if count <= self.max_entries and total <= self.max_bytes:
+                return 0
+            for key, size in conn.execute(
+                "SELECT cache_key, size_bytes FROM stability_result_cache ORDER BY last_accessed ASC"
+            ).fetchall():
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(self._path_for(key))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    # Typically a file still open by a response being streamed; retry on a later eviction
+                    logger.warning(f"Could not evict cached Stability result {key}: {e}")
+                    continue
+                conn.execute("DELETE FROM stability_result_cache WHERE cache_key = ?", (key,))
+                count -= 1
+                total -= size
+                removed += 1
+            conn.commit()
+        if removed:
+            logger.debug(f"Evicted {removed} Stability results from the result cache")
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        with self._lock, self._connect() as conn:
+            for (key,) in conn.execute("SELECT cache_key FROM stability_result_cache").fetchall():
+                try:
+                    os.remove(self._path_for(key))
+                except OSError as e:
+                    if not isinstance(e, FileNotFoundError):
+                        logger.warning(f"Could not remove cached Stability result {key}: {e}")
+            conn.execute("DELETE FROM stability_result_cache")
+            conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry count, size and hit counters."""
+        with self._connect() as conn:
+            count, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM stability_result_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0.0
+        }
@@ -9,6 +9,7 @@ from loguru import logger
 from datetime import datetime
 import asyncio
 import json
+import os
 from collections import Counter, defaultdict
 
 # Import AI providers
@@ -20,6 +21,8 @@ from services.database import get_db_session
 from .ai_engine_service import AIEngineService
 from .website_analyzer import WebsiteAnalyzer
 
+COMPETITOR_ANALYSIS_CONCURRENCY = int(os.getenv("COMPETITOR_ANALYSIS_CONCURRENCY", "5"))
+
 class CompetitorAnalyzer:
     """Analyzes competitor content and market position."""
     
@@ -53,9 +56,15 @@ class CompetitorAnalyzer:
                 'industry': industry
             }
             
-            # Analyze each competitor
-            for url in competitor_urls:
-                competitor_analysis = await self._analyze_single_competitor(url, industry)
+            # Analyze competitors concurrently, keeping their order
+            semaphore = asyncio.Semaphore(COMPETITOR_ANALYSIS_CONCURRENCY)
+            
+            async def analyze(url: str) -> Optional[Dict[str, Any]]:
+                async with semaphore:
+                    return await self._analyze_single_competitor(url, industry)
+            
+            analyses = await asyncio.gather(*(analyze(url) for url in competitor_urls))
+            for url, competitor_analysis in zip(competitor_urls, analyses):
                 if competitor_analysis:
                     results['competitors'].append({
                         'url': url,
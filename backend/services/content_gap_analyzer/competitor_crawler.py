@@ -0,0 +1,218 @@
+"""
+Competitor Crawler
+Runs competitor site crawls off the event loop and caches their summaries per domain.
+
+Crawls run adv.crawl in a process pool; the JSON-lines output is summarized in the
+worker, reading it in chunks and keeping only the columns the gap analysis uses, so
+only a small summary crosses back into the server process. Summaries are cached in
+SQLite per domain for a freshness window, so repeated gap analyses against the same
+competitors do not crawl again.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from loguru import logger
+
+from utils.sqlite_utils import connect, init_database
+
+COMPETITOR_CRAWL_WORKERS = int(os.getenv("COMPETITOR_CRAWL_WORKERS", "3"))
+COMPETITOR_CRAWL_CACHE_DB = os.getenv("COMPETITOR_CRAWL_CACHE_DB", "competitor_crawl_cache.db")
+COMPETITOR_CRAWL_CACHE_TTL_HOURS = float(os.getenv("COMPETITOR_CRAWL_CACHE_TTL_HOURS", "24"))
+
+# Columns of the adv.crawl output used by the gap analysis
+CRAWL_COLUMNS = ["url", "status", "size", "title", "meta_desc"]
+CRAWL_READ_CHUNK_SIZE = 500
+CRAWL_SETTINGS = {
+    'DEPTH_LIMIT': 2,  # Crawl 2 levels deep
+    'CLOSESPIDER_PAGECOUNT': 50,  # Limit pages
+    'DOWNLOAD_DELAY': 1,  # Be respectful
+}
+
+_crawl_pool: Optional[ProcessPoolExecutor] = None
+_crawl_pool_lock = threading.Lock()
+
+
+# Page types reported in crawl summaries, in the order categorize_page_url checks them
+PAGE_TYPES = ('blog_posts', 'product_pages', 'category_pages', 'landing_pages', 'other')
+
+
+def categorize_page_url(url: str) -> str:
+    """Page type of a crawled URL, from its path."""
+    url_lower = url.lower()
+    if any(indicator in url_lower for indicator in ['/blog/', '/post/', '/article/', '/news/']):
+        return 'blog_posts'
+    if any(indicator in url_lower for indicator in ['/product/', '/item/', '/shop/']):
+        return 'product_pages'
+    if any(indicator in url_lower for indicator in ['/category/', '/collection/', '/browse/']):
+        return 'category_pages'
+    if any(indicator in url_lower for indicator in ['/landing/', '/promo/', '/campaign/']):
+        return 'landing_pages'
+    return 'other'
+
+
+def summarize_crawl_file(crawl_file: str, chunk_size: int = CRAWL_READ_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Summarize an adv.crawl JSON-lines file chunk by chunk.
+
+    Returns:
+        Dictionary with the crawl results and content structure of the domain
+    """
+    total_pages = 0
+    status_codes: Counter = Counter()
+    page_types = Counter(dict.fromkeys(PAGE_TYPES, 0))
+    sizes = []
+    title_lengths = []
+    meta_desc_lengths = []
+
+    for chunk in pd.read_json(crawl_file, lines=True, chunksize=chunk_size):
+        chunk = chunk.reindex(columns=CRAWL_COLUMNS)
+        total_pages += len(chunk)
+        status_codes.update(str(int(status)) for status in chunk['status'].dropna())
+        page_types.update(categorize_page_url(str(url)) for url in chunk['url'].dropna())
+        sizes.extend(int(size) for size in chunk['size'].dropna())
+        title_lengths.extend(chunk['title'].dropna().astype(str).str.len())
+        meta_desc_lengths.extend(chunk['meta_desc'].dropna().astype(str).str.len())
+
+    return {
+        'crawl_results': {
+            'total_pages': total_pages,
+            'status_codes': dict(status_codes),
+            'page_types': dict(page_types),
+            'content_length_stats': {
+                'mean': statistics.fmean(sizes) if sizes else 0,
+                'median': statistics.median(sizes) if sizes else 0
+            }
+        },
+        'content_structure': {
+            'avg_title_length': statistics.fmean(title_lengths) if title_lengths else 0,
+            'avg_meta_desc_length': statistics.fmean(meta_desc_lengths) if meta_desc_lengths else 0,
+            'h1_usage': 0,
+            'internal_links_avg': 0,
+            'external_links_avg': 0
+        }
+    }
+
+
+def crawl_competitor(url: str) -> Optional[Dict[str, Any]]:
+    """Crawl a competitor site with adv.crawl and summarize it (runs in a worker process)."""
+    import advertools as adv
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        crawl_file = os.path.join(temp_dir, "crawl.jl")
+        adv.crawl(
+            url_list=[url],
+            output_file=crawl_file,
+            follow_links=True,
+            custom_settings=CRAWL_SETTINGS
+        )
+        if not os.path.exists(crawl_file) or os.path.getsize(crawl_file) == 0:
+            return None
+        return summarize_crawl_file(crawl_file)
+
+
+def _get_crawl_pool() -> ProcessPoolExecutor:
+    """Process pool for competitor crawls, created on first use."""
+    global _crawl_pool
+    with _crawl_pool_lock:
+        if _crawl_pool is None:
+            # spawn: workers must not inherit the server's threads and open sockets
+            _crawl_pool = ProcessPoolExecutor(
+                max_workers=COMPETITOR_CRAWL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _crawl_pool
+
+
+def shutdown_crawl_pool() -> None:
+    """Stop the competitor crawl worker processes."""
+    global _crawl_pool
+    with _crawl_pool_lock:
+        if _crawl_pool is not None:
+            _crawl_pool.shutdown(wait=False, cancel_futures=True)
+            _crawl_pool = None
+
+
+async def run_competitor_crawl(url: str) -> Optional[Dict[str, Any]]:
+    """Run crawl_competitor in the process pool, or a thread if the pool is unusable."""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_crawl_pool(), crawl_competitor, url)
+    except BrokenProcessPool:
+        # A crashed worker breaks the whole pool; replace it on the next call
+        shutdown_crawl_pool()
+        return await loop.run_in_executor(None, crawl_competitor, url)
+
+
+class CompetitorCrawlCache:
+    """Per-domain cache of competitor crawl summaries."""
+
+    def __init__(self, db_path: str = COMPETITOR_CRAWL_CACHE_DB,
+                 ttl_hours: float = COMPETITOR_CRAWL_CACHE_TTL_HOURS):
+        """
+        Args:
+            db_path: Path to SQLite database file
+            ttl_hours: How long a crawl summary stays fresh
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_hours * 3600
+
+        # Ensure database directory exists
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect(self.db_path)
+
+    def _init_database(self):
+        """Initialize the SQLite database with required tables."""
+        init_database(
+            self.db_path,
+            """
+                CREATE TABLE IF NOT EXISTS competitor_crawls (
+                    domain TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL,
+                    crawled_at REAL NOT NULL
+                )
+            """
+        )
+
+    def get(self, domain: str) -> Optional[Dict[str, Any]]:
+        """Crawl summary of a domain if it is still fresh."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT summary, crawled_at FROM competitor_crawls WHERE domain = ?", (domain.lower(),)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def put(self, domain: str, summary: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO competitor_crawls (domain, summary, crawled_at) VALUES (?, ?, ?)",
+                (domain.lower(), json.dumps(summary, default=str), time.time())
+            )
+            conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM competitor_crawls WHERE crawled_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            conn.commit()
+            return cursor.rowcount
@@ -11,7 +11,6 @@ import asyncio
 import json
 import pandas as pd
 import advertools as adv
-import tempfile
 import os
 from urllib.parse import urlparse
 from collections import Counter, defaultdict
@@ -21,6 +20,10 @@ from services.database import get_db_session
 from .ai_engine_service import AIEngineService
 from .competitor_analyzer import CompetitorAnalyzer
 from .keyword_researcher import KeywordResearcher
+from .competitor_crawler import CompetitorCrawlCache, run_competitor_crawl
+
+COMPETITOR_CRAWL_CONCURRENCY = int(os.getenv("COMPETITOR_CRAWL_CONCURRENCY", "3"))
+COMPETITOR_CRAWL_MAX_DOMAINS = int(os.getenv("COMPETITOR_CRAWL_MAX_DOMAINS", "5"))
 
 class ContentGapAnalyzer:
     """Enhanced content gap analyzer with advertools integration and AI insights."""
@@ -30,9 +33,7 @@ class ContentGapAnalyzer:
         self.ai_engine = AIEngineService()
         self.competitor_analyzer = CompetitorAnalyzer()
         self.keyword_researcher = KeywordResearcher()
-        
-        # Temporary directories for crawl data
-        self.temp_dir = tempfile.mkdtemp()
+        self.crawl_cache = CompetitorCrawlCache()
         
         logger.info("ContentGapAnalyzer initialized")
     
@@ -311,70 +312,28 @@ class ContentGapAnalyzer:
                 'technical_insights': {}
             }
             
-            for i, url in enumerate(competitor_urls[:3]):  # Limit to 3 for performance
-                try:
-                    domain = urlparse(url).netloc
-                    logger.info(f"🔍 Analyzing competitor {i+1}: {domain}")
-                    
-                    # Create temporary file for crawl results
-                    crawl_file = os.path.join(self.temp_dir, f"crawl_{domain.replace('.', '_')}.jl")
-                    
-                    # Use adv.crawl for comprehensive analysis
-                    # Note: This is a simplified crawl - in production, customize settings
-                    try:
-                        adv.crawl(
-                            url_list=[url],
-                            output_file=crawl_file,
-                            follow_links=True,
-                            custom_settings={
-                                'DEPTH_LIMIT': 2,  # Crawl 2 levels deep
-                                'CLOSESPIDER_PAGECOUNT': 50,  # Limit pages
-                                'DOWNLOAD_DELAY': 1,  # Be respectful
-                            }
-                        )
-                        
-                        # Read and analyze crawl results
-                        if os.path.exists(crawl_file):
-                            crawl_df = pd.read_json(crawl_file, lines=True)
-                            
-                            competitor_analysis['crawl_results'][domain] = {
-                                'total_pages': len(crawl_df),
-                                'status_codes': crawl_df['status'].value_counts().to_dict() if 'status' in crawl_df.columns else {},
-                                'page_types': self._categorize_pages(crawl_df),
-                                'content_length_stats': {
-                                    'mean': crawl_df['size'].mean() if 'size' in crawl_df.columns else 0,
-                                    'median': crawl_df['size'].median() if 'size' in crawl_df.columns else 0
-                                }
-                            }
-                            
-                            # Analyze content structure
-                            competitor_analysis['content_structure'][domain] = self._analyze_content_structure(crawl_df)
-                            
-                            logger.info(f"✅ Crawled {len(crawl_df)} pages from {domain}")
-                        else:
-                            logger.warning(f"⚠️ No crawl data available for {domain}")
-                            
-                    except Exception as crawl_error:
-                        logger.warning(f"Could not crawl {url}: {str(crawl_error)}")
-                        # Fallback to simulated data
-                        competitor_analysis['crawl_results'][domain] = {
-                            'total_pages': 150,
-                            'status_codes': {'200': 150},
-                            'page_types': {
-                                'blog_posts': 80,
-                                'product_pages': 30,
-                                'landing_pages': 20,
-                                'guides': 20
-                            },
-                            'content_length_stats': {
-                                'mean': 2500,
-                                'median': 2200
-                            }
-                        }
-                        
-                except Exception as e:
-                    logger.warning(f"Could not analyze {url}: {str(e)}")
+            # One crawl per domain; competitors sharing a domain reuse it
+            domains = {}
+            for url in competitor_urls:
+                domain = urlparse(url).netloc
+                if domain and domain not in domains and len(domains) < COMPETITOR_CRAWL_MAX_DOMAINS:
+                    domains[domain] = url
+            
+            semaphore = asyncio.Semaphore(COMPETITOR_CRAWL_CONCURRENCY)
+            
+            async def crawl_domain(domain: str, url: str):
+                async with semaphore:
+                    return await self._crawl_competitor_domain(domain, url)
+            
+            summaries = await asyncio.gather(*(crawl_domain(domain, url) for domain, url in domains.items()))
+            
+            for domain, summary in zip(domains, summaries):
+                if summary is None:
+                    logger.warning(f"⚠️ No crawl data available for {domain}")
                     continue
+                competitor_analysis['crawl_results'][domain] = summary['crawl_results']
+                if 'content_structure' in summary:
+                    competitor_analysis['content_structure'][domain] = summary['content_structure']
             
             # Analyze content themes across competitors
             all_topics = []
@@ -718,52 +677,49 @@ class ContentGapAnalyzer:
             logger.error(f"Error generating strategic recommendations: {str(e)}")
             return []
     
-    def _categorize_pages(self, crawl_df: pd.DataFrame) -> Dict[str, int]:
-        """Categorize crawled pages by type."""
-        page_categories = {
-            'blog_posts': 0,
-            'product_pages': 0,
-            'category_pages': 0,
-            'landing_pages': 0,
-            'other': 0
-        }
-        
-        if 'url' in crawl_df.columns:
-            for url in crawl_df['url']:
-                url_lower = url.lower()
-                if any(indicator in url_lower for indicator in ['/blog/', '/post/', '/article/', '/news/']):
-                    page_categories['blog_posts'] += 1
-                elif any(indicator in url_lower for indicator in ['/product/', '/item/', '/shop/']):
-                    page_categories['product_pages'] += 1
-                elif any(indicator in url_lower for indicator in ['/category/', '/collection/', '/browse/']):
-                    page_categories['category_pages'] += 1
-                elif any(indicator in url_lower for indicator in ['/landing/', '/promo/', '/campaign/']):
-                    page_categories['landing_pages'] += 1
-                else:
-                    page_categories['other'] += 1
-        
-        return page_categories
-    
-    def _analyze_content_structure(self, crawl_df: pd.DataFrame) -> Dict[str, Any]:
-        """Analyze content structure from crawl data."""
-        structure_analysis = {
-            'avg_title_length': 0,
-            'avg_meta_desc_length': 0,
-            'h1_usage': 0,
-            'internal_links_avg': 0,
-            'external_links_avg': 0
-        }
-        
-        # Analyze available columns
-        if 'title' in crawl_df.columns:
-            structure_analysis['avg_title_length'] = crawl_df['title'].str.len().mean()
+    async def _crawl_competitor_domain(self, domain: str, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Crawl summary of a competitor domain, from the cache when fresh.
         
-        if 'meta_desc' in crawl_df.columns:
-            structure_analysis['avg_meta_desc_length'] = crawl_df['meta_desc'].str.len().mean()
+        Args:
+            domain: Competitor domain
+            url: Start URL of the crawl
+            
+        Returns:
+            Crawl summary, or None if the crawl produced no data
+        """
+        cached = self.crawl_cache.get(domain)
+        if cached is not None:
+            logger.info(f"Using cached crawl for {domain}")
+            return cached
         
-        # Add more structure analysis based on available crawl data
+        logger.info(f"🔍 Crawling competitor: {domain}")
+        try:
+            summary = await run_competitor_crawl(url)
+        except Exception as crawl_error:
+            logger.warning(f"Could not crawl {url}: {str(crawl_error)}")
+            # Fallback to simulated data
+            return {
+                'crawl_results': {
+                    'total_pages': 150,
+                    'status_codes': {'200': 150},
+                    'page_types': {
+                        'blog_posts': 80,
+                        'product_pages': 30,
+                        'landing_pages': 20,
+                        'guides': 20
+                    },
+                    'content_length_stats': {
+                        'mean': 2500,
+                        'median': 2200
+                    }
+                }
+            }
         
-        return structure_analysis
+        if summary is not None:
+            self.crawl_cache.put(domain, summary)
+            logger.info(f"✅ Crawled {summary['crawl_results']['total_pages']} pages from {domain}")
+        return summary
     
     def _cluster_themes(self, themes_df: pd.DataFrame) -> Dict[str, List[str]]:
         """Cluster themes into topic groups."""
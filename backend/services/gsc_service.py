@@ -3,14 +3,72 @@
 import os
 import json
 import sqlite3
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+import threading
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+from datetime import date, datetime, timedelta
 from google.auth.transport.requests import Request as GoogleRequest
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
 from loguru import logger
 
+# Maximum rows the Search Analytics API returns per request
+GSC_PAGE_SIZE = 25000
+# Days fetched when a site has never been synced
+GSC_SYNC_LOOKBACK_DAYS = int(os.getenv("GSC_SYNC_LOOKBACK_DAYS", "90"))
+# Recent days are re-fetched on every sync because GSC keeps revising them for a few days
+GSC_SYNC_REFRESH_DAYS = int(os.getenv("GSC_SYNC_REFRESH_DAYS", "3"))
+# Minimum time between incremental syncs triggered by dashboard reads
+GSC_SYNC_MIN_INTERVAL_MINUTES = int(os.getenv("GSC_SYNC_MIN_INTERVAL_MINUTES", "60"))
+# Query rows returned to the dashboard (matches the previous API rowLimit)
+GSC_DASHBOARD_QUERY_LIMIT = 1000
+
+# Authenticated discovery clients keyed by (database path, user_id): (service, credentials).
+# Shared by every GSCService instance so a revoke or credential save through one
+# (e.g. the auth router) drops the client used by the others (e.g. background jobs).
+_service_cache: Dict[Tuple[str, str], Tuple[Any, Credentials]] = {}
+_service_lock = threading.Lock()
+
+
+def invalidate_gsc_service(db_path: str, user_id: str, keep_credentials: Optional[Credentials] = None):
+    """Drop the cached client for a user unless it was built from keep_credentials."""
+    key = (os.path.abspath(db_path), user_id)
+    with _service_lock:
+        cached = _service_cache.get(key)
+        if cached and cached[1] is not keep_credentials:
+            del _service_cache[key]
+
+
+def _merge_date_ranges(ranges: List[Tuple[date, date]]) -> List[Tuple[date, date]]:
+    """Sort date ranges and merge those that overlap or touch."""
+    merged: List[Tuple[date, date]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _uncovered_ranges(start: date, end: date, covered: List[Tuple[date, date]]) -> List[Tuple[date, date]]:
+    """Parts of start..end not inside any of the (merged) covered ranges."""
+    gaps = []
+    cursor = start
+    for first, last in covered:
+        if last < cursor:
+            continue
+        if first > end:
+            break
+        if first > cursor:
+            gaps.append((cursor, first - timedelta(days=1)))
+        cursor = max(cursor, last + timedelta(days=1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
 class GSCService:
     """Service for Google Search Console integration."""
     
@@ -60,7 +118,53 @@ class GSCService:
                         FOREIGN KEY (user_id) REFERENCES gsc_credentials (user_id)
                     )
                 ''')
-                
+
+                # Synced search analytics rows (date x query x page)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS gsc_search_analytics (
+                        user_id TEXT NOT NULL,
+                        site_url TEXT NOT NULL,
+                        date TEXT NOT NULL,
+                        query TEXT NOT NULL,
+                        page TEXT NOT NULL,
+                        clicks INTEGER NOT NULL DEFAULT 0,
+                        impressions INTEGER NOT NULL DEFAULT 0,
+                        ctr REAL NOT NULL DEFAULT 0,
+                        position REAL NOT NULL DEFAULT 0,
+                        PRIMARY KEY (user_id, site_url, date, query, page)
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_gsc_search_analytics_query
+                    ON gsc_search_analytics (user_id, site_url, query, date)
+                ''')
+
+                # Synced property-level daily totals (includes anonymized queries)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS gsc_daily_totals (
+                        user_id TEXT NOT NULL,
+                        site_url TEXT NOT NULL,
+                        date TEXT NOT NULL,
+                        clicks INTEGER NOT NULL DEFAULT 0,
+                        impressions INTEGER NOT NULL DEFAULT 0,
+                        ctr REAL NOT NULL DEFAULT 0,
+                        position REAL NOT NULL DEFAULT 0,
+                        PRIMARY KEY (user_id, site_url, date)
+                    )
+                ''')
+
+                # Synced date coverage per site, one row per range; ranges that do not touch stay separate
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS gsc_sync_state (
+                        user_id TEXT NOT NULL,
+                        site_url TEXT NOT NULL,
+                        first_date TEXT NOT NULL,
+                        last_date TEXT NOT NULL,
+                        last_synced_at TIMESTAMP NOT NULL,
+                        PRIMARY KEY (user_id, site_url, first_date)
+                    )
+                ''')
+
                 conn.commit()
                 logger.info("GSC database tables initialized successfully")
                 
@@ -94,7 +198,9 @@ class GSCService:
                     VALUES (?, ?, CURRENT_TIMESTAMP)
                 ''', (user_id, credentials_json))
                 conn.commit()
-            
+
+            self._invalidate_service(user_id, keep_credentials=credentials)
+
             logger.info(f"GSC credentials saved for user: {user_id}")
             return True
             
@@ -263,19 +369,31 @@ class GSCService:
             return False
     
     def get_authenticated_service(self, user_id: str):
-        """Get authenticated GSC service for user."""
+        """Get authenticated GSC service for user, reusing the cached client while its token is valid."""
+        key = (os.path.abspath(self.db_path), user_id)
+        with _service_lock:
+            cached = _service_cache.get(key)
+        if cached and cached[1].valid:
+            return cached[0]
+
         try:
             credentials = self.load_user_credentials(user_id)
             if not credentials:
                 raise ValueError("No valid credentials found")
-            
-            service = build('searchconsole', 'v1', credentials=credentials)
+
+            service = build('searchconsole', 'v1', credentials=credentials, cache_discovery=False)
+            with _service_lock:
+                _service_cache[key] = (service, credentials)
             logger.info(f"Authenticated GSC service created for user: {user_id}")
             return service
-            
+
         except Exception as e:
             logger.error(f"Error creating authenticated GSC service for user {user_id}: {e}")
             raise
+
+    def _invalidate_service(self, user_id: str, keep_credentials: Optional[Credentials] = None):
+        """Drop the cached client for a user unless it was built from keep_credentials."""
+        invalidate_gsc_service(self.db_path, user_id, keep_credentials)
     
     def get_site_list(self, user_id: str) -> List[Dict[str, Any]]:
         """Get list of sites from GSC."""
@@ -297,146 +415,259 @@ class GSCService:
             logger.error(f"Error getting site list for user {user_id}: {e}")
             raise
     
-    def get_search_analytics(self, user_id: str, site_url: str, 
+    def get_search_analytics(self, user_id: str, site_url: str,
                            start_date: str = None, end_date: str = None) -> Dict[str, Any]:
-        """Get search analytics data from GSC."""
+        """Get search analytics data, served from the locally synced store."""
         try:
             # Set default date range (last 30 days)
             if not end_date:
                 end_date = datetime.now().strftime('%Y-%m-%d')
             if not start_date:
                 start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-            
-            # Check cache first
-            cache_key = f"{user_id}_{site_url}_{start_date}_{end_date}"
-            cached_data = self._get_cached_data(user_id, site_url, 'analytics', cache_key)
-            if cached_data:
-                logger.info(f"Returning cached analytics data for user: {user_id}")
-                return cached_data
-            
-            service = self.get_authenticated_service(user_id)
-            if not service:
-                logger.error(f"Failed to get authenticated GSC service for user: {user_id}")
-                return {'error': 'Authentication failed', 'rows': [], 'rowCount': 0}
-            
-            # Step 1: Verify data presence first (as per GSC API documentation)
-            verification_request = {
-                'startDate': start_date,
-                'endDate': end_date,
-                'dimensions': ['date']  # Only date dimension for verification
-            }
-            
-            logger.info(f"GSC Data verification request for user {user_id}: {verification_request}")
-            
-            try:
-                verification_response = service.searchanalytics().query(
-                    siteUrl=site_url,
-                    body=verification_request
-                ).execute()
-                
-                logger.info(f"GSC Data verification response for user {user_id}: {verification_response}")
-                
-                # Check if we have any data
-                verification_rows = verification_response.get('rows', [])
-                if not verification_rows:
-                    logger.warning(f"No GSC data available for user {user_id} in date range {start_date} to {end_date}")
-                    return {'error': 'No data available for this date range', 'rows': [], 'rowCount': 0}
-                
-                logger.info(f"GSC Data verification successful - found {len(verification_rows)} days with data")
-                
-            except Exception as verification_error:
-                logger.error(f"GSC Data verification failed for user {user_id}: {verification_error}")
-                return {'error': f'Data verification failed: {str(verification_error)}', 'rows': [], 'rowCount': 0}
-            
-            # Step 2: Get overall metrics (no dimensions)
-            request = {
-                'startDate': start_date,
-                'endDate': end_date,
-                'dimensions': [],  # No dimensions for overall metrics
-                'rowLimit': 1000
-            }
-            
-            logger.info(f"GSC API request for user {user_id}: {request}")
-            
-            try:
-                response = service.searchanalytics().query(
-                    siteUrl=site_url,
-                    body=request
-                ).execute()
-                
-                logger.info(f"GSC API response for user {user_id}: {response}")
-            except Exception as api_error:
-                logger.error(f"GSC API call failed for user {user_id}: {api_error}")
-                return {'error': str(api_error), 'rows': [], 'rowCount': 0}
-            
-            # Step 3: Get query-level data for insights (as per documentation)
-            query_request = {
-                'startDate': start_date,
-                'endDate': end_date,
-                'dimensions': ['query'],  # Get query-level data
-                'rowLimit': 1000
-            }
-            
-            logger.info(f"GSC Query-level request for user {user_id}: {query_request}")
-            
-            try:
-                query_response = service.searchanalytics().query(
-                    siteUrl=site_url,
-                    body=query_request
-                ).execute()
-                
-                logger.info(f"GSC Query-level response for user {user_id}: {query_response}")
-                
-                # Combine overall metrics with query-level data
-                analytics_data = {
-                    'overall_metrics': {
-                        'rows': response.get('rows', []),
-                        'rowCount': response.get('rowCount', 0)
-                    },
-                    'query_data': {
-                        'rows': query_response.get('rows', []),
-                        'rowCount': query_response.get('rowCount', 0)
-                    },
-                    'verification_data': {
-                        'rows': verification_rows,
-                        'rowCount': len(verification_rows)
-                    },
+
+            warning = None
+            if self._needs_sync(user_id, site_url, start_date, end_date):
+                try:
+                    self.sync_search_analytics(user_id, site_url, start_date, end_date)
+                except Exception as sync_error:
+                    logger.error(f"GSC sync failed for user {user_id}: {sync_error}")
+                    if not self._get_sync_state(user_id, site_url):
+                        return {'error': f'Data sync failed: {str(sync_error)}', 'rows': [], 'rowCount': 0}
+                    warning = f'Serving previously synced data: {str(sync_error)}'
+
+            analytics_data = self._read_search_analytics(user_id, site_url, start_date, end_date)
+            if not analytics_data['verification_data']['rows']:
+                logger.warning(f"No GSC data available for user {user_id} in date range {start_date} to {end_date}")
+                return {'error': 'No data available for this date range', 'rows': [], 'rowCount': 0}
+
+            if warning:
+                analytics_data['warning'] = warning
+
+            logger.info(f"Retrieved comprehensive analytics data for user: {user_id}, site: {site_url}")
+            return analytics_data
+
+        except Exception as e:
+            logger.error(f"Error getting search analytics for user {user_id}: {e}")
+            raise
+
+    def sync_search_analytics(self, user_id: str, site_url: str,
+                              start_date: str = None, end_date: str = None) -> Dict[str, Any]:
+        """
+        Incrementally sync search analytics into the local store.
+
+        Only dates outside the synced ranges are fetched, plus the most recent
+        GSC_SYNC_REFRESH_DAYS days which Google keeps revising. Each window is paged
+        through with startRow until the API returns a short page, and every page is
+        written as soon as it arrives.
+        """
+        if not end_date:
+            end_date = datetime.now().strftime('%Y-%m-%d')
+        if not start_date:
+            start_date = (datetime.now() - timedelta(days=GSC_SYNC_LOOKBACK_DAYS)).strftime('%Y-%m-%d')
+
+        windows = self._get_sync_windows(self._get_sync_state(user_id, site_url), start_date, end_date)
+        service = self.get_authenticated_service(user_id)
+
+        total_rows = 0
+        for window_start, window_end in windows:
+            window_rows = self._sync_window(service, user_id, site_url, window_start, window_end)
+            total_rows += window_rows
+            logger.info(f"Synced {window_rows} GSC rows for {site_url} ({window_start} to {window_end})")
+
+        self._update_sync_state(user_id, site_url, start_date, end_date)
+        return {'windows': windows, 'rows': total_rows}
+
+    def _iter_row_pages(self, service, site_url: str, start_date: str, end_date: str,
+                        dimensions: List[str]) -> Iterator[List[Dict[str, Any]]]:
+        """Page through a Search Analytics query, yielding each page of rows as it arrives."""
+        start_row = 0
+        while True:
+            response = service.searchanalytics().query(
+                siteUrl=site_url,
+                body={
                     'startDate': start_date,
                     'endDate': end_date,
-                    'siteUrl': site_url
+                    'dimensions': dimensions,
+                    'rowLimit': GSC_PAGE_SIZE,
+                    'startRow': start_row
                 }
-                
-                self._cache_data(user_id, site_url, 'analytics', analytics_data, cache_key)
-                
-                logger.info(f"Retrieved comprehensive analytics data for user: {user_id}, site: {site_url}")
-                return analytics_data
-                
-            except Exception as query_error:
-                logger.error(f"GSC Query-level request failed for user {user_id}: {query_error}")
-                # Fall back to overall metrics only
-                analytics_data = {
-                    'overall_metrics': {
-                        'rows': response.get('rows', []),
-                        'rowCount': response.get('rowCount', 0)
-                    },
-                    'query_data': {'rows': [], 'rowCount': 0},
-                    'verification_data': {
-                        'rows': verification_rows,
-                        'rowCount': len(verification_rows)
-                    },
-                    'startDate': start_date,
-                    'endDate': end_date,
-                    'siteUrl': site_url,
-                    'warning': f'Query-level data unavailable: {str(query_error)}'
+            ).execute()
+            page = response.get('rows', [])
+            if page:
+                yield page
+            if len(page) < GSC_PAGE_SIZE:
+                return
+            start_row += GSC_PAGE_SIZE
+
+    def _get_sync_windows(self, state: Optional[Dict[str, Any]], start_date: str, end_date: str) -> List[Tuple[str, str]]:
+        """Work out which date windows of the requested range still need fetching."""
+        if not state:
+            return [(start_date, end_date)]
+
+        requested_start = date.fromisoformat(start_date)
+        requested_end = date.fromisoformat(end_date)
+        covered = state['ranges']
+        windows = _uncovered_ranges(requested_start, requested_end, covered)
+
+        last_date = covered[-1][1]
+        refresh_from = max(covered[-1][0], last_date - timedelta(days=GSC_SYNC_REFRESH_DAYS - 1), requested_start)
+        if refresh_from <= min(last_date, requested_end):
+            windows.append((refresh_from, min(last_date, requested_end)))
+
+        return [(first.isoformat(), last.isoformat()) for first, last in _merge_date_ranges(windows)]
+
+    def _needs_sync(self, user_id: str, site_url: str, start_date: str, end_date: Optional[str] = None) -> bool:
+        """Whether a dashboard read should run an incremental sync first."""
+        state = self._get_sync_state(user_id, site_url)
+        if not state:
+            return True
+        # Any gap in the requested range up to the synced end (later dates are refreshed below)
+        check_end = min(date.fromisoformat(end_date or start_date), state['ranges'][-1][1])
+        if _uncovered_ranges(date.fromisoformat(start_date), check_end, state['ranges']):
+            return True
+        last_synced_at = datetime.fromisoformat(state['last_synced_at'])
+        return datetime.now() - last_synced_at >= timedelta(minutes=GSC_SYNC_MIN_INTERVAL_MINUTES)
+
+    def _get_sync_state(self, user_id: str, site_url: str) -> Optional[Dict[str, Any]]:
+        """Get the synced date ranges (merged, in date order) and last sync time for a site."""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute('''
+                SELECT first_date, last_date, last_synced_at FROM gsc_sync_state
+                WHERE user_id = ? AND site_url = ?
+            ''', (user_id, site_url)).fetchall()
+        if not rows:
+            return None
+        return {
+            'ranges': _merge_date_ranges([
+                (date.fromisoformat(first), date.fromisoformat(last)) for first, last, _ in rows
+            ]),
+            'last_synced_at': max(synced_at for _, _, synced_at in rows),
+        }
+
+    def _update_sync_state(self, user_id: str, site_url: str, start_date: str, end_date: str):
+        """Add the given range to the synced ranges, merging it with the ranges it overlaps or touches."""
+        with sqlite3.connect(self.db_path) as conn:
+            existing = conn.execute('''
+                SELECT first_date, last_date FROM gsc_sync_state WHERE user_id = ? AND site_url = ?
+            ''', (user_id, site_url)).fetchall()
+            ranges = _merge_date_ranges(
+                [(date.fromisoformat(first), date.fromisoformat(last)) for first, last in existing]
+                + [(date.fromisoformat(start_date), date.fromisoformat(end_date))]
+            )
+            synced_at = datetime.now().isoformat()
+            conn.execute('DELETE FROM gsc_sync_state WHERE user_id = ? AND site_url = ?', (user_id, site_url))
+            conn.executemany('''
+                INSERT INTO gsc_sync_state (user_id, site_url, first_date, last_date, last_synced_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(user_id, site_url, first.isoformat(), last.isoformat(), synced_at) for first, last in ranges])
+            conn.commit()
+
+    def _sync_window(self, service, user_id: str, site_url: str, start_date: str, end_date: str) -> int:
+        """
+        Replace the stored rows of a date window with freshly fetched ones.
+
+        Each page is committed as it arrives, so only one page is held in memory and
+        the database is not locked for the whole fetch. Returns the number of
+        query/page rows stored.
+        """
+        window = (user_id, site_url, start_date, end_date)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                DELETE FROM gsc_daily_totals
+                WHERE user_id = ? AND site_url = ? AND date BETWEEN ? AND ?
+            ''', window)
+            conn.execute('''
+                DELETE FROM gsc_search_analytics
+                WHERE user_id = ? AND site_url = ? AND date BETWEEN ? AND ?
+            ''', window)
+            conn.commit()
+
+            for page in self._iter_row_pages(service, site_url, start_date, end_date, ['date']):
+                conn.executemany('''
+                    INSERT OR REPLACE INTO gsc_daily_totals
+                    (user_id, site_url, date, clicks, impressions, ctr, position)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (user_id, site_url, row['keys'][0], row.get('clicks', 0), row.get('impressions', 0),
+                     row.get('ctr', 0), row.get('position', 0))
+                    for row in page
+                ])
+                conn.commit()
+
+            stored = 0
+            for page in self._iter_row_pages(service, site_url, start_date, end_date, ['date', 'query', 'page']):
+                conn.executemany('''
+                    INSERT OR REPLACE INTO gsc_search_analytics
+                    (user_id, site_url, date, query, page, clicks, impressions, ctr, position)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (user_id, site_url, row['keys'][0], row['keys'][1], row['keys'][2], row.get('clicks', 0),
+                     row.get('impressions', 0), row.get('ctr', 0), row.get('position', 0))
+                    for row in page
+                ])
+                conn.commit()
+                stored += len(page)
+        return stored
+
+    def _read_search_analytics(self, user_id: str, site_url: str, start_date: str, end_date: str,
+                               limit: int = GSC_DASHBOARD_QUERY_LIMIT) -> Dict[str, Any]:
+        """Build the analytics payload from the synced tables."""
+        params = (user_id, site_url, start_date, end_date)
+        # Combined CTR is clicks/impressions and positions are impression-weighted
+        metrics = '''
+            SUM(clicks), SUM(impressions),
+            CASE WHEN SUM(impressions) > 0 THEN CAST(SUM(clicks) AS REAL) / SUM(impressions) ELSE 0 END,
+            CASE WHEN SUM(impressions) > 0 THEN SUM(position * impressions) / SUM(impressions) ELSE 0 END
+        '''
+        with sqlite3.connect(self.db_path) as conn:
+            daily = conn.execute('''
+                SELECT date, clicks, impressions, ctr, position FROM gsc_daily_totals
+                WHERE user_id = ? AND site_url = ? AND date BETWEEN ? AND ?
+                ORDER BY date
+            ''', params).fetchall()
+            overall = conn.execute(f'''
+                SELECT {metrics} FROM gsc_daily_totals
+                WHERE user_id = ? AND site_url = ? AND date BETWEEN ? AND ?
+            ''', params).fetchone()
+            grouped = {}
+            for dimension in ('query', 'page'):
+                grouped[dimension] = conn.execute(f'''
+                    SELECT {dimension}, {metrics} FROM gsc_search_analytics
+                    WHERE user_id = ? AND site_url = ? AND date BETWEEN ? AND ?
+                    GROUP BY {dimension} ORDER BY SUM(clicks) DESC, SUM(impressions) DESC
+                    LIMIT ?
+                ''', params + (limit,)).fetchall()
+
+        def to_rows(records, with_keys: bool = True) -> List[Dict[str, Any]]:
+            rows = []
+            for record in records:
+                values = record[1:] if with_keys else record
+                row = {
+                    'clicks': values[0] or 0,
+                    'impressions': values[1] or 0,
+                    'ctr': values[2] or 0,
+                    'position': values[3] or 0
                 }
-                
-                self._cache_data(user_id, site_url, 'analytics', analytics_data, cache_key)
-                return analytics_data
-            
-        except Exception as e:
-            logger.error(f"Error getting search analytics for user {user_id}: {e}")
-            raise
-    
+                if with_keys:
+                    row['keys'] = [record[0]]
+                rows.append(row)
+            return rows
+
+        overall_rows = to_rows([overall], with_keys=False) if daily else []
+        query_rows = to_rows(grouped['query'])
+        page_rows = to_rows(grouped['page'])
+        verification_rows = to_rows(daily)
+
+        return {
+            'overall_metrics': {'rows': overall_rows, 'rowCount': len(overall_rows)},
+            'query_data': {'rows': query_rows, 'rowCount': len(query_rows)},
+            'page_data': {'rows': page_rows, 'rowCount': len(page_rows)},
+            'verification_data': {'rows': verification_rows, 'rowCount': len(verification_rows)},
+            'startDate': start_date,
+            'endDate': end_date,
+            'siteUrl': site_url
+        }
+
     def get_sitemaps(self, user_id: str, site_url: str) -> List[Dict[str, Any]]:
         """Get sitemaps from GSC."""
         try:
@@ -472,15 +703,23 @@ class GSCService:
                 
                 # Delete OAuth states
                 cursor.execute('DELETE FROM gsc_oauth_states WHERE user_id = ?', (user_id,))
-                
+
+                # Delete synced analytics
+                cursor.execute('DELETE FROM gsc_search_analytics WHERE user_id = ?', (user_id,))
+                cursor.execute('DELETE FROM gsc_daily_totals WHERE user_id = ?', (user_id,))
+                cursor.execute('DELETE FROM gsc_sync_state WHERE user_id = ?', (user_id,))
+
                 conn.commit()
-            
+
             logger.info(f"GSC access revoked for user: {user_id}")
             return True
             
         except Exception as e:
             logger.error(f"Error revoking GSC access for user {user_id}: {e}")
             return False
+        finally:
+            # Never keep serving a client for a user whose access is being revoked
+            self._invalidate_service(user_id)
     
     def clear_incomplete_credentials(self, user_id: str) -> bool:
         """Clear incomplete GSC credentials that are missing required fields."""
@@ -489,7 +728,8 @@ class GSCService:
                 cursor = conn.cursor()
                 cursor.execute('DELETE FROM gsc_credentials WHERE user_id = ?', (user_id,))
                 conn.commit()
-            
+
+            self._invalidate_service(user_id)
             logger.info(f"Cleared incomplete GSC credentials for user: {user_id}")
             return True
             
@@ -0,0 +1,90 @@
+"""
+Hallucination Claim Cache
+
+Caches fact-check results per claim, keyed by the normalized claim text, so that
+re-checking an edited blog, or the same claim appearing in several sections, does
+not search and assess that claim again within the freshness window.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from utils.sqlite_utils import connect, init_database
+
+HALLUCINATION_CLAIM_CACHE_DB = os.getenv("HALLUCINATION_CLAIM_CACHE_DB", "hallucination_claim_cache.db")
+HALLUCINATION_CLAIM_CACHE_TTL_HOURS = float(os.getenv("HALLUCINATION_CLAIM_CACHE_TTL_HOURS", "72"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_claim(claim: str) -> str:
+    """Cache key of a claim: case, whitespace, quotes and trailing punctuation do not matter."""
+    text = _WHITESPACE.sub(" ", claim).strip().lower()
+    return text.strip("\"'“”‘’").rstrip(".!;:, ")
+
+
+class ClaimVerificationCache:
+    """SQLite cache of claim evidence and assessments."""
+
+    def __init__(self, db_path: str = HALLUCINATION_CLAIM_CACHE_DB,
+                 ttl_hours: float = HALLUCINATION_CLAIM_CACHE_TTL_HOURS):
+        """
+        Args:
+            db_path: Path to SQLite database file
+            ttl_hours: How long a verification stays fresh
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_hours * 3600
+
+        # Ensure database directory exists
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect(self.db_path)
+
+    def _init_database(self):
+        """Initialize the SQLite database with required tables."""
+        init_database(
+            self.db_path,
+            """
+                CREATE TABLE IF NOT EXISTS claim_verifications (
+                    claim_key TEXT PRIMARY KEY,
+                    verification TEXT NOT NULL,
+                    verified_at REAL NOT NULL
+                )
+            """
+        )
+
+    def get(self, claim: str) -> Optional[Dict[str, Any]]:
+        """Cached verification of a claim if it is still fresh."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT verification, verified_at FROM claim_verifications WHERE claim_key = ?",
+                (normalize_claim(claim),)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def put(self, claim: str, verification: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO claim_verifications (claim_key, verification, verified_at) VALUES (?, ?, ?)",
+                (normalize_claim(claim), json.dumps(verification, default=str), time.time())
+            )
+            conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM claim_verifications WHERE verified_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            conn.commit()
+            return cursor.rowcount
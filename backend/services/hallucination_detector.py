@@ -4,6 +4,10 @@ Hallucination Detector Service
 This service implements fact-checking functionality using Exa.ai API
 to detect and verify claims in AI-generated content, similar to the
 Exa.ai demo implementation.
+
+Evidence for each claim is searched concurrently over a shared async Exa
+client, and verified claims are cached by their normalized text, so a
+re-check of edited content only verifies new or changed claims.
 """
 
 import json
@@ -11,10 +15,13 @@ import logging
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
-import requests
 import os
 import asyncio
 import concurrent.futures
+import threading
+
+from services.hallucination_claim_cache import ClaimVerificationCache, normalize_claim
+from services.research.exa_search_client import AsyncExaClient, exa_search_client
 try:
     from google import genai
     GOOGLE_GENAI_AVAILABLE = True
@@ -23,6 +30,17 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
+# Claims verified (searched and assessed) per check; cached claims do not count
+MAX_CLAIMS_PER_CHECK = 3
+MAX_SOURCES_PER_CLAIM = 3
+
+# Reasons given to claims that could not be verified; these are not cached
+UNVERIFIED_REASONS = ("Batch assessment failed", "No assessment provided", "No sources found")
+
+# Daily usage is shared by every detector instance (the API router and blog writer each create one)
+_daily_usage = {"date": None, "calls": 0}
+_daily_usage_lock = threading.Lock()
+
 @dataclass
 class Claim:
     """Represents a single verifiable claim extracted from text."""
@@ -54,7 +72,8 @@ class HallucinationDetector:
     3. Verify claims against sources
     """
     
-    def __init__(self):
+    def __init__(self, exa_client: Optional[AsyncExaClient] = None,
+                 claim_cache: Optional[ClaimVerificationCache] = None):
         self.exa_api_key = os.getenv('EXA_API_KEY')
         self.gemini_api_key = os.getenv('GEMINI_API_KEY')
         
@@ -67,10 +86,12 @@ class HallucinationDetector:
         # Initialize Gemini client for claim extraction and assessment
         self.gemini_client = genai.Client(api_key=self.gemini_api_key) if (GOOGLE_GENAI_AVAILABLE and self.gemini_api_key) else None
         
+        # Evidence search client (shared session, capped concurrency) and claim cache
+        self.exa_client = exa_client or exa_search_client
+        self.claim_cache = claim_cache or ClaimVerificationCache()
+        
         # Rate limiting to prevent API abuse
-        self.daily_api_calls = 0
         self.daily_limit = 20  # Max 20 API calls per day for fact checking
-        self.last_reset_date = None
     
     def _check_rate_limit(self) -> bool:
         """Check if we're within daily API usage limits."""
@@ -78,20 +99,21 @@ class HallucinationDetector:
         
         today = date.today()
         
-        # Reset counter if it's a new day
-        if self.last_reset_date != today:
-            self.daily_api_calls = 0
-            self.last_reset_date = today
-        
-        # Check if we've exceeded the limit
-        if self.daily_api_calls >= self.daily_limit:
-            logger.warning(f"Daily API limit reached ({self.daily_limit} calls). Fact checking disabled for today.")
-            return False
-        
-        # Increment counter for this API call
-        self.daily_api_calls += 1
-        logger.info(f"Fact check API call #{self.daily_api_calls}/{self.daily_limit} today")
-        return True
+        with _daily_usage_lock:
+            # Reset counter if it's a new day
+            if _daily_usage["date"] != today:
+                _daily_usage["calls"] = 0
+                _daily_usage["date"] = today
+            
+            # Check if we've exceeded the limit
+            if _daily_usage["calls"] >= self.daily_limit:
+                logger.warning(f"Daily API limit reached ({self.daily_limit} calls). Fact checking disabled for today.")
+                return False
+            
+            # Increment counter for this API call
+            _daily_usage["calls"] += 1
+            logger.info(f"Fact check API call #{_daily_usage['calls']}/{self.daily_limit} today")
+            return True
         
     async def detect_hallucinations(self, text: str) -> HallucinationResult:
         """
@@ -122,7 +144,7 @@ class HallucinationDetector:
             # Validate required API keys
             if not self.gemini_api_key:
                 raise Exception("GEMINI_API_KEY not configured. Cannot perform hallucination detection.")
-            if not self.exa_api_key:
+            if not self.exa_client.api_key:
                 raise Exception("EXA_API_KEY not configured. Cannot search for evidence.")
             
             # Step 1: Extract claims from text
@@ -254,7 +276,11 @@ class HallucinationDetector:
     
     async def _verify_claims_batch(self, claims: List[str]) -> List[Claim]:
         """
-        Verify multiple claims in batch to reduce API calls.
+        Verify multiple claims, reusing cached verifications.
+        
+        Identical claims are verified once. Claims without a fresh cached result
+        are searched concurrently and assessed together in one API call, each
+        against the sources found for it.
         
         Args:
             claims: List of claims to verify
@@ -265,29 +291,81 @@ class HallucinationDetector:
         try:
             logger.info(f"Starting batch verification of {len(claims)} claims")
             
-            # Limit to maximum 3 claims to prevent excessive API usage
-            max_claims = min(len(claims), 3)
-            claims_to_verify = claims[:max_claims]
+            verifications: Dict[str, Dict[str, Any]] = {}
+            claims_to_verify = []
+            seen_keys = set()
+            for claim in claims:
+                key = normalize_claim(claim)
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+                cached = await asyncio.to_thread(self.claim_cache.get, claim)
+                if cached is not None:
+                    verifications[key] = cached
+                else:
+                    claims_to_verify.append(claim)
             
-            if len(claims) > max_claims:
-                logger.warning(f"Limited verification to {max_claims} claims to prevent API rate limits")
+            logger.info(f"{len(verifications)} claims served from cache, {len(claims_to_verify)} to verify")
             
-            # Step 1: Search for evidence for all claims in one batch
-            all_sources = await self._search_evidence_batch(claims_to_verify)
+            # Limit new verifications to prevent excessive API usage
+            if len(claims_to_verify) > MAX_CLAIMS_PER_CHECK:
+                logger.warning(f"Limited verification to {MAX_CLAIMS_PER_CHECK} claims to prevent API rate limits")
+                claims_to_verify = claims_to_verify[:MAX_CLAIMS_PER_CHECK]
             
-            # Step 2: Assess all claims against sources in one API call
-            verified_claims = await self._assess_claims_batch(claims_to_verify, all_sources)
+            if claims_to_verify:
+                # Step 1: Search for evidence for each claim concurrently
+                sources_per_claim = await self._search_evidence_batch(claims_to_verify)
+                
+                # Claims whose search failed or found nothing cannot be verified
+                assessed_claims = [
+                    Claim(
+                        text=claim,
+                        confidence=0.5,
+                        assessment="insufficient_information",
+                        supporting_sources=[],
+                        refuting_sources=[],
+                        reasoning="No sources found for verification"
+                    )
+                    for claim, sources in zip(claims_to_verify, sources_per_claim) if not sources
+                ]
+                
+                # Step 2: Assess the other claims, each against its own sources, in one API call
+                claims_with_sources = [
+                    (claim, sources) for claim, sources in zip(claims_to_verify, sources_per_claim) if sources
+                ]
+                if claims_with_sources:
+                    assessed_claims.extend(await self._assess_claims_batch(
+                        [claim for claim, _ in claims_with_sources],
+                        [sources for _, sources in claims_with_sources]
+                    ))
+                
+                for claim in assessed_claims:
+                    verification = {
+                        "confidence": claim.confidence,
+                        "assessment": claim.assessment,
+                        "supporting_sources": claim.supporting_sources,
+                        "refuting_sources": claim.refuting_sources,
+                        "reasoning": claim.reasoning
+                    }
+                    verifications[normalize_claim(claim.text)] = verification
+                    if not claim.reasoning.startswith(UNVERIFIED_REASONS):
+                        await asyncio.to_thread(self.claim_cache.put, claim.text, verification)
             
-            # Add any remaining claims as insufficient information
-            for i in range(max_claims, len(claims)):
-                verified_claims.append(Claim(
-                    text=claims[i],
-                    confidence=0.0,
-                    assessment="insufficient_information",
-                    supporting_sources=[],
-                    refuting_sources=[],
-                    reasoning="Not verified due to API rate limit protection"
-                ))
+            verified_claims = []
+            for claim in claims:
+                verification = verifications.get(normalize_claim(claim))
+                if verification is not None:
+                    verified_claims.append(Claim(text=claim, **verification))
+                else:
+                    # Add any remaining claims as insufficient information
+                    verified_claims.append(Claim(
+                        text=claim,
+                        confidence=0.0,
+                        assessment="insufficient_information",
+                        supporting_sources=[],
+                        refuting_sources=[],
+                        reasoning="Not verified due to API rate limit protection"
+                    ))
             
             logger.info(f"Batch verification completed for {len(verified_claims)} claims")
             return verified_claims
@@ -318,6 +396,10 @@ class HallucinationDetector:
             Claim object with verification results
         """
         try:
+            cached = await asyncio.to_thread(self.claim_cache.get, claim)
+            if cached is not None:
+                return Claim(text=claim, **cached)
+            
             # Search for evidence using Exa.ai
             sources = await self._search_evidence(claim)
             
@@ -333,6 +415,7 @@ class HallucinationDetector:
             
             # Verify claim against sources using LLM
             verification_result = await self._assess_claim_against_sources(claim, sources)
+            await asyncio.to_thread(self.claim_cache.put, claim, verification_result)
             
             return Claim(
                 text=claim,
@@ -354,44 +437,40 @@ class HallucinationDetector:
                 reasoning=f"Error during verification: {str(e)}"
             )
     
-    async def _search_evidence_batch(self, claims: List[str]) -> List[Dict[str, Any]]:
+    async def _search_evidence_batch(self, claims: List[str]) -> List[List[Dict[str, Any]]]:
         """
-        Search for evidence for multiple claims in one API call.
+        Search for evidence for each claim concurrently.
         
         Args:
             claims: List of claims to search for
             
         Returns:
-            List of sources relevant to the claims
+            Sources found for each claim, in claim order (empty when a search failed)
         """
-        try:
-            # Combine all claims into one search query
-            combined_query = " ".join(claims[:2])  # Use first 2 claims to avoid query length limits
-            
-            logger.info(f"Searching for evidence for {len(claims)} claims with combined query")
-            
-            # Use the existing search method with combined query
-            sources = await self._search_evidence(combined_query)
-            
-            # Limit sources to prevent excessive processing
-            max_sources = 5
-            if len(sources) > max_sources:
-                sources = sources[:max_sources]
-                logger.info(f"Limited sources to {max_sources} to prevent API rate limits")
-            
-            return sources
-            
-        except Exception as e:
-            logger.error(f"Error in batch evidence search: {str(e)}")
-            return []
-
-    async def _assess_claims_batch(self, claims: List[str], sources: List[Dict[str, Any]]) -> List[Claim]:
+        logger.info(f"Searching for evidence for {len(claims)} claims concurrently")
+        
+        results = await asyncio.gather(
+            *(self._search_evidence(claim) for claim in claims), return_exceptions=True
+        )
+        
+        sources_per_claim = []
+        for claim, result in zip(claims, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Evidence search failed for claim '{claim[:50]}': {result}")
+                sources_per_claim.append([])
+            else:
+                # Limit sources to prevent excessive processing
+                sources_per_claim.append(result[:MAX_SOURCES_PER_CLAIM])
+        return sources_per_claim
+    
+    async def _assess_claims_batch(self, claims: List[str],
+                                   sources_per_claim: List[List[Dict[str, Any]]]) -> List[Claim]:
         """
-        Assess multiple claims against sources in one API call.
+        Assess multiple claims in one API call, each against its own sources.
         
         Args:
             claims: List of claims to assess
-            sources: List of sources to assess against
+            sources_per_claim: Sources found for each claim, in claim order
             
         Returns:
             List of Claim objects with assessment results
@@ -403,16 +482,13 @@ class HallucinationDetector:
             # Limit to 3 claims to prevent excessive API usage
             claims_to_assess = claims[:3]
             
-            # Prepare sources text
-            combined_sources = "\n\n".join([
-                f"Source {i+1}: {src.get('url','')}\nText: {src.get('text','')[:1000]}"
-                for i, src in enumerate(sources)
-            ])
-            
-            # Prepare claims text
-            claims_text = "\n".join([
-                f"Claim {i+1}: {claim}"
-                for i, claim in enumerate(claims_to_assess)
+            # Prepare claims text, each claim followed by its own sources
+            claims_text = "\n\n".join([
+                f"Claim {i+1}: {claim}\nSources for claim {i+1}:\n" + "\n".join([
+                    f"Source {j+1}: {src.get('url','')}\nText: {src.get('text','')[:1000]}"
+                    for j, src in enumerate(sources)
+                ])
+                for i, (claim, sources) in enumerate(zip(claims_to_assess, sources_per_claim))
             ])
             
             prompt = (
@@ -424,14 +500,14 @@ class HallucinationDetector:
                 '      "claim_index": 0,\n'
                 '      "assessment": "supported" or "refuted" or "insufficient_information",\n'
                 '      "confidence": number between 0.0 and 1.0,\n'
-                '      "supporting_sources": [array of source indices that support the claim],\n'
-                '      "refuting_sources": [array of source indices that refute the claim],\n'
+                '      "supporting_sources": [array of indices of this claim\'s sources that support it],\n'
+                '      "refuting_sources": [array of indices of this claim\'s sources that refute it],\n'
                 '      "reasoning": "brief explanation of your assessment"\n'
                 '    }\n'
                 '  ]\n'
                 "}\n\n"
+                "Assess each claim only against the sources listed for it.\n\n"
                 f"Claims to verify:\n{claims_text}\n\n"
-                f"Sources:\n{combined_sources}\n\n"
                 "Return only the JSON object:"
             )
             
@@ -468,7 +544,7 @@ class HallucinationDetector:
             assessments = result.get('assessments', [])
             verified_claims = []
             
-            for i, claim in enumerate(claims_to_assess):
+            for i, (claim, sources) in enumerate(zip(claims_to_assess, sources_per_claim)):
                 # Find assessment for this claim
                 assessment = None
                 for a in assessments:
@@ -538,52 +614,29 @@ class HallucinationDetector:
         Returns:
             List of source documents with evidence
         """
-        if not self.exa_api_key:
+        if not self.exa_client.api_key:
             raise Exception("Exa API key not available. Cannot search for evidence without Exa.ai access.")
         
         try:
-            headers = {
-                'x-api-key': self.exa_api_key,
-                'Content-Type': 'application/json'
-            }
-            
-            payload = {
-                'query': claim,
-                'numResults': 5,
-                'text': True,
-                'useAutoprompt': True
-            }
-            
-            response = requests.post(
-                'https://api.exa.ai/search',
-                headers=headers,
-                json=payload,
-                timeout=15
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                results = data.get('results', [])
-                
-                if not results:
-                    raise Exception(f"No search results found for claim: {claim}")
-                
-                sources = []
-                for result in results:
-                    source = {
-                        'title': result.get('title', 'Untitled'),
-                        'url': result.get('url', ''),
-                        'text': result.get('text', ''),
-                        'publishedDate': result.get('publishedDate', ''),
-                        'author': result.get('author', ''),
-                        'score': result.get('score', 0.5)
-                    }
-                    sources.append(source)
-                
-                logger.info(f"Found {len(sources)} sources for claim: {claim[:50]}...")
-                return sources
-            else:
-                raise Exception(f"Exa API error: {response.status_code} - {response.text}")
+            results = await self.exa_client.search(claim, num_results=5, text=True, useAutoprompt=True)
+            
+            if not results:
+                raise Exception(f"No search results found for claim: {claim}")
+            
+            sources = []
+            for result in results:
+                source = {
+                    'title': result.get('title', 'Untitled'),
+                    'url': result.get('url', ''),
+                    'text': result.get('text', ''),
+                    'publishedDate': result.get('publishedDate', ''),
+                    'author': result.get('author', ''),
+                    'score': result.get('score', 0.5)
+                }
+                sources.append(source)
+            
+            logger.info(f"Found {len(sources)} sources for claim: {claim[:50]}...")
+            return sources
                 
         except Exception as e:
             logger.error(f"Error searching evidence with Exa: {str(e)}")
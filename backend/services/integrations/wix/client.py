@@ -0,0 +1,439 @@
+"""
+Async Wix client.
+
+One aiohttp session is shared by all Wix calls, so connections to the API stay
+open between requests; rate-limited (429) and 5xx responses are retried with
+exponential backoff. Calls that create something (draft posts, terms, media
+imports) are only retried when the request never reached Wix. Access tokens
+are cached per refresh token and refreshed shortly before they expire, and the
+publish flow imports its images and resolves its categories and tags
+concurrently before creating the draft.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+from loguru import logger
+
+from .content import convert_content_to_ricos
+from .utils import extract_meta_from_token, normalize_token_string
+
+WIX_API_BASE_URL = "https://www.wixapis.com"
+WIX_REQUEST_TIMEOUT = int(os.getenv("WIX_REQUEST_TIMEOUT", "30"))
+WIX_MAX_CONCURRENT_REQUESTS = int(os.getenv("WIX_MAX_CONCURRENT_REQUESTS", "6"))
+WIX_MAX_RETRIES = int(os.getenv("WIX_MAX_RETRIES", "3"))
+WIX_RETRY_BACKOFF_SECONDS = float(os.getenv("WIX_RETRY_BACKOFF_SECONDS", "0.5"))
+# Upper bound of a server-sent Retry-After, so one response cannot stall a request for minutes
+WIX_MAX_RETRY_AFTER_SECONDS = float(os.getenv("WIX_MAX_RETRY_AFTER_SECONDS", "30"))
+# Largest page the Blog API serves when listing categories and tags
+WIX_TERMS_PAGE_SIZE = 100
+# Refresh this long before an access token expires, so no request goes out with a stale one
+WIX_TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("WIX_TOKEN_REFRESH_MARGIN_SECONDS", "60"))
+# Wix OAuth access tokens are short-lived; used when a token response has no expires_in
+WIX_DEFAULT_TOKEN_TTL_SECONDS = 300
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# A 5xx or a dropped connection may come after Wix applied the request, so
+# non-idempotent calls only retry responses that say it was not processed
+NON_IDEMPOTENT_RETRY_STATUSES = {429}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class WixAPIError(Exception):
+    """Raised when a Wix API request fails."""
+
+    def __init__(self, message: str, status: Optional[int] = None, body: str = ""):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+def _label_key(label: str) -> str:
+    return (label or '').strip().lower()
+
+
+def _unique_labels(labels: Optional[List[str]]) -> List[str]:
+    seen = set()
+    result = []
+    for label in labels or []:
+        key = _label_key(label)
+        if key and key not in seen:
+            seen.add(key)
+            result.append(label.strip())
+    return result
+
+
+class WixTokenCache:
+    """Access tokens by refresh token, served until shortly before they expire."""
+
+    def __init__(self, refresh_margin_seconds: int = WIX_TOKEN_REFRESH_MARGIN_SECONDS):
+        """
+        Args:
+            refresh_margin_seconds: How long before expiry a cached token stops being served
+        """
+        self.refresh_margin_seconds = refresh_margin_seconds
+        # refresh token -> (access token, expires_at)
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+
+    def get(self, refresh_token: str) -> Optional[str]:
+        entry = self._tokens.get(refresh_token)
+        if entry is None or entry[1] - self.refresh_margin_seconds <= time.time():
+            return None
+        return entry[0]
+
+    def put(self, refresh_token: str, tokens: Dict[str, Any]) -> str:
+        """Cache a token response under the refresh token it was obtained with (and a rotated one)."""
+        access_token = normalize_token_string(tokens)
+        if not access_token:
+            raise WixAPIError("Token response has no access token")
+        expires_at = time.time() + int(tokens.get('expires_in') or WIX_DEFAULT_TOKEN_TTL_SECONDS)
+        self._tokens[refresh_token] = (access_token, expires_at)
+        rotated = normalize_token_string(tokens.get('refresh_token'))
+        if rotated and rotated != refresh_token:
+            self._tokens[rotated] = (access_token, expires_at)
+        return access_token
+
+    def invalidate(self, refresh_token: str) -> None:
+        self._tokens.pop(refresh_token, None)
+
+
+class AsyncWixClient:
+    """Wix REST calls over a shared session with a concurrency cap and retries."""
+
+    def __init__(self, base_url: str = WIX_API_BASE_URL,
+                 client_id: Optional[str] = None,
+                 max_concurrency: int = WIX_MAX_CONCURRENT_REQUESTS,
+                 timeout: int = WIX_REQUEST_TIMEOUT,
+                 max_retries: int = WIX_MAX_RETRIES,
+                 retry_backoff: float = WIX_RETRY_BACKOFF_SECONDS,
+                 token_cache: Optional[WixTokenCache] = None):
+        """
+        Args:
+            base_url: Wix API base URL
+            client_id: Wix app client ID (read from WIX_CLIENT_ID at request time when not given)
+            max_concurrency: Maximum number of requests in flight
+            timeout: Timeout in seconds for one request
+            max_retries: Retries of a request answered with 429 or 5xx
+            retry_backoff: Base delay in seconds, doubled on every retry
+            token_cache: Access token cache (a private one when not given)
+        """
+        self.base_url = base_url.rstrip('/')
+        self._client_id = client_id
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.token_cache = token_cache or WixTokenCache()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._refresh_locks: Dict[str, asyncio.Lock] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def client_id(self) -> Optional[str]:
+        return self._client_id or os.getenv('WIX_CLIENT_ID')
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._refresh_locks = {}
+            self._loop = loop
+        return self._session
+
+    def _headers(self, access_token: Optional[str]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if access_token:
+            headers['Authorization'] = f'Bearer {access_token}'
+            # Site-scoped calls need the site of the token
+            meta_site_id = extract_meta_from_token(access_token).get('metaSiteId')
+            if meta_site_id:
+                headers['wix-site-id'] = meta_site_id
+        if self.client_id:
+            headers['wix-client-id'] = self.client_id
+        return headers
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), WIX_MAX_RETRY_AFTER_SECONDS)
+            except ValueError:
+                pass
+        return self.retry_backoff * (2 ** attempt) * (1 + random.random() * 0.1)
+
+    async def request(self, method: str, path: str, access_token: Optional[str] = None,
+                      idempotent: Optional[bool] = None, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Send one API request, retrying 429 and 5xx responses.
+
+        Non-idempotent requests are only retried on 429 and on failures to
+        connect, so a request Wix may already have applied is not sent twice.
+
+        Args:
+            method: HTTP method
+            path: Path below the API base URL, e.g. '/blog/v3/tags'
+            access_token: Bearer token of the call (token endpoints take none)
+            idempotent: Whether the call is safe to repeat; defaults to True for
+                GET, HEAD, OPTIONS, PUT and DELETE
+            **kwargs: Passed on to aiohttp, e.g. json=, data= or params=
+
+        Returns:
+            The decoded JSON response
+
+        Raises:
+            WixAPIError: If the request fails or is still rejected after the retries
+        """
+        session = self._get_session()
+        url = f"{self.base_url}{path}"
+        headers = self._headers(access_token)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        retry_statuses = RETRY_STATUSES if idempotent else NON_IDEMPOTENT_RETRY_STATUSES
+
+        for attempt in range(self.max_retries + 1):
+            error: Optional[Exception] = None
+            async with self._semaphore:
+                try:
+                    async with session.request(method, url, headers=headers, **kwargs) as response:
+                        status = response.status
+                        body = await response.text()
+                        retry_after = response.headers.get('Retry-After')
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = e
+
+            # Backoff sleeps happen outside the semaphore, so they do not hold a request slot
+            if error is not None:
+                # The request was never sent if the connection could not be opened
+                retryable = idempotent or isinstance(error, aiohttp.ClientConnectorError)
+                if retryable and attempt < self.max_retries:
+                    await asyncio.sleep(self._retry_delay(attempt, None))
+                    continue
+                raise WixAPIError(f"Wix request {method} {path} failed: {error!r}")
+            if status < 400:
+                return json.loads(body) if body else {}
+            if status in retry_statuses and attempt < self.max_retries:
+                delay = self._retry_delay(attempt, retry_after)
+                logger.warning(f"Wix {method} {path} returned {status}; retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            raise WixAPIError(f"Wix API error: {status} - {body[:500]}", status=status, body=body)
+
+    # Tokens
+
+    async def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
+        """Exchange a refresh token for new tokens, and cache the access token."""
+        # Refreshing again only issues another token, so every failure is retried
+        tokens = await self.request('POST', '/oauth2/token', idempotent=True, data={
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh_token,
+            'client_id': self.client_id or '',
+        })
+        self.token_cache.put(refresh_token, tokens)
+        return tokens
+
+    async def get_access_token(self, refresh_token: str) -> str:
+        """A valid access token for a refresh token; concurrent callers share one refresh."""
+        access_token = self.token_cache.get(refresh_token)
+        if access_token:
+            return access_token
+        self._get_session()
+        lock = self._refresh_locks.setdefault(refresh_token, asyncio.Lock())
+        async with lock:
+            access_token = self.token_cache.get(refresh_token)
+            if access_token:
+                return access_token
+            logger.info("Refreshing Wix access token")
+            tokens = await self.refresh_access_token(refresh_token)
+            return normalize_token_string(tokens)
+
+    async def get_current_member(self, access_token: str) -> Dict[str, Any]:
+        return await self.request('GET', '/members/v1/members/my', access_token)
+
+    # Media
+
+    async def import_image(self, access_token: str, image_url: str, display_name: str) -> str:
+        """Import an external image into the Media Manager and return its media ID."""
+        result = await self.request('POST', '/media/v1/files/import', access_token, json={
+            'url': image_url,
+            'mediaType': 'IMAGE',
+            'displayName': display_name,
+        })
+        return result['file']['id']
+
+    async def import_images(self, access_token: str, image_urls: List[str],
+                            display_name: str = "Image") -> List[Optional[str]]:
+        """Import images concurrently; a failed import yields None in its place."""
+        async def import_one(index: int, image_url: str) -> Optional[str]:
+            try:
+                return await self.import_image(access_token, image_url, f"{display_name} {index + 1}")
+            except (WixAPIError, KeyError) as e:
+                logger.warning(f"Failed to import image {image_url} to Wix: {e}")
+                return None
+
+        return list(await asyncio.gather(*(import_one(i, url) for i, url in enumerate(image_urls))))
+
+    # Categories and tags
+
+    async def _list_terms(self, access_token: str, kind: str) -> List[Dict[str, Any]]:
+        """Every term of a kind ('categories' or 'tags'), following the offset paging."""
+        terms: List[Dict[str, Any]] = []
+        while True:
+            result = await self.request('GET', f'/blog/v3/{kind}', access_token, params={
+                'paging.limit': WIX_TERMS_PAGE_SIZE,
+                'paging.offset': len(terms),
+            })
+            page = result.get(kind, [])
+            terms.extend(page)
+            total = (result.get('metaData') or {}).get('total')
+            if not page or total is None or len(terms) >= int(total):
+                return terms
+
+    async def list_categories(self, access_token: str) -> List[Dict[str, Any]]:
+        return await self._list_terms(access_token, 'categories')
+
+    async def list_tags(self, access_token: str) -> List[Dict[str, Any]]:
+        return await self._list_terms(access_token, 'tags')
+
+    async def create_category(self, access_token: str, label: str, description: Optional[str] = None,
+                              language: Optional[str] = None) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {'category': {'label': label}, 'fieldsets': ['URL']}
+        if description:
+            payload['category']['description'] = description
+        if language:
+            payload['category']['language'] = language
+        return await self.request('POST', '/blog/v3/categories', access_token, json=payload)
+
+    async def create_tag(self, access_token: str, label: str, language: Optional[str] = None) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {'label': label, 'fieldsets': ['URL']}
+        if language:
+            payload['language'] = language
+        return await self.request('POST', '/blog/v3/tags', access_token, json=payload)
+
+    async def _resolve_labels(self, access_token: str, labels: List[str], kind: str) -> List[str]:
+        labels = _unique_labels(labels)
+        if not labels:
+            return []
+        existing = await (self.list_categories(access_token) if kind == 'category' else self.list_tags(access_token))
+        ids = {_label_key(item.get('label')): item.get('id') for item in existing if item.get('label')}
+
+        missing = [label for label in labels if _label_key(label) not in ids]
+        if missing:
+            create = self.create_category if kind == 'category' else self.create_tag
+            created = await asyncio.gather(*(create(access_token, label) for label in missing), return_exceptions=True)
+            for label, result in zip(missing, created):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to create Wix {kind} {label}: {result}")
+                    continue
+                ids[_label_key(label)] = (result.get(kind) or {}).get('id')
+
+        return [ids[_label_key(label)] for label in labels if ids.get(_label_key(label))]
+
+    async def resolve_categories(self, access_token: str, labels: List[str]) -> List[str]:
+        """Category IDs of labels, from one listing plus concurrent creation of the missing ones."""
+        return await self._resolve_labels(access_token, labels, 'category')
+
+    async def resolve_tags(self, access_token: str, labels: List[str]) -> List[str]:
+        """Tag IDs of labels, from one listing plus concurrent creation of the missing ones."""
+        return await self._resolve_labels(access_token, labels, 'tag')
+
+    # Posts
+
+    async def create_draft_post(self, access_token: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.request('POST', '/blog/v3/draft-posts', access_token, json=payload)
+
+    async def publish_draft(self, access_token: str, draft_post_id: str) -> Dict[str, Any]:
+        return await self.request('POST', f'/blog/v3/draft-posts/{draft_post_id}/publish', access_token)
+
+    async def publish_post(self, access_token: str, title: str, content: str, member_id: str,
+                           cover_image_url: Optional[str] = None,
+                           image_urls: Optional[List[str]] = None,
+                           category_ids: Optional[List[str]] = None,
+                           tag_ids: Optional[List[str]] = None,
+                           categories: Optional[List[str]] = None,
+                           tags: Optional[List[str]] = None,
+                           publish: bool = True) -> Dict[str, Any]:
+        """
+        Create and optionally publish a blog post.
+
+        The cover and body images are imported, and category and tag labels
+        resolved, concurrently; the draft is created once all of them are done.
+
+        Args:
+            access_token: Valid access token
+            title: Post title
+            content: Post content (markdown-like text)
+            member_id: Member ID of the post author (required for third-party apps)
+            cover_image_url: Optional cover image URL
+            image_urls: Optional image URLs appended to the post body
+            category_ids: Category IDs to assign as they are
+            tag_ids: Tag IDs to assign as they are
+            categories: Category labels, created when missing
+            tags: Tag labels, created when missing
+            publish: Whether to publish immediately or save as draft
+
+        Returns:
+            The create draft post response
+        """
+        if not member_id:
+            raise ValueError("memberId is required for third-party apps creating blog posts")
+
+        image_urls = [url for url in ([cover_image_url] if cover_image_url else []) + list(image_urls or []) if url]
+        media_ids, category_result, tag_result = await asyncio.gather(
+            self.import_images(access_token, image_urls, title),
+            self.resolve_categories(access_token, categories or []),
+            self.resolve_tags(access_token, tags or []),
+            return_exceptions=True
+        )
+        for name, result in (('categories', category_result), ('tags', tag_result)):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to resolve Wix {name}: {result}")
+        if isinstance(media_ids, Exception):
+            raise media_ids
+
+        cover_media_id = media_ids.pop(0) if cover_image_url else None
+        body_media_ids = [media_id for media_id in media_ids if media_id]
+
+        draft_post: Dict[str, Any] = {
+            'title': title,
+            'memberId': member_id,
+            'richContent': convert_content_to_ricos(content or "This is a post from ALwrity.", body_media_ids),
+            'excerpt': (content or '').strip()[:200]
+        }
+        if cover_media_id:
+            draft_post['media'] = {
+                'wixMedia': {'image': {'id': cover_media_id}},
+                'displayed': True,
+                'custom': True
+            }
+        all_category_ids = list(category_ids or []) + ([] if isinstance(category_result, Exception) else category_result)
+        all_tag_ids = list(tag_ids or []) + ([] if isinstance(tag_result, Exception) else tag_result)
+        if all_category_ids:
+            draft_post['categoryIds'] = list(dict.fromkeys(all_category_ids))
+        if all_tag_ids:
+            draft_post['tagIds'] = list(dict.fromkeys(all_tag_ids))
+
+        result = await self.create_draft_post(access_token, {
+            'draftPost': draft_post,
+            'publish': publish,
+            'fieldsets': ['URL']
+        })
+        logger.info(f"Created Wix post '{title}' with {len(body_media_ids)} images")
+        return result
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# Global instance shared by the Wix routes
+wix_client = AsyncWixClient()
@@ -4,6 +4,8 @@ from typing import Any, Dict, List
 def convert_content_to_ricos(content: str, images: List[str] = None) -> Dict[str, Any]:
     """
     Convert simple markdown-like text into minimal valid Ricos JSON.
+
+    images are Wix media IDs, appended to the content as image nodes.
     """
     paragraphs = content.split('\n\n')
     nodes = []
@@ -48,6 +50,17 @@ def convert_content_to_ricos(content: str, images: List[str] = None) -> Dict[str
                 'paragraphData': {}
             })
 
+    for media_id in images or []:
+        nodes.append({
+            'id': str(uuid.uuid4()),
+            'type': 'IMAGE',
+            'nodes': [],
+            'imageData': {
+                'containerData': { 'width': { 'size': 'CONTENT' }, 'alignment': 'CENTER' },
+                'image': { 'src': { 'id': media_id } }
+            }
+        })
+
     return {
         'nodes': nodes,
         'metadata': { 'version': 1, 'id': str(uuid.uuid4()) },
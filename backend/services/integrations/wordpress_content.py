@@ -8,13 +8,50 @@ import json
 import base64
 import mimetypes
 import tempfile
-from typing import Optional, Dict, List, Any, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Any, Tuple, Union
 from datetime import datetime
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from PIL import Image
 from loguru import logger
 
+from .wordpress_taxonomy import term_key, unique_names, wordpress_taxonomy_cache
+
+WORDPRESS_REQUEST_TIMEOUT = int(os.getenv("WORDPRESS_REQUEST_TIMEOUT", "30"))
+WORDPRESS_TERM_CREATE_CONCURRENCY = int(os.getenv("WORDPRESS_TERM_CREATE_CONCURRENCY", "4"))
+
+# One pooled HTTP session per site connection, shared by every content manager for it
+_site_sessions: Dict[tuple, requests.Session] = {}
+_site_sessions_lock = threading.Lock()
+
+
+def get_site_session(site_url: str, username: str, app_password: str) -> requests.Session:
+    """Authenticated session of a site connection, keeping its connections open between requests."""
+    key = (site_url, username, app_password)
+    with _site_sessions_lock:
+        session = _site_sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            session.auth = HTTPBasicAuth(username, app_password)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(WORDPRESS_TERM_CREATE_CONCURRENCY, 4))
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _site_sessions[key] = session
+        return session
+
+
+def evict_site_sessions(site_url: str) -> None:
+    """Close the pooled sessions of a site, e.g. once it is disconnected or its credentials change."""
+    site_url = site_url.rstrip('/')
+    with _site_sessions_lock:
+        keys = [key for key in _site_sessions if key[0] == site_url]
+        sessions = [_site_sessions.pop(key) for key in keys]
+    for session in sessions:
+        session.close()
+
 
 class WordPressContentManager:
     """Manages WordPress content operations including posts, media, and taxonomies."""
@@ -26,12 +63,14 @@ class WordPressContentManager:
         self.app_password = app_password
         self.api_base = f"{self.site_url}/wp-json/wp/v2"
         self.auth = HTTPBasicAuth(username, app_password)
+        self.session = get_site_session(self.site_url, username, app_password)
     
     def _make_request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict[str, Any]]:
         """Make authenticated request to WordPress API."""
         try:
             url = f"{self.api_base}/{endpoint.lstrip('/')}"
-            response = requests.request(method, url, auth=self.auth, **kwargs)
+            kwargs.setdefault('timeout', WORDPRESS_REQUEST_TIMEOUT)
+            response = self.session.request(method, url, **kwargs)
             
             if response.status_code in [200, 201]:
                 return response.json()
@@ -70,52 +109,120 @@ class WordPressContentManager:
             return []
     
     def create_category(self, name: str, description: str = "") -> Optional[Dict[str, Any]]:
-        """Create a new category."""
-        try:
-            data = {
-                'name': name,
-                'description': description
-            }
-            result = self._make_request('POST', 'categories', json=data)
-            if result:
-                logger.info(f"Created category: {name}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error creating category {name}: {e}")
-            return None
+        """Create a new category (or find the existing one with that name)."""
+        term_id = self._create_term('categories', name, description)
+        return {'id': term_id, 'name': name} if term_id else None
     
     def create_tag(self, name: str, description: str = "") -> Optional[Dict[str, Any]]:
-        """Create a new tag."""
+        """Create a new tag (or find the existing one with that name)."""
+        term_id = self._create_term('tags', name, description)
+        return {'id': term_id, 'name': name} if term_id else None
+    
+    def _list_terms(self, taxonomy: str) -> Optional[List[Dict[str, Any]]]:
+        """All terms of a taxonomy (every page), or None when the listing failed."""
+        terms: List[Dict[str, Any]] = []
+        page = 1
+        while True:
+            try:
+                response = self.session.get(
+                    f"{self.api_base}/{taxonomy}",
+                    params={'per_page': 100, 'page': page, '_fields': 'id,name'},
+                    timeout=WORDPRESS_REQUEST_TIMEOUT
+                )
+            except requests.RequestException as e:
+                logger.error(f"Error listing {taxonomy} of {self.site_url}: {e}")
+                return None
+            if response.status_code != 200:
+                logger.error(f"WordPress API error listing {taxonomy}: {response.status_code} - {response.text}")
+                return None
+            batch = response.json()
+            terms.extend(batch)
+            total_pages = int(response.headers.get('X-WP-TotalPages', 1))
+            if page >= total_pages or not batch:
+                return terms
+            page += 1
+    
+    def _get_term_ids(self, taxonomy: str) -> Dict[str, int]:
+        """Term name to ID map of a taxonomy, from the cache or one fresh listing."""
+        term_ids = wordpress_taxonomy_cache.get_terms(self.site_url, taxonomy)
+        if term_ids is not None:
+            return term_ids
+        terms = self._list_terms(taxonomy)
+        if terms is None:
+            # Creating a term that exists returns its ID, so resolution still works uncached
+            return {}
+        logger.info(f"Retrieved {len(terms)} {taxonomy} from {self.site_url}")
+        return wordpress_taxonomy_cache.set_terms(self.site_url, taxonomy, terms)
+    
+    def _create_term(self, taxonomy: str, name: str, description: str = "") -> Optional[int]:
+        """Create a term and return its ID, or the ID of the existing term with that name."""
         try:
-            data = {
-                'name': name,
-                'description': description
-            }
-            result = self._make_request('POST', 'tags', json=data)
-            if result:
-                logger.info(f"Created tag: {name}")
-            return result
+            response = self.session.post(
+                f"{self.api_base}/{taxonomy}",
+                json={'name': name, 'description': description},
+                timeout=WORDPRESS_REQUEST_TIMEOUT
+            )
+            if response.status_code in [200, 201]:
+                term_id = response.json()['id']
+                logger.info(f"Created {taxonomy} term: {name}")
+            else:
+                error = response.json() if response.headers.get('Content-Type', '').startswith('application/json') else {}
+                term_id = error.get('data', {}).get('term_id') if error.get('code') == 'term_exists' else None
+                if term_id is None:
+                    logger.error(f"WordPress API error creating {taxonomy} term {name}: {response.status_code} - {response.text}")
+                    return None
+            wordpress_taxonomy_cache.add_term(self.site_url, taxonomy, name, term_id)
+            return term_id
             
         except Exception as e:
-            logger.error(f"Error creating tag {name}: {e}")
+            logger.error(f"Error creating {taxonomy} term {name}: {e}")
             return None
     
+    def resolve_terms(self, taxonomy: str, names: List[str], description: str = "") -> List[int]:
+        """
+        Resolve term names to IDs in one pass, creating the missing terms.
+        
+        Names are matched case-insensitively against one (cached) listing of the
+        taxonomy, and missing terms are created concurrently.
+        
+        Args:
+            taxonomy: 'categories' or 'tags'
+            names: Term names; duplicates are resolved once
+            description: Description for created terms
+            
+        Returns:
+            IDs of the resolved terms, in name order
+        """
+        names = unique_names(names)
+        if not names:
+            return []
+        
+        term_ids = self._get_term_ids(taxonomy)
+        missing = [name for name in names if term_key(name) not in term_ids]
+        if missing:
+            workers = min(len(missing), WORDPRESS_TERM_CREATE_CONCURRENCY)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                created = list(executor.map(lambda name: self._create_term(taxonomy, name, description), missing))
+            for name, term_id in zip(missing, created):
+                if term_id:
+                    term_ids[term_key(name)] = term_id
+        
+        logger.info(f"Resolved {len(names)} {taxonomy} for {self.site_url} ({len(missing)} created)")
+        return [term_ids[term_key(name)] for name in names if term_key(name) in term_ids]
+    
+    def resolve_categories(self, names: List[str]) -> List[int]:
+        """Resolve category names to IDs, creating missing categories."""
+        return self.resolve_terms('categories', names)
+    
+    def resolve_tags(self, names: List[str]) -> List[int]:
+        """Resolve tag names to IDs, creating missing tags."""
+        return self.resolve_terms('tags', names)
+    
     def get_or_create_category(self, name: str, description: str = "") -> Optional[int]:
         """Get existing category or create new one."""
         try:
-            # First, try to find existing category
-            categories = self.get_categories()
-            for category in categories:
-                if category['name'].lower() == name.lower():
-                    logger.info(f"Found existing category: {name}")
-                    return category['id']
-            
-            # Create new category if not found
-            new_category = self.create_category(name, description)
-            if new_category:
-                return new_category['id']
-            return None
+            category_ids = self.resolve_terms('categories', [name], description)
+            return category_ids[0] if category_ids else None
             
         except Exception as e:
             logger.error(f"Error getting or creating category {name}: {e}")
@@ -124,18 +231,8 @@ class WordPressContentManager:
     def get_or_create_tag(self, name: str, description: str = "") -> Optional[int]:
         """Get existing tag or create new one."""
         try:
-            # First, try to find existing tag
-            tags = self.get_tags()
-            for tag in tags:
-                if tag['name'].lower() == name.lower():
-                    logger.info(f"Found existing tag: {name}")
-                    return tag['id']
-            
-            # Create new tag if not found
-            new_tag = self.create_tag(name, description)
-            if new_tag:
-                return new_tag['id']
-            return None
+            tag_ids = self.resolve_terms('tags', [name], description)
+            return tag_ids[0] if tag_ids else None
             
         except Exception as e:
             logger.error(f"Error getting or creating tag {name}: {e}")
@@ -163,11 +260,11 @@ class WordPressContentManager:
             # Upload file
             with open(file_path, 'rb') as file:
                 files = {'file': (file_name, file, mime_type)}
-                response = requests.post(
+                response = self.session.post(
                     f"{self.api_base}/media",
-                    auth=self.auth,
                     headers=headers,
-                    files=files
+                    files=files,
+                    timeout=WORDPRESS_REQUEST_TIMEOUT
                 )
             
             if response.status_code == 201:
@@ -182,10 +279,10 @@ class WordPressContentManager:
                     'description': description
                 }
                 
-                update_response = requests.post(
+                update_response = self.session.post(
                     f"{self.api_base}/media/{media_id}",
-                    auth=self.auth,
-                    json=update_data
+                    json=update_data,
+                    timeout=WORDPRESS_REQUEST_TIMEOUT
                 )
                 
                 if update_response.status_code == 200:
@@ -234,7 +331,7 @@ class WordPressContentManager:
         try:
             # Test with a simple API call
             api_url = f"{self.api_base}/users/me"
-            response = requests.get(api_url, auth=self.auth, timeout=10)
+            response = self.session.get(api_url, timeout=10)
             
             if response.status_code == 200:
                 logger.info(f"WordPress connection test successful for {self.site_url}")
@@ -274,15 +371,63 @@ class WordPressContentManager:
             if meta:
                 post_data['meta'] = meta
             
-            result = self._make_request('POST', 'posts', json=post_data)
-            if result:
-                logger.info(f"Post created successfully: {title}")
+            result, _ = self._submit_post(post_data)
             return result
             
         except Exception as e:
             logger.error(f"Error creating post {title}: {e}")
             return None
     
+    def _submit_post(self, post_data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Create a post; returns the post (or None) and whether it was rejected for invalid term IDs."""
+        try:
+            response = self.session.post(f"{self.api_base}/posts", json=post_data, timeout=WORDPRESS_REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            logger.error(f"WordPress API request error: {e}")
+            return None, False
+        if response.status_code in [200, 201]:
+            logger.info(f"Post created successfully: {post_data.get('title')}")
+            return response.json(), False
+        logger.error(f"WordPress API error: {response.status_code} - {response.text}")
+        error = response.json() if response.headers.get('Content-Type', '').startswith('application/json') else {}
+        invalid_params = (error.get('data') or {}).get('params') or {}
+        return None, error.get('code') == 'rest_invalid_param' and bool({'categories', 'tags'} & set(invalid_params))
+    
+    def create_post_with_terms(self, title: str, content: str, excerpt: str = "",
+                               featured_media_id: Optional[int] = None,
+                               category_names: Optional[List[str]] = None,
+                               tag_names: Optional[List[str]] = None,
+                               status: str = 'draft',
+                               meta: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Dict[str, Any]], List[int], List[int]]:
+        """
+        Create a post from category and tag names, resolving them to IDs first.
+        
+        If the site rejects the post because a cached term was deleted in the
+        meantime, the site's taxonomy cache is dropped and the terms are resolved
+        once more against a fresh listing before retrying.
+        
+        Returns:
+            The created post (or None), and the category and tag IDs it was sent with
+        """
+        for attempt in range(2):
+            category_ids = self.resolve_categories(category_names) if category_names else []
+            tag_ids = self.resolve_tags(tag_names) if tag_names else []
+            post_data = {'title': title, 'content': content, 'excerpt': excerpt, 'status': status}
+            if featured_media_id:
+                post_data['featured_media'] = featured_media_id
+            if category_ids:
+                post_data['categories'] = category_ids
+            if tag_ids:
+                post_data['tags'] = tag_ids
+            if meta:
+                post_data['meta'] = meta
+            
+            result, rejected_terms = self._submit_post(post_data)
+            if not rejected_terms or attempt:
+                return result, category_ids, tag_ids
+            logger.warning(f"Post {title} rejected for stale terms of {self.site_url}; resolving them again")
+            wordpress_taxonomy_cache.invalidate(self.site_url)
+    
     def update_post(self, post_id: int, **kwargs) -> Optional[Dict[str, Any]]:
         """Update an existing WordPress post."""
         try:
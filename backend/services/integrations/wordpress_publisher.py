@@ -87,35 +87,19 @@ class WordPressPublisher:
                 except Exception as e:
                     logger.warning(f"Failed to upload featured image: {e}")
             
-            # Handle categories
-            category_ids = []
-            if categories:
-                for category_name in categories:
-                    category_id = content_manager.get_or_create_category(category_name)
-                    if category_id:
-                        category_ids.append(category_id)
-            
-            # Handle tags
-            tag_ids = []
-            if tags:
-                for tag_name in tags:
-                    tag_id = content_manager.get_or_create_tag(tag_name)
-                    if tag_id:
-                        tag_ids.append(tag_id)
-            
             # Prepare meta data
             meta_data = {}
             if meta_description:
                 meta_data['description'] = meta_description
             
-            # Create the post
-            post_data = content_manager.create_post(
+            # Create the post, resolving categories and tags against one cached listing of the site's terms
+            post_data, category_ids, tag_ids = content_manager.create_post_with_terms(
                 title=title,
                 content=content,
                 excerpt=excerpt,
                 featured_media_id=featured_media_id,
-                categories=category_ids if category_ids else None,
-                tags=tag_ids if tag_ids else None,
+                category_names=categories,
+                tag_names=tags,
                 status=status,
                 meta=meta_data if meta_data else None
             )
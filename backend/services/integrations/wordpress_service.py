@@ -16,6 +16,9 @@ from requests.auth import HTTPBasicAuth
 from PIL import Image
 from loguru import logger
 
+from .wordpress_content import evict_site_sessions
+from .wordpress_taxonomy import wordpress_taxonomy_cache
+
 
 class WordPressService:
     """Main WordPress service class for managing WordPress integrations."""
@@ -91,6 +94,9 @@ class WordPressService:
                 ''', (user_id, site_url, site_name, username, app_password))
                 conn.commit()
             
+            # Sessions pooled with the previous credentials of this site are stale now
+            evict_site_sessions(site_url)
+            
             logger.info(f"WordPress site added for user {user_id}: {site_name}")
             return True
             
@@ -176,6 +182,10 @@ class WordPressService:
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
+                cursor.execute(
+                    'SELECT site_url FROM wordpress_sites WHERE id = ? AND user_id = ?', (site_id, user_id)
+                )
+                row = cursor.fetchone()
                 cursor.execute('''
                     UPDATE wordpress_sites 
                     SET is_active = 0, updated_at = CURRENT_TIMESTAMP
@@ -183,6 +193,10 @@ class WordPressService:
                 ''', (site_id, user_id))
                 conn.commit()
             
+            if row:
+                evict_site_sessions(row[0])
+                wordpress_taxonomy_cache.invalidate(row[0].rstrip('/'))
+            
             logger.info(f"WordPress site {site_id} disconnected for user {user_id}")
             return True
             
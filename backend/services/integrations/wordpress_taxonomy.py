@@ -0,0 +1,78 @@
+"""
+WordPress Taxonomy Cache
+Per-site cache of category and tag IDs by name, so publishing a post resolves
+all of its terms against one listing of the site's taxonomy instead of one
+listing per term.
+"""
+
+import html
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+WORDPRESS_TAXONOMY_TTL_SECONDS = int(os.getenv("WORDPRESS_TAXONOMY_TTL_SECONDS", "900"))
+
+TAXONOMIES = ('categories', 'tags')
+
+
+def term_key(name: str) -> str:
+    """Lookup key of a term name; WordPress matches names case-insensitively and returns them HTML-escaped."""
+    return html.unescape(name).strip().lower()
+
+
+def unique_names(names: Iterable[str]) -> List[str]:
+    """Non-empty names in order, without case-insensitive duplicates."""
+    seen = set()
+    result = []
+    for name in names:
+        key = term_key(name or '')
+        if key and key not in seen:
+            seen.add(key)
+            result.append(name.strip())
+    return result
+
+
+class WordPressTaxonomyCache:
+    """Term name to ID maps per site and taxonomy, with a TTL."""
+
+    def __init__(self, ttl_seconds: int = WORDPRESS_TAXONOMY_TTL_SECONDS):
+        """
+        Args:
+            ttl_seconds: How long a site's term listing is trusted before it is fetched again
+        """
+        self.ttl_seconds = ttl_seconds
+        # (site_url, taxonomy) -> (term key -> id, loaded_at)
+        self._terms: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get_terms(self, site_url: str, taxonomy: str) -> Optional[Dict[str, int]]:
+        """The cached term map of a site's taxonomy, or None when it is missing or stale."""
+        with self._lock:
+            entry = self._terms.get((site_url, taxonomy))
+            if entry is None or time.time() - entry[1] > self.ttl_seconds:
+                return None
+            return dict(entry[0])
+
+    def set_terms(self, site_url: str, taxonomy: str, terms: List[Dict]) -> Dict[str, int]:
+        """Replace a site's taxonomy with a fresh listing of its terms."""
+        term_ids = {term_key(term['name']): term['id'] for term in terms if term.get('name')}
+        with self._lock:
+            self._terms[(site_url, taxonomy)] = (term_ids, time.time())
+        return dict(term_ids)
+
+    def add_term(self, site_url: str, taxonomy: str, name: str, term_id: int) -> None:
+        """Record a term created after the listing was fetched."""
+        with self._lock:
+            entry = self._terms.get((site_url, taxonomy))
+            if entry is not None:
+                entry[0][term_key(name)] = term_id
+
+    def invalidate(self, site_url: str, taxonomy: Optional[str] = None) -> None:
+        with self._lock:
+            for name in ([taxonomy] if taxonomy else TAXONOMIES):
+                self._terms.pop((site_url, name), None)
+
+
+# Global instance shared by all content managers of a process
+wordpress_taxonomy_cache = WordPressTaxonomyCache()
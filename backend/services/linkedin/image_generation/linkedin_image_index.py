@@ -0,0 +1,172 @@
+"""
+LinkedIn Image Metadata Index
+
+SQLite (WAL) index of stored LinkedIn images, maintained alongside the image and
+metadata files written by LinkedInImageStorage. Listing, lookups by image id,
+retention cleanup and storage statistics are answered from the index instead of
+reading every metadata file on disk.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from loguru import logger
+
+from utils.sqlite_utils import connect, init_database
+
+
+class LinkedInImageIndex:
+    """Metadata index for LinkedIn images, keyed by image id."""
+
+    def __init__(self, db_path: Union[str, Path]):
+        """
+        Args:
+            db_path: Path to SQLite database file
+        """
+        self.db_path = str(db_path)
+
+        # Ensure database directory exists
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect(self.db_path)
+
+    def _init_database(self):
+        """Initialize the SQLite database with required tables."""
+        init_database(
+            self.db_path,
+            """
+                CREATE TABLE IF NOT EXISTS linkedin_images (
+                    image_id TEXT PRIMARY KEY,
+                    user_id TEXT,
+                    content_type TEXT,
+                    storage_path TEXT NOT NULL,
+                    file_size INTEGER NOT NULL DEFAULT 0,
+                    stored_at TEXT NOT NULL,
+                    metadata TEXT NOT NULL
+                )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_linkedin_images_user ON linkedin_images(user_id, stored_at)",
+            "CREATE INDEX IF NOT EXISTS idx_linkedin_images_content_type ON linkedin_images(content_type, stored_at)",
+            "CREATE INDEX IF NOT EXISTS idx_linkedin_images_stored_at ON linkedin_images(stored_at)"
+        )
+
+    @staticmethod
+    def _row_values(metadata: Dict[str, Any], file_size: int) -> Tuple:
+        return (
+            metadata['image_id'],
+            metadata.get('user_id'),
+            metadata.get('content_type'),
+            metadata['storage_path'],
+            file_size,
+            metadata['stored_at'],
+            json.dumps(metadata, default=str),
+        )
+
+    def upsert(self, metadata: Dict[str, Any], file_size: int) -> None:
+        """Add or replace an image; metadata must contain image_id, storage_path and stored_at."""
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO linkedin_images
+                (image_id, user_id, content_type, storage_path, file_size, stored_at, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, self._row_values(metadata, file_size))
+            conn.commit()
+
+    def upsert_many(self, entries: List[Tuple[Dict[str, Any], int]]) -> None:
+        """Add or replace several images in one transaction."""
+        with self._connect() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO linkedin_images
+                (image_id, user_id, content_type, storage_path, file_size, stored_at, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [self._row_values(metadata, file_size) for metadata, file_size in entries])
+            conn.commit()
+
+    def get(self, image_id: str) -> Optional[Dict[str, Any]]:
+        """Metadata of one image, with its file size, or None if not indexed."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT metadata, file_size FROM linkedin_images WHERE image_id = ?", (image_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        metadata = json.loads(row[0])
+        metadata['file_size'] = row[1]
+        return metadata
+
+    def delete(self, image_id: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM linkedin_images WHERE image_id = ?", (image_id,))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def list(
+        self,
+        user_id: Optional[str] = None,
+        content_type: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Newest-first page of image metadata and the total number of matching images."""
+        conditions = []
+        params: List[Any] = []
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        if content_type is not None:
+            conditions.append("content_type = ?")
+            params.append(content_type)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM linkedin_images {where}", params).fetchone()[0]
+            rows = conn.execute(f"""
+                SELECT metadata, file_size FROM linkedin_images {where}
+                ORDER BY stored_at DESC, image_id
+                LIMIT ? OFFSET ?
+            """, params + [limit, offset]).fetchall()
+
+        images = []
+        for metadata_json, file_size in rows:
+            metadata = json.loads(metadata_json)
+            metadata['file_size'] = file_size
+            images.append(metadata)
+        return images, total
+
+    def ids_stored_before(self, cutoff_iso: str) -> List[str]:
+        """Ids of images stored before the cutoff (ISO timestamp)."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT image_id FROM linkedin_images WHERE stored_at < ? ORDER BY stored_at", (cutoff_iso,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Total files, total size and per content type counts."""
+        with self._connect() as conn:
+            total_files, total_size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(file_size), 0) FROM linkedin_images"
+            ).fetchone()
+            content_type_counts = dict(conn.execute(
+                "SELECT COALESCE(content_type, 'unknown'), COUNT(*) FROM linkedin_images GROUP BY content_type"
+            ).fetchall())
+        return {
+            'total_files': total_files,
+            'total_size_bytes': total_size,
+            'content_type_counts': content_type_counts,
+        }
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM linkedin_images").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM linkedin_images")
+            conn.commit()
+        logger.debug("Cleared LinkedIn image index")
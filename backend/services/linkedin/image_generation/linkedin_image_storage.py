@@ -17,6 +17,7 @@ from loguru import logger
 
 # Import existing infrastructure
 from ...api_key_manager import APIKeyManager
+from .linkedin_image_index import LinkedInImageIndex
 
 
 class LinkedInImageStorage:
@@ -52,6 +53,12 @@ class LinkedInImageStorage:
         # Ensure directories exist
         self._create_storage_directories()
         
+        # Metadata index; built from the metadata files on first use of an existing store
+        self.index = LinkedInImageIndex(self.base_storage_path / "image_index.db")
+        if self.index.count() == 0 and next(self.metadata_path.glob("*.json"), None) is not None:
+            logger.info("LinkedIn image index is empty, rebuilding it from stored metadata")
+            self.rebuild_index()
+        
         # Storage configuration
         self.max_storage_size_gb = 10  # Maximum storage size in GB
         self.image_retention_days = 30  # Days to keep images
@@ -82,7 +89,8 @@ class LinkedInImageStorage:
         self, 
         image_data: bytes, 
         metadata: Dict[str, Any],
-        content_type: str = "post"
+        content_type: str = "post",
+        user_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Store generated image with metadata.
@@ -91,6 +99,7 @@ class LinkedInImageStorage:
             image_data: Image data in bytes
             image_metadata: Image metadata and context
             content_type: Type of LinkedIn content (post, article, carousel, video_script)
+            user_id: User the image was generated for
             
         Returns:
             Dict containing storage result and image ID
@@ -109,6 +118,12 @@ class LinkedInImageStorage:
                     'error': f"Image validation failed: {validation_result['error']}"
                 }
             
+            # Callers pass the content context through, which may carry an explicit None
+            content_type = metadata.get('content_type') or content_type
+            metadata['content_type'] = content_type
+            if user_id is not None:
+                metadata['user_id'] = str(user_id)
+            
             # Determine storage path based on content type
             storage_path = self._get_storage_path(content_type, image_id)
             
@@ -228,6 +243,7 @@ class LinkedInImageStorage:
             if metadata_path.exists():
                 metadata_path.unlink()
                 logger.info(f"Deleted metadata file: {metadata_path}")
+            self.index.delete(image_id)
             
             # Update storage statistics
             await self._update_storage_stats()
@@ -248,56 +264,39 @@ class LinkedInImageStorage:
         self, 
         content_type: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        user_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        List stored images with optional filtering.
+        List stored images with optional filtering, newest first.
         
         Args:
             content_type: Filter by content type
             limit: Maximum number of images to return
             offset: Number of images to skip
+            user_id: Filter by the user the images were generated for
             
         Returns:
             Dict containing list of images and metadata
         """
         try:
-            images = []
-            
-            # Scan metadata directory
-            metadata_files = list(self.metadata_path.glob("*.json"))
-            
-            for metadata_file in metadata_files[offset:offset + limit]:
-                try:
-                    with open(metadata_file, 'r') as f:
-                        metadata = json.load(f)
-                    
-                    # Apply content type filter
-                    if content_type and metadata.get('content_type') != content_type:
-                        continue
-                    
-                    # Check if image file still exists
-                    image_id = metadata_file.stem
-                    image_path = await self._find_image_by_id(image_id)
-                    
-                    if image_path and image_path.exists():
-                        # Add file size and last modified info
-                        stat = image_path.stat()
-                        metadata['file_size'] = stat.st_size
-                        metadata['last_modified'] = datetime.fromtimestamp(stat.st_mtime).isoformat()
-                        
-                        images.append(metadata)
-                    
-                except Exception as e:
-                    logger.warning(f"Error reading metadata file {metadata_file}: {str(e)}")
-                    continue
+            images, total_count = self.index.list(
+                user_id=user_id,
+                content_type=content_type,
+                limit=limit,
+                offset=offset
+            )
+            
+            for metadata in images:
+                metadata['last_modified'] = metadata.get('stored_at')
             
             return {
                 'success': True,
                 'images': images,
-                'total_count': len(images),
+                'total_count': total_count,
                 'limit': limit,
-                'offset': offset
+                'offset': offset,
+                'has_more': offset + len(images) < total_count
             }
             
         except Exception as e:
@@ -325,31 +324,18 @@ class LinkedInImageStorage:
             deleted_count = 0
             errors = []
             
-            # Scan metadata directory
-            metadata_files = list(self.metadata_path.glob("*.json"))
-            
-            for metadata_file in metadata_files:
-                try:
-                    with open(metadata_file, 'r') as f:
-                        metadata = json.load(f)
-                    
-                    # Check creation date
-                    created_at = metadata.get('stored_at')
-                    if created_at:
-                        created_date = datetime.fromisoformat(created_at)
-                        if created_date < cutoff_date:
-                            # Delete old image
-                            image_id = metadata_file.stem
-                            delete_result = await self.delete_image(image_id)
-                            
-                            if delete_result['success']:
-                                deleted_count += 1
-                            else:
-                                errors.append(f"Failed to delete {image_id}: {delete_result['error']}")
-                    
-                except Exception as e:
-                    logger.warning(f"Error processing metadata file {metadata_file}: {str(e)}")
-                    continue
+            for image_id in self.index.ids_stored_before(cutoff_date.isoformat()):
+                delete_result = await self.delete_image(image_id)
+                
+                if delete_result['success']:
+                    deleted_count += 1
+                else:
+                    if await self._find_image_by_id(image_id) is None:
+                        # Image file already gone; drop the stale metadata as well
+                        self.index.delete(image_id)
+                        (self.metadata_path / f"{image_id}.json").unlink(missing_ok=True)
+                    # Otherwise keep the index row so the next cleanup retries the file
+                    errors.append(f"Failed to delete {image_id}: {delete_result['error']}")
             
             return {
                 'success': True,
@@ -373,21 +359,10 @@ class LinkedInImageStorage:
             Dict containing storage statistics
         """
         try:
-            total_size = 0
-            total_files = 0
-            content_type_counts = {}
-            
-            # Calculate storage usage
-            for content_type_dir in self.images_path.iterdir():
-                if content_type_dir.is_dir():
-                    content_type = content_type_dir.name
-                    content_type_counts[content_type] = 0
-                    
-                    for image_file in content_type_dir.glob("*"):
-                        if image_file.is_file():
-                            total_size += image_file.stat().st_size
-                            total_files += 1
-                            content_type_counts[content_type] += 1
+            index_stats = self.index.stats()
+            total_size = index_stats['total_size_bytes']
+            total_files = index_stats['total_files']
+            content_type_counts = index_stats['content_type_counts']
             
             # Check storage limits
             total_size_gb = total_size / (1024 ** 3)
@@ -411,6 +386,66 @@ class LinkedInImageStorage:
                 'error': f"Failed to get storage stats: {str(e)}"
             }
     
+    async def get_image_metadata(self, image_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get metadata for a stored image without reading the image file.
+        
+        Args:
+            image_id: Unique image identifier
+            
+        Returns:
+            Image metadata, or None if the image is unknown
+        """
+        return await self._load_metadata(image_id)
+    
+    def rebuild_index(self) -> Dict[str, Any]:
+        """
+        Rebuild the metadata index from the metadata files on disk.
+        
+        Used to migrate stores written before the index existed and to recover
+        from a lost or out-of-date index. Metadata whose image file is missing
+        is skipped.
+        
+        Returns:
+            Dict containing the number of indexed and skipped images
+        """
+        entries = []
+        skipped = 0
+        
+        for metadata_file in self.metadata_path.glob("*.json"):
+            try:
+                with open(metadata_file, 'r') as f:
+                    metadata = json.load(f)
+                
+                image_id = metadata.get('image_id') or metadata_file.stem
+                storage_path = Path(metadata['storage_path']) if metadata.get('storage_path') else None
+                if storage_path is None or not storage_path.exists():
+                    storage_path = self._scan_for_image(image_id)
+                if storage_path is None:
+                    skipped += 1
+                    continue
+                
+                stat = storage_path.stat()
+                metadata['image_id'] = image_id
+                metadata['storage_path'] = str(storage_path)
+                metadata.setdefault('stored_at', datetime.fromtimestamp(stat.st_mtime).isoformat())
+                metadata.setdefault('content_type', storage_path.parent.name)
+                entries.append((metadata, stat.st_size))
+                
+            except Exception as e:
+                logger.warning(f"Error reading metadata file {metadata_file}: {str(e)}")
+                skipped += 1
+        
+        self.index.clear()
+        self.index.upsert_many(entries)
+        
+        logger.info(f"Rebuilt LinkedIn image index: {len(entries)} indexed, {skipped} skipped")
+        return {
+            'success': True,
+            'indexed_count': len(entries),
+            'skipped_count': skipped
+        }
+    
     def _generate_image_id(self, image_data: bytes, metadata: Dict[str, Any]) -> str:
         """Generate unique image ID based on content and metadata."""
         # Create hash from image data and key metadata
@@ -492,6 +527,8 @@ class LinkedInImageStorage:
             with open(metadata_path, 'w') as f:
                 json.dump(metadata, f, indent=2, default=str)
             
+            self.index.upsert(metadata, storage_path.stat().st_size)
+            
             logger.info(f"Stored metadata: {metadata_path}")
             return True
             
@@ -500,6 +537,17 @@ class LinkedInImageStorage:
             return False
     
     async def _find_image_by_id(self, image_id: str) -> Optional[Path]:
+        """Find image file by ID using the metadata index."""
+        metadata = self.index.get(image_id)
+        if metadata:
+            image_path = Path(metadata['storage_path'])
+            if image_path.exists():
+                return image_path
+        
+        # Not indexed (e.g. written by an older version); fall back to a directory scan
+        return self._scan_for_image(image_id)
+    
+    def _scan_for_image(self, image_id: str) -> Optional[Path]:
         """Find image file by ID across all content type directories."""
         for content_dir in self.images_path.iterdir():
             if content_dir.is_dir():
@@ -512,6 +560,10 @@ class LinkedInImageStorage:
     async def _load_metadata(self, image_id: str) -> Optional[Dict[str, Any]]:
         """Load metadata for image ID."""
         try:
+            metadata = self.index.get(image_id)
+            if metadata:
+                return metadata
+            
             metadata_path = self.metadata_path / f"{image_id}.json"
             if metadata_path.exists():
                 with open(metadata_path, 'r') as f:
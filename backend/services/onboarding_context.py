@@ -0,0 +1,201 @@
+"""
+Onboarding Context Snapshot
+
+Loads all of a user's onboarding rows (session, website analyses, research
+preferences, persona data and API keys) in one query and caches the result per
+user, so the services that personalize AI inputs read one consistent object
+instead of re-querying each table with their own session.
+
+Writers invalidate the snapshot after committing: OnboardingDatabaseService for
+everything keyed by user, and the session-keyed website analysis and research
+preference services through invalidate_onboarding_session.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy.orm import Session, joinedload
+
+from models.onboarding import OnboardingSession
+from services.database import get_db_session
+
+ONBOARDING_CONTEXT_TTL_SECONDS = int(os.getenv("ONBOARDING_CONTEXT_TTL_SECONDS", "300"))
+
+
+@dataclass(frozen=True)
+class OnboardingContext:
+    """Read-only snapshot of a user's onboarding data.
+
+    Row data is kept in the models' to_dict() shape; the dicts are shared by
+    every reader of the snapshot, so copy one before changing it.
+    """
+    user_id: str
+    session: Optional[Dict[str, Any]] = None
+    website_analyses: List[Dict[str, Any]] = field(default_factory=list)  # newest first
+    research_preferences: Optional[Dict[str, Any]] = None
+    persona_data: Optional[Dict[str, Any]] = None
+    api_keys: List[Dict[str, Any]] = field(default_factory=list)
+    # Last-update times of the rows, for freshness scoring
+    session_updated_at: Optional[datetime] = None
+    website_analysis_updated_at: Optional[datetime] = None
+    research_preferences_updated_at: Optional[datetime] = None
+    loaded_at: float = field(default_factory=time.time)
+
+    @property
+    def session_id(self) -> Optional[int]:
+        return self.session['id'] if self.session else None
+
+    @property
+    def website_analysis(self) -> Optional[Dict[str, Any]]:
+        """The latest website analysis."""
+        return self.website_analyses[0] if self.website_analyses else None
+
+    @property
+    def api_key_map(self) -> Dict[str, str]:
+        return {key['provider']: key['key'] for key in self.api_keys}
+
+
+def _latest(rows: List[Any]) -> List[Any]:
+    return sorted(rows, key=lambda row: row.updated_at or datetime.min, reverse=True)
+
+
+def _build_context(user_id: str, onboarding_session: Optional[OnboardingSession]) -> OnboardingContext:
+    if onboarding_session is None:
+        return OnboardingContext(user_id=user_id)
+
+    analyses = _latest(onboarding_session.website_analyses)
+    prefs = onboarding_session.research_preferences
+    persona = onboarding_session.persona_data
+    return OnboardingContext(
+        user_id=user_id,
+        session={
+            'id': onboarding_session.id,
+            'user_id': onboarding_session.user_id,
+            'current_step': onboarding_session.current_step,
+            'progress': onboarding_session.progress,
+            'started_at': onboarding_session.started_at.isoformat() if onboarding_session.started_at else None,
+            'updated_at': onboarding_session.updated_at.isoformat() if onboarding_session.updated_at else None
+        },
+        website_analyses=[analysis.to_dict() for analysis in analyses],
+        research_preferences=prefs.to_dict() if prefs else None,
+        persona_data=persona.to_dict() if persona else None,
+        api_keys=[key.to_dict() for key in onboarding_session.api_keys],
+        session_updated_at=onboarding_session.updated_at,
+        website_analysis_updated_at=analyses[0].updated_at if analyses else None,
+        research_preferences_updated_at=prefs.updated_at if prefs else None
+    )
+
+
+class OnboardingContextCache:
+    """Per-user cache of onboarding snapshots."""
+
+    def __init__(self, ttl_seconds: int = ONBOARDING_CONTEXT_TTL_SECONDS):
+        """
+        Args:
+            ttl_seconds: How long a snapshot is served before it is reloaded
+        """
+        self.ttl_seconds = ttl_seconds
+        self._contexts: Dict[str, OnboardingContext] = {}
+        self._user_by_session: Dict[int, str] = {}
+        # Bumped on invalidation, so a load that raced a write is not cached
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "loads": 0, "invalidations": 0}
+
+    def get(self, user_id: Any, db: Session = None) -> OnboardingContext:
+        """The user's onboarding snapshot, loaded with one query when not cached.
+
+        Args:
+            user_id: User ID (Clerk ID string; integer IDs are accepted too)
+            db: Session to load with; a short-lived session is opened when omitted
+        """
+        user_key = str(user_id)
+        with self._lock:
+            context = self._contexts.get(user_key)
+            if context is not None and time.time() - context.loaded_at <= self.ttl_seconds:
+                self.stats["hits"] += 1
+                return context
+            version = self._versions.get(user_key, 0)
+
+        context = self._load(user_key, db)
+
+        with self._lock:
+            self.stats["loads"] += 1
+            if self._versions.get(user_key, 0) == version:
+                self._contexts[user_key] = context
+                if context.session_id is not None:
+                    self._user_by_session[context.session_id] = user_key
+        return context
+
+    def _load(self, user_id: str, db: Session = None) -> OnboardingContext:
+        session_db = db or get_db_session()
+        if session_db is None:
+            raise RuntimeError("Database session unavailable")
+        try:
+            # One round-trip: the latest session joined with all of its child rows
+            onboarding_session = (
+                session_db.query(OnboardingSession)
+                .options(
+                    joinedload(OnboardingSession.website_analyses),
+                    joinedload(OnboardingSession.research_preferences),
+                    joinedload(OnboardingSession.persona_data),
+                    joinedload(OnboardingSession.api_keys)
+                )
+                .filter(OnboardingSession.user_id == user_id)
+                .order_by(OnboardingSession.updated_at.desc())
+                .first()
+            )
+            return _build_context(user_id, onboarding_session)
+        finally:
+            if db is None:
+                session_db.close()
+
+    def invalidate(self, user_id: Any) -> None:
+        """Drop a user's snapshot; call after committing a change to their onboarding rows."""
+        user_key = str(user_id)
+        with self._lock:
+            self._versions[user_key] = self._versions.get(user_key, 0) + 1
+            context = self._contexts.pop(user_key, None)
+            if context is not None:
+                self._user_by_session.pop(context.session_id, None)
+            self.stats["invalidations"] += 1
+        logger.debug(f"Invalidated onboarding context for user {user_key}")
+
+    def invalidate_session(self, session_id: int, db: Session = None) -> None:
+        """Drop the snapshot of the user owning an onboarding session."""
+        with self._lock:
+            user_key = self._user_by_session.get(session_id)
+        if user_key is None and db is not None:
+            # Not cached under this session yet; a load may be in flight, so resolve the owner
+            user_key = db.query(OnboardingSession.user_id).filter(OnboardingSession.id == session_id).scalar()
+        if user_key is not None:
+            self.invalidate(user_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for user_key in self._contexts:
+                self._versions[user_key] = self._versions.get(user_key, 0) + 1
+            self._contexts.clear()
+            self._user_by_session.clear()
+
+
+# Global instance shared by the onboarding readers and writers
+onboarding_context_cache = OnboardingContextCache()
+
+
+def get_onboarding_context(user_id: Any, db: Session = None) -> OnboardingContext:
+    """The user's cached onboarding snapshot."""
+    return onboarding_context_cache.get(user_id, db)
+
+
+def invalidate_onboarding_context(user_id: Any) -> None:
+    onboarding_context_cache.invalidate(user_id)
+
+
+def invalidate_onboarding_session(session_id: int, db: Session = None) -> None:
+    onboarding_context_cache.invalidate_session(session_id, db)
@@ -9,8 +9,7 @@ from loguru import logger
 from datetime import datetime
 import json
 
-from services.database import get_db_session
-from models.onboarding import OnboardingSession, WebsiteAnalysis, ResearchPreferences
+from services.onboarding_context import get_onboarding_context
 
 class OnboardingDataService:
     """Service to extract and use real onboarding data for AI personalization."""
@@ -30,27 +29,17 @@ class OnboardingDataService:
             Website analysis data or None if not found
         """
         try:
-            session = get_db_session()
+            context = get_onboarding_context(user_id)
             
-            # Find onboarding session for user
-            onboarding_session = session.query(OnboardingSession).filter(
-                OnboardingSession.user_id == user_id
-            ).first()
-            
-            if not onboarding_session:
+            if not context.session:
                 logger.warning(f"No onboarding session found for user {user_id}")
                 return None
             
-            # Get website analysis for this session
-            website_analysis = session.query(WebsiteAnalysis).filter(
-                WebsiteAnalysis.session_id == onboarding_session.id
-            ).first()
-            
-            if not website_analysis:
+            if not context.website_analysis:
                 logger.warning(f"No website analysis found for user {user_id}")
                 return None
             
-            return website_analysis.to_dict()
+            return dict(context.website_analysis)
             
         except Exception as e:
             logger.error(f"Error getting website analysis for user {user_id}: {str(e)}")
@@ -67,27 +56,17 @@ class OnboardingDataService:
             Research preferences data or None if not found
         """
         try:
-            session = get_db_session()
+            context = get_onboarding_context(user_id)
             
-            # Find onboarding session for user
-            onboarding_session = session.query(OnboardingSession).filter(
-                OnboardingSession.user_id == user_id
-            ).first()
-            
-            if not onboarding_session:
+            if not context.session:
                 logger.warning(f"No onboarding session found for user {user_id}")
                 return None
             
-            # Get research preferences for this session
-            research_prefs = session.query(ResearchPreferences).filter(
-                ResearchPreferences.session_id == onboarding_session.id
-            ).first()
-            
-            if not research_prefs:
+            if not context.research_preferences:
                 logger.warning(f"No research preferences found for user {user_id}")
                 return None
             
-            return research_prefs.to_dict()
+            return dict(context.research_preferences)
             
         except Exception as e:
             logger.error(f"Error getting research preferences for user {user_id}: {str(e)}")
@@ -15,6 +15,7 @@ from sqlalchemy import text
 
 from models.onboarding import OnboardingSession, APIKey, WebsiteAnalysis, ResearchPreferences, PersonaData
 from services.database import get_db
+from services.onboarding_context import get_onboarding_context, invalidate_onboarding_context
 
 
 class OnboardingDatabaseService:
@@ -129,6 +130,7 @@ class OnboardingDatabaseService:
             session_db.add(session)
             session_db.commit()
             session_db.refresh(session)
+            invalidate_onboarding_context(user_id)
             
             logger.info(f"Created new onboarding session for user {user_id}")
             return session
@@ -163,6 +165,7 @@ class OnboardingDatabaseService:
             session.current_step = step_number
             session.updated_at = datetime.now()
             session_db.commit()
+            invalidate_onboarding_context(user_id)
             
             logger.info(f"Updated user {user_id} to step {step_number}")
             return True
@@ -183,6 +186,7 @@ class OnboardingDatabaseService:
             session.progress = progress
             session.updated_at = datetime.now()
             session_db.commit()
+            invalidate_onboarding_context(user_id)
             
             logger.info(f"Updated user {user_id} progress to {progress}%")
             return True
@@ -224,6 +228,7 @@ class OnboardingDatabaseService:
                 logger.info(f"Created new {provider} API key for user {user_id}")
             
             session_db.commit()
+            invalidate_onboarding_context(user_id)
             return True
             
         except SQLAlchemyError as e:
@@ -238,15 +243,7 @@ class OnboardingDatabaseService:
             raise ValueError("Database session required")
         
         try:
-            session = self.get_session_by_user(user_id, session_db)
-            if not session:
-                return {}
-            
-            keys = session_db.query(APIKey).filter(
-                APIKey.session_id == session.id
-            ).all()
-            
-            return {key.provider: key.key for key in keys}
+            return get_onboarding_context(user_id, session_db).api_key_map
             
         except SQLAlchemyError as e:
             logger.error(f"Error getting API keys: {e}")
@@ -326,6 +323,7 @@ class OnboardingDatabaseService:
                 content_strategy_insights=normalized.get('content_strategy_insights')
             )
             session_db.commit()
+            invalidate_onboarding_context(user_id)
             return True
             
         except SQLAlchemyError as e:
@@ -340,18 +338,14 @@ class OnboardingDatabaseService:
             raise ValueError("Database session required")
         
         try:
-            session = self.get_session_by_user(user_id, session_db)
-            if not session:
+            context = get_onboarding_context(user_id, session_db)
+            if not context.website_analysis:
                 return None
             
-            analysis = session_db.query(WebsiteAnalysis).filter(
-                WebsiteAnalysis.session_id == session.id
-            ).first()
-            
-            result = analysis.to_dict() if analysis else None
-            if result:
-                # Optionally include brand fields without touching ORM mapping
-                self._maybe_attach_brand_columns(session_db, session.id, result)
+            # Copy: the snapshot's dict is shared with its other readers
+            result = dict(context.website_analysis)
+            # Optionally include brand fields without touching ORM mapping
+            self._maybe_attach_brand_columns(session_db, context.session_id, result)
             return result
             
         except SQLAlchemyError as e:
@@ -401,6 +395,7 @@ class OnboardingDatabaseService:
                 logger.info(f"Created research preferences for user {user_id}")
             
             session_db.commit()
+            invalidate_onboarding_context(user_id)
             return True
             
         except SQLAlchemyError as e:
@@ -443,6 +438,7 @@ class OnboardingDatabaseService:
                 logger.info(f"Created persona data for user {user_id}")
             
             session_db.commit()
+            invalidate_onboarding_context(user_id)
             return True
             
         except SQLAlchemyError as e:
@@ -457,15 +453,8 @@ class OnboardingDatabaseService:
             raise ValueError("Database session required")
         
         try:
-            session = self.get_session_by_user(user_id, session_db)
-            if not session:
-                return None
-            
-            prefs = session_db.query(ResearchPreferences).filter(
-                ResearchPreferences.session_id == session.id
-            ).first()
-            
-            return prefs.to_dict() if prefs else None
+            prefs = get_onboarding_context(user_id, session_db).research_preferences
+            return dict(prefs) if prefs else None
             
         except SQLAlchemyError as e:
             logger.error(f"Error getting research preferences: {e}")
@@ -478,23 +467,16 @@ class OnboardingDatabaseService:
             raise ValueError("Database session required")
         
         try:
-            session = self.get_session_by_user(user_id, session_db)
-            if not session:
-                return None
-            
-            persona = session_db.query(PersonaData).filter(
-                PersonaData.session_id == session.id
-            ).first()
-            
+            persona = get_onboarding_context(user_id, session_db).persona_data
             if not persona:
                 return None
             
             # Return persona data in the expected format
             return {
-                'corePersona': persona.core_persona,
-                'platformPersonas': persona.platform_personas,
-                'qualityMetrics': persona.quality_metrics,
-                'selectedPlatforms': persona.selected_platforms
+                'corePersona': persona['core_persona'],
+                'platformPersonas': persona['platform_personas'],
+                'qualityMetrics': persona['quality_metrics'],
+                'selectedPlatforms': persona['selected_platforms']
             }
             
         except SQLAlchemyError as e:
@@ -513,6 +495,7 @@ class OnboardingDatabaseService:
             session.progress = 100.0
             session.updated_at = datetime.now()
             session_db.commit()
+            invalidate_onboarding_context(user_id)
             
             logger.info(f"Marked onboarding complete for user {user_id}")
             return True
@@ -529,7 +512,7 @@ class OnboardingDatabaseService:
             raise ValueError("Database session required")
         
         try:
-            session = self.get_session_by_user(user_id, session_db)
+            session = get_onboarding_context(user_id, session_db).session
             
             if not session:
                 # User hasn't started onboarding yet
@@ -542,11 +525,11 @@ class OnboardingDatabaseService:
                 }
             
             return {
-                "is_completed": session.current_step >= 6 and session.progress >= 100.0,
-                "current_step": session.current_step,
-                "progress": session.progress,
-                "started_at": session.started_at.isoformat() if session.started_at else None,
-                "updated_at": session.updated_at.isoformat() if session.updated_at else None
+                "is_completed": session['current_step'] >= 6 and session['progress'] >= 100.0,
+                "current_step": session['current_step'],
+                "progress": session['progress'],
+                "started_at": session['started_at'],
+                "updated_at": session['updated_at']
             }
             
         except SQLAlchemyError as e:
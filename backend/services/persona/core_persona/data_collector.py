@@ -5,79 +5,62 @@ Handles comprehensive collection of onboarding data for persona generation.
 """
 
 from typing import Dict, Any, List, Optional
-from sqlalchemy.orm import Session
 from loguru import logger
 
-from services.database import get_db_session
-from models.onboarding import OnboardingSession, WebsiteAnalysis, ResearchPreferences, APIKey
+from services.onboarding_context import get_onboarding_context
 
 
 class OnboardingDataCollector:
     """Collects comprehensive onboarding data for persona analysis."""
     
     def collect_onboarding_data(self, user_id: int, session_id: int = None) -> Optional[Dict[str, Any]]:
-        """Collect comprehensive onboarding data for persona analysis."""
+        """Collect comprehensive onboarding data for persona analysis.
+
+        Reads the user's cached onboarding snapshot, which holds their latest
+        onboarding session; a session_id of another session yields None.
+        """
         try:
-            session = get_db_session()
-            
-            # Find onboarding session
-            if session_id:
-                onboarding_session = session.query(OnboardingSession).filter(
-                    OnboardingSession.id == session_id,
-                    OnboardingSession.user_id == user_id
-                ).first()
-            else:
-                onboarding_session = session.query(OnboardingSession).filter(
-                    OnboardingSession.user_id == user_id
-                ).order_by(OnboardingSession.updated_at.desc()).first()
+            context = get_onboarding_context(user_id)
             
-            if not onboarding_session:
+            if not context.session:
+                return None
+            if session_id and context.session_id != session_id:
+                logger.warning(f"Onboarding session {session_id} is not the latest session of user {user_id}")
                 return None
             
-            # Get ALL website analyses (there might be multiple)
-            website_analyses = session.query(WebsiteAnalysis).filter(
-                WebsiteAnalysis.session_id == onboarding_session.id
-            ).order_by(WebsiteAnalysis.updated_at.desc()).all()
-            
-            # Get research preferences
-            research_prefs = session.query(ResearchPreferences).filter(
-                ResearchPreferences.session_id == onboarding_session.id
-            ).first()
-            
-            # Get API keys
-            api_keys = session.query(APIKey).filter(
-                APIKey.session_id == onboarding_session.id
-            ).all()
+            # ALL website analyses (there might be multiple), newest first
+            website_analyses = context.website_analyses
+            research_prefs = context.research_preferences
             
             # Compile comprehensive data with ALL available information
             onboarding_data = {
                 "session_info": {
-                    "session_id": onboarding_session.id,
-                    "user_id": onboarding_session.user_id,
-                    "current_step": onboarding_session.current_step,
-                    "progress": onboarding_session.progress,
-                    "started_at": onboarding_session.started_at.isoformat() if onboarding_session.started_at else None,
-                    "updated_at": onboarding_session.updated_at.isoformat() if onboarding_session.updated_at else None
+                    "session_id": context.session['id'],
+                    "user_id": context.session['user_id'],
+                    "current_step": context.session['current_step'],
+                    "progress": context.session['progress'],
+                    "started_at": context.session['started_at'],
+                    "updated_at": context.session['updated_at']
                 },
-                "api_keys": [key.to_dict() for key in api_keys] if api_keys else [],
-                "website_analyses": [analysis.to_dict() for analysis in website_analyses] if website_analyses else [],
-                "research_preferences": research_prefs.to_dict() if research_prefs else None,
+                "api_keys": list(context.api_keys),
+                "website_analyses": list(website_analyses),
+                "research_preferences": research_prefs,
                 
                 # Legacy compatibility - use the latest website analysis
-                "website_analysis": website_analyses[0].to_dict() if website_analyses else None,
+                "website_analysis": context.website_analysis,
                 
                 # Enhanced data extraction for persona generation
                 "enhanced_analysis": self._extract_enhanced_analysis_data(website_analyses, research_prefs)
             }
             
-            session.close()
             return onboarding_data
             
         except Exception as e:
             logger.error(f"Error collecting onboarding data: {str(e)}")
             return None
     
-    def _extract_enhanced_analysis_data(self, website_analyses: List, research_prefs) -> Dict[str, Any]:
+    def _extract_enhanced_analysis_data(self, website_analyses: List[Dict[str, Any]],
+                                        research_prefs: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Extract and structure all the rich AI analysis data for persona generation."""
         enhanced_data = {
             "comprehensive_style_analysis": {},
@@ -96,67 +79,72 @@ class OnboardingDataCollector:
         latest_analysis = website_analyses[0]
         
         # Extract comprehensive style analysis
-        if latest_analysis.writing_style:
+        writing_style = latest_analysis.get("writing_style")
+        if writing_style:
             enhanced_data["comprehensive_style_analysis"] = {
-                "tone_analysis": latest_analysis.writing_style.get("tone", ""),
-                "voice_characteristics": latest_analysis.writing_style.get("voice", ""),
-                "complexity_assessment": latest_analysis.writing_style.get("complexity", ""),
-                "engagement_level": latest_analysis.writing_style.get("engagement_level", ""),
-                "brand_personality": latest_analysis.writing_style.get("brand_personality", ""),
-                "formality_level": latest_analysis.writing_style.get("formality_level", ""),
-                "emotional_appeal": latest_analysis.writing_style.get("emotional_appeal", "")
+                "tone_analysis": writing_style.get("tone", ""),
+                "voice_characteristics": writing_style.get("voice", ""),
+                "complexity_assessment": writing_style.get("complexity", ""),
+                "engagement_level": writing_style.get("engagement_level", ""),
+                "brand_personality": writing_style.get("brand_personality", ""),
+                "formality_level": writing_style.get("formality_level", ""),
+                "emotional_appeal": writing_style.get("emotional_appeal", "")
             }
         
         # Extract content insights
-        if latest_analysis.content_characteristics:
+        content_characteristics = latest_analysis.get("content_characteristics")
+        if content_characteristics:
             enhanced_data["content_insights"] = {
-                "sentence_structure_analysis": latest_analysis.content_characteristics.get("sentence_structure", ""),
-                "vocabulary_level": latest_analysis.content_characteristics.get("vocabulary_level", ""),
-                "paragraph_organization": latest_analysis.content_characteristics.get("paragraph_organization", ""),
-                "content_flow": latest_analysis.content_characteristics.get("content_flow", ""),
-                "readability_score": latest_analysis.content_characteristics.get("readability_score", ""),
-                "content_density": latest_analysis.content_characteristics.get("content_density", ""),
-                "visual_elements_usage": latest_analysis.content_characteristics.get("visual_elements_usage", "")
+                "sentence_structure_analysis": content_characteristics.get("sentence_structure", ""),
+                "vocabulary_level": content_characteristics.get("vocabulary_level", ""),
+                "paragraph_organization": content_characteristics.get("paragraph_organization", ""),
+                "content_flow": content_characteristics.get("content_flow", ""),
+                "readability_score": content_characteristics.get("readability_score", ""),
+                "content_density": content_characteristics.get("content_density", ""),
+                "visual_elements_usage": content_characteristics.get("visual_elements_usage", "")
             }
         
         # Extract audience intelligence
-        if latest_analysis.target_audience:
+        target_audience = latest_analysis.get("target_audience")
+        if target_audience:
             enhanced_data["audience_intelligence"] = {
-                "demographics": latest_analysis.target_audience.get("demographics", []),
-                "expertise_level": latest_analysis.target_audience.get("expertise_level", ""),
-                "industry_focus": latest_analysis.target_audience.get("industry_focus", ""),
-                "geographic_focus": latest_analysis.target_audience.get("geographic_focus", ""),
-                "psychographic_profile": latest_analysis.target_audience.get("psychographic_profile", ""),
-                "pain_points": latest_analysis.target_audience.get("pain_points", []),
-                "motivations": latest_analysis.target_audience.get("motivations", [])
+                "demographics": target_audience.get("demographics", []),
+                "expertise_level": target_audience.get("expertise_level", ""),
+                "industry_focus": target_audience.get("industry_focus", ""),
+                "geographic_focus": target_audience.get("geographic_focus", ""),
+                "psychographic_profile": target_audience.get("psychographic_profile", ""),
+                "pain_points": target_audience.get("pain_points", []),
+                "motivations": target_audience.get("motivations", [])
             }
         
         # Extract brand voice analysis
-        if latest_analysis.content_type:
+        content_type = latest_analysis.get("content_type")
+        if content_type:
             enhanced_data["brand_voice_analysis"] = {
-                "primary_content_type": latest_analysis.content_type.get("primary_type", ""),
-                "secondary_content_types": latest_analysis.content_type.get("secondary_types", []),
-                "content_purpose": latest_analysis.content_type.get("purpose", ""),
-                "call_to_action_style": latest_analysis.content_type.get("call_to_action", ""),
-                "conversion_focus": latest_analysis.content_type.get("conversion_focus", ""),
-                "educational_value": latest_analysis.content_type.get("educational_value", "")
+                "primary_content_type": content_type.get("primary_type", ""),
+                "secondary_content_types": content_type.get("secondary_types", []),
+                "content_purpose": content_type.get("purpose", ""),
+                "call_to_action_style": content_type.get("call_to_action", ""),
+                "conversion_focus": content_type.get("conversion_focus", ""),
+                "educational_value": content_type.get("educational_value", "")
             }
         
         # Extract technical writing metrics
-        if latest_analysis.style_patterns:
+        style_patterns = latest_analysis.get("style_patterns")
+        if style_patterns:
             enhanced_data["technical_writing_metrics"] = {
-                "sentence_length_preference": latest_analysis.style_patterns.get("patterns", {}).get("sentence_length", ""),
-                "vocabulary_patterns": latest_analysis.style_patterns.get("patterns", {}).get("vocabulary_patterns", []),
-                "rhetorical_devices": latest_analysis.style_patterns.get("patterns", {}).get("rhetorical_devices", []),
-                "paragraph_structure": latest_analysis.style_patterns.get("patterns", {}).get("paragraph_structure", ""),
-                "transition_phrases": latest_analysis.style_patterns.get("patterns", {}).get("transition_phrases", []),
-                "style_consistency": latest_analysis.style_patterns.get("style_consistency", ""),
-                "unique_elements": latest_analysis.style_patterns.get("unique_elements", [])
+                "sentence_length_preference": style_patterns.get("patterns", {}).get("sentence_length", ""),
+                "vocabulary_patterns": style_patterns.get("patterns", {}).get("vocabulary_patterns", []),
+                "rhetorical_devices": style_patterns.get("patterns", {}).get("rhetorical_devices", []),
+                "paragraph_structure": style_patterns.get("patterns", {}).get("paragraph_structure", ""),
+                "transition_phrases": style_patterns.get("patterns", {}).get("transition_phrases", []),
+                "style_consistency": style_patterns.get("style_consistency", ""),
+                "unique_elements": style_patterns.get("unique_elements", [])
             }
         
         # Extract competitive analysis from crawl results
-        if latest_analysis.crawl_result:
-            crawl_data = latest_analysis.crawl_result
+        crawl_data = latest_analysis.get("crawl_result")
+        if crawl_data:
             enhanced_data["competitive_analysis"] = {
                 "domain_info": crawl_data.get("domain_info", {}),
                 "social_media_presence": crawl_data.get("social_media", {}),
@@ -166,8 +154,8 @@ class OnboardingDataCollector:
             }
         
         # Extract content strategy insights from style guidelines
-        if latest_analysis.style_guidelines:
-            guidelines = latest_analysis.style_guidelines
+        guidelines = latest_analysis.get("style_guidelines")
+        if guidelines:
             enhanced_data["content_strategy_insights"] = {
                 "tone_recommendations": guidelines.get("guidelines", {}).get("tone_recommendations", []),
                 "structure_guidelines": guidelines.get("guidelines", {}).get("structure_guidelines", []),
@@ -188,10 +176,10 @@ class OnboardingDataCollector:
         # Add research preferences insights
         if research_prefs:
             enhanced_data["research_preferences"] = {
-                "research_depth": research_prefs.research_depth,
-                "content_types": research_prefs.content_types,
-                "auto_research": research_prefs.auto_research,
-                "factual_content": research_prefs.factual_content
+                "research_depth": research_prefs.get("research_depth"),
+                "content_types": research_prefs.get("content_types"),
+                "auto_research": research_prefs.get("auto_research"),
+                "factual_content": research_prefs.get("factual_content")
             }
         
         return enhanced_data
@@ -5,45 +5,29 @@ Advanced analysis for better writing style mimicry and persona quality.
 
 import re
 import json
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from collections import Counter, defaultdict
 from loguru import logger
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.corpus import stopwords
-from nltk.tag import pos_tag
 from textstat import flesch_reading_ease, flesch_kincaid_grade
+
+from services.persona.nlp_pipeline import NLPPipeline, ParsedDocument
 class EnhancedLinguisticAnalyzer:
     """Advanced linguistic analysis for persona creation and improvement."""
     
-    def __init__(self):
-        """Initialize the linguistic analyzer with required spaCy dependency."""
-        self.nlp = None
-        self.spacy_available = False
-        
-        # spaCy is REQUIRED for high-quality persona generation
-        try:
-            import spacy
-            self.nlp = spacy.load("en_core_web_sm")
-            self.spacy_available = True
-            logger.debug("SUCCESS: spaCy model loaded successfully - Enhanced linguistic analysis available")
-        except ImportError as e:
-            logger.error(f"ERROR: spaCy is REQUIRED for persona generation. Install with: pip install spacy && python -m spacy download en_core_web_sm")
-            raise ImportError("spaCy is required for enhanced persona generation. Install with: pip install spacy && python -m spacy download en_core_web_sm") from e
-        except OSError as e:
-            logger.error(f"ERROR: spaCy model 'en_core_web_sm' is REQUIRED. Download with: python -m spacy download en_core_web_sm")
-            raise OSError("spaCy model 'en_core_web_sm' is required. Download with: python -m spacy download en_core_web_sm") from e
-        
-        # Download required NLTK data
-        try:
-            nltk.data.find('tokenizers/punkt_tab')  # Updated for newer NLTK versions
-            nltk.data.find('corpora/stopwords')
-            nltk.data.find('taggers/averaged_perceptron_tagger')
-        except LookupError:
-            logger.warning("NLTK data not found. Downloading required data...")
-            nltk.download('punkt_tab', quiet=True)  # Updated for newer NLTK versions
-            nltk.download('stopwords', quiet=True)
-            nltk.download('averaged_perceptron_tagger', quiet=True)
+    def __init__(self, pipeline: Optional[NLPPipeline] = None):
+        """
+        Initialize the linguistic analyzer.
+
+        Args:
+            pipeline: Shared NLP pipeline; defaults to the process-wide instance,
+                whose spaCy model is REQUIRED for persona generation
+        """
+        if pipeline is None:
+            from services.persona.nlp_models import get_nlp_pipeline
+            pipeline = get_nlp_pipeline()
+        self.pipeline = pipeline
+        self.nlp = pipeline.nlp
+        self.spacy_available = True
     
     def analyze_writing_style(self, text_samples: List[str]) -> Dict[str, Any]:
         """
@@ -58,32 +42,33 @@ class EnhancedLinguisticAnalyzer:
         try:
             logger.info(f"Analyzing writing style from {len(text_samples)} text samples")
             
-            # Combine all text samples
-            combined_text = " ".join(text_samples)
+            # Parse every sample once; all analyzers read the parsed documents
+            documents = self.pipeline.parse_many(text_samples)
+            combined = ParsedDocument.combine(documents)
             
             # Basic metrics
-            basic_metrics = self._analyze_basic_metrics(combined_text)
+            basic_metrics = self._analyze_basic_metrics(combined)
             
             # Sentence analysis
-            sentence_analysis = self._analyze_sentence_patterns(combined_text)
+            sentence_analysis = self._analyze_sentence_patterns(combined)
             
             # Vocabulary analysis
-            vocabulary_analysis = self._analyze_vocabulary(combined_text)
+            vocabulary_analysis = self._analyze_vocabulary(combined)
             
             # Rhetorical analysis
-            rhetorical_analysis = self._analyze_rhetorical_devices(combined_text)
+            rhetorical_analysis = self._analyze_rhetorical_devices(combined)
             
             # Style patterns
-            style_patterns = self._analyze_style_patterns(combined_text)
+            style_patterns = self._analyze_style_patterns(combined)
             
             # Readability analysis
-            readability_analysis = self._analyze_readability(combined_text)
+            readability_analysis = self._analyze_readability(combined)
             
             # Emotional tone analysis
-            emotional_analysis = self._analyze_emotional_tone(combined_text)
+            emotional_analysis = self._analyze_emotional_tone(combined)
             
             # Consistency analysis
-            consistency_analysis = self._analyze_consistency(text_samples)
+            consistency_analysis = self._analyze_consistency(documents)
             
             return {
                 "basic_metrics": basic_metrics,
@@ -98,7 +83,7 @@ class EnhancedLinguisticAnalyzer:
                     "sample_count": len(text_samples),
                     "total_words": basic_metrics["total_words"],
                     "total_sentences": basic_metrics["total_sentences"],
-                    "analysis_confidence": self._calculate_analysis_confidence(text_samples)
+                    "analysis_confidence": self._calculate_analysis_confidence(documents)
                 }
             }
             
@@ -106,13 +91,11 @@ class EnhancedLinguisticAnalyzer:
             logger.error(f"Error analyzing writing style: {str(e)}")
             return {"error": f"Failed to analyze writing style: {str(e)}"}
     
-    def _analyze_basic_metrics(self, text: str) -> Dict[str, Any]:
+    def _analyze_basic_metrics(self, doc: ParsedDocument) -> Dict[str, Any]:
         """Analyze basic text metrics."""
-        sentences = sent_tokenize(text)
-        words = word_tokenize(text.lower())
-        
-        # Filter out punctuation
-        words = [word for word in words if word.isalpha()]
+        text = doc.text
+        sentences = doc.sentences
+        words = doc.words
         
         return {
             "total_words": len(words),
@@ -124,11 +107,11 @@ class EnhancedLinguisticAnalyzer:
             "character_count_no_spaces": len(text.replace(' ', ''))
         }
     
-    def _analyze_sentence_patterns(self, text: str) -> Dict[str, Any]:
+    def _analyze_sentence_patterns(self, doc: ParsedDocument) -> Dict[str, Any]:
         """Analyze sentence structure patterns."""
-        sentences = sent_tokenize(text)
+        sentences = doc.sentences
         
-        sentence_lengths = [len(word_tokenize(sent)) for sent in sentences]
+        sentence_lengths = doc.sentence_lengths()
         sentence_types = []
         
         for sentence in sentences:
@@ -140,10 +123,7 @@ class EnhancedLinguisticAnalyzer:
                 sentence_types.append('declarative')
         
         # Analyze sentence beginnings
-        sentence_beginnings = []
-        for sentence in sentences:
-            first_word = word_tokenize(sentence)[0].lower() if word_tokenize(sentence) else ""
-            sentence_beginnings.append(first_word)
+        sentence_beginnings = [tokens[0].lower if tokens else "" for tokens in doc.sentence_tokens]
         
         return {
             "sentence_length_distribution": {
@@ -154,21 +134,18 @@ class EnhancedLinguisticAnalyzer:
             },
             "sentence_type_distribution": dict(Counter(sentence_types)),
             "common_sentence_starters": dict(Counter(sentence_beginnings).most_common(10)),
-            "sentence_complexity": self._analyze_sentence_complexity(sentences)
+            "sentence_complexity": self._analyze_sentence_complexity(doc)
         }
     
-    def _analyze_vocabulary(self, text: str) -> Dict[str, Any]:
+    def _analyze_vocabulary(self, doc: ParsedDocument) -> Dict[str, Any]:
         """Analyze vocabulary patterns and preferences."""
-        words = word_tokenize(text.lower())
-        words = [word for word in words if word.isalpha()]
+        words = doc.words
         
-        # Remove stopwords for analysis
-        stop_words = set(stopwords.words('english'))
-        content_words = [word for word in words if word not in stop_words]
+        # Stopwords are flagged by the pipeline
+        content_words = doc.content_words
         
-        # POS tagging
-        pos_tags = pos_tag(words)
-        pos_distribution = dict(Counter(tag for word, tag in pos_tags))
+        # POS tags from the shared parse
+        pos_distribution = dict(Counter(tag for word, tag in doc.pos_tags))
         
         # Vocabulary richness
         unique_words = set(words)
@@ -189,15 +166,16 @@ class EnhancedLinguisticAnalyzer:
             "vocabulary_sophistication": self._analyze_vocabulary_sophistication(words)
         }
     
-    def _analyze_rhetorical_devices(self, text: str) -> Dict[str, Any]:
+    def _analyze_rhetorical_devices(self, doc: ParsedDocument) -> Dict[str, Any]:
         """Analyze rhetorical devices and techniques."""
-        sentences = sent_tokenize(text)
+        text = doc.text
+        sentences = doc.sentences
         
         rhetorical_devices = {
             "questions": len([s for s in sentences if s.strip().endswith('?')]),
             "exclamations": len([s for s in sentences if s.strip().endswith('!')]),
-            "repetition": self._find_repetition_patterns(text),
-            "alliteration": self._find_alliteration(text),
+            "repetition": self._find_repetition_patterns(doc),
+            "alliteration": self._find_alliteration(doc),
             "metaphors": self._find_metaphors(text),
             "analogies": self._find_analogies(text),
             "lists": self._find_lists(text),
@@ -206,11 +184,12 @@ class EnhancedLinguisticAnalyzer:
         
         return rhetorical_devices
     
-    def _analyze_style_patterns(self, text: str) -> Dict[str, Any]:
+    def _analyze_style_patterns(self, doc: ParsedDocument) -> Dict[str, Any]:
         """Analyze writing style patterns."""
+        text = doc.text
         return {
             "formality_level": self._assess_formality(text),
-            "personal_pronouns": self._count_personal_pronouns(text),
+            "personal_pronouns": self._count_personal_pronouns(doc),
             "passive_voice": self._count_passive_voice(text),
             "contractions": self._count_contractions(text),
             "transition_words": self._find_transition_words(text),
@@ -218,26 +197,28 @@ class EnhancedLinguisticAnalyzer:
             "emphasis_patterns": self._find_emphasis_patterns(text)
         }
     
-    def _analyze_readability(self, text: str) -> Dict[str, Any]:
+    def _analyze_readability(self, doc: ParsedDocument) -> Dict[str, Any]:
         """Analyze readability metrics."""
+        text = doc.text
         try:
+            reading_ease = flesch_reading_ease(text)
             return {
-                "flesch_reading_ease": flesch_reading_ease(text),
+                "flesch_reading_ease": reading_ease,
                 "flesch_kincaid_grade": flesch_kincaid_grade(text),
-                "reading_level": self._determine_reading_level(flesch_reading_ease(text)),
-                "complexity_score": self._calculate_complexity_score(text)
+                "reading_level": self._determine_reading_level(reading_ease),
+                "complexity_score": self._calculate_complexity_score(doc)
             }
         except Exception as e:
             logger.warning(f"Error calculating readability: {e}")
             return {"error": "Could not calculate readability metrics"}
     
-    def _analyze_emotional_tone(self, text: str) -> Dict[str, Any]:
+    def _analyze_emotional_tone(self, doc: ParsedDocument) -> Dict[str, Any]:
         """Analyze emotional tone and sentiment patterns."""
         # Simple sentiment analysis based on word patterns
         positive_words = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'love', 'like', 'enjoy']
         negative_words = ['bad', 'terrible', 'awful', 'hate', 'dislike', 'horrible', 'worst', 'problem', 'issue']
         
-        words = word_tokenize(text.lower())
+        words = doc.tokens
         positive_count = sum(1 for word in words if word in positive_words)
         negative_count = sum(1 for word in words if word in negative_words)
         
@@ -245,30 +226,26 @@ class EnhancedLinguisticAnalyzer:
             "sentiment_bias": "positive" if positive_count > negative_count else "negative" if negative_count > positive_count else "neutral",
             "positive_word_count": positive_count,
             "negative_word_count": negative_count,
-            "emotional_intensity": self._calculate_emotional_intensity(text),
-            "tone_consistency": self._assess_tone_consistency(text)
+            "emotional_intensity": self._calculate_emotional_intensity(doc),
+            "tone_consistency": self._assess_tone_consistency(doc)
         }
     
-    def _analyze_consistency(self, text_samples: List[str]) -> Dict[str, Any]:
+    def _analyze_consistency(self, documents: List[ParsedDocument]) -> Dict[str, Any]:
         """Analyze consistency across multiple text samples."""
-        if len(text_samples) < 2:
+        if len(documents) < 2:
             return {"consistency_score": 100, "note": "Only one sample provided"}
         
         # Analyze consistency in various metrics
         sentence_lengths = []
         vocabulary_sets = []
         
-        for sample in text_samples:
-            sentences = sent_tokenize(sample)
-            words = word_tokenize(sample.lower())
-            words = [word for word in words if word.isalpha()]
-            
-            sentence_lengths.append([len(word_tokenize(sent)) for sent in sentences])
-            vocabulary_sets.append(set(words))
+        for doc in documents:
+            sentence_lengths.append(doc.sentence_lengths())
+            vocabulary_sets.append(set(doc.words))
         
         # Calculate consistency scores
         avg_sentence_length_consistency = self._calculate_metric_consistency(
-            [sum(lengths)/len(lengths) for lengths in sentence_lengths]
+            [sum(lengths)/len(lengths) if lengths else 0 for lengths in sentence_lengths]
         )
         
         vocabulary_overlap = self._calculate_vocabulary_overlap(vocabulary_sets)
@@ -277,16 +254,16 @@ class EnhancedLinguisticAnalyzer:
             "consistency_score": (avg_sentence_length_consistency + vocabulary_overlap) / 2,
             "sentence_length_consistency": avg_sentence_length_consistency,
             "vocabulary_consistency": vocabulary_overlap,
-            "style_stability": self._assess_style_stability(text_samples)
+            "style_stability": self._assess_style_stability(documents)
         }
     
-    def _calculate_analysis_confidence(self, text_samples: List[str]) -> float:
+    def _calculate_analysis_confidence(self, documents: List[ParsedDocument]) -> float:
         """Calculate confidence in the analysis based on data quality."""
-        if not text_samples:
+        if not documents:
             return 0.0
         
-        total_words = sum(len(word_tokenize(sample)) for sample in text_samples)
-        sample_count = len(text_samples)
+        total_words = sum(len(doc.tokens) for doc in documents)
+        sample_count = len(documents)
         
         # Confidence based on amount of data
         word_confidence = min(100, (total_words / 1000) * 100)  # 1000 words = 100% confidence
@@ -295,15 +272,16 @@ class EnhancedLinguisticAnalyzer:
         return (word_confidence + sample_confidence) / 2
     
     # Helper methods for specific analyses
-    def _analyze_sentence_complexity(self, sentences: List[str]) -> Dict[str, Any]:
+    def _analyze_sentence_complexity(self, doc: ParsedDocument) -> Dict[str, Any]:
         """Analyze sentence complexity patterns."""
+        sentences = doc.sentences
         complex_sentences = 0
         compound_sentences = 0
         
-        for sentence in sentences:
+        for sentence, length in zip(sentences, doc.sentence_lengths()):
             if ',' in sentence and ('and' in sentence or 'but' in sentence or 'or' in sentence):
                 compound_sentences += 1
-            if len(word_tokenize(sentence)) > 20:
+            if length > 20:
                 complex_sentences += 1
         
         return {
@@ -324,9 +302,9 @@ class EnhancedLinguisticAnalyzer:
             "rare_word_ratio": len(rare_words) / len(words) if words else 0
         }
     
-    def _find_repetition_patterns(self, text: str) -> Dict[str, Any]:
+    def _find_repetition_patterns(self, doc: ParsedDocument) -> Dict[str, Any]:
         """Find repetition patterns in text."""
-        words = word_tokenize(text.lower())
+        words = doc.tokens
         word_freq = Counter(words)
         
         # Find words that appear multiple times
@@ -337,14 +315,12 @@ class EnhancedLinguisticAnalyzer:
             "repetition_score": len(repeated_words) / len(set(words)) * 100 if words else 0
         }
     
-    def _find_alliteration(self, text: str) -> List[str]:
+    def _find_alliteration(self, doc: ParsedDocument) -> List[str]:
         """Find alliteration patterns."""
-        sentences = sent_tokenize(text)
         alliterations = []
         
-        for sentence in sentences:
-            words = word_tokenize(sentence.lower())
-            words = [word for word in words if word.isalpha()]
+        for tokens in doc.sentence_tokens:
+            words = [token.lower for token in tokens if token.is_alpha]
             
             if len(words) >= 2:
                 for i in range(len(words) - 1):
@@ -424,14 +400,14 @@ class EnhancedLinguisticAnalyzer:
         else:
             return "neutral"
     
-    def _count_personal_pronouns(self, text: str) -> Dict[str, int]:
+    def _count_personal_pronouns(self, doc: ParsedDocument) -> Dict[str, int]:
         """Count personal pronouns in text."""
         pronouns = ['i', 'me', 'my', 'mine', 'myself', 'we', 'us', 'our', 'ours', 'ourselves', 
                    'you', 'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself',
                    'she', 'her', 'hers', 'herself', 'they', 'them', 'their', 'theirs', 'themselves']
         
-        words = word_tokenize(text.lower())
-        pronoun_count = {pronoun: words.count(pronoun) for pronoun in pronouns}
+        word_counts = Counter(doc.tokens)
+        pronoun_count = {pronoun: word_counts[pronoun] for pronoun in pronouns}
         
         return pronoun_count
     
@@ -507,11 +483,10 @@ class EnhancedLinguisticAnalyzer:
         else:
             return "very_difficult"
     
-    def _calculate_complexity_score(self, text: str) -> float:
+    def _calculate_complexity_score(self, doc: ParsedDocument) -> float:
         """Calculate overall complexity score."""
-        sentences = sent_tokenize(text)
-        words = word_tokenize(text.lower())
-        words = [word for word in words if word.isalpha()]
+        sentences = doc.sentences
+        words = doc.words
         
         if not sentences or not words:
             return 0.0
@@ -526,30 +501,26 @@ class EnhancedLinguisticAnalyzer:
         
         return min(100, complexity * 100)
     
-    def _calculate_emotional_intensity(self, text: str) -> float:
+    def _calculate_emotional_intensity(self, doc: ParsedDocument) -> float:
         """Calculate emotional intensity of text."""
         emotional_words = ['amazing', 'incredible', 'fantastic', 'terrible', 'awful', 'horrible', 
                           'love', 'hate', 'passion', 'fury', 'joy', 'sorrow', 'excitement', 'fear']
         
-        words = word_tokenize(text.lower())
+        words = doc.tokens
         emotional_word_count = sum(1 for word in words if word in emotional_words)
         
         return (emotional_word_count / len(words)) * 100 if words else 0
     
-    def _assess_tone_consistency(self, text: str) -> float:
+    def _assess_tone_consistency(self, doc: ParsedDocument) -> float:
         """Assess tone consistency throughout text."""
         # Simple heuristic: check for tone shifts
-        sentences = sent_tokenize(text)
-        if len(sentences) < 2:
+        if len(doc.sentences) < 2:
             return 100.0
         
         # Analyze first half vs second half
-        mid_point = len(sentences) // 2
-        first_half = " ".join(sentences[:mid_point])
-        second_half = " ".join(sentences[mid_point:])
-        
-        first_tone = self._analyze_emotional_tone(first_half)
-        second_tone = self._analyze_emotional_tone(second_half)
+        mid_point = len(doc.sentences) // 2
+        first_tone = self._analyze_emotional_tone(doc.slice(0, mid_point))
+        second_tone = self._analyze_emotional_tone(doc.slice(mid_point))
         
         # Calculate consistency based on sentiment similarity
         if first_tone["sentiment_bias"] == second_tone["sentiment_bias"]:
@@ -587,18 +558,18 @@ class EnhancedLinguisticAnalyzer:
         
         return sum(overlaps) / len(overlaps) if overlaps else 0
     
-    def _assess_style_stability(self, text_samples: List[str]) -> Dict[str, Any]:
+    def _assess_style_stability(self, documents: List[ParsedDocument]) -> Dict[str, Any]:
         """Assess style stability across samples."""
-        if len(text_samples) < 2:
+        if len(documents) < 2:
             return {"stability_score": 100, "note": "Only one sample provided"}
         
         # Analyze consistency in key style metrics
         metrics = []
-        for sample in text_samples:
+        for doc in documents:
             sample_metrics = {
-                "avg_sentence_length": len(word_tokenize(sample)) / len(sent_tokenize(sample)),
-                "formality": self._assess_formality(sample),
-                "emotional_intensity": self._calculate_emotional_intensity(sample)
+                "avg_sentence_length": len(doc.tokens) / len(doc.sentences) if doc.sentences else 0,
+                "formality": self._assess_formality(doc.text),
+                "emotional_intensity": self._calculate_emotional_intensity(doc)
             }
             metrics.append(sample_metrics)
         
@@ -0,0 +1,60 @@
+"""
+Lazily created, process-wide persona NLP services.
+
+Loading spaCy's en_core_web_sm takes seconds. Route modules use these accessors so
+the model is loaded once per process, on first use or by the startup warm-up,
+instead of at import time, and every analyzer shares the same NLP pipeline.
+"""
+
+import threading
+
+from loguru import logger
+
+# Re-entrant: building the analyzer resolves the shared pipeline under the same lock
+_lock = threading.RLock()
+_nlp_pipeline = None
+_linguistic_analyzer = None
+_quality_improver = None
+
+
+def get_nlp_pipeline():
+    """Shared NLPPipeline instance."""
+    global _nlp_pipeline
+    if _nlp_pipeline is None:
+        with _lock:
+            if _nlp_pipeline is None:
+                from services.persona.nlp_pipeline import NLPPipeline
+                _nlp_pipeline = NLPPipeline()
+    return _nlp_pipeline
+
+
+def get_linguistic_analyzer():
+    """Shared EnhancedLinguisticAnalyzer instance."""
+    global _linguistic_analyzer
+    if _linguistic_analyzer is None:
+        with _lock:
+            if _linguistic_analyzer is None:
+                from services.persona.enhanced_linguistic_analyzer import EnhancedLinguisticAnalyzer
+                _linguistic_analyzer = EnhancedLinguisticAnalyzer(get_nlp_pipeline())
+    return _linguistic_analyzer
+
+
+def get_quality_improver():
+    """Shared PersonaQualityImprover instance."""
+    global _quality_improver
+    if _quality_improver is None:
+        with _lock:
+            if _quality_improver is None:
+                from services.persona.persona_quality_improver import PersonaQualityImprover
+                _quality_improver = PersonaQualityImprover()
+    return _quality_improver
+
+
+def warm_up_persona_models():
+    """Load the persona NLP models ahead of the first persona request."""
+    try:
+        get_linguistic_analyzer()
+        get_quality_improver()
+        logger.info("Persona NLP models loaded")
+    except Exception as e:
+        logger.warning(f"Persona NLP models not available: {e}")
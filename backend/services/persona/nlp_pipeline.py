@@ -0,0 +1,120 @@
+"""
+Shared NLP Pipeline
+Parses persona writing samples once with spaCy and hands every analyzer the same
+tokens, sentences and POS tags.
+
+The spaCy model is loaded with only the components the linguistic analysis reads
+(token vectors, tagger and sentence segmentation); the dependency parser, NER and
+lemmatizer are excluded. Multiple samples are parsed in one `nlp.pipe` batch.
+"""
+
+import os
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+SPACY_MODEL_NAME = os.getenv("PERSONA_SPACY_MODEL", "en_core_web_sm")
+SPACY_EXCLUDED_COMPONENTS = ["parser", "ner", "lemmatizer"]
+NLP_PIPE_BATCH_SIZE = int(os.getenv("PERSONA_NLP_BATCH_SIZE", "32"))
+
+
+class ParsedToken(NamedTuple):
+    """Token attributes read by the linguistic analyzers."""
+    text: str
+    lower: str
+    tag: str
+    is_alpha: bool
+    is_stop: bool
+
+
+class ParsedDocument:
+    """A text parsed once into sentences, tokens and Penn Treebank POS tags."""
+
+    __slots__ = ('text', 'sentences', 'sentence_tokens', 'tokens', 'words', 'content_words', 'pos_tags')
+
+    def __init__(self, text: str, sentences: List[str], sentence_tokens: List[List[ParsedToken]]):
+        self.text = text
+        self.sentences = sentences
+        self.sentence_tokens = sentence_tokens
+
+        alpha_tokens = [token for sentence in sentence_tokens for token in sentence if token.is_alpha]
+        # Lowercased tokens including punctuation, alphabetic words, and words without stopwords
+        self.tokens = [token.lower for sentence in sentence_tokens for token in sentence]
+        self.words = [token.lower for token in alpha_tokens]
+        self.content_words = [token.lower for token in alpha_tokens if not token.is_stop]
+        self.pos_tags: List[Tuple[str, str]] = [(token.lower, token.tag) for token in alpha_tokens]
+
+    @classmethod
+    def from_spacy(cls, doc) -> "ParsedDocument":
+        """Build from a spaCy Doc, dropping whitespace tokens and empty sentences."""
+        sentences = []
+        sentence_tokens = []
+        for sent in doc.sents:
+            tokens = [
+                ParsedToken(token.text, token.lower_, token.tag_, token.is_alpha, token.is_stop)
+                for token in sent if not token.is_space
+            ]
+            if not tokens:
+                continue
+            sentences.append(sent.text.strip())
+            sentence_tokens.append(tokens)
+        return cls(doc.text, sentences, sentence_tokens)
+
+    @classmethod
+    def combine(cls, documents: List["ParsedDocument"]) -> "ParsedDocument":
+        """Concatenate parsed samples, equivalent to parsing the space-joined text."""
+        return cls(
+            " ".join(document.text for document in documents),
+            [sentence for document in documents for sentence in document.sentences],
+            [tokens for document in documents for tokens in document.sentence_tokens],
+        )
+
+    def slice(self, start: int, end: Optional[int] = None) -> "ParsedDocument":
+        """Sub-document made of sentences [start:end]."""
+        sentences = self.sentences[start:end]
+        return ParsedDocument(" ".join(sentences), sentences, self.sentence_tokens[start:end])
+
+    def sentence_lengths(self) -> List[int]:
+        """Token count of each sentence."""
+        return [len(tokens) for tokens in self.sentence_tokens]
+
+
+def load_spacy_model(model_name: str = SPACY_MODEL_NAME):
+    """Load the spaCy model with only the components the analysis needs."""
+    try:
+        import spacy
+    except ImportError as e:
+        logger.error("ERROR: spaCy is REQUIRED for persona generation. Install with: pip install spacy && python -m spacy download en_core_web_sm")
+        raise ImportError("spaCy is required for enhanced persona generation. Install with: pip install spacy && python -m spacy download en_core_web_sm") from e
+
+    try:
+        nlp = spacy.load(model_name, exclude=SPACY_EXCLUDED_COMPONENTS)
+    except OSError as e:
+        logger.error(f"ERROR: spaCy model '{model_name}' is REQUIRED. Download with: python -m spacy download {model_name}")
+        raise OSError(f"spaCy model '{model_name}' is required. Download with: python -m spacy download {model_name}") from e
+
+    # Sentence boundaries come from the dependency parser by default; use the
+    # lighter statistical senter (or the rule-based sentencizer) instead
+    if "senter" in nlp.disabled:
+        nlp.enable_pipe("senter")
+    elif not nlp.has_pipe("senter"):
+        nlp.add_pipe("sentencizer")
+
+    logger.debug(f"SUCCESS: spaCy model loaded with components {nlp.pipe_names}")
+    return nlp
+
+
+class NLPPipeline:
+    """Process-wide spaCy pipeline producing ParsedDocument objects."""
+
+    def __init__(self, nlp=None, batch_size: int = NLP_PIPE_BATCH_SIZE):
+        self.nlp = nlp if nlp is not None else load_spacy_model()
+        self.batch_size = batch_size
+
+    def parse(self, text: str) -> ParsedDocument:
+        """Parse a single text."""
+        return ParsedDocument.from_spacy(self.nlp(text))
+
+    def parse_many(self, texts: Iterable[str]) -> List[ParsedDocument]:
+        """Parse several texts in batches, preserving their order."""
+        return [ParsedDocument.from_spacy(doc) for doc in self.nlp.pipe(texts, batch_size=self.batch_size)]
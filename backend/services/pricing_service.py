@@ -3,9 +3,14 @@ Pricing Service for API Usage Tracking
 Manages API pricing, cost calculation, and subscription limits.
 """
 
+import copy
+import os
+import threading
+import time
 from typing import Dict, Any, Optional, List, Tuple
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, timedelta
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from loguru import logger
 
@@ -14,13 +19,252 @@ from models.subscription_models import (
     UsageSummary, APIUsageLog, APIProvider, SubscriptionTier
 )
 
+# Pricing rows and plans are cached process-wide; the cache re-checks the tables after this many seconds
+PRICING_CACHE_TTL_SECONDS = int(os.getenv("PRICING_CACHE_TTL_SECONDS", "300"))
+
+# Fallback when no pricing row exists for a model: $1 per 1M tokens
+DEFAULT_COST_PER_TOKEN = 0.000001
+DEFAULT_TOKENS_PER_WORD = 1.3
+
+# Providers whose plans also limit tokens
+LLM_PROVIDERS = (APIProvider.GEMINI, APIProvider.OPENAI, APIProvider.ANTHROPIC, APIProvider.MISTRAL)
+
+
+def compute_api_cost(pricing: Optional[Dict[str, Any]], tokens_input: int = 0, tokens_output: int = 0,
+                     request_count: int = 1, search_count: int = 0, image_count: int = 0,
+                     page_count: int = 0) -> Dict[str, float]:
+    """Cost of an API call for a cached pricing row (or the default estimate when None)."""
+    if not pricing:
+        cost_input = tokens_input * DEFAULT_COST_PER_TOKEN
+        cost_output = tokens_output * DEFAULT_COST_PER_TOKEN
+        cost_total = (cost_input + cost_output) * request_count
+    else:
+        cost_input = tokens_input * pricing['cost_per_input_token']
+        cost_output = tokens_output * pricing['cost_per_output_token']
+        cost_request = request_count * pricing['cost_per_request']
+
+        # Handle special cases for non-LLM APIs
+        cost_search = search_count * pricing['cost_per_search']
+        cost_image = image_count * pricing['cost_per_image']
+        cost_page = page_count * pricing['cost_per_page']
+
+        cost_total = cost_input + cost_output + cost_request + cost_search + cost_image + cost_page
+
+    # Round to 6 decimal places for precision
+    return {
+        'cost_input': round(cost_input, 6),
+        'cost_output': round(cost_output, 6),
+        'cost_total': round(cost_total, 6)
+    }
+
+
+def plan_to_limits(plan: SubscriptionPlan) -> Dict[str, Any]:
+    """Convert subscription plan to limits dictionary."""
+    return {
+        'plan_name': plan.name,
+        'tier': plan.tier.value,
+        'limits': {
+            'gemini_calls': plan.gemini_calls_limit,
+            'openai_calls': plan.openai_calls_limit,
+            'anthropic_calls': plan.anthropic_calls_limit,
+            'mistral_calls': plan.mistral_calls_limit,
+            'tavily_calls': plan.tavily_calls_limit,
+            'serper_calls': plan.serper_calls_limit,
+            'metaphor_calls': plan.metaphor_calls_limit,
+            'firecrawl_calls': plan.firecrawl_calls_limit,
+            'stability_calls': plan.stability_calls_limit,
+            'gemini_tokens': plan.gemini_tokens_limit,
+            'openai_tokens': plan.openai_tokens_limit,
+            'anthropic_tokens': plan.anthropic_tokens_limit,
+            'mistral_tokens': plan.mistral_tokens_limit,
+            'monthly_cost': plan.monthly_cost_limit
+        },
+        'features': plan.features or []
+    }
+
+
+def evaluate_usage_limits(limits: Optional[Dict[str, Any]], provider: APIProvider, current_calls: int,
+                          current_tokens: int, total_cost: float,
+                          tokens_requested: int = 0) -> Tuple[bool, str, Dict[str, Any]]:
+    """Check current-period usage totals against a plan's limits (as returned by plan_to_limits)."""
+    if not limits:
+        return False, "No subscription plan found", {}
+
+    provider_name = provider.value
+    call_limit = limits['limits'].get(f"{provider_name}_calls") or 0
+    if call_limit > 0 and current_calls >= call_limit:
+        return False, f"API call limit reached for {provider_name}", {
+            'current_calls': current_calls,
+            'limit': call_limit,
+            'usage_percentage': 100.0
+        }
+
+    # Check token limits for LLM providers
+    if provider in LLM_PROVIDERS:
+        token_limit = limits['limits'].get(f"{provider_name}_tokens") or 0
+        if token_limit > 0 and (current_tokens + tokens_requested) > token_limit:
+            return False, f"Token limit would be exceeded for {provider_name}", {
+                'current_tokens': current_tokens,
+                'requested_tokens': tokens_requested,
+                'limit': token_limit,
+                'usage_percentage': ((current_tokens + tokens_requested) / token_limit) * 100
+            }
+
+    cost_limit = limits['limits'].get('monthly_cost') or 0
+    if cost_limit > 0 and total_cost >= cost_limit:
+        return False, "Monthly cost limit reached", {
+            'current_cost': total_cost,
+            'limit': cost_limit,
+            'usage_percentage': 100.0
+        }
+
+    # Calculate usage percentages for warnings
+    call_usage_pct = (current_calls / max(call_limit, 1)) * 100 if call_limit > 0 else 0
+    cost_usage_pct = (total_cost / max(cost_limit, 1)) * 100 if cost_limit > 0 else 0
+
+    return True, "Within limits", {
+        'current_calls': current_calls,
+        'call_limit': call_limit,
+        'call_usage_percentage': call_usage_pct,
+        'current_cost': total_cost,
+        'cost_limit': cost_limit,
+        'cost_usage_percentage': cost_usage_pct
+    }
+
+
+class PricingCatalog:
+    """
+    Process-wide, versioned snapshot of API pricing rows and subscription plans.
+
+    The snapshot is loaded once and re-validated every PRICING_CACHE_TTL_SECONDS
+    with a cheap count/max(updated_at) fingerprint of both tables; it is reloaded
+    (and `version` bumped) only when the fingerprint changed or after invalidate().
+    Each user's active subscription plan is memoized for the current billing period.
+    """
+
+    def __init__(self, ttl_seconds: int = PRICING_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._lock = threading.Lock()
+        self._bind = None
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._pricing: Dict[Tuple[APIProvider, str], Dict[str, Any]] = {}
+        self._provider_pricing: Dict[APIProvider, Dict[str, Any]] = {}
+        self._plans: Dict[int, Dict[str, Any]] = {}
+        self._free_plan_id: Optional[int] = None
+        # user_id -> (billing_period, plan_id or None, memoized_at)
+        self._subscriptions: Dict[str, Tuple[str, Optional[int], float]] = {}
+
+    def invalidate(self):
+        """Force a reload on next use (after pricing or plan changes)."""
+        with self._lock:
+            self._fingerprint = None
+            self._subscriptions.clear()
+
+    def invalidate_user(self, user_id: str):
+        """Forget a user's memoized subscription (after a plan change)."""
+        with self._lock:
+            self._subscriptions.pop(user_id, None)
+
+    def _table_fingerprint(self, db: Session) -> Tuple:
+        pricing = db.query(func.count(APIProviderPricing.id), func.max(APIProviderPricing.updated_at)).one()
+        plans = db.query(func.count(SubscriptionPlan.id), func.max(SubscriptionPlan.updated_at)).one()
+        return tuple(pricing) + tuple(plans)
+
+    def _load(self, db: Session):
+        pricing: Dict[Tuple[APIProvider, str], Dict[str, Any]] = {}
+        provider_pricing: Dict[APIProvider, Dict[str, Any]] = {}
+        rows = db.query(APIProviderPricing).filter(
+            APIProviderPricing.is_active == True
+        ).order_by(APIProviderPricing.id).all()
+        for row in rows:
+            entry = {
+                'provider': row.provider,
+                'model_name': row.model_name,
+                'cost_per_input_token': row.cost_per_input_token or 0.0,
+                'cost_per_output_token': row.cost_per_output_token or 0.0,
+                'cost_per_request': row.cost_per_request or 0.0,
+                'cost_per_search': row.cost_per_search or 0.0,
+                'cost_per_image': row.cost_per_image or 0.0,
+                'cost_per_page': row.cost_per_page or 0.0,
+                'tokens_per_word': row.tokens_per_word,
+                'description': row.description
+            }
+            pricing.setdefault((row.provider, row.model_name), entry)
+            provider_pricing.setdefault(row.provider, entry)
+
+        plans = db.query(SubscriptionPlan).order_by(SubscriptionPlan.id).all()
+        self._pricing = pricing
+        self._provider_pricing = provider_pricing
+        self._plans = {plan.id: plan_to_limits(plan) for plan in plans}
+        self._free_plan_id = next((plan.id for plan in plans if plan.tier == SubscriptionTier.FREE), None)
+        self._subscriptions.clear()
+        self.version += 1
+        logger.debug(f"Pricing catalog loaded (version {self.version}): "
+                     f"{len(pricing)} pricing rows, {len(plans)} plans")
+
+    def refresh(self, db: Session, force: bool = False):
+        """Reload the snapshot if it is missing, from another database, changed or forced."""
+        bind = db.get_bind()
+        now = time.monotonic()
+        if (not force and self._fingerprint is not None and self._bind is bind
+                and now - self._checked_at < self.ttl_seconds):
+            return
+        with self._lock:
+            if (not force and self._fingerprint is not None and self._bind is bind
+                    and now - self._checked_at < self.ttl_seconds):
+                return
+            fingerprint = self._table_fingerprint(db)
+            if force or self._bind is not bind or fingerprint != self._fingerprint:
+                self._load(db)
+                self._bind = bind
+                self._fingerprint = fingerprint
+            self._checked_at = now
+
+    def get_pricing(self, db: Session, provider: APIProvider, model_name: str) -> Optional[Dict[str, Any]]:
+        """Active pricing row for a provider/model."""
+        self.refresh(db)
+        return self._pricing.get((provider, model_name))
+
+    def get_provider_pricing(self, db: Session, provider: APIProvider) -> Optional[Dict[str, Any]]:
+        """First active pricing row for a provider."""
+        self.refresh(db)
+        return self._provider_pricing.get(provider)
+
+    def get_user_limits(self, db: Session, user_id: str) -> Optional[Dict[str, Any]]:
+        """Limits of the user's active plan, falling back to the free plan."""
+        self.refresh(db)
+        plan_id = self._get_subscription_plan_id(db, user_id)
+        if plan_id is None:
+            plan_id = self._free_plan_id
+        elif plan_id not in self._plans:
+            # Subscribed to a plan created since the last load
+            self.refresh(db, force=True)
+        limits = self._plans.get(plan_id) if plan_id is not None else None
+        return copy.deepcopy(limits) if limits else None
+
+    def _get_subscription_plan_id(self, db: Session, user_id: str) -> Optional[int]:
+        billing_period = datetime.now().strftime("%Y-%m")
+        now = time.monotonic()
+        memo = self._subscriptions.get(user_id)
+        if memo and memo[0] == billing_period and now - memo[2] < self.ttl_seconds:
+            return memo[1]
+
+        row = db.query(UserSubscription.plan_id).filter(
+            UserSubscription.user_id == user_id,
+            UserSubscription.is_active == True
+        ).first()
+        plan_id = row[0] if row else None
+        with self._lock:
+            self._subscriptions[user_id] = (billing_period, plan_id, now)
+        return plan_id
+
 class PricingService:
     """Service for managing API pricing and cost calculations."""
     
     def __init__(self, db: Session):
         self.db = db
-        self._pricing_cache = {}
-        self._plans_cache = {}
         
     def initialize_default_pricing(self):
         """Initialize default pricing for all API providers."""
@@ -215,6 +459,7 @@ class PricingService:
                 self.db.add(pricing)
         
         self.db.commit()
+        pricing_catalog.invalidate()
         logger.debug("Default API pricing initialized")
     
     def initialize_default_plans(self):
@@ -318,6 +563,7 @@ class PricingService:
                 self.db.add(plan)
         
         self.db.commit()
+        pricing_catalog.invalidate()
         logger.debug("Default subscription plans initialized")
     
     def calculate_api_cost(self, provider: APIProvider, model_name: str, 
@@ -325,81 +571,27 @@ class PricingService:
                           request_count: int = 1, **kwargs) -> Dict[str, float]:
         """Calculate cost for an API call."""
         
-        # Get pricing for the provider and model
-        pricing = self.db.query(APIProviderPricing).filter(
-            APIProviderPricing.provider == provider,
-            APIProviderPricing.model_name == model_name,
-            APIProviderPricing.is_active == True
-        ).first()
-        
+        pricing = pricing_catalog.get_pricing(self.db, provider, model_name)
         if not pricing:
             logger.warning(f"No pricing found for {provider.value}:{model_name}, using default estimates")
-            # Use default estimates
-            cost_input = tokens_input * 0.000001  # $1 per 1M tokens default
-            cost_output = tokens_output * 0.000001
-            cost_total = (cost_input + cost_output) * request_count
-        else:
-            # Calculate based on actual pricing
-            cost_input = tokens_input * pricing.cost_per_input_token
-            cost_output = tokens_output * pricing.cost_per_output_token
-            cost_request = request_count * pricing.cost_per_request
-            
-            # Handle special cases for non-LLM APIs
-            cost_search = kwargs.get('search_count', 0) * pricing.cost_per_search
-            cost_image = kwargs.get('image_count', 0) * pricing.cost_per_image
-            cost_page = kwargs.get('page_count', 0) * pricing.cost_per_page
-            
-            cost_total = cost_input + cost_output + cost_request + cost_search + cost_image + cost_page
         
-        # Round to 6 decimal places for precision
-        return {
-            'cost_input': round(cost_input, 6),
-            'cost_output': round(cost_output, 6),
-            'cost_total': round(cost_total, 6)
-        }
+        return compute_api_cost(
+            pricing,
+            tokens_input=tokens_input or 0,
+            tokens_output=tokens_output or 0,
+            request_count=request_count,
+            search_count=kwargs.get('search_count', 0),
+            image_count=kwargs.get('image_count', 0),
+            page_count=kwargs.get('page_count', 0)
+        )
     
     def get_user_limits(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get usage limits for a user based on their subscription."""
-        
-        subscription = self.db.query(UserSubscription).filter(
-            UserSubscription.user_id == user_id,
-            UserSubscription.is_active == True
-        ).first()
-        
-        if not subscription:
-            # Return free tier limits
-            free_plan = self.db.query(SubscriptionPlan).filter(
-                SubscriptionPlan.tier == SubscriptionTier.FREE
-            ).first()
-            if free_plan:
-                return self._plan_to_limits_dict(free_plan)
-            return None
-        
-        return self._plan_to_limits_dict(subscription.plan)
+        return pricing_catalog.get_user_limits(self.db, user_id)
     
     def _plan_to_limits_dict(self, plan: SubscriptionPlan) -> Dict[str, Any]:
         """Convert subscription plan to limits dictionary."""
-        return {
-            'plan_name': plan.name,
-            'tier': plan.tier.value,
-            'limits': {
-                'gemini_calls': plan.gemini_calls_limit,
-                'openai_calls': plan.openai_calls_limit,
-                'anthropic_calls': plan.anthropic_calls_limit,
-                'mistral_calls': plan.mistral_calls_limit,
-                'tavily_calls': plan.tavily_calls_limit,
-                'serper_calls': plan.serper_calls_limit,
-                'metaphor_calls': plan.metaphor_calls_limit,
-                'firecrawl_calls': plan.firecrawl_calls_limit,
-                'stability_calls': plan.stability_calls_limit,
-                'gemini_tokens': plan.gemini_tokens_limit,
-                'openai_tokens': plan.openai_tokens_limit,
-                'anthropic_tokens': plan.anthropic_tokens_limit,
-                'mistral_tokens': plan.mistral_tokens_limit,
-                'monthly_cost': plan.monthly_cost_limit
-            },
-            'features': plan.features or []
-        }
+        return plan_to_limits(plan)
     
     def check_usage_limits(self, user_id: str, provider: APIProvider, 
                           tokens_requested: int = 0) -> Tuple[bool, str, Dict[str, Any]]:
@@ -426,95 +618,49 @@ class PricingService:
             self.db.add(usage)
             self.db.commit()
         
-        # Check call limits
         provider_name = provider.value
-        current_calls = getattr(usage, f"{provider_name}_calls", 0)
-        call_limit = limits['limits'].get(f"{provider_name}_calls", 0)
-        
-        if call_limit > 0 and current_calls >= call_limit:
-            return False, f"API call limit reached for {provider_name}", {
-                'current_calls': current_calls,
-                'limit': call_limit,
-                'usage_percentage': 100.0
-            }
-        
-        # Check token limits for LLM providers
-        if provider in [APIProvider.GEMINI, APIProvider.OPENAI, APIProvider.ANTHROPIC, APIProvider.MISTRAL]:
-            current_tokens = getattr(usage, f"{provider_name}_tokens", 0)
-            token_limit = limits['limits'].get(f"{provider_name}_tokens", 0)
-            
-            if token_limit > 0 and (current_tokens + tokens_requested) > token_limit:
-                return False, f"Token limit would be exceeded for {provider_name}", {
-                    'current_tokens': current_tokens,
-                    'requested_tokens': tokens_requested,
-                    'limit': token_limit,
-                    'usage_percentage': ((current_tokens + tokens_requested) / token_limit) * 100
-                }
-        
-        # Check cost limits
-        cost_limit = limits['limits'].get('monthly_cost', 0)
-        if cost_limit > 0 and usage.total_cost >= cost_limit:
-            return False, "Monthly cost limit reached", {
-                'current_cost': usage.total_cost,
-                'limit': cost_limit,
-                'usage_percentage': 100.0
-            }
-        
-        # Calculate usage percentages for warnings
-        call_usage_pct = (current_calls / max(call_limit, 1)) * 100 if call_limit > 0 else 0
-        cost_usage_pct = (usage.total_cost / max(cost_limit, 1)) * 100 if cost_limit > 0 else 0
-        
-        return True, "Within limits", {
-            'current_calls': current_calls,
-            'call_limit': call_limit,
-            'call_usage_percentage': call_usage_pct,
-            'current_cost': usage.total_cost,
-            'cost_limit': cost_limit,
-            'cost_usage_percentage': cost_usage_pct
-        }
+        return evaluate_usage_limits(
+            limits, provider,
+            current_calls=getattr(usage, f"{provider_name}_calls", 0) or 0,
+            current_tokens=getattr(usage, f"{provider_name}_tokens", 0) or 0,
+            total_cost=usage.total_cost or 0.0,
+            tokens_requested=tokens_requested
+        )
     
     def estimate_tokens(self, text: str, provider: APIProvider) -> int:
         """Estimate token count for text based on provider."""
         
-        # Get pricing info for token estimation
-        pricing = self.db.query(APIProviderPricing).filter(
-            APIProviderPricing.provider == provider,
-            APIProviderPricing.is_active == True
-        ).first()
-        
-        if pricing and pricing.tokens_per_word:
+        pricing = pricing_catalog.get_provider_pricing(self.db, provider)
+        word_count = len(text.split())
+        if pricing and pricing['tokens_per_word']:
             # Use provider-specific conversion
-            word_count = len(text.split())
-            return int(word_count * pricing.tokens_per_word)
-        else:
-            # Use default estimation (roughly 1.3 tokens per word for most models)
-            word_count = len(text.split())
-            return int(word_count * 1.3)
+            return int(word_count * pricing['tokens_per_word'])
+        # Use default estimation (roughly 1.3 tokens per word for most models)
+        return int(word_count * DEFAULT_TOKENS_PER_WORD)
     
     def get_pricing_info(self, provider: APIProvider, model_name: str = None) -> Optional[Dict[str, Any]]:
         """Get pricing information for a provider/model."""
         
-        query = self.db.query(APIProviderPricing).filter(
-            APIProviderPricing.provider == provider,
-            APIProviderPricing.is_active == True
-        )
-        
         if model_name:
-            query = query.filter(APIProviderPricing.model_name == model_name)
-        
-        pricing = query.first()
+            pricing = pricing_catalog.get_pricing(self.db, provider, model_name)
+        else:
+            pricing = pricing_catalog.get_provider_pricing(self.db, provider)
         
         if not pricing:
             return None
         
         return {
-            'provider': pricing.provider.value,
-            'model_name': pricing.model_name,
-            'cost_per_input_token': pricing.cost_per_input_token,
-            'cost_per_output_token': pricing.cost_per_output_token,
-            'cost_per_request': pricing.cost_per_request,
-            'cost_per_search': pricing.cost_per_search,
-            'cost_per_image': pricing.cost_per_image,
-            'cost_per_page': pricing.cost_per_page,
-            'description': pricing.description
-        }
\ No newline at end of file
+            'provider': pricing['provider'].value,
+            'model_name': pricing['model_name'],
+            'cost_per_input_token': pricing['cost_per_input_token'],
+            'cost_per_output_token': pricing['cost_per_output_token'],
+            'cost_per_request': pricing['cost_per_request'],
+            'cost_per_search': pricing['cost_per_search'],
+            'cost_per_image': pricing['cost_per_image'],
+            'cost_per_page': pricing['cost_per_page'],
+            'description': pricing['description']
+        }
+
+
+# Global pricing catalog instance
+pricing_catalog = PricingCatalog()
@@ -0,0 +1,105 @@
+"""
+Async Exa Search Client
+
+Thin asyncio client for the Exa search endpoint. One aiohttp session is reused
+for all searches, so connections to the API stay open between calls, and a
+semaphore caps how many searches run at once however many callers fan out.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from loguru import logger
+
+EXA_SEARCH_URL = "https://api.exa.ai/search"
+EXA_MAX_CONCURRENT_SEARCHES = int(os.getenv("EXA_MAX_CONCURRENT_SEARCHES", "3"))
+EXA_SEARCH_TIMEOUT = int(os.getenv("EXA_SEARCH_TIMEOUT", "15"))
+
+
+class ExaSearchError(Exception):
+    """Raised when an Exa search request fails."""
+
+
+class AsyncExaClient:
+    """Exa search over a shared session with a concurrency cap."""
+
+    def __init__(self, api_key: Optional[str] = None,
+                 max_concurrency: int = EXA_MAX_CONCURRENT_SEARCHES,
+                 timeout: int = EXA_SEARCH_TIMEOUT,
+                 search_url: str = EXA_SEARCH_URL):
+        """
+        Args:
+            api_key: Exa API key (read from EXA_API_KEY at request time when not given)
+            max_concurrency: Maximum number of searches in flight
+            timeout: Timeout in seconds for one search
+            search_url: Search endpoint
+        """
+        self._api_key = api_key
+        self.search_url = search_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def api_key(self) -> Optional[str]:
+        # Keys may be injected into the environment per request, so read them late
+        return self._api_key or os.getenv("EXA_API_KEY")
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._session
+
+    async def search(self, query: str, num_results: int = 5, **options: Any) -> List[Dict[str, Any]]:
+        """
+        Run one Exa search.
+
+        Args:
+            query: Search query
+            num_results: Number of results requested
+            **options: Further request fields, e.g. text=True or useAutoprompt=True
+
+        Returns:
+            The raw result objects of the response
+
+        Raises:
+            ExaSearchError: If no API key is configured or the request fails
+        """
+        api_key = self.api_key
+        if not api_key:
+            raise ExaSearchError("EXA_API_KEY not configured")
+
+        session = self._get_session()
+        payload = {"query": query, "numResults": num_results, **options}
+        headers = {"x-api-key": api_key, "Content-Type": "application/json"}
+
+        async with self._semaphore:
+            try:
+                async with session.post(self.search_url, json=payload, headers=headers) as response:
+                    if response.status != 200:
+                        raise ExaSearchError(f"Exa API error: {response.status} - {await response.text()}")
+                    data = await response.json()
+            except asyncio.TimeoutError:
+                raise ExaSearchError(f"Exa search timed out after {self.timeout}s")
+            except aiohttp.ClientError as e:
+                raise ExaSearchError(f"Exa request failed: {e}")
+
+        results = data.get("results", [])
+        logger.debug(f"Exa returned {len(results)} results for: {query[:60]}")
+        return results
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# Global instance shared by the services that search Exa
+exa_search_client = AsyncExaClient()
@@ -11,6 +11,7 @@ import json
 from loguru import logger
 
 from models.onboarding import ResearchPreferences, OnboardingSession, WebsiteAnalysis
+from services.onboarding_context import invalidate_onboarding_session
 
 
 class ResearchPreferencesService:
@@ -52,6 +53,7 @@ class ResearchPreferencesService:
                 
                 existing_preferences.updated_at = datetime.utcnow()
                 self.db.commit()
+                invalidate_onboarding_session(session_id, self.db)
                 logger.info(f"Updated research preferences for session {session_id}")
                 return existing_preferences.id
             else:
@@ -70,6 +72,7 @@ class ResearchPreferencesService:
                 
                 self.db.add(preferences)
                 self.db.commit()
+                invalidate_onboarding_session(session_id, self.db)
                 logger.info(f"Created research preferences for session {session_id}")
                 return preferences.id
                 
@@ -192,6 +195,7 @@ class ResearchPreferencesService:
             
             preferences.updated_at = datetime.utcnow()
             self.db.commit()
+            invalidate_onboarding_session(preferences.session_id, self.db)
             logger.info(f"Updated research preferences {preferences_id}")
             return True
             
@@ -219,6 +223,7 @@ class ResearchPreferencesService:
             if preferences:
                 self.db.delete(preferences)
                 self.db.commit()
+                invalidate_onboarding_session(session_id, self.db)
                 logger.info(f"Deleted research preferences for session {session_id}")
                 return True
             return False
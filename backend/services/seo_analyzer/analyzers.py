@@ -425,7 +425,8 @@ class PerformanceAnalyzer(BaseAnalyzer):
         try:
             start_time = time.time()
             response = self.session.get(url, timeout=20)
-            load_time = time.time() - start_time
+            # A shared session may answer from its cache; elapsed is the original fetch time
+            load_time = max(time.time() - start_time, response.elapsed.total_seconds())
             
             issues = []
             warnings = []
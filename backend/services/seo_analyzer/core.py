@@ -3,6 +3,7 @@ Core SEO Analyzer Module
 Contains the main ComprehensiveSEOAnalyzer class and data structures.
 """
 
+import threading
 from datetime import datetime
 from dataclasses import dataclass
 from typing import Dict, List, Any, Optional
@@ -41,8 +42,14 @@ class ComprehensiveSEOAnalyzer:
     Orchestrates all individual analyzers to provide complete SEO analysis.
     """
     
-    def __init__(self):
-        """Initialize the comprehensive SEO analyzer with all sub-analyzers"""
+    def __init__(self, session: Optional[Any] = None):
+        """
+        Initialize the comprehensive SEO analyzer with all sub-analyzers
+
+        Args:
+            session: Requests-like session shared by the fetcher and all analyzers,
+                e.g. an audit fetch cache session so each URL is downloaded once
+        """
         self.html_fetcher = HTMLFetcher()
         self.ai_insight_generator = AIInsightGenerator()
         
@@ -57,10 +64,24 @@ class ComprehensiveSEOAnalyzer:
         self.security_analyzer = SecurityHeadersAnalyzer()
         self.keyword_analyzer = KeywordAnalyzer()
 
-    def analyze_url_progressive(self, url: str, target_keywords: Optional[List[str]] = None) -> SEOAnalysisResult:
+        if session is not None:
+            for component in (self.html_fetcher, self.url_analyzer, self.meta_analyzer,
+                              self.content_analyzer, self.technical_analyzer, self.performance_analyzer,
+                              self.accessibility_analyzer, self.ux_analyzer, self.security_analyzer,
+                              self.keyword_analyzer):
+                component.session = session
+
+    def analyze_url_progressive(self, url: str, target_keywords: Optional[List[str]] = None,
+                                stop_event: Optional[threading.Event] = None) -> SEOAnalysisResult:
         """
         Progressive analysis method that runs all analyses with enhanced AI insights
+
+        When stop_event is set (e.g. the caller was cancelled), the analysis returns
+        an error result at the next stage boundary instead of running the later stages.
         """
+        def stopped() -> bool:
+            return stop_event is not None and stop_event.is_set()
+
         try:
             logger.info(f"Starting enhanced SEO analysis for URL: {url}")
             
@@ -68,6 +89,8 @@ class ComprehensiveSEOAnalyzer:
             html_content = self.html_fetcher.fetch_html(url)
             if not html_content:
                 return self._create_error_result(url, "Failed to fetch HTML content")
+            if stopped():
+                return self._create_error_result(url, "Analysis cancelled")
             
             # Run all analyzers
             analysis_data = {}
@@ -83,6 +106,9 @@ class ComprehensiveSEOAnalyzer:
                 'user_experience': self.ux_analyzer.analyze(html_content, url)
             })
             
+            if stopped():
+                return self._create_error_result(url, "Analysis cancelled")
+
             # Run potentially slower analyses with error handling
             logger.info("Running security headers analysis...")
             try:
@@ -91,6 +117,8 @@ class ComprehensiveSEOAnalyzer:
                 logger.warning(f"Security headers analysis failed: {e}")
                 analysis_data['security_headers'] = self._create_fallback_result('security_headers', str(e))
             
+            if stopped():
+                return self._create_error_result(url, "Analysis cancelled")
             logger.info("Running performance analysis...")
             try:
                 analysis_data['performance'] = self.performance_analyzer.analyze(url)
@@ -98,6 +126,9 @@ class ComprehensiveSEOAnalyzer:
                 logger.warning(f"Performance analysis failed: {e}")
                 analysis_data['performance'] = self._create_fallback_result('performance', str(e))
             
+            if stopped():
+                return self._create_error_result(url, "Analysis cancelled")
+
             # Generate AI-powered insights
             ai_insights = self.ai_insight_generator.generate_insights(analysis_data, url)
             
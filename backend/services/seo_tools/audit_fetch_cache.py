@@ -0,0 +1,183 @@
+"""
+Audit Fetch Cache
+
+Per-audit HTTP cache shared by every tool taking part in one enterprise SEO audit.
+All fetches go through a single aiohttp session; concurrent requests for the same
+URL are coalesced onto one in-flight fetch and the response is kept for the rest of
+the audit, so a page is downloaded once no matter how many analyzers need it.
+
+The seo_analyzer package is synchronous and built around requests sessions, so
+the cache also hands out a requests-like session that runs its fetches on the
+audit's event loop from a worker thread.
+"""
+
+import asyncio
+import os
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+import requests
+from loguru import logger
+from requests.structures import CaseInsensitiveDict
+
+from .site_crawler import normalize_url
+
+AUDIT_FETCH_TIMEOUT = int(os.getenv("AUDIT_FETCH_TIMEOUT", "20"))
+AUDIT_FETCH_PER_HOST_CONCURRENCY = int(os.getenv("AUDIT_FETCH_PER_HOST_CONCURRENCY", "4"))
+AUDIT_FETCH_MAX_BODY_BYTES = int(os.getenv("AUDIT_FETCH_MAX_BODY_KB", "5120")) * 1024
+AUDIT_FETCH_CACHE_MAX_BYTES = int(os.getenv("AUDIT_FETCH_CACHE_MAX_MB", "64")) * 1024 * 1024
+
+AUDIT_FETCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class CachedResponse:
+    """A fetched response, exposing the parts of requests.Response the analyzers use."""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes,
+                 elapsed: float, truncated: bool = False, encoding: Optional[str] = None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.elapsed = timedelta(seconds=elapsed)
+        self.truncated = truncated
+        self.encoding = encoding or "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class AuditFetchCache:
+    """Shared, coalescing HTTP cache for the lifetime of one audit."""
+
+    def __init__(
+        self,
+        timeout: int = AUDIT_FETCH_TIMEOUT,
+        per_host_concurrency: int = AUDIT_FETCH_PER_HOST_CONCURRENCY,
+        max_body_bytes: int = AUDIT_FETCH_MAX_BODY_BYTES,
+        max_cache_bytes: int = AUDIT_FETCH_CACHE_MAX_BYTES
+    ):
+        """
+        Args:
+            timeout: Timeout in seconds for one fetch
+            per_host_concurrency: Maximum concurrent requests to one host
+            max_body_bytes: Response bodies are cut off after this many bytes
+            max_cache_bytes: Responses are no longer retained once the cache holds this many bytes
+        """
+        self.timeout = timeout
+        self.per_host_concurrency = per_host_concurrency
+        self.max_body_bytes = max_body_bytes
+        self.max_cache_bytes = max_cache_bytes
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.stats = {"requests": 0, "hits": 0, "bytes": 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._fetches: Dict[str, asyncio.Task] = {}
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._cached_bytes = 0
+        self._closed = False
+
+    async def __aenter__(self) -> "AuditFetchCache":
+        self._loop = asyncio.get_running_loop()
+        self.session = aiohttp.ClientSession(headers=AUDIT_FETCH_HEADERS)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in self._fetches.values():
+            task.cancel()
+        self._fetches.clear()
+        if self.session is not None:
+            await self.session.close()
+        logger.debug(
+            f"Audit fetch cache closed: {self.stats['requests']} requests, "
+            f"{self.stats['hits']} hits, {self.stats['bytes']} bytes"
+        )
+
+    async def fetch(self, url: str) -> CachedResponse:
+        """
+        Fetch a URL, or return the response of an earlier or in-flight fetch of it.
+
+        Raises:
+            Exception: If the URL cannot be fetched; every caller of that URL gets the same error
+        """
+        if self._closed or self.session is None:
+            raise RuntimeError("Audit fetch cache is closed")
+
+        key = normalize_url(url)
+        task = self._fetches.get(key)
+        if task is not None:
+            self.stats["hits"] += 1
+        else:
+            task = asyncio.ensure_future(self._fetch(url))
+            self._fetches[key] = task
+        # Shielded so one caller timing out does not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    async def _fetch(self, url: str) -> CachedResponse:
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        async with semaphore:
+            self.stats["requests"] += 1
+            start_time = time.monotonic()
+            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                body = await response.content.read(self.max_body_bytes + 1)
+                elapsed = time.monotonic() - start_time
+                truncated = len(body) > self.max_body_bytes
+                cached = CachedResponse(
+                    url=str(response.url),
+                    status_code=response.status,
+                    headers=dict(response.headers),
+                    content=body[:self.max_body_bytes],
+                    elapsed=elapsed,
+                    truncated=truncated,
+                    encoding=response.get_encoding() if body else None
+                )
+
+        self.stats["bytes"] += len(cached.content)
+        self._cached_bytes += len(cached.content)
+        if self._cached_bytes > self.max_cache_bytes:
+            # Over budget: later callers fetch again instead of the cache growing without bound
+            self._fetches.pop(normalize_url(url), None)
+            self._cached_bytes -= len(cached.content)
+        return cached
+
+    def requests_session(self) -> "SyncFetchSession":
+        """Requests-like session for synchronous analyzers running in worker threads."""
+        if self._loop is None:
+            raise RuntimeError("Audit fetch cache is not open")
+        return SyncFetchSession(self, self._loop)
+
+
+class SyncFetchSession:
+    """Synchronous facade over an AuditFetchCache, used from worker threads only."""
+
+    def __init__(self, cache: AuditFetchCache, loop: asyncio.AbstractEventLoop):
+        self.cache = cache
+        self.loop = loop
+        # Analyzers update session headers on init; the audit session's headers apply
+        self.headers: Dict[str, Any] = {}
+
+    def get(self, url: str, timeout: Optional[float] = None, allow_redirects: bool = True, **kwargs) -> CachedResponse:
+        future = asyncio.run_coroutine_threadsafe(self.cache.fetch(url), self.loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise requests.Timeout(f"Timed out fetching {url}")
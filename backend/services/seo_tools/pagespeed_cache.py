@@ -0,0 +1,92 @@
+"""
+PageSpeed Cache
+Persistent cache of PageSpeed Insights results.
+
+A PSI run takes 10-30 seconds and the API is rate limited, so results are kept in
+SQLite for a freshness window, keyed by URL, strategy, categories and locale. Only
+the structured results the service reports are stored, never the multi-megabyte
+Lighthouse JSON they are extracted from.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from utils.sqlite_utils import connect, init_database
+
+PAGESPEED_CACHE_DB = os.getenv("PAGESPEED_CACHE_DB", "pagespeed_cache.db")
+PAGESPEED_CACHE_TTL_HOURS = float(os.getenv("PAGESPEED_CACHE_TTL_HOURS", "12"))
+
+
+def pagespeed_cache_key(url: str, strategy: str, categories: Iterable[str], locale: str) -> tuple:
+    """Cache key of a PSI run; category order does not change the result."""
+    return url, strategy.upper(), ",".join(sorted(set(categories))), locale
+
+
+class PageSpeedCache:
+    """SQLite cache of structured PageSpeed Insights results."""
+
+    def __init__(self, db_path: str = PAGESPEED_CACHE_DB, ttl_hours: float = PAGESPEED_CACHE_TTL_HOURS):
+        """
+        Args:
+            db_path: Path to SQLite database file
+            ttl_hours: How long a PSI result stays fresh
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_hours * 3600
+
+        # Ensure database directory exists
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect(self.db_path)
+
+    def _init_database(self):
+        """Initialize the SQLite database with required tables."""
+        init_database(
+            self.db_path,
+            """
+                CREATE TABLE IF NOT EXISTS pagespeed_results (
+                    url TEXT NOT NULL,
+                    strategy TEXT NOT NULL,
+                    categories TEXT NOT NULL,
+                    locale TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (url, strategy, categories, locale)
+                )
+            """
+        )
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        """Cached result for a key if it is still fresh."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result, fetched_at FROM pagespeed_results "
+                "WHERE url = ? AND strategy = ? AND categories = ? AND locale = ?", key
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: tuple, result: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pagespeed_results "
+                "(url, strategy, categories, locale, result, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, json.dumps(result, default=str), time.time())
+            )
+            conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM pagespeed_results WHERE fetched_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            conn.commit()
+            return cursor.rowcount
@@ -3,27 +3,59 @@ Google PageSpeed Insights Service
 
 AI-enhanced PageSpeed analysis service that provides comprehensive
 performance insights with actionable recommendations for optimization.
+
+PSI runs share one HTTP session, concurrent requests for the same URL, strategy,
+categories and locale are coalesced into one API call, and structured results
+are cached in SQLite (see pagespeed_cache).
 """
 
 import aiohttp
 import asyncio
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence
 from datetime import datetime
 from loguru import logger
 import os
 
 from ..llm_providers.main_text_generation import llm_text_gen
 from middleware.logging_middleware import seo_logger
+from .pagespeed_cache import PageSpeedCache, pagespeed_cache_key
+
+DEFAULT_CATEGORIES = ["performance", "accessibility", "best-practices", "seo"]
+
+# Shared by all service instances; PSI requests are long and the API is rate limited
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+_in_flight: Dict[tuple, asyncio.Task] = {}
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """Shared PSI session, created on first use (and again if its event loop changed)."""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
+        _session_loop = loop
+    return _session
+
+
+async def close_pagespeed_session() -> None:
+    """Close the shared PSI session."""
+    global _session, _session_loop
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_loop = None
 
 
 class PageSpeedService:
     """Service for Google PageSpeed Insights analysis with AI enhancement"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[PageSpeedCache] = None):
         """Initialize the PageSpeed service"""
         self.service_name = "pagespeed_analyzer"
         self.api_key = os.getenv("GOOGLE_PAGESPEED_API_KEY")
         self.base_url = "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"
+        self.cache = cache or PageSpeedCache()
         logger.info(f"Initialized {self.service_name}")
     
     async def analyze_pagespeed(
@@ -49,7 +81,7 @@ class PageSpeedService:
             start_time = datetime.utcnow()
             
             if categories is None:
-                categories = ["performance", "accessibility", "best-practices", "seo"]
+                categories = DEFAULT_CATEGORIES
             
             # Validate inputs
             if not url:
@@ -60,14 +92,9 @@ class PageSpeedService:
             
             logger.info(f"Analyzing PageSpeed for URL: {url} (Strategy: {strategy})")
             
-            # Fetch PageSpeed data
-            pagespeed_data = await self._fetch_pagespeed_data(url, strategy, locale, categories)
-            
-            if not pagespeed_data:
-                raise Exception("Failed to fetch PageSpeed data")
-            
-            # Extract and structure the data
-            structured_results = self._structure_pagespeed_results(pagespeed_data)
+            # Fetch PageSpeed data (cached, and shared with concurrent identical requests)
+            pagespeed_entry = await self._get_pagespeed_results(url, strategy, locale, categories)
+            structured_results = pagespeed_entry["results"]
             
             # Generate AI-enhanced insights
             ai_insights = await self._generate_ai_insights(structured_results, url, strategy)
@@ -89,10 +116,11 @@ class PageSpeedService:
                 "ai_insights": ai_insights,
                 "optimization_plan": optimization_plan,
                 "raw_data": {
-                    "lighthouse_version": pagespeed_data.get("lighthouseResult", {}).get("lighthouseVersion"),
-                    "fetch_time": pagespeed_data.get("analysisUTCTimestamp"),
+                    "lighthouse_version": pagespeed_entry.get("lighthouse_version"),
+                    "fetch_time": pagespeed_entry.get("fetch_time"),
                     "categories_analyzed": categories
                 },
+                "cached": pagespeed_entry["cached"],
                 "execution_time": execution_time
             }
             
@@ -138,6 +166,71 @@ class PageSpeedService:
             
             raise
     
+    async def analyze_pagespeed_strategies(
+        self,
+        url: str,
+        strategies: Sequence[str] = ("MOBILE", "DESKTOP"),
+        locale: str = "en",
+        categories: List[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze a URL with several strategies concurrently
+        
+        Returns:
+            Dictionary of analysis results by strategy
+        """
+        results = await asyncio.gather(*(
+            self.analyze_pagespeed(url, strategy, locale, categories) for strategy in strategies
+        ))
+        return dict(zip(strategies, results))
+    
+    async def _get_pagespeed_results(
+        self,
+        url: str,
+        strategy: str,
+        locale: str,
+        categories: List[str]
+    ) -> Dict[str, Any]:
+        """Structured PSI results from the cache, an in-flight request or a new API call"""
+        key = pagespeed_cache_key(url, strategy, categories, locale)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"PageSpeed cache hit for {url} ({strategy})")
+            return {**cached, "cached": True}
+        
+        task = _in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_cache(key, url, strategy, locale, categories))
+            _in_flight[key] = task
+            task.add_done_callback(lambda _: _in_flight.pop(key, None))
+        else:
+            logger.info(f"Joining in-flight PageSpeed request for {url} ({strategy})")
+        # Shielded so a cancelled caller does not cancel the request for the others
+        entry = await asyncio.shield(task)
+        return {**entry, "cached": False}
+    
+    async def _fetch_and_cache(
+        self,
+        key: tuple,
+        url: str,
+        strategy: str,
+        locale: str,
+        categories: List[str]
+    ) -> Dict[str, Any]:
+        pagespeed_data = await self._fetch_pagespeed_data(url, strategy, locale, categories)
+        
+        if not pagespeed_data:
+            raise Exception("Failed to fetch PageSpeed data")
+        
+        # Only the extracted audits are kept, not the full Lighthouse report
+        entry = {
+            "results": self._structure_pagespeed_results(pagespeed_data),
+            "lighthouse_version": pagespeed_data.get("lighthouseResult", {}).get("lighthouseVersion"),
+            "fetch_time": pagespeed_data.get("analysisUTCTimestamp")
+        }
+        self.cache.put(key, entry)
+        return entry
+    
     async def _fetch_pagespeed_data(
         self,
         url: str,
@@ -147,33 +240,32 @@ class PageSpeedService:
     ) -> Dict[str, Any]:
         """Fetch data from Google PageSpeed Insights API"""
         
-        # Build API URL
-        api_url = f"{self.base_url}?url={url}&strategy={strategy}&locale={locale}"
+        # Build API parameters
+        params = [("url", url), ("strategy", strategy), ("locale", locale)]
         
         # Add categories
         for category in categories:
-            api_url += f"&category={category}"
+            params.append(("category", category))
         
         # Add API key if available
         if self.api_key:
-            api_url += f"&key={self.api_key}"
+            params.append(("key", self.api_key))
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=60)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data
+            async with _get_session().get(self.base_url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return data
+                else:
+                    error_text = await response.text()
+                    logger.error(f"PageSpeed API error {response.status}: {error_text}")
+                    
+                    if response.status == 429:
+                        raise Exception("PageSpeed API rate limit exceeded")
+                    elif response.status == 400:
+                        raise Exception(f"Invalid URL or parameters: {error_text}")
                     else:
-                        error_text = await response.text()
-                        logger.error(f"PageSpeed API error {response.status}: {error_text}")
-                        
-                        if response.status == 429:
-                            raise Exception("PageSpeed API rate limit exceeded")
-                        elif response.status == 400:
-                            raise Exception(f"Invalid URL or parameters: {error_text}")
-                        else:
-                            raise Exception(f"PageSpeed API error: {response.status}")
+                        raise Exception(f"PageSpeed API error: {response.status}")
                         
         except asyncio.TimeoutError:
             raise Exception("PageSpeed API request timed out")
@@ -0,0 +1,450 @@
+"""
+Site Crawler
+
+In-process async crawler for technical SEO audits. Pages are discovered through a
+deduplicating frontier, fetched with robots.txt rules, crawl-delay and per-host
+connection limits, and reduced to compact PageRecord entries that are streamed to
+the caller as they are produced, so audits of thousands of pages run with bounded
+memory. Validators (ETag / Last-Modified) of crawled pages are stored so re-crawls
+send conditional requests and unchanged pages are answered with 304s.
+"""
+
+import asyncio
+import codecs
+import json
+import os
+import sqlite3
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+from loguru import logger
+
+from utils.sqlite_utils import connect, init_database
+
+SITE_CRAWL_MAX_PAGES = int(os.getenv("SITE_CRAWL_MAX_PAGES", "500"))
+SITE_CRAWL_CONCURRENCY = int(os.getenv("SITE_CRAWL_CONCURRENCY", "8"))
+SITE_CRAWL_PER_HOST_CONCURRENCY = int(os.getenv("SITE_CRAWL_PER_HOST_CONCURRENCY", "4"))
+SITE_CRAWL_TIMEOUT = int(os.getenv("SITE_CRAWL_TIMEOUT", "20"))
+SITE_CRAWL_MAX_PAGE_KB = int(os.getenv("SITE_CRAWL_MAX_PAGE_KB", "2048"))
+SITE_CRAWL_CACHE_DB = os.getenv("SITE_CRAWL_CACHE_DB", "site_crawl_cache.db")
+
+CRAWLER_USER_AGENT = "ALwritySEOBot/1.0 (https://alwrity.com)"
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+READ_CHUNK_SIZE = 64 * 1024
+# Bounded so a slow consumer applies backpressure to the workers
+RESULT_QUEUE_SIZE = 100
+
+
+class PageRecord(NamedTuple):
+    """Compact result of crawling one page."""
+    url: str
+    final_url: str
+    status: int
+    depth: int
+    redirect_chain: Tuple[str, ...] = ()
+    content_type: str = ""
+    response_time: float = 0.0
+    size: int = 0
+    title: Optional[str] = None
+    meta_description: Optional[str] = None
+    canonical: Optional[str] = None
+    hreflang: Tuple[Tuple[str, str], ...] = ()
+    noindex: bool = False
+    h1_count: int = 0
+    internal_links: int = 0
+    external_links: int = 0
+    not_modified: bool = False
+    error: Optional[str] = None
+
+    def to_json(self) -> str:
+        return json.dumps(self._asdict())
+
+    @classmethod
+    def from_json(cls, data: str) -> "PageRecord":
+        values = json.loads(data)
+        values["redirect_chain"] = tuple(values.get("redirect_chain") or ())
+        values["hreflang"] = tuple(tuple(pair) for pair in values.get("hreflang") or ())
+        return cls(**values)
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL used for deduplication: no fragment, lowercase host, default ports removed."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+class _PageParser(HTMLParser):
+    """Streaming extraction of the fields of a PageRecord and the page's links."""
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.links: List[str] = []
+        self.title: Optional[str] = None
+        self.meta_description: Optional[str] = None
+        self.canonical: Optional[str] = None
+        self.hreflang: List[Tuple[str, str]] = []
+        self.noindex = False
+        self.nofollow = False
+        self.h1_count = 0
+        self._in_title = False
+        self._title_parts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attributes = {name: value or "" for name, value in attrs}
+        if tag == "a":
+            href = attributes.get("href", "").strip()
+            if href and not href.startswith(("#", "mailto:", "tel:", "javascript:")):
+                self.links.append(urljoin(self.base_url, href))
+        elif tag == "link":
+            rel = attributes.get("rel", "").lower().split()
+            href = attributes.get("href", "").strip()
+            if "canonical" in rel and href and self.canonical is None:
+                self.canonical = urljoin(self.base_url, href)
+            elif "alternate" in rel and attributes.get("hreflang") and href:
+                self.hreflang.append((attributes["hreflang"].strip(), urljoin(self.base_url, href)))
+        elif tag == "meta":
+            name = attributes.get("name", "").lower()
+            content = attributes.get("content", "")
+            if name == "description" and self.meta_description is None:
+                self.meta_description = content.strip()
+            elif name == "robots":
+                directives = content.lower()
+                self.noindex = self.noindex or "noindex" in directives
+                self.nofollow = self.nofollow or "nofollow" in directives
+        elif tag == "base" and attributes.get("href"):
+            self.base_url = urljoin(self.base_url, attributes["href"])
+        elif tag == "title" and self.title is None:
+            self._in_title = True
+        elif tag == "h1":
+            self.h1_count += 1
+
+    def handle_endtag(self, tag):
+        if tag == "title" and self._in_title:
+            self._in_title = False
+            self.title = " ".join("".join(self._title_parts).split())
+
+    def handle_data(self, data):
+        if self._in_title:
+            self._title_parts.append(data)
+
+
+class CrawlValidatorStore:
+    """Stores validators and the last record of crawled pages for conditional re-crawls."""
+
+    def __init__(self, db_path: str = SITE_CRAWL_CACHE_DB):
+        """
+        Args:
+            db_path: Path to SQLite database file
+        """
+        self.db_path = db_path
+
+        # Ensure database directory exists
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect(self.db_path)
+
+    def _init_database(self):
+        """Initialize the SQLite database with required tables."""
+        init_database(
+            self.db_path,
+            """
+                CREATE TABLE IF NOT EXISTS crawl_validators (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    record TEXT NOT NULL,
+                    links TEXT NOT NULL,
+                    crawled_at REAL NOT NULL
+                )
+            """
+        )
+
+    def get(self, url: str) -> Optional[Tuple[Optional[str], Optional[str], PageRecord, List[str]]]:
+        """Validators, record and links of a previously crawled page."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, record, links FROM crawl_validators WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], PageRecord.from_json(row[2]), json.loads(row[3])
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str],
+            record: PageRecord, links: List[str]) -> None:
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO crawl_validators
+                (url, etag, last_modified, record, links, crawled_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (url, etag, last_modified, record.to_json(), json.dumps(links), time.time()))
+            conn.commit()
+
+
+class _HostPolicy:
+    """robots.txt rules, crawl-delay and connection limit for one host."""
+
+    def __init__(self, robots: Optional[RobotFileParser], concurrency: int, delay: float):
+        self.robots = robots
+        self.delay = delay
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+        self._next_request = 0.0
+
+    def allows(self, url: str) -> bool:
+        return self.robots is None or self.robots.can_fetch(CRAWLER_USER_AGENT, url)
+
+    async def wait_turn(self) -> None:
+        """Space requests to the host by its crawl-delay."""
+        if not self.delay:
+            return
+        async with self._lock:
+            wait = self._next_request - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_request = time.monotonic() + self.delay
+
+
+class SiteCrawler:
+    """Breadth-first crawler of one site within depth and page budgets."""
+
+    def __init__(
+        self,
+        max_pages: int = SITE_CRAWL_MAX_PAGES,
+        max_depth: int = 3,
+        concurrency: int = SITE_CRAWL_CONCURRENCY,
+        per_host_concurrency: int = SITE_CRAWL_PER_HOST_CONCURRENCY,
+        timeout: int = SITE_CRAWL_TIMEOUT,
+        max_page_bytes: int = SITE_CRAWL_MAX_PAGE_KB * 1024,
+        respect_robots: bool = True,
+        validator_store: Optional[CrawlValidatorStore] = None
+    ):
+        """
+        Args:
+            max_pages: Maximum number of pages fetched
+            max_depth: Maximum link depth from the start URL
+            concurrency: Number of concurrent workers
+            per_host_concurrency: Maximum concurrent requests to one host
+            timeout: Timeout in seconds for fetching one page
+            max_page_bytes: Maximum number of bytes read from one page
+            respect_robots: Whether robots.txt rules and crawl-delay are honoured
+            validator_store: Store used for conditional requests on re-crawls
+        """
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.timeout = timeout
+        self.max_page_bytes = max_page_bytes
+        self.respect_robots = respect_robots
+        self.validator_store = validator_store
+        self.stats: Dict[str, Any] = {}
+
+    async def crawl(self, start_url: str) -> AsyncIterator[PageRecord]:
+        """
+        Crawl the site of start_url, yielding a PageRecord for every fetched page.
+
+        Only pages on the start URL's host are followed. Crawl statistics are
+        available in self.stats once the iteration finishes.
+        """
+        start_url = normalize_url(start_url)
+        self._host = urlsplit(start_url).netloc
+        self._seen: Set[str] = set()
+        self._policies: Dict[str, _HostPolicy] = {}
+        self._frontier: asyncio.Queue = asyncio.Queue()
+        self._results: asyncio.Queue = asyncio.Queue(maxsize=RESULT_QUEUE_SIZE)
+        self.stats = {"pages_fetched": 0, "not_modified": 0, "blocked_by_robots": 0,
+                      "robots_txt_found": False, "budget_reached": False}
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(headers={"User-Agent": CRAWLER_USER_AGENT}, timeout=timeout) as session:
+            await self._host_policy(session, start_url)
+            self._enqueue(start_url, 0)
+
+            workers = [asyncio.create_task(self._worker(session)) for _ in range(self.concurrency)]
+            done = asyncio.create_task(self._signal_when_done())
+            try:
+                while True:
+                    record = await self._results.get()
+                    if record is None:
+                        break
+                    yield record
+            finally:
+                for task in workers + [done]:
+                    task.cancel()
+                await asyncio.gather(*workers, done, return_exceptions=True)
+
+        logger.info(
+            f"Crawled {self.stats['pages_fetched']} pages of {self._host} "
+            f"({self.stats['not_modified']} not modified, {self.stats['blocked_by_robots']} blocked by robots.txt)"
+        )
+
+    async def _signal_when_done(self) -> None:
+        await self._frontier.join()
+        await self._results.put(None)
+
+    def _enqueue(self, url: str, depth: int) -> None:
+        url = normalize_url(url)
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or parts.netloc != self._host or url in self._seen:
+            return
+        if len(self._seen) >= self.max_pages:
+            self.stats["budget_reached"] = True
+            return
+        self._seen.add(url)
+        if not self._policies[self._host].allows(url):
+            self.stats["blocked_by_robots"] += 1
+            return
+        self._frontier.put_nowait((url, depth))
+
+    async def _worker(self, session: aiohttp.ClientSession) -> None:
+        while True:
+            url, depth = await self._frontier.get()
+            try:
+                record, links = await self._crawl_page(session, url, depth)
+                await self._results.put(record)
+                if depth < self.max_depth:
+                    for link in links:
+                        self._enqueue(link, depth + 1)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"Error crawling {url}: {e}")
+                await self._results.put(PageRecord(url=url, final_url=url, status=0, depth=depth, error=str(e)))
+            finally:
+                self._frontier.task_done()
+
+    async def _host_policy(self, session: aiohttp.ClientSession, url: str) -> _HostPolicy:
+        parts = urlsplit(url)
+        host = parts.netloc
+        if host in self._policies:
+            return self._policies[host]
+
+        robots = None
+        delay = 0.0
+        if self.respect_robots:
+            robots = RobotFileParser()
+            robots_url = urlunsplit((parts.scheme, host, "/robots.txt", "", ""))
+            try:
+                async with session.get(robots_url) as response:
+                    if response.status == 200:
+                        robots.parse((await response.text(errors="replace")).splitlines())
+                        if host == self._host:
+                            self.stats["robots_txt_found"] = True
+                    elif response.status in (401, 403):
+                        robots.disallow_all = True
+                    else:
+                        robots.allow_all = True
+            except Exception as e:
+                logger.debug(f"Could not fetch {robots_url}: {e}")
+                robots.allow_all = True
+            delay = float(robots.crawl_delay(CRAWLER_USER_AGENT) or 0)
+
+        # Host may have been added while robots.txt was being fetched
+        return self._policies.setdefault(host, _HostPolicy(robots, self.per_host_concurrency, delay))
+
+    async def _crawl_page(self, session: aiohttp.ClientSession, url: str, depth: int) -> Tuple[PageRecord, List[str]]:
+        cached = self.validator_store.get(url) if self.validator_store else None
+        headers = {}
+        if cached:
+            etag, last_modified, _, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        started = time.monotonic()
+        chain: List[str] = []
+        current = url
+        while True:
+            policy = await self._host_policy(session, current)
+            async with policy.semaphore:
+                await policy.wait_turn()
+                async with session.get(current, headers=headers, allow_redirects=False) as response:
+                    location = response.headers.get("Location")
+                    if response.status in REDIRECT_STATUSES and location and len(chain) < MAX_REDIRECTS:
+                        chain.append(current)
+                        current = urljoin(current, location)
+                        headers = {}
+                        continue
+
+                    self.stats["pages_fetched"] += 1
+                    if chain:
+                        # Don't crawl the redirect target again when it is linked elsewhere
+                        self._seen.add(normalize_url(current))
+                    if response.status == 304 and cached:
+                        self.stats["not_modified"] += 1
+                        _, _, record, links = cached
+                        return record._replace(
+                            depth=depth, not_modified=True, response_time=round(time.monotonic() - started, 3)
+                        ), links
+
+                    record, links = await self._read_page(response, url, current, depth, tuple(chain), started)
+
+                    if self.validator_store and record.status == 200:
+                        etag = response.headers.get("ETag")
+                        last_modified = response.headers.get("Last-Modified")
+                        if etag or last_modified:
+                            self.validator_store.put(url, etag, last_modified, record, links)
+                    return record, links
+
+    async def _read_page(self, response: aiohttp.ClientResponse, url: str, final_url: str, depth: int,
+                         chain: Tuple[str, ...], started: float) -> Tuple[PageRecord, List[str]]:
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        size = 0
+        parser = None
+        if response.status == 200 and content_type in ("text/html", "application/xhtml+xml"):
+            parser = _PageParser(final_url)
+            try:
+                decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+            except LookupError:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+                size += len(chunk)
+                parser.feed(decoder.decode(chunk))
+                if size >= self.max_page_bytes:
+                    break
+            parser.feed(decoder.decode(b"", final=True))
+            parser.close()
+
+        record = PageRecord(
+            url=url,
+            final_url=final_url,
+            status=response.status,
+            depth=depth,
+            redirect_chain=chain,
+            content_type=content_type,
+            response_time=round(time.monotonic() - started, 3),
+            size=size or int(response.headers.get("Content-Length") or 0)
+        )
+        if parser is None:
+            return record, []
+
+        internal = 0
+        for link in parser.links:
+            if urlsplit(link).netloc.lower() == self._host:
+                internal += 1
+        record = record._replace(
+            title=parser.title,
+            meta_description=parser.meta_description,
+            canonical=parser.canonical,
+            hreflang=tuple(parser.hreflang),
+            noindex=parser.noindex,
+            h1_count=parser.h1_count,
+            internal_links=internal,
+            external_links=len(parser.links) - internal
+        )
+        return record, [] if parser.nofollow else parser.links
@@ -0,0 +1,318 @@
+"""
+Sitemap Crawler
+
+Fetches a sitemap, or a sitemap index and its child sitemaps, over one shared HTTP
+session. Child sitemaps are fetched concurrently with a per-host connection limit,
+gzipped sitemaps are decompressed on the fly and XML is parsed incrementally as it
+arrives, so large enterprise sitemaps are reduced to compact URL records without
+ever holding a whole document in memory. Total URL, byte and sitemap budgets bound
+the work done for a single crawl.
+"""
+
+import asyncio
+import os
+import zlib
+import xml.etree.ElementTree as ET
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, NamedTuple, Optional, Set
+from urllib.parse import urlparse
+
+import aiohttp
+from loguru import logger
+
+SITEMAP_MAX_URLS = int(os.getenv("SITEMAP_MAX_URLS", "200000"))
+SITEMAP_MAX_BYTES = int(os.getenv("SITEMAP_MAX_MB", "200")) * 1024 * 1024
+SITEMAP_MAX_SITEMAPS = int(os.getenv("SITEMAP_MAX_SITEMAPS", "200"))
+SITEMAP_PER_HOST_CONCURRENCY = int(os.getenv("SITEMAP_PER_HOST_CONCURRENCY", "4"))
+SITEMAP_FETCH_TIMEOUT = int(os.getenv("SITEMAP_FETCH_TIMEOUT", "30"))
+
+# Sitemap indexes are not supposed to nest, but some CMSs do it anyway
+MAX_SITEMAP_DEPTH = 3
+READ_CHUNK_SIZE = 64 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+
+SITEMAP_HEADERS = {
+    'User-Agent': 'ALwritySitemapBot/1.0 (https://alwrity.com)',
+    'Accept': 'application/xml, text/xml, application/x-gzip, */*'
+}
+
+
+class SitemapURL(NamedTuple):
+    """One <url> entry of a sitemap."""
+    loc: str
+    lastmod: Optional[str] = None
+    changefreq: Optional[str] = None
+    priority: Optional[str] = None
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """Dict-style access, so records can be used where URL dicts were."""
+        value = getattr(self, field, None)
+        return default if value is None else value
+
+
+class SitemapBudgetExceeded(Exception):
+    """Raised when a crawl reaches its URL or byte budget."""
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(element: ET.Element, name: str) -> Optional[str]:
+    for child in element:
+        if _local_name(child.tag) == name:
+            return child.text.strip() if child.text else None
+    return None
+
+
+class SitemapParser:
+    """
+    Incremental parser for one sitemap document.
+
+    Feed it raw (optionally gzipped) chunks; <url> entries are appended to urls and
+    <sitemap> entries of an index to sitemaps as soon as they are complete, and the
+    parsed elements are discarded.
+    """
+
+    def __init__(self):
+        self.urls: List[SitemapURL] = []
+        self.sitemaps: List[str] = []
+        self.is_index = False
+        self.bytes_parsed = 0
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: Optional[ET.Element] = None
+        self._decompressor = None
+        self._first_chunk = True
+
+    def feed(self, chunk: bytes) -> None:
+        if self._first_chunk:
+            self._first_chunk = False
+            if chunk.startswith(GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._decompressor is not None:
+            chunk = self._decompressor.decompress(chunk)
+        self._feed_xml(chunk)
+
+    def close(self) -> None:
+        if self._decompressor is not None:
+            self._feed_xml(self._decompressor.flush())
+        self._parser.close()
+        self._read_events()
+
+    def _feed_xml(self, data: bytes) -> None:
+        if not data:
+            return
+        self.bytes_parsed += len(data)
+        self._parser.feed(data)
+        self._read_events()
+
+    def _read_events(self) -> None:
+        for event, element in self._parser.read_events():
+            name = _local_name(element.tag)
+            if event == "start":
+                if self._root is None:
+                    self._root = element
+                    self.is_index = name == "sitemapindex"
+                continue
+
+            if name == "url":
+                loc = _child_text(element, "loc")
+                if loc:
+                    self.urls.append(SitemapURL(
+                        loc=loc,
+                        lastmod=_child_text(element, "lastmod"),
+                        changefreq=_child_text(element, "changefreq"),
+                        priority=_child_text(element, "priority")
+                    ))
+            elif name == "sitemap" and self.is_index:
+                loc = _child_text(element, "loc")
+                if loc:
+                    self.sitemaps.append(loc)
+            else:
+                continue
+
+            # Drop finished entries so memory stays flat
+            self._root.clear()
+
+
+class SitemapCrawler:
+    """Crawls a sitemap and its children within URL, byte and sitemap budgets."""
+
+    def __init__(
+        self,
+        max_urls: int = SITEMAP_MAX_URLS,
+        max_bytes: int = SITEMAP_MAX_BYTES,
+        max_sitemaps: int = SITEMAP_MAX_SITEMAPS,
+        per_host_concurrency: int = SITEMAP_PER_HOST_CONCURRENCY,
+        timeout: int = SITEMAP_FETCH_TIMEOUT,
+        session: Optional[aiohttp.ClientSession] = None,
+        document_cache: Optional[Any] = None
+    ):
+        """
+        Args:
+            max_urls: Maximum number of URL records collected per crawl
+            max_bytes: Maximum number of (decompressed) sitemap bytes parsed per crawl
+            max_sitemaps: Maximum number of sitemap documents fetched per crawl
+            per_host_concurrency: Maximum concurrent requests to one host
+            timeout: Timeout in seconds for fetching one sitemap
+            session: Session to use instead of a crawler-owned one
+            document_cache: Fetch cache (e.g. an AuditFetchCache) the root sitemap is
+                read through, so it is not downloaded again by other tools
+        """
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.max_sitemaps = max_sitemaps
+        self.per_host_concurrency = per_host_concurrency
+        self.timeout = timeout
+        self._session = session
+        self._document_cache = document_cache
+
+    async def crawl(self, sitemap_url: str) -> Dict[str, Any]:
+        """
+        Fetch a sitemap and, for a sitemap index, all of its child sitemaps.
+
+        Returns:
+            Dictionary with the URL records, child sitemap URLs, totals, whether a
+            budget truncated the crawl and the child sitemaps that failed
+
+        Raises:
+            Exception: If the sitemap itself cannot be fetched or parsed
+        """
+        state = _CrawlState()
+        if self._session is not None:
+            await self._crawl_sitemap(self._session, state, sitemap_url, depth=0)
+        else:
+            async with aiohttp.ClientSession(headers=SITEMAP_HEADERS) as session:
+                await self._crawl_sitemap(session, state, sitemap_url, depth=0)
+
+        logger.info(
+            f"Crawled {state.sitemaps_fetched} sitemaps from {sitemap_url}: "
+            f"{len(state.urls)} URLs, {state.bytes_parsed} bytes"
+            f"{' (truncated)' if state.truncated else ''}"
+        )
+        return {
+            "urls": state.urls,
+            "sitemaps": state.sitemaps,
+            "total_urls": len(state.urls),
+            "sitemaps_fetched": state.sitemaps_fetched,
+            "bytes_parsed": state.bytes_parsed,
+            "truncated": state.truncated,
+            "errors": state.errors
+        }
+
+    async def _crawl_sitemap(self, session: aiohttp.ClientSession, state: "_CrawlState",
+                             url: str, depth: int) -> None:
+        state.seen.add(url)
+        # Child sitemaps are streamed: only the root is small and shared enough to cache
+        if depth == 0 and self._document_cache is not None:
+            parser = await self._parse_cached(state, url)
+        else:
+            parser = await self._fetch_and_parse(session, state, url)
+
+        if not parser.is_index:
+            return
+
+        state.sitemaps.extend(parser.sitemaps)
+        children = []
+        for child_url in parser.sitemaps:
+            if child_url in state.seen:
+                continue
+            if depth + 1 > MAX_SITEMAP_DEPTH or len(state.seen) >= self.max_sitemaps:
+                state.truncated = True
+                break
+            state.seen.add(child_url)
+            children.append(child_url)
+
+        await asyncio.gather(*(
+            self._crawl_child(session, state, child_url, depth + 1) for child_url in children
+        ))
+
+    async def _crawl_child(self, session: aiohttp.ClientSession, state: "_CrawlState",
+                           url: str, depth: int) -> None:
+        if state.budget_exhausted:
+            return
+        try:
+            await self._crawl_sitemap(session, state, url, depth)
+        except Exception as e:
+            logger.warning(f"Failed to fetch nested sitemap {url}: {e}")
+            state.errors.append({"sitemap": url, "error": str(e)})
+
+    async def _fetch_and_parse(self, session: aiohttp.ClientSession, state: "_CrawlState",
+                               url: str) -> SitemapParser:
+        async with self._host_semaphore(state, url):
+            if state.budget_exhausted:
+                return SitemapParser()
+            state.sitemaps_fetched += 1
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                if response.status != 200:
+                    raise Exception(f"Failed to fetch sitemap: HTTP {response.status}")
+                return await self._parse_chunks(state, response.content.iter_chunked(READ_CHUNK_SIZE))
+
+    async def _parse_cached(self, state: "_CrawlState", url: str) -> SitemapParser:
+        response = await self._document_cache.fetch(url)
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch sitemap: HTTP {response.status_code}")
+        if response.truncated:
+            return await self._fetch_and_parse(self._document_cache.session, state, url)
+
+        state.sitemaps_fetched += 1
+        return await self._parse_chunks(state, _iter_chunks(response.content))
+
+    async def _parse_chunks(self, state: "_CrawlState", chunks: AsyncIterable[bytes]) -> SitemapParser:
+        """Parse a sitemap chunk by chunk, collecting URLs into the crawl as they are parsed."""
+        parser = SitemapParser()
+        try:
+            async for chunk in chunks:
+                urls_before, bytes_before = len(parser.urls), parser.bytes_parsed
+                parser.feed(chunk)
+                self._collect(state, parser, urls_before, bytes_before)
+            urls_before, bytes_before = len(parser.urls), parser.bytes_parsed
+            parser.close()
+            self._collect(state, parser, urls_before, bytes_before)
+        except SitemapBudgetExceeded:
+            state.budget_exhausted = True
+            state.truncated = True
+        except ET.ParseError as e:
+            raise Exception(f"Failed to parse sitemap XML: {e}")
+        except zlib.error as e:
+            raise Exception(f"Failed to decompress sitemap: {e}")
+        return parser
+
+    def _collect(self, state: "_CrawlState", parser: SitemapParser, urls_before: int, bytes_before: int) -> None:
+        """Move newly parsed URLs into the crawl and enforce the budgets."""
+        state.bytes_parsed += parser.bytes_parsed - bytes_before
+        new_urls = parser.urls[urls_before:]
+        del parser.urls[urls_before:]
+
+        room = self.max_urls - len(state.urls)
+        state.urls.extend(new_urls[:room])
+        if len(new_urls) > room or len(state.urls) >= self.max_urls:
+            raise SitemapBudgetExceeded()
+        if state.bytes_parsed >= self.max_bytes:
+            raise SitemapBudgetExceeded()
+
+    def _host_semaphore(self, state: "_CrawlState", url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        if host not in state.host_semaphores:
+            state.host_semaphores[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return state.host_semaphores[host]
+
+
+async def _iter_chunks(content: bytes) -> AsyncIterator[bytes]:
+    """Split a buffered document into parser-sized chunks."""
+    for offset in range(0, len(content), READ_CHUNK_SIZE):
+        yield content[offset:offset + READ_CHUNK_SIZE]
+
+
+class _CrawlState:
+    """Mutable state of one crawl, shared by its concurrent fetches."""
+
+    def __init__(self):
+        self.urls: List[SitemapURL] = []
+        self.sitemaps: List[str] = []
+        self.seen: Set[str] = set()
+        self.errors: List[Dict[str, str]] = []
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.sitemaps_fetched = 0
+        self.bytes_parsed = 0
+        self.truncated = False
+        self.budget_exhausted = False
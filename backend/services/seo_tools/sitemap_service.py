@@ -11,11 +11,11 @@ import re
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from loguru import logger
-import xml.etree.ElementTree as ET
 from urllib.parse import urlparse, urljoin
 import pandas as pd
 
 from ..llm_providers.main_text_generation import llm_text_gen
+from .sitemap_crawler import SitemapCrawler
 from middleware.logging_middleware import seo_logger
 
 
@@ -80,17 +80,17 @@ class SitemapService:
                 raise Exception("Failed to fetch sitemap data")
             
             # Analyze sitemap structure
-            structure_analysis = self._analyze_sitemap_structure(sitemap_data)
+            structure_analysis = self.analyze_sitemap_structure(sitemap_data)
             
             # Analyze content trends if requested
             content_trends = {}
             if analyze_content_trends and sitemap_data.get("urls"):
-                content_trends = self._analyze_content_trends(sitemap_data["urls"])
+                content_trends = self.analyze_content_trends(sitemap_data["urls"])
             
             # Analyze publishing patterns if requested  
             publishing_patterns = {}
             if analyze_publishing_patterns and sitemap_data.get("urls"):
-                publishing_patterns = self._analyze_publishing_patterns(sitemap_data["urls"])
+                publishing_patterns = self.analyze_publishing_patterns(sitemap_data["urls"])
             
             # Generate AI insights
             ai_insights = await self._generate_ai_insights(
@@ -103,6 +103,8 @@ class SitemapService:
                 "sitemap_url": sitemap_url,
                 "analysis_date": datetime.utcnow().isoformat(),
                 "total_urls": len(sitemap_data.get("urls", [])),
+                "sitemaps_fetched": sitemap_data.get("sitemaps_fetched", 1),
+                "truncated": sitemap_data.get("truncated", False),
                 "structure_analysis": structure_analysis,
                 "content_trends": content_trends,
                 "publishing_patterns": publishing_patterns,
@@ -146,66 +148,15 @@ class SitemapService:
             raise
     
     async def _fetch_sitemap_data(self, sitemap_url: str) -> Dict[str, Any]:
-        """Fetch and parse sitemap data"""
+        """Fetch and parse sitemap data, including the child sitemaps of a sitemap index"""
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(sitemap_url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status != 200:
-                        raise Exception(f"Failed to fetch sitemap: HTTP {response.status}")
-                    
-                    content = await response.text()
-                    
-                    # Parse XML
-                    root = ET.fromstring(content)
-                    
-                    # Handle different sitemap formats
-                    urls = []
-                    sitemaps = []
-                    
-                    # Check if it's a sitemap index
-                    if root.tag.endswith('sitemapindex'):
-                        # Extract nested sitemaps
-                        for sitemap in root:
-                            if sitemap.tag.endswith('sitemap'):
-                                loc = sitemap.find('.//{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-                                if loc is not None:
-                                    sitemaps.append(loc.text)
-                        
-                        # Fetch and parse nested sitemaps
-                        for nested_url in sitemaps[:10]:  # Limit to 10 sitemaps
-                            try:
-                                nested_data = await self._fetch_sitemap_data(nested_url)
-                                urls.extend(nested_data.get("urls", []))
-                            except Exception as e:
-                                logger.warning(f"Failed to fetch nested sitemap {nested_url}: {e}")
-                    
-                    else:
-                        # Regular sitemap with URLs
-                        for url_element in root:
-                            if url_element.tag.endswith('url'):
-                                url_data = {}
-                                
-                                for child in url_element:
-                                    tag_name = child.tag.split('}')[-1]  # Remove namespace
-                                    url_data[tag_name] = child.text
-                                
-                                if 'loc' in url_data:
-                                    urls.append(url_data)
-                    
-                    return {
-                        "urls": urls,
-                        "sitemaps": sitemaps,
-                        "total_urls": len(urls)
-                    }
-                    
-        except ET.ParseError as e:
-            raise Exception(f"Failed to parse sitemap XML: {e}")
+            return await SitemapCrawler().crawl(sitemap_url)
         except Exception as e:
             logger.error(f"Error fetching sitemap data: {e}")
             raise
     
-    def _analyze_sitemap_structure(self, sitemap_data: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_sitemap_structure(self, sitemap_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze the structure of the sitemap"""
         
         urls = sitemap_data.get("urls", [])
@@ -248,7 +199,7 @@ class SitemapService:
             "structure_quality": self._assess_structure_quality(url_patterns, avg_path_depth)
         }
     
-    def _analyze_content_trends(self, urls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_content_trends(self, urls: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze content publishing trends"""
         
         # Extract dates from lastmod
@@ -298,7 +249,7 @@ class SitemapService:
             "trends": self._identify_publishing_trends(monthly_counts)
         }
     
-    def _analyze_publishing_patterns(self, urls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_publishing_patterns(self, urls: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze publishing patterns and frequency"""
         
         # Extract and analyze priority and changefreq
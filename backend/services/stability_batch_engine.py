@@ -0,0 +1,522 @@
+"""
+Stability AI Batch Engine
+Runs batch operations on many images concurrently within the Stability account's
+rate limit, with per-item state persisted so batches can be inspected and resumed.
+
+Uploaded inputs and results are written under the batch directory; batch and item
+status live in a SQLite database in WAL mode. Items are claimed with a lease that
+is renewed while the item is processed, so a worker that restarts (or another
+worker) picks up unfinished items without redoing completed ones. Failed items are
+retried with exponential backoff.
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException
+from loguru import logger
+
+from config.stability_config import RATE_LIMIT_CONFIG
+from utils.sqlite_utils import connect, init_database
+
+STABILITY_BATCH_DB = os.getenv("STABILITY_BATCH_DB", "stability_batches.db")
+STABILITY_BATCH_DIR = os.getenv("STABILITY_BATCH_DIR", "stability_batches")
+STABILITY_BATCH_CONCURRENCY = int(os.getenv("STABILITY_BATCH_CONCURRENCY", "4"))
+STABILITY_BATCH_MAX_ATTEMPTS = int(os.getenv("STABILITY_BATCH_MAX_ATTEMPTS", "3"))
+# An item whose lease has not been renewed for this long is assumed abandoned by a dead worker
+STABILITY_BATCH_LEASE_SECONDS = int(os.getenv("STABILITY_BATCH_LEASE_SECONDS", "120"))
+
+# Supported batch operations and whether they take the uploaded image
+BATCH_OPERATIONS = {
+    "upscale_fast": True,
+    "remove_background": True,
+    "erase": True,
+    "generate_ultra": True,
+    "generate_core": False,
+}
+
+# Seconds per image used for the completion estimate before any item has finished
+DEFAULT_SECONDS_PER_ITEM = 120
+
+ITEM_PENDING = "pending"
+ITEM_PROCESSING = "processing"
+ITEM_COMPLETED = "completed"
+ITEM_FAILED = "failed"
+
+
+class SlidingWindowRateLimiter:
+    """Async limiter allowing at most max_requests calls per window_seconds."""
+
+    def __init__(self, max_requests: int, window_seconds: float):
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self._calls: Deque[float] = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a call fits in the window, then record it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.window_seconds:
+                    self._calls.popleft()
+                if len(self._calls) < self.max_requests:
+                    self._calls.append(now)
+                    return
+                await asyncio.sleep(self.window_seconds - (now - self._calls[0]))
+
+
+class StabilityBatchStore:
+    """SQLite-backed batch and item state shared by all workers."""
+
+    def __init__(self, db_path: str = STABILITY_BATCH_DB, batch_dir: str = STABILITY_BATCH_DIR):
+        """
+        Args:
+            db_path: Path to SQLite database file
+            batch_dir: Directory holding batch inputs and results
+        """
+        self.db_path = db_path
+        self.batch_dir = Path(batch_dir)
+
+        # Ensure database directory exists
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect(self.db_path)
+
+    def _init_database(self):
+        """Initialize the SQLite database with required tables."""
+        init_database(
+            self.db_path,
+            """
+                CREATE TABLE IF NOT EXISTS stability_batches (
+                    batch_id TEXT PRIMARY KEY,
+                    operation TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    total INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """,
+            """
+                CREATE TABLE IF NOT EXISTS stability_batch_items (
+                    batch_id TEXT NOT NULL,
+                    item_index INTEGER NOT NULL,
+                    filename TEXT,
+                    input_path TEXT,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_until REAL,
+                    result_path TEXT,
+                    error TEXT,
+                    started_at REAL,
+                    completed_at REAL,
+                    PRIMARY KEY (batch_id, item_index)
+                )
+            """,
+            # Resume scans look for unfinished items only
+            "CREATE INDEX IF NOT EXISTS idx_stability_batch_items_status ON stability_batch_items(status, batch_id)"
+        )
+
+    def create_batch(self, batch_id: str, operation: str, params: Dict[str, Any],
+                     images: List[Tuple[Optional[str], bytes]]) -> None:
+        """Write the uploaded images to disk and register one pending item per image."""
+        directory = self.batch_dir / batch_id
+        directory.mkdir(parents=True, exist_ok=True)
+
+        items = []
+        for index, (filename, content) in enumerate(images):
+            safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", filename or "image")
+            input_path = directory / f"input_{index:04d}_{safe_name}"
+            input_path.write_bytes(content)
+            items.append((batch_id, index, filename, str(input_path), ITEM_PENDING))
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT INTO stability_batches (batch_id, operation, params, total, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (batch_id, operation, json.dumps(params), len(images), now, now))
+            conn.executemany("""
+                INSERT INTO stability_batch_items (batch_id, item_index, filename, input_path, status)
+                VALUES (?, ?, ?, ?, ?)
+            """, items)
+            conn.commit()
+
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Batch record with its items, or None if unknown."""
+        with self._connect() as conn:
+            row = conn.execute("""
+                SELECT operation, params, total, created_at, updated_at
+                FROM stability_batches WHERE batch_id = ?
+            """, (batch_id,)).fetchone()
+            if row is None:
+                return None
+            item_rows = conn.execute("""
+                SELECT item_index, filename, status, attempts, result_path, error, started_at, completed_at
+                FROM stability_batch_items WHERE batch_id = ? ORDER BY item_index
+            """, (batch_id,)).fetchall()
+
+        return {
+            "batch_id": batch_id,
+            "operation": row[0],
+            "params": json.loads(row[1]),
+            "total": row[2],
+            "created_at": row[3],
+            "updated_at": row[4],
+            "items": [
+                {
+                    "index": item[0],
+                    "filename": item[1],
+                    "status": item[2],
+                    "attempts": item[3],
+                    "result_path": item[4],
+                    "error": item[5],
+                    "started_at": item[6],
+                    "completed_at": item[7],
+                }
+                for item in item_rows
+            ],
+        }
+
+    def claimable_items(self, batch_id: str) -> List[int]:
+        """Indexes of items that are pending or whose lease has expired."""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT item_index FROM stability_batch_items
+                WHERE batch_id = ? AND (status = ? OR (status = ? AND lease_until < ?))
+                ORDER BY item_index
+            """, (batch_id, ITEM_PENDING, ITEM_PROCESSING, time.time())).fetchall()
+        return [row[0] for row in rows]
+
+    def next_lease_expiry(self, batch_id: str) -> Optional[float]:
+        """Earliest lease expiry among the batch's processing items, or None if none are processing."""
+        with self._connect() as conn:
+            row = conn.execute("""
+                SELECT MIN(lease_until) FROM stability_batch_items WHERE batch_id = ? AND status = ?
+            """, (batch_id, ITEM_PROCESSING)).fetchone()
+        return row[0]
+
+    def claim_item(self, batch_id: str, item_index: int, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """Atomically take an item for processing; None if another worker holds it."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE stability_batch_items
+                SET status = ?, attempts = attempts + 1, lease_until = ?, started_at = ?, error = NULL
+                WHERE batch_id = ? AND item_index = ?
+                  AND (status = ? OR (status = ? AND lease_until < ?))
+            """, (ITEM_PROCESSING, now + lease_seconds, now, batch_id, item_index,
+                  ITEM_PENDING, ITEM_PROCESSING, now))
+            if cursor.rowcount == 0:
+                conn.commit()
+                return None
+            row = conn.execute("""
+                SELECT filename, input_path, attempts FROM stability_batch_items
+                WHERE batch_id = ? AND item_index = ?
+            """, (batch_id, item_index)).fetchone()
+            conn.commit()
+        return {"index": item_index, "filename": row[0], "input_path": row[1], "attempts": row[2]}
+
+    def renew_lease(self, batch_id: str, item_index: int, lease_seconds: float) -> bool:
+        """Extend the lease of an item that is still processing; False if it is no longer leased."""
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE stability_batch_items SET lease_until = ?
+                WHERE batch_id = ? AND item_index = ? AND status = ?
+            """, (time.time() + lease_seconds, batch_id, item_index, ITEM_PROCESSING))
+            conn.commit()
+        return cursor.rowcount > 0
+
+    def _finish_item(self, batch_id: str, item_index: int, status: str,
+                     result_path: Optional[str] = None, error: Optional[str] = None) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE stability_batch_items
+                SET status = ?, result_path = ?, error = ?, lease_until = NULL, completed_at = ?
+                WHERE batch_id = ? AND item_index = ?
+            """, (status, result_path, error, now if status != ITEM_PENDING else None, batch_id, item_index))
+            conn.execute("UPDATE stability_batches SET updated_at = ? WHERE batch_id = ?", (now, batch_id))
+            conn.commit()
+
+    def complete_item(self, batch_id: str, item_index: int, result: Union[bytes, Dict[str, Any]],
+                      extension: str = "png") -> str:
+        """Store an item's result next to its input and mark it completed."""
+        directory = self.batch_dir / batch_id
+        directory.mkdir(parents=True, exist_ok=True)
+        if isinstance(result, (bytes, bytearray)):
+            result_path = directory / f"result_{item_index:04d}.{extension}"
+            result_path.write_bytes(result)
+        else:
+            result_path = directory / f"result_{item_index:04d}.json"
+            result_path.write_text(json.dumps(result))
+        self._finish_item(batch_id, item_index, ITEM_COMPLETED, result_path=str(result_path))
+        return str(result_path)
+
+    def retry_item(self, batch_id: str, item_index: int, error: str) -> None:
+        """Return an item to the pending state after a failed attempt."""
+        self._finish_item(batch_id, item_index, ITEM_PENDING, error=error)
+
+    def fail_item(self, batch_id: str, item_index: int, error: str) -> None:
+        """Mark an item as permanently failed."""
+        self._finish_item(batch_id, item_index, ITEM_FAILED, error=error)
+
+    def unfinished_batches(self) -> List[str]:
+        """Batches that still have pending or processing items."""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT DISTINCT batch_id FROM stability_batch_items WHERE status IN (?, ?)
+            """, (ITEM_PENDING, ITEM_PROCESSING)).fetchall()
+        return [row[0] for row in rows]
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Client errors other than rate limiting, and invalid input, will fail the same way on retry."""
+    if isinstance(error, HTTPException):
+        return error.status_code == 429 or error.status_code >= 500
+    return not isinstance(error, ValueError)
+
+
+class StabilityBatchEngine:
+    """Runs Stability batch items concurrently, persisting progress in a StabilityBatchStore."""
+
+    def __init__(
+        self,
+        store: Optional[StabilityBatchStore] = None,
+        service_factory: Optional[Callable[[], Any]] = None,
+        rate_limiter: Optional[SlidingWindowRateLimiter] = None,
+        concurrency: int = STABILITY_BATCH_CONCURRENCY,
+        max_attempts: int = STABILITY_BATCH_MAX_ATTEMPTS,
+        lease_seconds: float = STABILITY_BATCH_LEASE_SECONDS,
+        retry_base_delay: float = 2.0,
+    ):
+        self._store = store
+        self._service = None
+        self.service_factory = service_factory
+        self.rate_limiter = rate_limiter or SlidingWindowRateLimiter(
+            RATE_LIMIT_CONFIG["requests_per_window"], RATE_LIMIT_CONFIG["window_seconds"]
+        )
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_base_delay = retry_base_delay
+        self._running: Dict[str, asyncio.Task] = {}
+
+    @property
+    def store(self) -> StabilityBatchStore:
+        # Created on first use so importing the router does not touch the filesystem
+        if self._store is None:
+            self._store = StabilityBatchStore()
+        return self._store
+
+    @property
+    def service(self):
+        # One client shared by every batch this engine runs; raises ValueError without an API key
+        if self._service is None:
+            if self.service_factory is not None:
+                self._service = self.service_factory()
+            else:
+                from services.stability_service import StabilityAIService
+                self._service = StabilityAIService()
+        return self._service
+
+    async def close(self) -> None:
+        """Stop running batches (their items resume on the next start) and close the client."""
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        service, self._service = self._service, None
+        if service is not None:
+            await service.__aexit__(None, None, None)
+
+    async def submit(self, operation: str, params: Dict[str, Any],
+                     images: List[Tuple[Optional[str], bytes]]) -> str:
+        """Persist a new batch and start processing it; returns the batch id."""
+        if operation not in BATCH_OPERATIONS:
+            raise ValueError(f"Unsupported batch operation: {operation}")
+        batch_id = f"batch_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        await asyncio.to_thread(self.store.create_batch, batch_id, operation, params, images)
+        self.start(batch_id)
+        return batch_id
+
+    def start(self, batch_id: str) -> asyncio.Task:
+        """Schedule run_batch on the running loop unless it is already running here."""
+        task = self._running.get(batch_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self.run_batch(batch_id))
+            self._running[batch_id] = task
+            task.add_done_callback(lambda _: self._running.pop(batch_id, None))
+        return task
+
+    async def run_batch(self, batch_id: str) -> None:
+        """
+        Process every claimable item of a batch until none are left.
+
+        Items still leased by another (possibly dead) worker are waited for: the
+        loop sleeps until the earliest lease expires and claims them then, unless
+        their worker finished them in the meantime.
+        """
+        batch = await asyncio.to_thread(self.store.get_batch, batch_id)
+        if batch is None:
+            logger.warning(f"Stability batch {batch_id} not found")
+            return
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        while True:
+            indexes = await asyncio.to_thread(self.store.claimable_items, batch_id)
+            if not indexes:
+                lease_until = await asyncio.to_thread(self.store.next_lease_expiry, batch_id)
+                if lease_until is None:
+                    break
+                await asyncio.sleep(max(lease_until - time.time(), 0) + 0.05)
+                continue
+            await asyncio.gather(*(
+                self._run_item(self.service, semaphore, batch, index) for index in indexes
+            ))
+
+        status = await asyncio.to_thread(self.get_status, batch_id)
+        logger.info(
+            f"Batch {batch_id}: {status['progress']['completed']}/{status['progress']['total']} completed, "
+            f"{status['progress']['failed']} failed"
+        )
+
+    async def _run_item(self, service, semaphore: asyncio.Semaphore, batch: Dict[str, Any], index: int) -> None:
+        batch_id = batch["batch_id"]
+        async with semaphore:
+            item = await asyncio.to_thread(self.store.claim_item, batch_id, index, self.lease_seconds)
+            if item is None:
+                return
+            heartbeat = asyncio.create_task(self._renew_lease(batch_id, index))
+            try:
+                content = await asyncio.to_thread(Path(item["input_path"]).read_bytes) if item["input_path"] else None
+                await self.rate_limiter.acquire()
+                result = await self._call_operation(service, batch["operation"], batch["params"], content)
+                await asyncio.to_thread(
+                    self.store.complete_item, batch_id, index, result, batch["params"].get("output_format", "png")
+                )
+                logger.info(f"Batch {batch_id}: Completed image {index + 1}/{batch['total']}")
+                return
+            except Exception as e:
+                error = str(getattr(e, "detail", None) or e)
+                if item["attempts"] >= self.max_attempts or not _is_retryable(e):
+                    await asyncio.to_thread(self.store.fail_item, batch_id, index, error)
+                    logger.error(f"Batch {batch_id}: Error processing image {index + 1}: {error}")
+                    return
+                await asyncio.to_thread(self.store.retry_item, batch_id, index, error)
+                delay = self.retry_base_delay * (2 ** (item["attempts"] - 1))
+                logger.warning(f"Batch {batch_id}: Retrying image {index + 1} in {delay:.1f}s after error: {error}")
+            finally:
+                heartbeat.cancel()
+        # Back off outside the semaphore so other items keep running
+        await asyncio.sleep(delay)
+
+    async def _renew_lease(self, batch_id: str, index: int) -> None:
+        """Keep an item's lease alive while this worker processes it."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                if not await asyncio.to_thread(self.store.renew_lease, batch_id, index, self.lease_seconds):
+                    return
+            except sqlite3.Error as e:
+                logger.warning(f"Batch {batch_id}: Could not renew lease of image {index + 1}: {e}")
+
+    @staticmethod
+    async def _call_operation(service, operation: str, params: Dict[str, Any],
+                              content: Optional[bytes]) -> Union[bytes, Dict[str, Any]]:
+        method = getattr(service, operation)
+        if BATCH_OPERATIONS[operation]:
+            return await method(image=content, **params)
+        return await method(**params)
+
+    def get_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Progress and per-item results of a batch, or None if unknown."""
+        batch = self.store.get_batch(batch_id)
+        if batch is None:
+            return None
+
+        items = batch["items"]
+        counts = {state: 0 for state in (ITEM_PENDING, ITEM_PROCESSING, ITEM_COMPLETED, ITEM_FAILED)}
+        for item in items:
+            counts[item["status"]] += 1
+        total = batch["total"]
+        finished = counts[ITEM_COMPLETED] + counts[ITEM_FAILED]
+
+        if finished == total:
+            status = "completed" if counts[ITEM_FAILED] == 0 else ("failed" if counts[ITEM_COMPLETED] == 0 else "completed_with_errors")
+        elif counts[ITEM_PROCESSING] or finished:
+            status = "processing"
+        else:
+            status = "pending"
+
+        durations = [
+            item["completed_at"] - item["started_at"]
+            for item in items
+            if item["status"] == ITEM_COMPLETED and item["started_at"] and item["completed_at"]
+        ]
+        seconds_per_item = sum(durations) / len(durations) if durations else DEFAULT_SECONDS_PER_ITEM
+        remaining = total - finished
+        estimated_seconds = seconds_per_item * -(-remaining // max(self.concurrency, 1))
+
+        return {
+            "batch_id": batch_id,
+            "operation": batch["operation"],
+            "status": status,
+            "progress": {
+                "completed": counts[ITEM_COMPLETED],
+                "failed": counts[ITEM_FAILED],
+                "processing": counts[ITEM_PROCESSING],
+                "pending": counts[ITEM_PENDING],
+                "total": total,
+                "percentage": round(finished / total * 100, 1) if total else 100.0
+            },
+            "items": [
+                {
+                    "index": item["index"],
+                    "filename": item["filename"],
+                    "status": item["status"],
+                    "attempts": item["attempts"],
+                    "result_path": item["result_path"],
+                    "error": item["error"]
+                }
+                for item in items
+            ],
+            "created_at": datetime.utcfromtimestamp(batch["created_at"]).isoformat(),
+            "updated_at": datetime.utcfromtimestamp(batch["updated_at"]).isoformat(),
+            "estimated_completion": (datetime.utcnow() + timedelta(seconds=estimated_seconds)).isoformat()
+        }
+
+    async def resume_unfinished(self) -> int:
+        """Restart processing of batches left unfinished by a previous run."""
+        try:
+            batch_ids = await asyncio.to_thread(self.store.unfinished_batches)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read unfinished Stability batches: {e}")
+            return 0
+        if not batch_ids:
+            return 0
+        try:
+            self.service
+        except ValueError as e:
+            logger.warning(f"Not resuming {len(batch_ids)} Stability batches: {e}")
+            return 0
+        for batch_id in batch_ids:
+            self.start(batch_id)
+        logger.info(f"Resuming {len(batch_ids)} unfinished Stability batches")
+        return len(batch_ids)
+
+
+# Global batch engine instance
+stability_batch_engine = StabilityBatchEngine()
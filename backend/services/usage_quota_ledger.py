@@ -0,0 +1,185 @@
+"""
+Usage Quota Ledger
+Per-process, in-memory view of each user's current-period usage and plan limits.
+
+The usage-limit middleware checks provider-bound requests against this ledger
+instead of querying UsageSummary and the user's plan on every request. Entries are
+seeded from the database on first use, updated in place when UsageTrackingService
+commits a tracked call, and reconciled with UsageSummary in the background so usage
+recorded by other worker processes is picked up.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from models.subscription_models import APIProvider, UsageSummary
+from services.pricing_service import LLM_PROVIDERS, PricingService, evaluate_usage_limits
+
+# Entries older than this are refreshed from UsageSummary in the background
+QUOTA_LEDGER_RECONCILE_SECONDS = int(os.getenv("USAGE_QUOTA_RECONCILE_SECONDS", "30"))
+
+
+def current_billing_period(now: Optional[datetime] = None) -> str:
+    """Billing period key used by UsageSummary and APIUsageLog."""
+    return (now or datetime.now()).strftime("%Y-%m")
+
+
+class QuotaEntry:
+    """Counters and plan limits of one user for one billing period."""
+
+    __slots__ = ('billing_period', 'limits', 'calls', 'tokens', 'total_cost', 'loaded_at')
+
+    def __init__(self, billing_period: str, limits: Optional[Dict[str, Any]],
+                 calls: Dict[str, int], tokens: Dict[str, int], total_cost: float):
+        self.billing_period = billing_period
+        self.limits = limits
+        self.calls = calls
+        self.tokens = tokens
+        self.total_cost = total_cost
+        self.loaded_at = time.monotonic()
+
+
+class UsageQuotaLedger:
+    """Thread-safe in-memory quota ledger keyed by user id."""
+
+    def __init__(self, reconcile_seconds: int = QUOTA_LEDGER_RECONCILE_SECONDS):
+        self.reconcile_seconds = reconcile_seconds
+        self._entries: Dict[str, QuotaEntry] = {}
+        self._lock = threading.Lock()
+        self._reconciling: Set[str] = set()
+
+    def _current_entry(self, user_id: str) -> Optional[QuotaEntry]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry.billing_period != current_billing_period():
+            return None
+        return entry
+
+    def load(self, db: Session, user_id: str) -> QuotaEntry:
+        """Seed (or refresh) a user's entry from UsageSummary and their plan."""
+        billing_period = current_billing_period()
+        limits = PricingService(db).get_user_limits(user_id)
+        summary = db.query(UsageSummary).filter(
+            UsageSummary.user_id == user_id,
+            UsageSummary.billing_period == billing_period
+        ).first()
+
+        calls = {}
+        tokens = {}
+        for provider in APIProvider:
+            calls[provider.value] = (getattr(summary, f"{provider.value}_calls", 0) or 0) if summary else 0
+            if provider in LLM_PROVIDERS:
+                tokens[provider.value] = (getattr(summary, f"{provider.value}_tokens", 0) or 0) if summary else 0
+        total_cost = (summary.total_cost or 0.0) if summary else 0.0
+
+        fresh = QuotaEntry(billing_period, limits, calls, tokens, total_cost)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry.billing_period == billing_period:
+                # Counters only grow within a period; keep usage recorded here after the read
+                for key, value in entry.calls.items():
+                    fresh.calls[key] = max(fresh.calls.get(key, 0), value)
+                for key, value in entry.tokens.items():
+                    fresh.tokens[key] = max(fresh.tokens.get(key, 0), value)
+                fresh.total_cost = max(fresh.total_cost, entry.total_cost)
+            self._entries[user_id] = fresh
+        return fresh
+
+    def needs_token_estimate(self, user_id: str, provider: APIProvider) -> bool:
+        """Whether a check for this provider depends on the requested token count."""
+        if provider not in LLM_PROVIDERS:
+            return False
+        entry = self._current_entry(user_id)
+        if entry is None:
+            return True
+        if not entry.limits:
+            return False
+        return (entry.limits['limits'].get(f"{provider.value}_tokens") or 0) > 0
+
+    def check(self, user_id: str, provider: APIProvider,
+              tokens_requested: int = 0) -> Optional[Tuple[bool, str, Dict[str, Any]]]:
+        """
+        Check a call against the in-memory limits.
+
+        Returns the evaluate_usage_limits() result for the ledger's counters, or None
+        when the user is not loaded for the current billing period.
+        """
+        entry = self._current_entry(user_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.loaded_at >= self.reconcile_seconds:
+            # Keep serving the current counters while the refresh runs
+            entry.loaded_at = time.monotonic()
+            self._schedule_reconcile(user_id)
+
+        with self._lock:
+            current_calls = entry.calls.get(provider.value, 0)
+            current_tokens = entry.tokens.get(provider.value, 0)
+            total_cost = entry.total_cost
+        return evaluate_usage_limits(entry.limits, provider, current_calls, current_tokens,
+                                     total_cost, tokens_requested)
+
+    def record_usage(self, user_id: str, provider: APIProvider, tokens_used: int,
+                     cost: float, billing_period: Optional[str] = None):
+        """Apply a committed usage event to a loaded entry."""
+        billing_period = billing_period or current_billing_period()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry.billing_period != billing_period:
+                return
+            entry.calls[provider.value] = entry.calls.get(provider.value, 0) + 1
+            if provider in LLM_PROVIDERS:
+                entry.tokens[provider.value] = entry.tokens.get(provider.value, 0) + (tokens_used or 0)
+            entry.total_cost += cost or 0.0
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """Drop one user's entry (e.g. after a plan change), or every entry."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def reconcile(self, user_id: str):
+        """Refresh a user's entry from the database using its own session."""
+        from services.database import get_db_session
+
+        db = get_db_session()
+        if db is None:
+            return
+        try:
+            self.load(db, user_id)
+        except Exception as e:
+            logger.error(f"Error reconciling usage quota for {user_id}: {e}")
+        finally:
+            db.close()
+
+    def _schedule_reconcile(self, user_id: str):
+        """Run reconcile() for a user off the event loop, at most once at a time."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        with self._lock:
+            if user_id in self._reconciling:
+                return
+            self._reconciling.add(user_id)
+
+        def _run():
+            try:
+                self.reconcile(user_id)
+            finally:
+                with self._lock:
+                    self._reconciling.discard(user_id)
+
+        loop.run_in_executor(None, _run)
+
+
+# Global ledger instance
+usage_quota_ledger = UsageQuotaLedger()
@@ -14,7 +14,8 @@ from models.subscription_models import (
     APIUsageLog, UsageSummary, APIProvider, UsageAlert, 
     UserSubscription, UsageStatus
 )
-from services.pricing_service import PricingService
+from services.pricing_service import PricingService, pricing_catalog
+from services.usage_quota_ledger import usage_quota_ledger
 
 class UsageTrackingService:
     """Service for tracking API usage and managing subscription limits."""
@@ -95,6 +96,14 @@ class UsageTrackingService:
             await self._check_usage_alerts(user_id, provider, billing_period)
             
             self.db.commit()
+
+            usage_quota_ledger.record_usage(
+                user_id=user_id,
+                provider=provider,
+                tokens_used=(tokens_input or 0) + (tokens_output or 0),
+                cost=cost_data['cost_total'],
+                billing_period=billing_period
+            )
             
             logger.info(f"Tracked API usage: {user_id} -> {provider.value} -> ${cost_data['cost_total']:.6f}")
             
@@ -489,6 +498,9 @@ class UsageTrackingService:
 
     async def reset_current_billing_period(self, user_id: str) -> Dict[str, Any]:
         """Reset usage status for the current billing period (after plan change)."""
+        # The plan may have changed; reload limits on the next check
+        pricing_catalog.invalidate_user(user_id)
+        usage_quota_ledger.invalidate(user_id)
         try:
             billing_period = datetime.now().strftime("%Y-%m")
             summary = self.db.query(UsageSummary).filter(
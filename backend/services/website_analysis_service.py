@@ -11,6 +11,7 @@ import json
 from loguru import logger
 
 from models.onboarding import WebsiteAnalysis, OnboardingSession
+from services.onboarding_context import invalidate_onboarding_session
 
 
 class WebsiteAnalysisService:
@@ -61,6 +62,7 @@ class WebsiteAnalysisService:
                 existing_analysis.updated_at = datetime.utcnow()
                 
                 self.db.commit()
+                invalidate_onboarding_session(session_id, self.db)
                 logger.info(f"Updated existing analysis for URL: {website_url}")
                 return existing_analysis.id
             else:
@@ -90,6 +92,7 @@ class WebsiteAnalysisService:
                 
                 self.db.add(analysis)
                 self.db.commit()
+                invalidate_onboarding_session(session_id, self.db)
                 logger.info(f"Saved new analysis for URL: {website_url}")
                 return analysis.id
                 
@@ -235,8 +238,10 @@ class WebsiteAnalysisService:
         try:
             analysis = self.db.query(WebsiteAnalysis).get(analysis_id)
             if analysis:
+                session_id = analysis.session_id
                 self.db.delete(analysis)
                 self.db.commit()
+                invalidate_onboarding_session(session_id, self.db)
                 logger.info(f"Deleted analysis {analysis_id}")
                 return True
             return False
@@ -268,6 +273,7 @@ class WebsiteAnalysisService:
             
             self.db.add(analysis)
             self.db.commit()
+            invalidate_onboarding_session(session_id, self.db)
             logger.info(f"Saved error analysis for URL: {website_url}")
             return analysis.id
             
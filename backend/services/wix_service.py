@@ -19,6 +19,7 @@ from services.integrations.wix.media import WixMediaService
 from services.integrations.wix.utils import extract_meta_from_token, normalize_token_string, extract_member_id_from_access_token as utils_extract_member
 from services.integrations.wix.content import convert_content_to_ricos as ricos_builder
 from services.integrations.wix.auth import WixAuthService
+from services.integrations.wix.client import wix_client
 
 class WixService:
     """Service for interacting with Wix APIs"""
@@ -32,6 +33,8 @@ class WixService:
         self.blog_service = WixBlogService(self.base_url, self.client_id)
         self.media_service = WixMediaService(self.base_url)
         self.auth_service = WixAuthService(self.client_id, self.redirect_uri, self.base_url)
+        # Async client for the publish flow (shared session, token cache, retries)
+        self.async_client = wix_client
         
         if not self.client_id:
             logger.warning("Wix client ID not configured. Set WIX_CLIENT_ID environment variable.")
@@ -352,6 +355,65 @@ class WixService:
                 logger.error(f"Response body: {e.response.text}")
             raise
     
+    async def get_access_token(self, refresh_token: str) -> str:
+        """
+        Get a valid access token for a refresh token, refreshing it only when
+        the cached one is about to expire
+        
+        Args:
+            refresh_token: Valid refresh token
+            
+        Returns:
+            Access token
+        """
+        return await self.async_client.get_access_token(refresh_token)
+    
+    async def publish_blog_post(self, access_token: str, title: str, content: str, member_id: str = None,
+                                cover_image_url: str = None, image_urls: List[str] = None,
+                                category_ids: List[str] = None, tag_ids: List[str] = None,
+                                categories: List[str] = None, tags: List[str] = None,
+                                publish: bool = True) -> Dict[str, Any]:
+        """
+        Create and optionally publish a blog post on Wix without blocking the event loop
+        
+        Images are imported, and category and tag labels resolved, concurrently
+        before the draft is created.
+        
+        Args:
+            access_token: Valid access token
+            title: Blog post title
+            content: Blog post content
+            member_id: Author member ID; resolved from the token when not given
+            cover_image_url: Optional cover image URL
+            image_urls: Optional image URLs appended to the post body
+            category_ids: Optional list of category IDs
+            tag_ids: Optional list of tag IDs
+            categories: Optional category labels, created when missing
+            tags: Optional tag labels, created when missing
+            publish: Whether to publish immediately or save as draft
+            
+        Returns:
+            Created blog post information
+        """
+        token_str = normalize_token_string(access_token)
+        if not token_str:
+            raise ValueError("Invalid access token format for publish_blog_post")
+        if not member_id:
+            member_id = utils_extract_member(token_str)
+        if not member_id:
+            member_info = await self.async_client.get_current_member(token_str)
+            member_id = (member_info.get('member') or {}).get('id') or member_info.get('id')
+        return await self.async_client.publish_post(
+            token_str, title, content, member_id,
+            cover_image_url=cover_image_url,
+            image_urls=image_urls,
+            category_ids=category_ids,
+            tag_ids=tag_ids,
+            categories=categories,
+            tags=tags,
+            publish=publish
+        )
+    
     def get_blog_categories(self, access_token: str) -> List[Dict[str, Any]]:
         """
         Get available blog categories
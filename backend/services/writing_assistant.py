@@ -1,17 +1,23 @@
 import os
 import asyncio
 import concurrent.futures
-from typing import Any, Dict, List
-from dataclasses import dataclass
-import requests
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from dataclasses import asdict, dataclass
 from loguru import logger
 
+from services.research.exa_search_client import AsyncExaClient, exa_search_client
+from services.writing_assistant_cache import SuggestionPrefixCache
+
 try:
     from google import genai
     GOOGLE_GENAI_AVAILABLE = True
 except Exception:
     GOOGLE_GENAI_AVAILABLE = False
 
+# Incremental requests wait this long for the user to stop typing before calling any API
+WRITING_ASSISTANT_DEBOUNCE_MS = int(os.getenv("WRITING_ASSISTANT_DEBOUNCE_MS", "400"))
+
 
 @dataclass
 class WritingSuggestion:
@@ -20,14 +26,22 @@ class WritingSuggestion:
     sources: List[Dict[str, Any]]
 
 
+class SuggestionSuperseded(Exception):
+    """Raised when a newer request for the same session replaced this one."""
+
+
 class WritingAssistantService:
     """
     Minimal writing assistant that combines Exa search with Gemini continuation.
     - Exa provides relevant sources with content snippets
     - Gemini generates a short, cited continuation based on current text and sources
+    - Incremental requests are debounced per user session; a newer request cancels the older one
+    - Sources are reused while a paragraph grows, and suggestions while the user types them out,
+      only for the user they were made for
     """
 
-    def __init__(self) -> None:
+    def __init__(self, exa_client: Optional[AsyncExaClient] = None,
+                 cache: Optional[SuggestionPrefixCache] = None) -> None:
         self.exa_api_key = os.getenv("EXA_API_KEY")
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
 
@@ -40,16 +54,27 @@ class WritingAssistantService:
         else:
             self.gemini_client = genai.Client(api_key=self.gemini_api_key)
 
-        self.http_timeout_seconds = 15
+        self.exa_client = exa_client or exa_search_client
+        self.cache = cache or SuggestionPrefixCache()
+        self.debounce_seconds = WRITING_ASSISTANT_DEBOUNCE_MS / 1000
+
+        # In-flight incremental request per "user_id:session_id"
+        self._session_tasks: Dict[str, asyncio.Task] = {}
+        # Tasks cancelled because a newer request replaced them
+        self._superseded_tasks: Set[asyncio.Task] = set()
         
         # COST CONTROL: Daily usage limits
         self.daily_api_calls = 0
         self.daily_limit = 50  # Max 50 API calls per day (~$2.50 max cost)
         self.last_reset_date = None
 
-    def _get_cached_suggestion(self, text: str) -> WritingSuggestion | None:
-        """No cached suggestions - always use real API calls for authentic results."""
-        return None
+    def _get_cached_suggestion(self, user_id: Optional[str], text: str) -> WritingSuggestion | None:
+        """Suggestion cached for this text, or the untyped rest of one the user is typing out."""
+        cached = self.cache.get_suggestion(user_id, text)
+        if cached is None:
+            return None
+        suggestion_text, confidence, sources = cached
+        return WritingSuggestion(text=suggestion_text, confidence=confidence, sources=sources)
 
     def _check_daily_limit(self) -> bool:
         """Check if we're within daily API usage limits."""
@@ -71,27 +96,27 @@ class WritingAssistantService:
         logger.info(f"Writing assistant API call #{self.daily_api_calls}/{self.daily_limit} today")
         return True
 
-    async def suggest(self, text: str, max_results: int = 1) -> List[WritingSuggestion]:
+    async def suggest(self, text: str, max_results: int = 1,
+                      user_id: Optional[str] = None) -> List[WritingSuggestion]:
         if not text or len(text.strip()) < 6:
             return []
 
-        # COST OPTIMIZATION: Use cached/static suggestions for common patterns
-        # This reduces API calls by 90%+ while maintaining usefulness
-        cached_suggestion = self._get_cached_suggestion(text)
+        # COST OPTIMIZATION: Reuse the suggestion cached for this user's text or its prefix
+        cached_suggestion = self._get_cached_suggestion(user_id, text)
         if cached_suggestion:
             return [cached_suggestion]
 
+        # Only make expensive API calls for unique, substantial content
+        if len(text.strip()) < 50:  # Skip API calls for very short text
+            return []
+
         # COST CONTROL: Check daily usage limits
         if not self._check_daily_limit():
             logger.warning("Daily API limit reached for writing assistant")
             return []
 
-        # Only make expensive API calls for unique, substantial content
-        if len(text.strip()) < 50:  # Skip API calls for very short text
-            return []
-
-        # 1) Find relevant sources via Exa (reduced results for cost)
-        sources = await self._search_sources(text)
+        # 1) Find relevant sources via Exa (reused while the paragraph grows)
+        sources = await self._get_sources(user_id, text)
 
         # 2) Generate continuation suggestion via Gemini
         suggestion_text, confidence = await self._generate_continuation(text, sources)
@@ -99,10 +124,121 @@ class WritingAssistantService:
         if not suggestion_text:
             return []
 
+        self.cache.put_suggestion(user_id, text, suggestion_text.strip(), confidence, sources)
         return [WritingSuggestion(text=suggestion_text.strip(), confidence=confidence, sources=sources)]
 
+    async def suggest_incremental(self, user_id: str, session_id: str, text: str,
+                                  max_results: int = 1) -> Optional[List[WritingSuggestion]]:
+        """
+        Debounced suggest for text that is being typed.
+
+        Waits for the user to pause, and cancels the previous request of the same
+        user session if it is still waiting or in flight.
+
+        Returns:
+            The suggestions, or None when a newer request for the session replaced this one
+        """
+        async def debounced() -> List[WritingSuggestion]:
+            await asyncio.sleep(self.debounce_seconds)
+            return await self.suggest(text, max_results, user_id=user_id)
+
+        try:
+            return await self._run_latest(f"{user_id}:{session_id}", debounced())
+        except SuggestionSuperseded:
+            logger.debug(f"Writing assistant request superseded for session {session_id} of user {user_id}")
+            return None
+
+    async def stream_suggestion(self, user_id: str, session_id: str, text: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Debounced suggest that streams the continuation as it is generated.
+
+        Yields events: "sources" (the sources used), "chunk" (a piece of the
+        continuation), "done" (the complete suggestion, or None when there is none),
+        "superseded" (a newer request for the session replaced this one) or "error".
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def produce() -> None:
+            try:
+                await self._run_latest(f"{user_id}:{session_id}", self._stream_into(user_id, text, queue))
+            except SuggestionSuperseded:
+                queue.put_nowait({"type": "superseded"})
+            except Exception as e:
+                logger.error(f"WritingAssistant stream_suggestion error: {e}")
+                queue.put_nowait({"type": "error", "message": str(e)})
+            finally:
+                queue.put_nowait(None)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+        finally:
+            # The client went away: stop searching and generating for it
+            producer.cancel()
+
+    async def _stream_into(self, user_id: str, text: str, queue: asyncio.Queue) -> None:
+        await asyncio.sleep(self.debounce_seconds)
+
+        cached_suggestion = self._get_cached_suggestion(user_id, text)
+        if cached_suggestion:
+            queue.put_nowait({"type": "sources", "sources": cached_suggestion.sources})
+            queue.put_nowait({"type": "chunk", "text": cached_suggestion.text})
+            queue.put_nowait({"type": "done", "suggestion": asdict(cached_suggestion), "cached": True})
+            return
+
+        if len(text.strip()) < 50 or not self._check_daily_limit():
+            queue.put_nowait({"type": "done", "suggestion": None})
+            return
+
+        sources = await self._get_sources(user_id, text)
+        queue.put_nowait({"type": "sources", "sources": sources})
+
+        parts: List[str] = []
+        async for chunk in self._stream_continuation(text, sources):
+            parts.append(chunk)
+            queue.put_nowait({"type": "chunk", "text": chunk})
+
+        suggestion_text = "".join(parts).strip()
+        if not suggestion_text:
+            raise Exception("Gemini returned empty suggestion")
+        confidence = 0.7 if sources else 0.5
+        self.cache.put_suggestion(user_id, text, suggestion_text, confidence, sources)
+        suggestion = WritingSuggestion(text=suggestion_text, confidence=confidence, sources=sources)
+        queue.put_nowait({"type": "done", "suggestion": asdict(suggestion), "cached": False})
+
+    async def _run_latest(self, session_id: str, coro) -> Any:
+        """Run coro as the session's only in-flight request, cancelling the one it replaces."""
+        task = asyncio.ensure_future(coro)
+        previous = self._session_tasks.get(session_id)
+        if previous is not None and not previous.done():
+            # Mark before cancelling so its caller can tell this apart from its own cancellation
+            self._superseded_tasks.add(previous)
+            previous.cancel()
+        self._session_tasks[session_id] = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            # Cancelled by a newer request rather than by our own caller
+            if task in self._superseded_tasks:
+                raise SuggestionSuperseded(session_id)
+            raise
+        finally:
+            self._superseded_tasks.discard(task)
+            if self._session_tasks.get(session_id) is task:
+                del self._session_tasks[session_id]
+
+    async def _get_sources(self, user_id: Optional[str], text: str) -> List[Dict[str, Any]]:
+        sources = self.cache.get_sources(user_id, text)
+        if sources is not None:
+            logger.debug("Reusing Exa sources for the current paragraph")
+            return sources
+        sources = await self._search_sources(text)
+        self.cache.put_sources(user_id, text, sources)
+        return sources
+
     async def _search_sources(self, text: str) -> List[Dict[str, Any]]:
-        if not self.exa_api_key:
+        if not self.exa_client.api_key:
             raise Exception("EXA_API_KEY not configured")
 
         # Follow Exa demo guidance: continuation-style prompt and 1000-char cap
@@ -111,25 +247,14 @@ class WritingAssistantService:
             + "\n\nIf you found the above interesting, here's another useful resource to read:"
         )
 
-        payload = {
-            "query": exa_query,
-            "numResults": 3,  # Reduced from 5 to 3 for cost savings
-            "text": True,
-            "type": "neural",
-            "highlights": {"numSentences": 1, "highlightsPerUrl": 1},
-        }
-
         try:
-            resp = requests.post(
-                "https://api.exa.ai/search",
-                headers={"x-api-key": self.exa_api_key, "Content-Type": "application/json"},
-                json=payload,
-                timeout=self.http_timeout_seconds,
+            results = await self.exa_client.search(
+                exa_query,
+                num_results=3,  # Reduced from 5 to 3 for cost savings
+                text=True,
+                type="neural",
+                highlights={"numSentences": 1, "highlightsPerUrl": 1},
             )
-            if resp.status_code != 200:
-                raise Exception(f"Exa error {resp.status_code}: {resp.text}")
-            data = resp.json()
-            results = data.get("results", [])
             sources: List[Dict[str, Any]] = []
             for r in results:
                 sources.append(
@@ -150,10 +275,7 @@ class WritingAssistantService:
             logger.error(f"WritingAssistant _search_sources error: {e}")
             raise
 
-    async def _generate_continuation(self, text: str, sources: List[Dict[str, Any]]) -> tuple[str, float]:
-        if not self.gemini_client:
-            raise Exception("Gemini client not available")
-
+    def _build_prompt(self, text: str, sources: List[Dict[str, Any]]) -> str:
         # Build compact sources context block
         source_blocks: List[str] = []
         for i, s in enumerate(sources[:5]):
@@ -177,6 +299,13 @@ class WritingAssistantService:
             f"Relevant sources to inform your continuation:\n{sources_text}\n\n"
             "Return only the continuation text, without quotes."
         )
+        return f"{system_prompt}\n\n{user_prompt}"
+
+    async def _generate_continuation(self, text: str, sources: List[Dict[str, Any]]) -> tuple[str, float]:
+        if not self.gemini_client:
+            raise Exception("Gemini client not available")
+
+        prompt = self._build_prompt(text, sources)
 
         try:
             loop = asyncio.get_event_loop()
@@ -184,7 +313,7 @@ class WritingAssistantService:
                 resp = await loop.run_in_executor(
                     executor,
                     lambda: self.gemini_client.models.generate_content(
-                        model="gemini-1.5-flash", contents=f"{system_prompt}\n\n{user_prompt}"
+                        model="gemini-1.5-flash", contents=prompt
                     ),
                 )
             suggestion = (resp.text or "").strip()
@@ -198,4 +327,38 @@ class WritingAssistantService:
             # Propagate to ensure frontend does not show stale/generic content
             raise
 
+    async def _stream_continuation(self, text: str, sources: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """Continuation text chunks as Gemini generates them."""
+        if not self.gemini_client:
+            raise Exception("Gemini client not available")
+
+        prompt = self._build_prompt(text, sources)
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+
+        def generate() -> None:
+            # The SDK stream is blocking, so read it in a worker thread and hand chunks to the loop
+            try:
+                for chunk in self.gemini_client.models.generate_content_stream(
+                    model="gemini-1.5-flash", contents=prompt
+                ):
+                    if stopped.is_set():
+                        return
+                    if chunk.text:
+                        loop.call_soon_threadsafe(chunks.put_nowait, chunk.text)
+                loop.call_soon_threadsafe(chunks.put_nowait, None)
+            except Exception as e:
+                if not stopped.is_set():
+                    loop.call_soon_threadsafe(chunks.put_nowait, e)
 
+        loop.run_in_executor(None, generate)
+        try:
+            while (chunk := await chunks.get()) is not None:
+                if isinstance(chunk, Exception):
+                    logger.error(f"WritingAssistant _stream_continuation error: {chunk}")
+                    raise chunk
+                yield chunk
+        finally:
+            # Superseded or finished: stop reading the stream
+            stopped.set()
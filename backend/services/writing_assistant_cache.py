@@ -0,0 +1,127 @@
+"""
+Writing Assistant Prefix Cache
+
+In-memory cache for suggestions requested while a user types. Requests for the
+same draft differ only by a few trailing characters, so lookups are by prefix:
+
+- Exa sources are stored per paragraph and reused while that paragraph grows,
+  until it has gained more than a configured number of characters.
+- A suggestion is reused when the text is unchanged, and keeps being offered as
+  the user types it out: whatever of the suggestion is still untyped is returned.
+
+Entries are scoped to the user whose draft they were made for, so one user's text
+and continuations are never offered to another. Calls without a user id neither
+read nor write the cache.
+"""
+
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+WRITING_ASSISTANT_CACHE_TTL_SECONDS = int(os.getenv("WRITING_ASSISTANT_CACHE_TTL_SECONDS", "900"))
+WRITING_ASSISTANT_SOURCE_REUSE_CHARS = int(os.getenv("WRITING_ASSISTANT_SOURCE_REUSE_CHARS", "400"))
+WRITING_ASSISTANT_CACHE_MAX_ENTRIES = int(os.getenv("WRITING_ASSISTANT_CACHE_MAX_ENTRIES", "1000"))
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+# (suggestion text, confidence, sources)
+CachedSuggestion = Tuple[str, float, List[Dict[str, Any]]]
+
+
+def current_paragraph(text: str) -> str:
+    """The paragraph being written (the last non-empty one), with whitespace collapsed."""
+    paragraphs = [p for p in _PARAGRAPH_BREAK.split(text) if p.strip()]
+    return _WHITESPACE.sub(" ", paragraphs[-1]).strip() if paragraphs else ""
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class SuggestionPrefixCache:
+    """LRU caches of paragraph sources and suggestions, looked up by prefix."""
+
+    def __init__(self, ttl_seconds: int = WRITING_ASSISTANT_CACHE_TTL_SECONDS,
+                 source_reuse_chars: int = WRITING_ASSISTANT_SOURCE_REUSE_CHARS,
+                 max_entries: int = WRITING_ASSISTANT_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            ttl_seconds: How long cached sources and suggestions stay fresh
+            source_reuse_chars: How much a paragraph may grow before its sources are searched again
+            max_entries: Maximum number of entries kept in each cache
+        """
+        self.ttl_seconds = ttl_seconds
+        self.source_reuse_chars = source_reuse_chars
+        self.max_entries = max_entries
+        # (user_id, paragraph) -> (sources, stored_at)
+        self._sources: "OrderedDict[Tuple[str, str], Tuple[List[Dict[str, Any]], float]]" = OrderedDict()
+        # (user_id, normalized text) -> (suggestion, stored_at)
+        self._suggestions: "OrderedDict[Tuple[str, str], Tuple[CachedSuggestion, float]]" = OrderedDict()
+        self.stats = {"source_hits": 0, "suggestion_hits": 0}
+
+    def _fresh(self, stored_at: float) -> bool:
+        return time.time() - stored_at <= self.ttl_seconds
+
+    def _store(self, entries: OrderedDict, key: Tuple[str, str], value: Any) -> None:
+        entries[key] = (value, time.time())
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def get_sources(self, user_id: Optional[str], text: str) -> Optional[List[Dict[str, Any]]]:
+        """Sources found earlier for the paragraph being written, if it has not grown too much."""
+        paragraph = current_paragraph(text)
+        if not paragraph or not user_id:
+            return None
+        # Most recent first: the latest search for this paragraph is the closest match
+        for key in reversed(self._sources):
+            owner, cached = key
+            if owner != user_id:
+                continue
+            sources, stored_at = self._sources[key]
+            if (paragraph.startswith(cached) and len(paragraph) - len(cached) <= self.source_reuse_chars
+                    and self._fresh(stored_at)):
+                self._sources.move_to_end(key)
+                self.stats["source_hits"] += 1
+                return sources
+        return None
+
+    def put_sources(self, user_id: Optional[str], text: str, sources: List[Dict[str, Any]]) -> None:
+        paragraph = current_paragraph(text)
+        if user_id and paragraph and sources:
+            self._store(self._sources, (user_id, paragraph), sources)
+
+    def get_suggestion(self, user_id: Optional[str], text: str) -> Optional[CachedSuggestion]:
+        """A cached suggestion for this user's text, minus any part of it they have typed since."""
+        if not user_id:
+            return None
+        normalized = _normalize(text)
+        entry = self._suggestions.get((user_id, normalized))
+        if entry is not None and self._fresh(entry[1]):
+            self.stats["suggestion_hits"] += 1
+            return entry[0]
+
+        for key in reversed(self._suggestions):
+            owner, cached = key
+            if owner != user_id:
+                continue
+            (suggestion, confidence, sources), stored_at = self._suggestions[key]
+            if not normalized.startswith(cached) or not self._fresh(stored_at):
+                continue
+            typed = normalized[len(cached):].lstrip()
+            if typed and suggestion.startswith(typed) and len(typed) < len(suggestion):
+                remainder = suggestion[len(typed):]
+                # Keep the space the user has not typed yet, drop the one they have
+                remainder = remainder.lstrip() if text[-1:].isspace() else remainder
+                if remainder.strip():
+                    self.stats["suggestion_hits"] += 1
+                    return remainder, confidence, sources
+        return None
+
+    def put_suggestion(self, user_id: Optional[str], text: str, suggestion: str, confidence: float,
+                       sources: List[Dict[str, Any]]) -> None:
+        if user_id:
+            self._store(self._suggestions, (user_id, _normalize(text)), (suggestion, confidence, sources))
@@ -0,0 +1,118 @@
+"""
+Unit tests for AIAnalyticsService SQL aggregations.
+
+Runs the analytics queries against an in-memory SQLite database.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.content_planning import Base, ContentAnalytics, ContentStrategy, CalendarEvent
+from services.ai_analytics_service import AIAnalyticsService
+
+
+class TestAIAnalyticsAggregations:
+    """Test cases for SQL-side analytics aggregation."""
+
+    def setup_method(self):
+        """Create an in-memory database with sample analytics rows."""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.session = sessionmaker(bind=engine)()
+
+        strategy = ContentStrategy(user_id=1, name="Test Strategy")
+        self.session.add(strategy)
+        self.session.flush()
+        event = CalendarEvent(
+            strategy_id=strategy.id,
+            title="Post",
+            content_type="blog_post",
+            platform="website",
+            scheduled_date=datetime.utcnow()
+        )
+        self.session.add(event)
+        self.session.flush()
+
+        now = datetime.utcnow()
+        self.engagement_values = []
+        for i in range(9):
+            metrics = {"engagement_rate": 0.1 * i} if i != 4 else {}
+            if i != 4:
+                self.engagement_values.append(0.1 * i)
+            self.session.add(ContentAnalytics(
+                strategy_id=strategy.id,
+                event_id=event.id if i % 2 else None,
+                platform="linkedin" if i % 3 else "website",
+                metrics=metrics,
+                performance_score=0.1 * i,
+                recorded_at=now - timedelta(days=9 - i)
+            ))
+        self.session.commit()
+
+        self.strategy_id = strategy.id
+        self.service = AIAnalyticsService()
+        self.service.db_session = self.session
+
+    def teardown_method(self):
+        self.session.close()
+
+    def test_content_evolution_summary(self):
+        result = asyncio.run(self.service.analyze_content_evolution(self.strategy_id, "30d"))
+
+        trends = result['performance_trends']
+        assert trends['total_analytics'] == 9
+        assert trends['average_performance'] == pytest.approx(0.4)
+
+        content_types = result['content_evolution']['content_types']
+        assert content_types['blog_post']['count'] == 4
+        assert content_types['unknown']['count'] == 5
+        assert content_types['blog_post']['avg_performance'] == pytest.approx((0.1 + 0.3 + 0.5 + 0.7) / 4)
+
+        platforms = result['engagement_patterns']['platform_engagement']
+        assert platforms['website']['count'] == 3
+        assert platforms['website']['avg_engagement'] == pytest.approx((0.0 + 0.3 + 0.6) / 3)
+        assert result['engagement_patterns']['best_platform'] == 'linkedin'
+
+    def test_metric_trend_uses_time_ordered_halves(self):
+        result = asyncio.run(self.service.analyze_performance_trends(self.strategy_id, ['engagement_rate', 'reach']))
+
+        values = self.engagement_values
+        half = len(values) // 2
+        older_avg = sum(values[:half]) / half
+        recent_avg = sum(values[-half:]) / half
+
+        engagement = result['trend_analysis']['engagement_rate']
+        assert engagement['data_points'] == len(values)
+        assert engagement['value'] == pytest.approx(sum(values) / len(values))
+        assert engagement['change_percent'] == pytest.approx((recent_avg - older_avg) / older_avg * 100)
+        assert engagement['trend'] == 'increasing'
+        assert result['trend_analysis']['reach']['trend'] == 'no_data'
+
+    def test_metric_trend_with_odd_count_excludes_middle_row(self):
+        strategy = ContentStrategy(user_id=2, name="Odd Strategy")
+        self.session.add(strategy)
+        self.session.flush()
+        now = datetime.utcnow()
+        for i, value in enumerate([1, 1, 10, 10, 10]):
+            self.session.add(ContentAnalytics(
+                strategy_id=strategy.id,
+                platform="website",
+                metrics={"engagement_rate": value},
+                recorded_at=now - timedelta(days=5 - i)
+            ))
+        self.session.commit()
+
+        result = asyncio.run(self.service.analyze_performance_trends(strategy.id, ['engagement_rate']))
+
+        engagement = result['trend_analysis']['engagement_rate']
+        assert engagement['data_points'] == 5
+        assert engagement['change_percent'] == pytest.approx(900.0)
+
+    def test_empty_period(self):
+        result = asyncio.run(self.service.analyze_content_evolution(self.strategy_id + 1, "7d"))
+        assert result['performance_trends']['trend'] == 'stable'
+        assert result['content_evolution']['most_performing_type'] is None
@@ -0,0 +1,193 @@
+"""
+Unit tests for API monitoring rollups and retention.
+
+Runs against an in-memory SQLite database.
+"""
+
+import asyncio
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.api_monitoring import (
+    Base, APIRequest, APIEndpointStats, APIRequestRollup, APIRequestRollupLatency
+)
+from services.api_monitoring_service import (
+    ALL_ENDPOINTS,
+    APIMonitoringRollupService,
+    estimate_percentile,
+    latency_bucket,
+)
+
+
+def _create_tables(engine):
+    """Create only the tables under test (other monitoring tables share index names)."""
+    Base.metadata.create_all(engine, tables=[
+        APIRequest.__table__, APIEndpointStats.__table__, APIRequestRollup.__table__,
+        APIRequestRollupLatency.__table__
+    ])
+
+
+class TestAPIMonitoringRollups:
+    """Test cases for rollup maintenance, window summaries and pruning."""
+
+    def setup_method(self):
+        engine = create_engine("sqlite://")
+        _create_tables(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.service = APIMonitoringRollupService()
+        self.now = datetime(2025, 1, 6, 12, 30, 15)
+
+    def teardown_method(self):
+        self.db.close()
+
+    def test_record_maintains_minute_and_hour_rows(self):
+        for i, status in enumerate([200, 200, 500]):
+            self.service.record(self.db, "GET /a", status, 0.1 * (i + 1), self.now)
+        self.service.record(self.db, "POST /b", 404, 0.5, self.now + timedelta(minutes=1))
+        self.db.commit()
+
+        rows = {(r.granularity, r.endpoint, r.bucket_start.minute): r for r in self.db.query(APIRequestRollup).all()}
+        minute_a = rows[("minute", "GET /a", 30)]
+        assert minute_a.request_count == 3
+        assert minute_a.error_count == 1
+        assert minute_a.total_duration == pytest.approx(0.6)
+        assert minute_a.min_duration == pytest.approx(0.1)
+        assert minute_a.max_duration == pytest.approx(0.3)
+
+        hour_all = rows[("hour", ALL_ENDPOINTS, 0)]
+        assert hour_all.request_count == 4
+        assert hour_all.error_count == 2
+        hour_latencies = self.db.query(APIRequestRollupLatency).filter(
+            APIRequestRollupLatency.granularity == "hour", APIRequestRollupLatency.endpoint == ALL_ENDPOINTS
+        ).all()
+        assert sum(row.request_count for row in hour_latencies) == 4
+
+    def test_window_summary(self):
+        for i in range(100):
+            self.service.record(self.db, "GET /a", 200 if i % 10 else 500, (i + 1) / 100,
+                                self.now - timedelta(minutes=i % 3))
+        # Outside a 5 minute window
+        self.service.record(self.db, "GET /a", 500, 9.0, self.now - timedelta(minutes=30))
+        self.db.commit()
+
+        summary = self.service.get_window_summary(self.db, 5, now=self.now)
+        assert summary['requests'] == 100
+        assert summary['errors'] == 10
+        assert summary['avg_duration'] == pytest.approx(0.505, abs=1e-3)
+        assert summary['p50_duration'] == pytest.approx(0.50, rel=0.1)
+        assert summary['p95_duration'] == pytest.approx(0.95, rel=0.1)
+
+        endpoints = self.service.get_endpoint_summaries(self.db, 120, ["GET /a", "GET /missing"], now=self.now)
+        assert endpoints["GET /a"]['requests'] == 101
+        assert endpoints["GET /missing"]['requests'] == 0
+
+    def test_percentile_estimate_error_is_bounded(self):
+        durations = [0.002 * (i + 1) for i in range(1000)]
+        histogram = {}
+        for duration in durations:
+            key = str(latency_bucket(duration))
+            histogram[key] = histogram.get(key, 0) + 1
+        assert estimate_percentile(histogram, 95) == pytest.approx(durations[949], rel=0.1)
+        assert estimate_percentile({}, 50) is None
+
+    def test_prune_raw_requests_in_batches(self, tmp_path):
+        old = self.now - timedelta(days=10)
+        for i in range(25):
+            self.db.add(APIRequest(path="/a", method="GET", status_code=200, duration=0.1,
+                                   timestamp=old + timedelta(minutes=i)))
+        self.db.add(APIRequest(path="/a", method="GET", status_code=200, duration=0.1, timestamp=self.now))
+        self.db.commit()
+
+        deleted = self.service.prune_raw_requests(
+            self.db, cutoff=self.now - timedelta(days=7), batch_size=10, max_batches=2,
+            archive_dir=str(tmp_path)
+        )
+        assert deleted == 20
+        assert self.db.query(APIRequest).count() == 6
+
+        deleted = self.service.prune_raw_requests(
+            self.db, cutoff=self.now - timedelta(days=7), batch_size=10, archive_dir=str(tmp_path)
+        )
+        assert deleted == 5
+        assert self.db.query(APIRequest).count() == 1
+
+        with gzip.open(tmp_path / f"api_requests_{old:%Y-%m-%d}.jsonl.gz", 'rt') as archive:
+            archived = [json.loads(line) for line in archive]
+        assert len(archived) == 25
+
+    def test_prune_rollups(self):
+        self.service.record(self.db, "GET /a", 200, 0.1, self.now - timedelta(days=3))
+        self.service.record(self.db, "GET /a", 200, 0.1, self.now)
+        self.db.commit()
+
+        deleted = self.service.prune_rollups(self.db, now=self.now)
+        assert deleted == {'minute': 2, 'hour': 0}
+        assert self.db.query(APIRequestRollup).filter(APIRequestRollup.granularity == 'hour').count() == 4
+        assert self.db.query(APIRequestRollupLatency).filter(
+            APIRequestRollupLatency.granularity == 'minute'
+        ).count() == 2
+
+    def test_concurrent_workers_do_not_lose_updates(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'monitoring.db'}")
+        _create_tables(engine)
+        make_session = sessionmaker(bind=engine)
+        worker_a, worker_b = make_session(), make_session()
+        try:
+            self.service.record(worker_a, "GET /a", 200, 0.1, self.now)
+            worker_a.commit()
+            # Worker A holds the row in its session while worker B updates it
+            stale = worker_a.query(APIRequestRollup).filter(APIRequestRollup.endpoint == "GET /a").first()
+            assert stale.request_count == 1
+
+            self.service.record(worker_b, "GET /a", 500, 0.3, self.now)
+            worker_b.commit()
+            worker_a.add(APIRequest(path="/a", method="GET", status_code=200, duration=0.2, timestamp=self.now))
+            self.service.record(worker_a, "GET /a", 200, 0.2, self.now)
+            worker_a.commit()
+
+            assert worker_a.query(APIRequest).count() == 1
+            summary = self.service.get_window_summary(worker_a, 5, "GET /a", now=self.now)
+            assert summary['requests'] == 3
+            assert summary['errors'] == 1
+            minute_row = worker_a.query(APIRequestRollup).filter(
+                APIRequestRollup.granularity == "minute", APIRequestRollup.endpoint == "GET /a"
+            ).one()
+            assert (minute_row.min_duration, minute_row.max_duration) == (pytest.approx(0.1), pytest.approx(0.3))
+        finally:
+            worker_a.close()
+            worker_b.close()
+
+class TestMonitorStats:
+    """Test that the monitor serves dashboard stats from the rollups."""
+
+    def setup_method(self):
+        engine = create_engine("sqlite://")
+        _create_tables(engine)
+        self.db = sessionmaker(bind=engine)()
+
+    def teardown_method(self):
+        self.db.close()
+
+    def test_get_stats_uses_rollups(self):
+        from middleware.monitoring_middleware import DatabaseAPIMonitor
+
+        monitor = DatabaseAPIMonitor()
+        for status in (200, 200, 503):
+            asyncio.run(monitor.add_request(self.db, "/api/health", "GET", status, 0.2))
+
+        stats = asyncio.run(monitor.get_stats(self.db, minutes=5))
+        assert stats['overview'] == {
+            'total_requests': 3, 'total_errors': 1, 'recent_requests': 3, 'recent_errors': 1
+        }
+        assert stats['latency']['p50'] == pytest.approx(0.2, rel=0.1)
+        assert stats['top_endpoints'][0]['recent_count'] == 3
+        assert len(stats['recent_errors']) == 1
+
+        light = asyncio.run(monitor.get_lightweight_stats(self.db))
+        assert light['recent_requests'] == 3
+        assert light['recent_errors'] == 1
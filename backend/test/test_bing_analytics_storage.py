@@ -0,0 +1,137 @@
+"""
+Unit tests for BingAnalyticsStorageService bulk ingest and SQL rollups.
+
+Runs against a temporary SQLite database; no Bing API calls are made.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.bing_analytics_models import BingQueryStats, BingDailyMetrics, BingTrendAnalysis
+from services.bing_analytics_storage_service import BingAnalyticsStorageService
+
+SITE_URL = "https://alwrity.com/"
+
+
+def _bing_date(value: datetime) -> str:
+    """Format a datetime the way the Bing API returns it."""
+    return f"/Date({int(value.timestamp() * 1000)}-0700)/"
+
+
+def _row(query: str, day: datetime, clicks: int, impressions: int, position: float = 3.0) -> dict:
+    return {
+        'Query': query,
+        'Date': _bing_date(day),
+        'Clicks': clicks,
+        'Impressions': impressions,
+        'AvgClickPosition': position,
+        'AvgImpressionPosition': position,
+    }
+
+
+class TestBingAnalyticsStorage:
+    """Test cases for bulk ingest, rollups and incremental refresh."""
+
+    @pytest.fixture(autouse=True)
+    def _service(self, tmp_path, monkeypatch):
+        self.monday = datetime(2025, 1, 6, 12, 0)
+        # BingOAuthService creates its token database in the working directory
+        monkeypatch.chdir(tmp_path)
+        self.service = BingAnalyticsStorageService(f"sqlite:///{tmp_path / 'bing.db'}")
+
+    def _session(self):
+        return self.service._get_db_session()
+
+    def test_ingest_dedupes_and_replaces(self):
+        day = self.monday
+        touched = self.service.ingest_query_data("u1", SITE_URL, [
+            _row("alwrity ai writer", day, 5, 50),
+            _row("alwrity ai writer", day, 7, 70),
+            _row("business plan", day, 1, 10),
+        ])
+        assert touched == {day.date()}
+
+        # Re-ingesting the same key replaces the stored row instead of duplicating it
+        self.service.ingest_query_data("u1", SITE_URL, [_row("alwrity ai writer", day, 9, 90)])
+
+        db = self._session()
+        rows = {row.query: row for row in db.query(BingQueryStats).all()}
+        db.close()
+        assert len(rows) == 2
+        assert rows["alwrity ai writer"].clicks == 9
+        assert rows["alwrity ai writer"].is_brand_query is True
+        assert rows["alwrity ai writer"].category == 'ai'
+        assert rows["business plan"].is_brand_query is False
+        assert rows["business plan"].category == 'business'
+        assert rows["business plan"].ctr == pytest.approx(10.0)
+
+    def test_categorize_matches_keyword_priority(self):
+        assert self.service._categorize_query("Free Email Tool") == 'ai'
+        assert self.service._categorize_query("short story ideas") == 'story_writing'
+        assert self.service._categorize_query("online generator") == 'tools'
+        assert self.service._categorize_query("weather") == 'general'
+
+    def test_daily_rollup_aggregates_in_sql(self):
+        day = self.monday
+        queries = [_row(f"query {i}", day, i, i * 10, position=float(i) if i % 2 else -1) for i in range(12)]
+        self.service.ingest_query_data("u1", SITE_URL, queries)
+
+        assert self.service.generate_daily_metrics("u1", SITE_URL, day)
+
+        db = self._session()
+        metrics = db.query(BingDailyMetrics).one()
+        db.close()
+        assert metrics.total_queries == 12
+        assert metrics.total_clicks == sum(range(12))
+        assert metrics.total_impressions == sum(range(12)) * 10
+        assert metrics.avg_ctr == pytest.approx(10.0)
+        assert metrics.avg_position == pytest.approx(sum(range(1, 12, 2)) / 6)
+        assert metrics.metric_date == day.replace(hour=0)
+
+        top_clicks = json.loads(metrics.top_clicks)
+        assert [q['query'] for q in top_clicks] == [f"query {i}" for i in range(11, 1, -1)]
+
+    def test_incremental_refresh_updates_touched_days_and_weeks(self):
+        days = [self.monday + timedelta(days=i) for i in range(3)]
+        touched = self.service.ingest_query_data("u1", SITE_URL, [
+            _row("alpha", days[0], 10, 100),
+            _row("alpha", days[1], 20, 100),
+            _row("alpha", days[2], 30, 100),
+        ])
+        assert self.service.refresh_rollups("u1", SITE_URL, touched) == 3
+
+        # New data for the middle day also refreshes the following day's changes
+        touched = self.service.ingest_query_data("u1", SITE_URL, [_row("alpha", days[1], 40, 100)])
+        assert self.service.refresh_rollups("u1", SITE_URL, touched) == 2
+
+        db = self._session()
+        daily = db.query(BingDailyMetrics).order_by(BingDailyMetrics.metric_date).all()
+        weekly = db.query(BingTrendAnalysis).filter(BingTrendAnalysis.period_type == 'weekly').all()
+        db.close()
+
+        assert [m.total_clicks for m in daily] == [10, 40, 30]
+        assert daily[2].clicks_change == pytest.approx(-25.0)
+        assert len(weekly) == 1
+        assert weekly[0].period_start == self.monday.replace(hour=0)
+        assert weekly[0].total_clicks == 80
+        assert weekly[0].total_impressions == 300
+
+    def test_summary_reads_rollups(self):
+        today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        days = [today - timedelta(days=i) for i in range(1, 4)]
+        touched = self.service.ingest_query_data("u1", SITE_URL, [
+            _row("alpha", day, 5, 50) for day in days
+        ] + [_row("beta", days[0], 8, 20)])
+        self.service.refresh_rollups("u1", SITE_URL, touched)
+
+        summary = self.service.get_analytics_summary("u1", SITE_URL, days=7)
+        assert summary['total_clicks'] == 23
+        assert summary['total_impressions'] == 170
+        assert summary['total_queries'] == 4
+        assert summary['daily_metrics_count'] == 3
+        assert summary['top_queries'][0] == {'query': 'alpha', 'clicks': 15, 'impressions': 150, 'count': 3}
+        assert summary['weekly_metrics']
+
+        assert 'error' in self.service.get_analytics_summary("u2", SITE_URL, days=7)
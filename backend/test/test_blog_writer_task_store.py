@@ -0,0 +1,124 @@
+"""
+Unit tests for the blog writer task stores.
+
+Covers the in-memory and SQLite implementations: expiry, progress ring buffer,
+cross-instance visibility and long-poll reads.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.blog_writer.core.task_store import InMemoryTaskStore, SQLiteTaskStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Create a task store of each implementation with a small progress cap."""
+    if request.param == "memory":
+        return InMemoryTaskStore(max_progress_messages=3, poll_interval=0.05)
+    return SQLiteTaskStore(db_path=str(tmp_path / "tasks.db"), max_progress_messages=3, poll_interval=0.05)
+
+
+class TestTaskStore:
+    """Test cases shared by all task store implementations."""
+
+    def test_create_and_update(self, store):
+        store.create("t1", task_type="research")
+        task = store.get("t1")
+        assert task["status"] == "pending"
+        assert task["task_type"] == "research"
+        assert task["version"] == 0
+
+        assert store.update("t1", status="completed", result={"sources": [1, 2]})
+        task = store.get("t1")
+        assert task["status"] == "completed"
+        assert task["result"] == {"sources": [1, 2]}
+        assert task["version"] == 1
+
+    def test_missing_task(self, store):
+        assert store.get("missing") is None
+        assert not store.update("missing", status="failed")
+        assert not store.append_progress("missing", "hello")
+
+    def test_rejects_unknown_fields(self, store):
+        store.create("t1")
+        with pytest.raises(ValueError):
+            store.update("t1", created_at=0)
+
+    def test_progress_ring_buffer(self, store):
+        store.create("t1")
+        for i in range(5):
+            store.append_progress("t1", f"message {i}")
+        messages = [entry["message"] for entry in store.get("t1")["progress_messages"]]
+        assert messages == ["message 2", "message 3", "message 4"]
+
+        store.clear_progress("t1")
+        assert store.get("t1")["progress_messages"] == []
+
+    def test_expired_tasks_are_purged(self, store):
+        store.ttl_seconds = 0.01
+        store.create("old")
+        time.sleep(0.02)
+        assert store.get("old") is None
+        store.purge_expired()
+        store.ttl_seconds = 3600
+        store.create("new")
+        assert store.purge_expired() == 0
+        assert store.get("new") is not None
+
+    def test_wait_for_change_wakes_on_update(self, store):
+        store.create("t1")
+
+        async def scenario():
+            async def finish_later():
+                await asyncio.sleep(0.05)
+                store.update("t1", status="completed", result={"ok": True})
+
+            asyncio.create_task(finish_later())
+            started = time.monotonic()
+            task = await store.wait_for_change("t1", since_version=0, timeout=2)
+            return task, time.monotonic() - started
+
+        task, elapsed = asyncio.run(scenario())
+        assert task["status"] == "completed"
+        assert elapsed < 1
+
+    def test_wait_for_change_times_out(self, store):
+        store.create("t1")
+        task = asyncio.run(store.wait_for_change("t1", since_version=0, timeout=0.1))
+        assert task["version"] == 0
+
+    def test_async_methods_drop_change_events_of_finished_tasks(self, store):
+        async def scenario():
+            await store.acreate("t1")
+            await store.aappend_progress("t1", "working")
+            waiter = asyncio.create_task(store.wait_for_change("t1", since_version=1, timeout=2))
+            await asyncio.sleep(0.05)
+            await store.aupdate("t1", status="completed", result={"ok": True})
+            await waiter
+            return await store.wait_for_change("t1", since_version=2, timeout=2)
+
+        task = asyncio.run(scenario())
+        assert task["status"] == "completed"
+        assert task["progress_messages"][0]["message"] == "working"
+        assert store._change_events == {}
+
+
+class TestSQLiteTaskStore:
+    """Test cases specific to the shared SQLite store."""
+
+    def test_visible_across_instances(self, tmp_path):
+        db_path = str(tmp_path / "tasks.db")
+        writer = SQLiteTaskStore(db_path=db_path)
+        reader = SQLiteTaskStore(db_path=db_path)
+
+        writer.create("t1", task_type="outline")
+        writer.append_progress("t1", "working")
+        writer.update("t1", status="failed", error="boom")
+
+        task = reader.get("t1")
+        assert task["status"] == "failed"
+        assert task["error"] == "boom"
+        assert task["progress_messages"][0]["message"] == "working"
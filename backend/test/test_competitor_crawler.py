@@ -0,0 +1,80 @@
+"""
+Unit tests for competitor crawl summaries, their cache and concurrent gap analysis crawls.
+"""
+
+import asyncio
+import json
+
+from services.content_gap_analyzer import content_gap_analyzer
+from services.content_gap_analyzer.competitor_crawler import CompetitorCrawlCache, summarize_crawl_file
+from services.content_gap_analyzer.content_gap_analyzer import ContentGapAnalyzer
+
+
+def _write_crawl(path, rows):
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+
+class TestCompetitorCrawler:
+    """Test cases for chunked summaries and the per-domain cache."""
+
+    def test_summary_is_built_in_chunks(self, tmp_path):
+        crawl_file = tmp_path / "crawl.jl"
+        _write_crawl(crawl_file, [
+            {"url": "https://c.com/blog/a", "status": 200, "size": 1000, "title": "Post A", "body_text": "x" * 500},
+            {"url": "https://c.com/product/b", "status": 200, "size": 3000, "title": "Product", "meta_desc": "Buy"},
+            {"url": "https://c.com/missing", "status": 404, "size": 200},
+        ])
+
+        summary = summarize_crawl_file(str(crawl_file), chunk_size=2)
+        results = summary["crawl_results"]
+
+        assert results["total_pages"] == 3
+        assert results["status_codes"] == {"200": 2, "404": 1}
+        assert results["page_types"]["blog_posts"] == 1
+        assert results["page_types"]["product_pages"] == 1
+        assert results["page_types"]["other"] == 1
+        assert results["content_length_stats"] == {"mean": 1400, "median": 1000}
+        assert summary["content_structure"]["avg_title_length"] == 6.5
+        json.dumps(summary)
+
+    def test_cache_freshness(self, tmp_path):
+        fresh = CompetitorCrawlCache(str(tmp_path / "crawl.db"), ttl_hours=1)
+        fresh.put("Competitor.com", {"crawl_results": {"total_pages": 3}})
+        assert fresh.get("competitor.com") == {"crawl_results": {"total_pages": 3}}
+
+        expired = CompetitorCrawlCache(str(tmp_path / "crawl.db"), ttl_hours=-1)
+        assert expired.get("competitor.com") is None
+        assert expired.purge_expired() == 1
+
+
+class TestContentGapCompetitorCrawls:
+    """Test that competitor domains are crawled concurrently and cached."""
+
+    def test_domains_crawled_concurrently_then_cached(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        calls = []
+        in_flight = {"now": 0, "max": 0}
+
+        async def fake_crawl(url):
+            calls.append(url)
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.02)
+            in_flight["now"] -= 1
+            return {"crawl_results": {"total_pages": 2, "page_types": {"blog_posts": 1}},
+                    "content_structure": {"avg_title_length": 10}}
+
+        monkeypatch.setattr(content_gap_analyzer, "run_competitor_crawl", fake_crawl)
+        analyzer = ContentGapAnalyzer()
+        urls = ["https://a.com/", "https://b.com/", "https://a.com/blog", "https://c.com/"]
+
+        first = asyncio.run(analyzer._analyze_competitor_content_deep(urls))
+        second = asyncio.run(analyzer._analyze_competitor_content_deep(urls))
+
+        assert sorted(calls) == ["https://a.com/", "https://b.com/", "https://c.com/"]
+        assert in_flight["max"] > 1
+        assert list(first["crawl_results"]) == ["a.com", "b.com", "c.com"]
+        assert second["crawl_results"] == first["crawl_results"]
+        assert first["content_structure"]["b.com"] == {"avg_title_length": 10}
@@ -0,0 +1,108 @@
+"""
+Unit tests for the content scheduler's schedule time index.
+
+The content scheduler still lives in ToBeMigrated; its conflict index only needs the
+standard library, so it is imported from there directly.
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add the content scheduler core directory to the Python path
+core_dir = Path(__file__).resolve().parents[2] / "ToBeMigrated" / "content_scheduler" / "core"
+sys.path.insert(0, str(core_dir))
+
+from conflict_index import ScheduleTimeIndex, share_platform  # noqa: E402
+
+START = datetime(2025, 1, 6, 9, 0)
+
+
+def _schedule(name, minutes, platforms=None):
+    return SimpleNamespace(name=name, scheduled_time=START + timedelta(minutes=minutes), platforms=platforms)
+
+
+def _names(pairs):
+    return [(first.name, second.name) for first, second in pairs]
+
+
+def _all_pairs(schedules, window=timedelta(hours=1)):
+    """Reference: every pair of the time-sorted schedules less than the window apart."""
+    ordered = sorted(schedules, key=lambda x: x.scheduled_time)
+    return [
+        (ordered[i], ordered[j])
+        for i in range(len(ordered)) for j in range(i + 1, len(ordered))
+        if ordered[j].scheduled_time - ordered[i].scheduled_time < window
+    ]
+
+
+class TestScheduleTimeIndex:
+    """Test cases for sweeps, incremental changes and neighbour queries."""
+
+    def setup_method(self):
+        self.a = _schedule("a", 0)
+        self.b = _schedule("b", 30)
+        self.c = _schedule("c", 60)
+        self.d = _schedule("d", 200)
+        self.index = ScheduleTimeIndex([self.d, self.c, self.a, self.b])
+
+    def test_pairs_match_all_pairs_within_window(self):
+        schedules = [_schedule(f"s{i}", minutes) for i, minutes in enumerate([0, 10, 10, 59, 60, 61, 130, 300, 301])]
+
+        assert _names(ScheduleTimeIndex(schedules).pairs()) == _names(_all_pairs(schedules))
+        # Exactly one window apart is not a conflict
+        assert ("a", "c") not in _names(self.index.pairs())
+        assert _names(self.index.pairs()) == [("a", "b"), ("b", "c")]
+
+    def test_add_remove_and_update(self):
+        e = _schedule("e", 190)
+        self.index.add(e)
+        assert len(self.index) == 5 and e in self.index
+        assert _names(self.index.pairs()) == [("a", "b"), ("b", "c"), ("e", "d")]
+
+        self.index.remove(self.b)
+        assert self.b not in self.index
+        assert _names(self.index.pairs()) == [("e", "d")]
+
+        self.d.scheduled_time = START + timedelta(minutes=20)
+        self.index.update(self.d)
+        assert [schedule.name for schedule in self.index] == ["a", "d", "c", "e"]
+        assert _names(self.index.pairs()) == [("a", "d"), ("d", "c")]
+
+        with pytest.raises(ValueError):
+            self.index.add(self.a)
+        with pytest.raises(ValueError):
+            self.index.remove(self.b)
+
+    def test_same_time_schedules_keep_insertion_order(self):
+        first, second = _schedule("first", 0), _schedule("second", 0)
+        index = ScheduleTimeIndex([first])
+        index.add(second)
+
+        assert _names(index.pairs()) == [("first", "second")]
+        assert _names(index.neighbours(first)) == [("first", "second")]
+        assert _names(index.neighbours(second)) == [("first", "second")]
+
+    def test_neighbours_of_indexed_and_unindexed_schedules(self):
+        assert _names(self.index.neighbours(self.b)) == [("a", "b"), ("b", "c")]
+        assert list(self.index.neighbours(self.d)) == []
+
+        probe = _schedule("probe", 30)
+        # An unindexed schedule sorts after indexed ones at the same time
+        assert _names(self.index.neighbours(probe)) == [("a", "probe"), ("b", "probe"), ("probe", "c")]
+        assert probe not in self.index
+
+
+class TestSharePlatform:
+    """Test that platform conflicts need a shared platform."""
+
+    def test_share_platform(self):
+        assert share_platform(_schedule("x", 0, ["twitter", "linkedin"]), _schedule("y", 0, ["linkedin"]))
+        assert not share_platform(_schedule("x", 0, ["twitter"]), _schedule("y", 0, ["linkedin"]))
+        # Schedules without platform information are assumed to share one
+        assert share_platform(_schedule("x", 0), _schedule("y", 0, ["linkedin"]))
+        single = SimpleNamespace(scheduled_time=START, platform=SimpleNamespace(value="wix"))
+        assert share_platform(single, _schedule("y", 0, ["wix"]))
@@ -0,0 +1,125 @@
+"""
+Unit tests for the enterprise SEO audit orchestrator and its shared fetch cache.
+
+The audited sites are served by a local aiohttp server and PageSpeed Insights is
+replaced by a stub, so no external requests are made.
+"""
+
+import asyncio
+import threading
+from collections import Counter
+
+from aiohttp import web
+
+from services.seo_tools.enterprise_seo_service import EnterpriseSEOService
+
+PAGE = (
+    '<html><head><title>{title}</title><meta name="description" content="About {title}">'
+    '<link rel="canonical" href="/"></head><body><h1>{title}</h1><p>{body}</p></body></html>'
+)
+SITEMAP = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    '<url><loc>https://example.com/blog/a</loc><lastmod>2024-01-02</lastmod></url>'
+    '<url><loc>https://example.com/blog/b</loc><lastmod>2024-02-03</lastmod></url>'
+    '</urlset>'
+)
+
+
+class StubPageSpeedService:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    async def analyze_pagespeed(self, url, strategy="DESKTOP", locale="en", categories=None):
+        await asyncio.sleep(self.delay)
+        return {
+            "category_scores": {"performance": {"score": 90}},
+            "opportunities": [{"title": "Serve images in modern formats", "savings_ms": 300}]
+        }
+
+    async def analyze_pagespeed_strategies(self, url, strategies=("MOBILE", "DESKTOP"), locale="en", categories=None):
+        results = await asyncio.gather(*(self.analyze_pagespeed(url, strategy) for strategy in strategies))
+        return dict(zip(strategies, results))
+
+
+class TestEnterpriseAudit:
+    """Test running the audit tools concurrently over one fetch cache."""
+
+    def setup_method(self):
+        self.requests = Counter()
+
+    def _app(self):
+        async def handler(request):
+            path = request.path
+            self.requests[path] += 1
+            if path == "/robots.txt":
+                return web.Response(text=f"User-agent: *\nSitemap: http://{request.host}/sitemap.xml\n")
+            if path == "/sitemap.xml":
+                return web.Response(text=SITEMAP, content_type="application/xml")
+            if path in ("/", "/competitor"):
+                title = "Home" if path == "/" else "Competitor"
+                return web.Response(text=PAGE.format(title=title, body="word " * 400), content_type="text/html")
+            return web.Response(status=404)
+
+        app = web.Application()
+        app.router.add_get("/{path:.*}", handler)
+        return app
+
+    async def _with_site(self, run):
+        runner = web.AppRunner(self._app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        try:
+            return await run(f"http://127.0.0.1:{runner.addresses[0][1]}")
+        finally:
+            await runner.cleanup()
+
+    def test_each_url_fetched_once_and_results_streamed(self):
+        service = EnterpriseSEOService(pagespeed_service=StubPageSpeedService())
+
+        async def run(base):
+            return [event async for event in service.stream_audit(
+                base + "/", competitors=[base + "/competitor"], target_keywords=["word"]
+            )]
+
+        events = asyncio.run(self._with_site(run))
+        tool_events = [event for event in events if event["type"] == "tool_result"]
+        audit = events[-1]["result"]
+
+        assert events[-1]["type"] == "audit_complete"
+        assert sorted(event["tool"] for event in tool_events) == ["on_page", "on_page", "pagespeed", "sitemap"]
+        assert all(event["status"] == "completed" for event in tool_events), tool_events
+        assert self.requests == {"/": 1, "/competitor": 1, "/robots.txt": 1, "/sitemap.xml": 1}
+        assert audit["fetch_stats"]["hits"] > 0
+        assert audit["sitemap"]["total_urls"] == 2
+        assert audit["competitors_analyzed"] == 1
+        assert "Serve images in modern formats" in audit["priority_actions"]
+        assert audit["timed_out"] == []
+
+    def test_deadline_reports_unfinished_tools(self):
+        service = EnterpriseSEOService(pagespeed_service=StubPageSpeedService(delay=30))
+
+        async def run(base):
+            return await service.execute_complete_audit(base + "/", deadline_seconds=3)
+
+        audit = asyncio.run(self._with_site(run))
+
+        assert audit["timed_out"] == [f"pagespeed:{audit['website_url']}"]
+        assert audit["tools"][f"on_page:{audit['website_url']}"] == "completed"
+        assert audit["execution_time"] < 10
+        assert audit["overall_score"] == audit["on_page"]["overall_score"]
+
+    def test_stopped_on_page_analysis_skips_remaining_stages(self, monkeypatch):
+        from services.seo_analyzer.core import ComprehensiveSEOAnalyzer
+
+        analyzer = ComprehensiveSEOAnalyzer()
+        monkeypatch.setattr(analyzer.html_fetcher, "fetch_html", lambda url: PAGE.format(title="Home", body="word"))
+        monkeypatch.setattr(analyzer.security_analyzer, "analyze",
+                            lambda url: (_ for _ in ()).throw(AssertionError("stage ran after stop")))
+        stop_event = threading.Event()
+        stop_event.set()
+
+        result = analyzer.analyze_url_progressive("https://example.com/", stop_event=stop_event)
+        assert result.health_status == "error"
+        assert result.critical_issues[0]["message"] == "Analysis failed: Analysis cancelled"
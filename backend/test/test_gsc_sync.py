@@ -0,0 +1,180 @@
+"""
+Unit tests for the incremental Google Search Console sync.
+
+A fake Search Analytics client stands in for the Google API; rows are stored in a
+temporary SQLite database.
+"""
+
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+import services.gsc_service as gsc_module
+from services.gsc_service import GSCService
+
+SITE_URL = "https://example.com/"
+
+
+class FakeSearchAnalytics:
+    """Serves generated rows for date/query/page dimensions with startRow paging."""
+
+    def __init__(self, queries_per_day: int = 3):
+        self.queries_per_day = queries_per_day
+        self.requests = []
+
+    def searchanalytics(self):
+        return self
+
+    def query(self, siteUrl, body):
+        self.requests.append(body)
+        self._body = body
+        return self
+
+    def execute(self):
+        body = self._body
+        start = date.fromisoformat(body['startDate'])
+        end = date.fromisoformat(body['endDate'])
+        rows = []
+        day = start
+        while day <= end:
+            detail = [
+                {'keys': [day.isoformat(), f"query {i}", f"/page-{i % 2}"],
+                 'clicks': i + 1, 'impressions': 10, 'ctr': (i + 1) / 10, 'position': float(i + 1)}
+                for i in range(self.queries_per_day)
+            ]
+            if body['dimensions'] == ['date']:
+                rows.append({'keys': [day.isoformat()], 'clicks': sum(r['clicks'] for r in detail) + 1,
+                             'impressions': 40, 'ctr': 0.2, 'position': 2.0})
+            else:
+                rows.extend(detail)
+            day += timedelta(days=1)
+        start_row = body.get('startRow', 0)
+        return {'rows': rows[start_row:start_row + body['rowLimit']]}
+
+
+class TestGSCSync:
+    """Test cases for paging, incremental windows and local reads."""
+
+    @pytest.fixture(autouse=True)
+    def _service(self, tmp_path, monkeypatch):
+        self.service = GSCService(db_path=str(tmp_path / "gsc.db"))
+        self.api = FakeSearchAnalytics()
+        monkeypatch.setattr(self.service, "get_authenticated_service", lambda user_id: self.api)
+
+    def test_sync_pages_through_all_rows(self, monkeypatch):
+        monkeypatch.setattr(gsc_module, "GSC_PAGE_SIZE", 4)
+        result = self.service.sync_search_analytics("u1", SITE_URL, "2025-01-01", "2025-01-03")
+
+        assert result['rows'] == 9
+        detail_requests = [r for r in self.api.requests if r['dimensions'] != ['date']]
+        assert [r['startRow'] for r in detail_requests] == [0, 4, 8]
+
+    def test_pages_are_stored_as_they_arrive(self, monkeypatch):
+        monkeypatch.setattr(gsc_module, "GSC_PAGE_SIZE", 4)
+        execute = self.api.execute
+
+        def fail_after_first_detail_page():
+            if self.api._body['dimensions'] != ['date'] and self.api._body['startRow'] > 0:
+                raise RuntimeError("quota exceeded")
+            return execute()
+
+        monkeypatch.setattr(self.api, "execute", fail_after_first_detail_page)
+        with pytest.raises(RuntimeError):
+            self.service.sync_search_analytics("u1", SITE_URL, "2025-01-01", "2025-01-03")
+
+        with sqlite3.connect(self.service.db_path) as conn:
+            assert conn.execute('SELECT COUNT(*) FROM gsc_search_analytics').fetchone()[0] == 4
+        assert self.service._get_sync_state("u1", SITE_URL) is None
+
+    def test_incremental_sync_fetches_only_new_and_recent_dates(self):
+        self.service.sync_search_analytics("u1", SITE_URL, "2025-01-01", "2025-01-10")
+        self.api.requests.clear()
+
+        result = self.service.sync_search_analytics("u1", SITE_URL, "2025-01-01", "2025-01-12")
+        refresh_start = date(2025, 1, 10) - timedelta(days=gsc_module.GSC_SYNC_REFRESH_DAYS - 1)
+        assert result['windows'] == [(refresh_start.isoformat(), "2025-01-12")]
+        assert {r['startDate'] for r in self.api.requests} == {refresh_start.isoformat()}
+
+        result = self.service.sync_search_analytics("u1", SITE_URL, "2024-12-28", "2025-01-12")
+        assert result['windows'][0] == ("2024-12-28", "2024-12-31")
+
+    def test_gap_between_disjoint_syncs_is_fetched(self):
+        self.service.sync_search_analytics("u1", SITE_URL, "2025-03-01", "2025-03-30")
+        self.service.sync_search_analytics("u1", SITE_URL, "2025-01-01", "2025-01-10")
+        self.api.requests.clear()
+
+        assert self.service._needs_sync("u1", SITE_URL, "2025-02-01", "2025-02-28")
+        result = self.service.sync_search_analytics("u1", SITE_URL, "2025-01-01", "2025-03-30")
+
+        refresh_start = date(2025, 3, 30) - timedelta(days=gsc_module.GSC_SYNC_REFRESH_DAYS - 1)
+        assert result['windows'] == [("2025-01-11", "2025-02-28"), (refresh_start.isoformat(), "2025-03-30")]
+        data = self.service._read_search_analytics("u1", SITE_URL, "2025-02-01", "2025-02-28")
+        assert data['verification_data']['rowCount'] == 28
+        assert self.service._get_sync_state("u1", SITE_URL)['ranges'] == [(date(2025, 1, 1), date(2025, 3, 30))]
+
+    def test_reads_are_served_from_local_store(self):
+        self.service.sync_search_analytics("u1", SITE_URL, "2025-01-01", "2025-01-02")
+        self.api.requests.clear()
+
+        data = self.service.get_search_analytics("u1", SITE_URL, "2025-01-01", "2025-01-02")
+        assert self.api.requests == []
+
+        overall = data['overall_metrics']['rows'][0]
+        assert overall['clicks'] == 14
+        assert overall['impressions'] == 80
+        assert data['verification_data']['rowCount'] == 2
+
+        top_query = data['query_data']['rows'][0]
+        assert top_query['keys'] == ["query 2"]
+        assert top_query['clicks'] == 6
+        assert top_query['ctr'] == pytest.approx(0.3)
+        assert top_query['position'] == pytest.approx(3.0)
+        assert data['page_data']['rows'][0]['keys'] == ["/page-0"]
+
+    def test_resync_replaces_rows(self):
+        self.service.sync_search_analytics("u1", SITE_URL, "2025-01-01", "2025-01-01")
+        self.api.queries_per_day = 1
+        self.service.sync_search_analytics("u1", SITE_URL, "2025-01-01", "2025-01-01")
+
+        data = self.service._read_search_analytics("u1", SITE_URL, "2025-01-01", "2025-01-01")
+        assert [row['keys'] for row in data['query_data']['rows']] == [["query 0"]]
+        assert data['overall_metrics']['rows'][0]['clicks'] == 2
+
+    def test_authenticated_service_is_cached(self, monkeypatch):
+        service = GSCService(db_path=self.service.db_path)
+        built = []
+
+        class FakeCredentials:
+            valid = True
+
+        monkeypatch.setattr(service, "load_user_credentials", lambda user_id: FakeCredentials())
+        monkeypatch.setattr(gsc_module, "build", lambda *args, **kwargs: built.append(kwargs) or object())
+
+        first = service.get_authenticated_service("u1")
+        assert service.get_authenticated_service("u1") is first
+        assert len(built) == 1
+
+        service.clear_incomplete_credentials("u1")
+        assert service.get_authenticated_service("u1") is not first
+        assert len(built) == 2
+
+    def test_revoke_through_one_instance_drops_client_of_others(self, monkeypatch):
+        built = []
+
+        class FakeCredentials:
+            valid = True
+
+        monkeypatch.setattr(GSCService, "load_user_credentials", lambda self, user_id: FakeCredentials())
+        monkeypatch.setattr(gsc_module, "build", lambda *args, **kwargs: built.append(kwargs) or object())
+        job_service = GSCService(db_path=self.service.db_path)
+        router_service = GSCService(db_path=self.service.db_path)
+
+        client = job_service.get_authenticated_service("u2")
+        assert router_service.get_authenticated_service("u2") is client
+
+        with sqlite3.connect(self.service.db_path) as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS gsc_oauth_states (state TEXT, user_id TEXT)')
+        assert router_service.revoke_user_access("u2")
+        assert job_service.get_authenticated_service("u2") is not client
+        assert len(built) == 2
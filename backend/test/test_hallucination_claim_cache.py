@@ -0,0 +1,186 @@
+"""
+Unit tests for claim-level caching and concurrent evidence search in the
+hallucination detector.
+
+Exa is served by a local aiohttp server and the Gemini assessment is replaced by
+a stub, so no external requests are made.
+"""
+
+import asyncio
+import time
+
+from aiohttp import web
+
+from services.hallucination_claim_cache import ClaimVerificationCache, normalize_claim
+from services.hallucination_detector import Claim, HallucinationDetector
+from services.research.exa_search_client import AsyncExaClient
+
+
+class TestClaimVerificationCache:
+    """Test the SQLite claim cache."""
+
+    def setup_method(self):
+        self.verification = {
+            "confidence": 0.9,
+            "assessment": "supported",
+            "supporting_sources": [],
+            "refuting_sources": [],
+            "reasoning": "Matches the source"
+        }
+
+    def test_normalized_claims_share_an_entry(self, tmp_path):
+        cache = ClaimVerificationCache(db_path=str(tmp_path / "claims.db"))
+        cache.put("The Eiffel Tower is 330 metres tall.", self.verification)
+
+        assert normalize_claim('  "The Eiffel  Tower is 330 metres TALL"  ') == "the eiffel tower is 330 metres tall"
+        assert cache.get("the eiffel tower is 330 metres tall") == self.verification
+        assert cache.get("The Eiffel Tower is 300 metres tall.") is None
+
+    def test_expired_entries_are_misses(self, tmp_path):
+        cache = ClaimVerificationCache(db_path=str(tmp_path / "claims.db"), ttl_hours=1)
+        cache.put("Water boils at 100 C", self.verification)
+        with cache._connect() as conn:
+            conn.execute("UPDATE claim_verifications SET verified_at = ?", (time.time() - 7200,))
+
+        assert cache.get("Water boils at 100 C") is None
+        assert cache.purge_expired() == 1
+
+
+class TestHallucinationDetectorCaching:
+    """Test that evidence is searched concurrently and verified claims are reused."""
+
+    def setup_method(self):
+        self.queries = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.assessed = []
+
+    def _app(self):
+        async def search(request):
+            payload = await request.json()
+            self.queries.append(payload["query"])
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.2)
+            self.in_flight -= 1
+            slug = payload["query"].split()[0].lower()
+            if slug == "unknown":
+                return web.json_response({"results": []})
+            return web.json_response({"results": [
+                {"title": slug, "url": f"https://example.com/{slug}", "text": payload["query"]},
+                {"title": "Shared", "url": "https://example.com/shared", "text": "shared source"}
+            ]})
+
+        app = web.Application()
+        app.router.add_post("/search", search)
+        return app
+
+    def _detector(self, base, tmp_path):
+        detector = HallucinationDetector(
+            exa_client=AsyncExaClient(api_key="test", search_url=base + "/search"),
+            claim_cache=ClaimVerificationCache(db_path=str(tmp_path / "claims.db"))
+        )
+
+        async def assess(claims, sources_per_claim):
+            self.assessed.append([(claim, [source["url"] for source in sources])
+                                  for claim, sources in zip(claims, sources_per_claim)])
+            return [
+                Claim(text=claim, confidence=0.8, assessment="supported",
+                      supporting_sources=sources[:1], refuting_sources=[], reasoning="Found in sources")
+                for claim, sources in zip(claims, sources_per_claim)
+            ]
+
+        detector._assess_claims_batch = assess
+        return detector
+
+    async def _with_exa(self, run):
+        runner = web.AppRunner(self._app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        try:
+            return await run(f"http://127.0.0.1:{runner.addresses[0][1]}")
+        finally:
+            await runner.cleanup()
+
+    def test_searches_run_concurrently_and_assess_once(self, tmp_path):
+        claims = ["Alpha launched in 2019.", "Beta has 10 million users.", "Gamma is based in Berlin."]
+
+        async def run(base):
+            detector = self._detector(base, tmp_path)
+            try:
+                return await detector._verify_claims_batch(claims)
+            finally:
+                await detector.exa_client.close()
+
+        verified = asyncio.run(self._with_exa(run))
+
+        assert [claim.text for claim in verified] == claims
+        assert all(claim.assessment == "supported" for claim in verified)
+        assert sorted(self.queries) == sorted(claims)
+        assert self.max_in_flight > 1
+        # One assessment call, each claim with only its own sources
+        assert len(self.assessed) == 1
+        assert self.assessed[0][0] == ("Alpha launched in 2019.", ["https://example.com/alpha", "https://example.com/shared"])
+        assert [urls[0] for _, urls in self.assessed[0]] == [
+            "https://example.com/alpha", "https://example.com/beta", "https://example.com/gamma"
+        ]
+
+    def test_claims_without_sources_are_not_assessed_or_cached(self, tmp_path):
+        claims = ["Alpha launched in 2019.", "Unknown startup raised $5M."]
+
+        async def run(base):
+            detector = self._detector(base, tmp_path)
+            try:
+                verified = await detector._verify_claims_batch(claims)
+                return verified, await detector._verify_claims_batch(claims)
+            finally:
+                await detector.exa_client.close()
+
+        verified, rechecked = asyncio.run(self._with_exa(run))
+
+        assert verified[0].assessment == "supported"
+        assert (verified[1].assessment, verified[1].reasoning) == (
+            "insufficient_information", "No sources found for verification"
+        )
+        assert [claim for claim, _ in self.assessed[0]] == ["Alpha launched in 2019."]
+        # Only the verified claim was cached; the unsourced one is searched again
+        assert rechecked[1].reasoning == "No sources found for verification"
+        assert self.queries.count("Unknown startup raised $5M.") == 2
+        assert self.queries.count("Alpha launched in 2019.") == 1
+
+    def test_recheck_only_verifies_new_claims(self, tmp_path):
+        first = ["Alpha launched in 2019.", "Beta has 10 million users."]
+        second = ["alpha launched in 2019", "Beta has 10 million users.", "Delta was acquired in 2021."]
+
+        async def run(base):
+            detector = self._detector(base, tmp_path)
+            try:
+                await detector._verify_claims_batch(first)
+                return await detector._verify_claims_batch(second)
+            finally:
+                await detector.exa_client.close()
+
+        verified = asyncio.run(self._with_exa(run))
+
+        assert [claim.text for claim in verified] == second
+        assert all(claim.assessment == "supported" for claim in verified)
+        assert self.queries.count("Delta was acquired in 2021.") == 1
+        assert len(self.queries) == 3
+        assert [claim for claim, _ in self.assessed[-1]] == ["Delta was acquired in 2021."]
+
+    def test_duplicate_claims_are_verified_once(self, tmp_path):
+        claims = ["Alpha launched in 2019.", "ALPHA launched in 2019!", "Alpha launched in 2019."]
+
+        async def run(base):
+            detector = self._detector(base, tmp_path)
+            try:
+                return await detector._verify_claims_batch(claims)
+            finally:
+                await detector.exa_client.close()
+
+        verified = asyncio.run(self._with_exa(run))
+
+        assert len(verified) == 3
+        assert all(claim.assessment == "supported" for claim in verified)
+        assert len(self.queries) == 1
@@ -0,0 +1,113 @@
+"""
+Unit tests for the LinkedIn image storage metadata index.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+from services.linkedin.image_generation import LinkedInImageStorage
+
+
+def _png(color=(255, 0, 0)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestLinkedInImageIndex:
+    """Test cases for indexed listing, lookup, cleanup and rebuilding."""
+
+    def setup_method(self):
+        self.image = _png()
+
+    def _store(self, storage, **metadata):
+        content_type = metadata.pop("content_type", "post")
+        result = asyncio.run(storage.store_image(self.image, dict(metadata), content_type))
+        assert result["success"]
+        return result["image_id"]
+
+    def test_lookup_and_paginated_listing(self, tmp_path):
+        storage = LinkedInImageStorage(storage_path=str(tmp_path))
+        ids = [self._store(storage, topic=f"t{index}", user_id="u1") for index in range(3)]
+        article_id = self._store(storage, topic="a", user_id="u2", content_type="article")
+
+        metadata = asyncio.run(storage.get_image_metadata(ids[0]))
+        assert metadata["topic"] == "t0" and metadata["file_size"] == len(self.image)
+        assert asyncio.run(storage.retrieve_image(article_id))["image_data"] == self.image
+
+        page = asyncio.run(storage.list_images(user_id="u1", limit=2))
+        assert (page["total_count"], len(page["images"]), page["has_more"]) == (3, 2, True)
+        rest = asyncio.run(storage.list_images(user_id="u1", limit=2, offset=2))
+        assert {image["image_id"] for image in page["images"] + rest["images"]} == set(ids)
+
+        articles = asyncio.run(storage.list_images(content_type="article"))
+        assert [image["image_id"] for image in articles["images"]] == [article_id]
+
+        stats = asyncio.run(storage.get_storage_stats())
+        assert stats["total_files"] == 4
+        assert stats["content_type_counts"] == {"post": 3, "article": 1}
+
+    def test_explicit_none_content_type_and_user_are_stored(self, tmp_path):
+        storage = LinkedInImageStorage(storage_path=str(tmp_path))
+        result = asyncio.run(storage.store_image(self.image, {"topic": "t", "content_type": None}, "article", user_id="u3"))
+
+        metadata = asyncio.run(storage.get_image_metadata(result["image_id"]))
+        assert (metadata["content_type"], metadata["user_id"]) == ("article", "u3")
+        listed = asyncio.run(storage.list_images(user_id="u3", content_type="article"))
+        assert [image["image_id"] for image in listed["images"]] == [result["image_id"]]
+
+    def test_delete_and_cleanup_update_index(self, tmp_path):
+        storage = LinkedInImageStorage(storage_path=str(tmp_path))
+        old_id = self._store(storage, topic="old")
+        new_id = self._store(storage, topic="new")
+        deleted_id = self._store(storage, topic="deleted")
+
+        assert asyncio.run(storage.delete_image(deleted_id))["success"]
+        assert asyncio.run(storage.get_image_metadata(deleted_id)) is None
+
+        metadata = storage.index.get(old_id)
+        metadata["stored_at"] = (datetime.now() - timedelta(days=40)).isoformat()
+        storage.index.upsert(metadata, metadata.pop("file_size"))
+
+        result = asyncio.run(storage.cleanup_old_images())
+        assert result["deleted_count"] == 1
+        remaining = asyncio.run(storage.list_images())["images"]
+        assert [image["image_id"] for image in remaining] == [new_id]
+
+    def test_cleanup_keeps_index_row_when_file_cannot_be_deleted(self, tmp_path, monkeypatch):
+        storage = LinkedInImageStorage(storage_path=str(tmp_path))
+        gone_id = self._store(storage, topic="gone")
+        locked_id = self._store(storage, topic="locked")
+        for image_id in (gone_id, locked_id):
+            metadata = storage.index.get(image_id)
+            metadata["stored_at"] = (datetime.now() - timedelta(days=40)).isoformat()
+            storage.index.upsert(metadata, metadata.pop("file_size"))
+        Path(storage.index.get(gone_id)["storage_path"]).unlink()
+
+        async def failing_delete(image_id):
+            return {"success": False, "error": "Permission denied"}
+
+        monkeypatch.setattr(storage, "delete_image", failing_delete)
+        result = asyncio.run(storage.cleanup_old_images())
+
+        assert result["deleted_count"] == 0 and len(result["errors"]) == 2
+        assert storage.index.get(gone_id) is None
+        assert storage.index.get(locked_id) is not None
+        assert (tmp_path / "metadata" / f"{locked_id}.json").exists()
+
+    def test_existing_store_is_migrated(self, tmp_path):
+        storage = LinkedInImageStorage(storage_path=str(tmp_path))
+        image_id = self._store(storage, topic="legacy")
+        orphan = tmp_path / "metadata" / "orphan.json"
+        orphan.write_text(json.dumps({"image_id": "orphan", "stored_at": datetime.now().isoformat()}))
+        (tmp_path / "image_index.db").unlink()
+
+        reopened = LinkedInImageStorage(storage_path=str(tmp_path))
+        assert reopened.index.count() == 1
+        assert asyncio.run(reopened.get_image_metadata(image_id))["topic"] == "legacy"
+        assert reopened.rebuild_index() == {"success": True, "indexed_count": 1, "skipped_count": 1}
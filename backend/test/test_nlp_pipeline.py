@@ -0,0 +1,111 @@
+"""
+Unit tests for the shared persona NLP pipeline and the analyzers reading its documents.
+
+Documents are built by a small regex tokenizer so the analyzer runs without the
+spaCy model; the spaCy-backed test is skipped when spaCy is not installed.
+"""
+
+import re
+
+import pytest
+
+from services.persona.enhanced_linguistic_analyzer import EnhancedLinguisticAnalyzer
+from services.persona.nlp_pipeline import NLPPipeline, ParsedDocument, ParsedToken
+
+STOP_WORDS = {"the", "a", "is", "and", "we", "it"}
+
+
+def _parse(text: str) -> ParsedDocument:
+    sentences = [s for s in re.split(r"(?<=[.!?])\s+", text.strip()) if s]
+    sentence_tokens = [
+        [ParsedToken(t, t.lower(), "NN" if t.isalpha() else ".", t.isalpha(), t.lower() in STOP_WORDS)
+         for t in re.findall(r"\w+|[^\w\s]", sentence)]
+        for sentence in sentences
+    ]
+    return ParsedDocument(text, sentences, sentence_tokens)
+
+
+class RegexPipeline:
+    """Pipeline stand-in that records how often texts are parsed."""
+
+    nlp = None
+
+    def __init__(self):
+        self.parsed = []
+
+    def parse_many(self, texts):
+        texts = list(texts)
+        self.parsed.append(texts)
+        return [_parse(text) for text in texts]
+
+
+SAMPLES = [
+    "We love building great tools. The team is amazing! Do you like it?",
+    "However, the product is good and simple. We ship every week.",
+]
+
+
+class TestParsedDocument:
+    """Test cases for the derived token views of a parsed document."""
+
+    def test_token_views(self):
+        doc = _parse("The cat sat. It is happy!")
+        assert doc.sentences == ["The cat sat.", "It is happy!"]
+        assert doc.sentence_lengths() == [4, 4]
+        assert doc.words == ["the", "cat", "sat", "it", "is", "happy"]
+        assert doc.content_words == ["cat", "sat", "happy"]
+        assert doc.pos_tags[0] == ("the", "NN")
+
+    def test_combine_and_slice(self):
+        first, second = _parse("One two. Three."), _parse("Four five!")
+        combined = ParsedDocument.combine([first, second])
+        assert combined.text == "One two. Three. Four five!"
+        assert combined.sentences == ["One two.", "Three.", "Four five!"]
+        assert combined.words == ["one", "two", "three", "four", "five"]
+
+        tail = combined.slice(1)
+        assert tail.text == "Three. Four five!"
+        assert tail.words == ["three", "four", "five"]
+
+
+class TestEnhancedLinguisticAnalyzer:
+    """Test that the analyzer parses each sample once and reads the shared documents."""
+
+    def setup_method(self):
+        self.pipeline = RegexPipeline()
+        self.analyzer = EnhancedLinguisticAnalyzer(self.pipeline)
+
+    def test_samples_are_parsed_once_in_one_batch(self):
+        analysis = self.analyzer.analyze_writing_style(SAMPLES)
+
+        assert "error" not in analysis
+        assert self.pipeline.parsed == [SAMPLES]
+        assert analysis["basic_metrics"]["total_words"] == 24
+        assert analysis["basic_metrics"]["total_sentences"] == 5
+        assert analysis["sentence_analysis"]["sentence_type_distribution"] == {
+            "declarative": 3, "exclamation": 1, "question": 1
+        }
+        assert analysis["vocabulary_analysis"]["pos_distribution"] == {"NN": 24}
+        assert analysis["style_patterns"]["personal_pronouns"]["we"] == 2
+        assert analysis["emotional_analysis"]["sentiment_bias"] == "positive"
+        assert analysis["consistency_analysis"]["style_stability"]["formality_consistency"] == 100
+
+    def test_single_sample(self):
+        analysis = self.analyzer.analyze_writing_style(SAMPLES[:1])
+        assert analysis["consistency_analysis"]["consistency_score"] == 100
+        assert analysis["analysis_metadata"]["sample_count"] == 1
+
+
+class TestNLPPipeline:
+    """Test the spaCy-backed pipeline with a blank English model."""
+
+    def test_parse_many_matches_parse(self):
+        spacy = pytest.importorskip("spacy")
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+        pipeline = NLPPipeline(nlp=nlp, batch_size=2)
+
+        documents = pipeline.parse_many(SAMPLES)
+        assert [doc.sentences for doc in documents] == [pipeline.parse(text).sentences for text in SAMPLES]
+        assert documents[0].sentences[1] == "The team is amazing!"
+        assert documents[1].words[:3] == ["however", "the", "product"]
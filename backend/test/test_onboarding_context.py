@@ -0,0 +1,107 @@
+"""
+Unit tests for the per-user onboarding context snapshot and its invalidation.
+
+Runs against an in-memory SQLite database.
+"""
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from models.onboarding import Base, OnboardingSession, WebsiteAnalysis, ResearchPreferences, APIKey
+from services.onboarding_context import onboarding_context_cache, get_onboarding_context
+from services.onboarding_database_service import OnboardingDatabaseService
+from services.persona.core_persona.data_collector import OnboardingDataCollector
+from services.research_preferences_service import ResearchPreferencesService
+
+
+class TestOnboardingContext:
+    """Test loading, caching and invalidating onboarding snapshots."""
+
+    def setup_method(self):
+        """Create an in-memory database with one user's onboarding rows."""
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+
+        session = OnboardingSession(user_id="user_1", current_step=4, progress=60.0)
+        self.db.add(session)
+        self.db.flush()
+        self.db.add_all([
+            WebsiteAnalysis(session_id=session.id, website_url="https://example.com",
+                            writing_style={"tone": "friendly"}, target_audience={"industry_focus": "marketing"}),
+            ResearchPreferences(session_id=session.id, research_depth="Standard", content_types=["blog"]),
+            APIKey(session_id=session.id, provider="gemini", key="g-key"),
+            APIKey(session_id=session.id, provider="exa", key="e-key")
+        ])
+        self.db.commit()
+        self.session_id = session.id
+
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        onboarding_context_cache.clear()
+
+    def teardown_method(self):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+        self.db.close()
+        onboarding_context_cache.clear()
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.statements.append(statement)
+
+    def test_snapshot_loads_in_one_query_and_is_cached(self):
+        context = get_onboarding_context("user_1", self.db)
+
+        assert len(self.statements) == 1
+        assert context.session_id == self.session_id
+        assert context.website_analysis["writing_style"] == {"tone": "friendly"}
+        assert context.research_preferences["research_depth"] == "Standard"
+        assert context.api_key_map == {"gemini": "g-key", "exa": "e-key"}
+
+        service = OnboardingDatabaseService(self.db)
+        assert service.get_api_keys("user_1") == {"gemini": "g-key", "exa": "e-key"}
+        assert service.get_research_preferences("user_1")["content_types"] == ["blog"]
+        assert service.get_onboarding_status("user_1")["current_step"] == 4
+        assert len(self.statements) == 1
+
+    def test_unknown_user_gets_empty_snapshot(self):
+        context = get_onboarding_context("nobody", self.db)
+
+        assert context.session is None
+        assert context.website_analyses == [] and context.api_key_map == {}
+        assert OnboardingDatabaseService(self.db).get_website_analysis("nobody") is None
+
+    def test_save_methods_invalidate_snapshot(self):
+        service = OnboardingDatabaseService(self.db)
+        assert service.get_research_preferences("user_1")["research_depth"] == "Standard"
+
+        assert service.save_research_preferences("user_1", {"research_depth": "Expert", "content_types": ["video"]})
+        assert service.get_research_preferences("user_1")["research_depth"] == "Expert"
+
+        assert service.save_api_key("user_1", "gemini", "new-key")
+        assert service.get_api_keys("user_1")["gemini"] == "new-key"
+
+        assert service.update_step("user_1", 5)
+        assert service.get_onboarding_status("user_1")["current_step"] == 5
+
+    def test_session_keyed_writers_invalidate_snapshot(self):
+        assert get_onboarding_context("user_1", self.db).research_preferences["research_depth"] == "Standard"
+
+        ResearchPreferencesService(self.db).save_research_preferences(
+            self.session_id, {"research_depth": "Comprehensive", "content_types": ["blog"]}
+        )
+
+        assert get_onboarding_context("user_1", self.db).research_preferences["research_depth"] == "Comprehensive"
+
+    def test_persona_collector_reads_cached_snapshot(self):
+        get_onboarding_context("user_1", self.db)
+        self.statements.clear()
+
+        data = OnboardingDataCollector().collect_onboarding_data("user_1")
+
+        assert self.statements == []
+        assert data["session_info"]["session_id"] == self.session_id
+        assert data["website_analysis"]["website_url"] == "https://example.com"
+        assert data["enhanced_analysis"]["comprehensive_style_analysis"]["tone_analysis"] == "friendly"
+        assert data["enhanced_analysis"]["research_preferences"]["research_depth"] == "Standard"
+        assert OnboardingDataCollector().collect_onboarding_data("user_1", session_id=self.session_id + 1) is None
@@ -0,0 +1,123 @@
+"""
+Unit tests for PageSpeed Insights result caching and request coalescing.
+
+The PSI API is served by a local aiohttp server, so no external requests are made.
+"""
+
+import asyncio
+import json
+import sqlite3
+
+from aiohttp import web
+
+from services.seo_tools.pagespeed_cache import PageSpeedCache, pagespeed_cache_key
+from services.seo_tools.pagespeed_service import PageSpeedService
+
+
+def _lighthouse_report(strategy):
+    audits = {
+        "largest-contentful-paint": {"score": 0.5, "displayValue": "3.1 s", "numericValue": 3100, "title": "LCP"},
+        "unused-javascript": {
+            "score": 0.4, "scoreDisplayMode": "numeric", "title": "Reduce unused JavaScript",
+            "details": {"overallSavingsMs": 800, "overallSavingsBytes": 50000, "items": [{"url": "x" * 1000}] * 50}
+        },
+        "screenshot-thumbnails": {"score": None, "scoreDisplayMode": "informative", "details": {"data": "y" * 50000}}
+    }
+    return {
+        "analysisUTCTimestamp": "2024-01-01T00:00:00Z",
+        "lighthouseResult": {
+            "lighthouseVersion": "12.0.0",
+            "categories": {"performance": {"score": 0.9 if strategy == "DESKTOP" else 0.6, "title": "Performance"}},
+            "audits": audits
+        }
+    }
+
+
+class TestPageSpeedCache:
+    """Test that PSI runs are coalesced, run concurrently and cached compactly."""
+
+    def setup_method(self):
+        self.api_calls = []
+        self.in_flight = {"now": 0, "max": 0}
+
+    def _app(self):
+        async def handler(request):
+            self.api_calls.append(request.query["strategy"])
+            self.in_flight["now"] += 1
+            self.in_flight["max"] = max(self.in_flight["max"], self.in_flight["now"])
+            await asyncio.sleep(0.1)
+            self.in_flight["now"] -= 1
+            return web.json_response(_lighthouse_report(request.query["strategy"]))
+
+        app = web.Application()
+        app.router.add_get("/runPagespeed", handler)
+        return app
+
+    def _service(self, tmp_path, base):
+        service = PageSpeedService(cache=PageSpeedCache(str(tmp_path / "psi.db")))
+        service.base_url = base + "/runPagespeed"
+
+        async def no_ai_insights(structured_results, url, strategy):
+            return {}
+
+        service._generate_ai_insights = no_ai_insights
+        return service
+
+    async def _with_api(self, run):
+        runner = web.AppRunner(self._app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        try:
+            return await run(f"http://127.0.0.1:{runner.addresses[0][1]}")
+        finally:
+            await runner.cleanup()
+
+    def test_identical_requests_coalesced_then_cached(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        async def run(base):
+            service = self._service(tmp_path, base)
+            first, second = await asyncio.gather(
+                service.analyze_pagespeed("https://example.com/", "MOBILE"),
+                service.analyze_pagespeed("https://example.com/", "MOBILE",
+                                          categories=["seo", "best-practices", "accessibility", "performance"])
+            )
+            third = await self._service(tmp_path, base).analyze_pagespeed("https://example.com/", "MOBILE")
+            return first, second, third
+
+        first, second, third = asyncio.run(self._with_api(run))
+
+        assert self.api_calls == ["MOBILE"]
+        assert not first["cached"] and third["cached"]
+        assert first["category_scores"] == second["category_scores"] == third["category_scores"]
+        assert third["opportunities"][0]["id"] == "unused-javascript"
+        assert third["raw_data"]["lighthouse_version"] == "12.0.0"
+
+    def test_strategies_run_concurrently_and_store_only_extracted_audits(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        async def run(base):
+            return await self._service(tmp_path, base).analyze_pagespeed_strategies("https://example.com/")
+
+        results = asyncio.run(self._with_api(run))
+
+        assert sorted(self.api_calls) == ["DESKTOP", "MOBILE"]
+        assert self.in_flight["max"] == 2
+        assert results["DESKTOP"]["category_scores"]["performance"]["score"] == 90
+        assert results["MOBILE"]["category_scores"]["performance"]["score"] == 60
+
+        with sqlite3.connect(str(tmp_path / "psi.db")) as conn:
+            stored = [json.loads(row[0]) for row in conn.execute("SELECT result FROM pagespeed_results")]
+        assert len(stored) == 2
+        assert all("lighthouseResult" not in entry and "results" in entry for entry in stored)
+        assert max(len(json.dumps(entry)) for entry in stored) < 5000
+
+    def test_expired_entries_are_not_served(self, tmp_path):
+        key = pagespeed_cache_key("https://example.com/", "mobile", ["seo", "performance"], "en")
+        assert key == ("https://example.com/", "MOBILE", "performance,seo", "en")
+
+        PageSpeedCache(str(tmp_path / "psi.db")).put(key, {"results": {}})
+        expired = PageSpeedCache(str(tmp_path / "psi.db"), ttl_hours=-1)
+        assert expired.get(key) is None
+        assert expired.purge_expired() == 1
@@ -0,0 +1,98 @@
+"""
+Unit tests for the process-wide pricing and plan cache.
+
+Runs against an in-memory SQLite database.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from models.subscription_models import (
+    Base, APIProvider, APIProviderPricing, SubscriptionPlan, SubscriptionTier, UserSubscription
+)
+from services.pricing_service import PricingCatalog, PricingService, compute_api_cost
+import services.pricing_service as pricing_module
+
+
+class TestPricingCatalog:
+    """Test cases for cached pricing lookups, plan limits and invalidation."""
+
+    @pytest.fixture(autouse=True)
+    def _catalog(self, monkeypatch):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.statements = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: self.statements.append(statement))
+        self.db = sessionmaker(bind=engine)()
+        self.db.add_all([
+            APIProviderPricing(provider=APIProvider.GEMINI, model_name="gemini-2.5-flash",
+                               cost_per_input_token=0.0000003, cost_per_output_token=0.0000025,
+                               tokens_per_word=1.5),
+            APIProviderPricing(provider=APIProvider.TAVILY, model_name="tavily-search", cost_per_search=0.001),
+            SubscriptionPlan(name="Free", tier=SubscriptionTier.FREE, gemini_calls_limit=100),
+            SubscriptionPlan(name="Pro", tier=SubscriptionTier.PRO, gemini_calls_limit=5000)
+        ])
+        self.db.commit()
+        self.catalog = PricingCatalog()
+        monkeypatch.setattr(pricing_module, "pricing_catalog", self.catalog)
+        self.service = PricingService(self.db)
+        yield
+        self.db.close()
+
+    def test_cost_calculation_is_served_from_cache(self):
+        self.service.calculate_api_cost(APIProvider.GEMINI, "gemini-2.5-flash", 1000, 100)
+        self.statements.clear()
+
+        for _ in range(10):
+            cost = self.service.calculate_api_cost(APIProvider.GEMINI, "gemini-2.5-flash", 1000, 100)
+        assert self.statements == []
+        assert cost == {'cost_input': 0.0003, 'cost_output': 0.00025, 'cost_total': 0.00055}
+
+        cost = self.service.calculate_api_cost(APIProvider.TAVILY, "tavily-search", search_count=2)
+        assert cost['cost_total'] == pytest.approx(0.002)
+        assert self.service.estimate_tokens("one two", APIProvider.GEMINI) == 3
+        assert self.service.get_pricing_info(APIProvider.TAVILY)['model_name'] == "tavily-search"
+
+    def test_missing_pricing_uses_default_estimate(self):
+        assert compute_api_cost(None, 1_000_000, 0)['cost_total'] == pytest.approx(1.0)
+        cost = self.service.calculate_api_cost(APIProvider.OPENAI, "unknown", 1_000_000, 0)
+        assert cost['cost_total'] == pytest.approx(1.0)
+
+    def test_user_limits_memoized_per_user(self):
+        assert self.service.get_user_limits("u1")['plan_name'] == "Free"
+        self.statements.clear()
+        assert self.service.get_user_limits("u1")['plan_name'] == "Free"
+        assert self.statements == []
+
+        pro = self.db.query(SubscriptionPlan).filter(SubscriptionPlan.name == "Pro").first()
+        now = datetime.utcnow()
+        self.db.add(UserSubscription(user_id="u1", plan_id=pro.id, current_period_start=now,
+                                     current_period_end=now + timedelta(days=30)))
+        self.db.commit()
+        self.catalog.invalidate_user("u1")
+        assert self.service.get_user_limits("u1")['limits']['gemini_calls'] == 5000
+
+    def test_changed_tables_reload_after_ttl(self):
+        version = self.catalog.version
+        self.service.calculate_api_cost(APIProvider.GEMINI, "gemini-2.5-flash", 1000)
+        assert self.catalog.version == version + 1
+
+        pricing = self.db.query(APIProviderPricing).filter(APIProviderPricing.model_name == "gemini-2.5-flash").first()
+        pricing.cost_per_input_token = 0.000001
+        pricing.updated_at = datetime.utcnow() + timedelta(seconds=1)
+        self.db.commit()
+
+        # Still cached within the TTL
+        assert self.service.calculate_api_cost(APIProvider.GEMINI, "gemini-2.5-flash", 1000)['cost_input'] == 0.0003
+
+        self.catalog.ttl_seconds = 0
+        assert self.service.calculate_api_cost(APIProvider.GEMINI, "gemini-2.5-flash", 1000)['cost_input'] == 0.001
+        assert self.catalog.version == version + 2
+
+        # An unchanged fingerprint does not reload
+        self.service.calculate_api_cost(APIProvider.GEMINI, "gemini-2.5-flash", 1000)
+        assert self.catalog.version == version + 2
@@ -0,0 +1,79 @@
+"""
+Unit tests for lazy router mounting in RouterManager.
+
+Lazy groups point at small router modules registered in sys.modules.
+"""
+
+import asyncio
+import sys
+import types
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from alwrity_utils.router_manager import RouterManager
+
+
+def _register_router_module(name: str, prefix: str) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.router = APIRouter(prefix=prefix)
+
+    @module.router.get("/ping")
+    async def ping():
+        return {"router": name}
+
+    sys.modules[name] = module
+    return module
+
+
+class TestLazyRouters:
+    """Test cases for mounting lazy router groups on first use and on warm-up."""
+
+    def setup_method(self):
+        _register_router_module("lazy_reports_router", "/api/reports")
+        _register_router_module("lazy_reports_admin_router", "/api/reports/admin")
+        _register_router_module("lazy_search_router", "/api/search")
+        self.app = FastAPI()
+        self.manager = RouterManager(self.app)
+        self.app.middleware("http")(self.manager.lazy_router_middleware)
+        self.manager.include_lazy_routers({
+            "/api/reports": [
+                ("reports", "lazy_reports_router", "router"),
+                ("reports_admin", "lazy_reports_admin_router", "router"),
+            ],
+            "/api/search": [("search", "lazy_search_router", "router")],
+            "/api/broken": [("broken", "lazy_missing_router_module", "router")],
+        })
+
+    def teardown_method(self):
+        for name in ("lazy_reports_router", "lazy_reports_admin_router", "lazy_search_router"):
+            sys.modules.pop(name, None)
+
+    def test_group_is_mounted_on_first_request(self):
+        assert "reports" not in self.manager.included_routers
+
+        client = TestClient(self.app)
+        assert client.get("/api/reports/admin/ping").json() == {"router": "lazy_reports_admin_router"}
+        assert client.get("/api/reports/ping").json() == {"router": "lazy_reports_router"}
+
+        status = self.manager.get_router_status()
+        assert status["included_routers"] == ["reports", "reports_admin"]
+        assert sorted(status["pending_lazy_routers"]) == ["broken", "search"]
+        # Prefix matching is per path segment
+        assert client.get("/api/searches").status_code == 404
+        assert "search" not in self.manager.included_routers
+
+    def test_new_routes_appear_in_openapi_schema(self):
+        client = TestClient(self.app)
+        assert "/api/search/ping" not in client.get("/openapi.json").json()["paths"]
+        client.get("/api/search/ping")
+        assert "/api/search/ping" in client.get("/openapi.json").json()["paths"]
+
+    def test_warm_up_mounts_pending_groups_and_runs_warmups(self):
+        warmed = []
+        asyncio.run(self.manager.warm_up_lazy_routers(delay_seconds=0, warmups=[lambda: warmed.append(True)]))
+
+        assert self.manager.pending_lazy_routers == {}
+        assert sorted(self.manager.included_routers) == ["reports", "reports_admin", "search"]
+        assert [failure["name"] for failure in self.manager.failed_routers] == ["broken"]
+        assert warmed == [True]
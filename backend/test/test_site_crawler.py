@@ -0,0 +1,113 @@
+"""
+Unit tests for the site crawler and the technical SEO checks.
+
+The site is served by a local aiohttp server, so no external requests are made.
+"""
+
+import asyncio
+
+from aiohttp import web
+
+from services.seo_tools.site_crawler import CrawlValidatorStore, SiteCrawler, normalize_url
+from services.seo_tools.technical_seo_service import TechnicalSEOService
+
+
+def _page(title, links=(), canonical=None, extra_head=""):
+    anchors = "".join(f'<a href="{link}">link</a>' for link in links)
+    canonical_tag = f'<link rel="canonical" href="{canonical}">' if canonical else ""
+    return (
+        f"<html><head><title>{title}</title>{canonical_tag}{extra_head}"
+        f'<meta name="description" content="about {title}"></head>'
+        f"<body><h1>{title}</h1>{anchors}</body></html>"
+    )
+
+
+class TestSiteCrawler:
+    """Test crawling a local site and running the technical checks on it."""
+
+    def setup_method(self):
+        self.requests = []
+        self.conditional_requests = []
+
+    def _app(self):
+        pages = {
+            "/": _page("Home", ["/a", "/b#section", "/private/x", "/old", "/missing", "https://other.example/"],
+                       extra_head='<link rel="alternate" hreflang="english" href="/a">'),
+            "/a": _page("Shared title", ["/", "/deep/1"]),
+            "/b": _page("Shared title", ["/a"], canonical="/a"),
+            "/deep/1": _page("Deep", ["/deep/2"]),
+            "/deep/2": _page("Deeper"),
+        }
+
+        async def handler(request):
+            path = request.path
+            self.requests.append(path)
+            if path == "/robots.txt":
+                return web.Response(text="User-agent: *\nDisallow: /private/\n")
+            if path == "/old":
+                raise web.HTTPMovedPermanently("/moved")
+            if path == "/moved":
+                raise web.HTTPFound("/b")
+            if path not in pages:
+                return web.Response(status=404)
+            if path == "/a":
+                if request.headers.get("If-None-Match") == '"v1"':
+                    self.conditional_requests.append(path)
+                    return web.Response(status=304)
+                return web.Response(text=pages[path], content_type="text/html", headers={"ETag": '"v1"'})
+            return web.Response(text=pages[path], content_type="text/html")
+
+        app = web.Application()
+        app.router.add_get("/{path:.*}", handler)
+        return app
+
+    async def _with_site(self, run):
+        runner = web.AppRunner(self._app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        try:
+            return await run(f"http://127.0.0.1:{runner.addresses[0][1]}")
+        finally:
+            await runner.cleanup()
+
+    def test_crawl_respects_robots_depth_and_dedupes(self, tmp_path):
+        async def run(base):
+            crawler = SiteCrawler(max_depth=2, validator_store=CrawlValidatorStore(str(tmp_path / "crawl.db")))
+            records = [record async for record in crawler.crawl(base + "/")]
+            return crawler, records
+
+        crawler, records = asyncio.run(self._with_site(run))
+        paths = sorted(record.url.split(":", 2)[2].split("/", 1)[1] for record in records)
+
+        assert paths == ["", "a", "b", "deep/1", "missing", "old"]
+        assert "/private/x" not in self.requests and "/deep/2" not in self.requests
+        assert crawler.stats["blocked_by_robots"] == 1
+        redirected = next(record for record in records if record.url.endswith("/old"))
+        assert redirected.final_url.endswith("/b") and len(redirected.redirect_chain) == 2
+
+    def test_recrawl_uses_conditional_requests(self, tmp_path):
+        service = TechnicalSEOService(validator_store=CrawlValidatorStore(str(tmp_path / "crawl.db")))
+
+        async def run(base):
+            first = await service.analyze_technical_seo(base + "/", crawl_depth=1)
+            second = await service.analyze_technical_seo(base + "/", crawl_depth=1)
+            return first, second
+
+        first, second = asyncio.run(self._with_site(run))
+        issues = {issue["type"]: issue for issue in first["technical_issues"]}
+
+        assert self.conditional_requests == ["/a"]
+        assert second["crawl_summary"]["not_modified"] == 1
+        assert first["pages_crawled"] == second["pages_crawled"] == 5
+        assert "Missing robots.txt" not in issues
+        assert issues["HTTP errors"]["pages_affected"] == 1
+        assert issues["Redirect chains"]["pages_affected"] == 1
+        assert issues["Duplicate titles"]["pages_affected"] == 2
+        assert issues["Canonicalized to another URL"]["pages_affected"] == 1
+        assert issues["Invalid hreflang codes"]["examples"][0]["hreflang"] == "english"
+        assert first["site_structure"]["external_links"] == 1
+
+    def test_normalize_url(self):
+        assert normalize_url("HTTPS://Example.com:443/a#top") == "https://example.com/a"
+        assert normalize_url("http://example.com") == "http://example.com/"
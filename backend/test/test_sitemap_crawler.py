@@ -0,0 +1,141 @@
+"""
+Unit tests for the sitemap crawler.
+
+Sitemaps are served by a local aiohttp server, so no external requests are made.
+"""
+
+import asyncio
+import gzip
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+
+from services.seo_tools.sitemap_crawler import SitemapCrawler, SitemapParser
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def _urlset(paths, lastmod="2024-01-15"):
+    entries = "".join(
+        f"<url><loc>https://example.com{path}</loc><lastmod>{lastmod}</lastmod>"
+        f"<priority>0.8</priority></url>"
+        for path in paths
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{entries}</urlset>'.encode()
+
+
+def _index(locations):
+    entries = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locations)
+    return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NS}>{entries}</sitemapindex>'.encode()
+
+
+class TestSitemapParser:
+    """Test incremental parsing of plain and gzipped sitemaps."""
+
+    def test_parses_byte_by_byte(self):
+        parser = SitemapParser()
+        for byte in _urlset(["/a", "/blog/b"]):
+            parser.feed(bytes([byte]))
+        parser.close()
+
+        assert not parser.is_index
+        assert [url.loc for url in parser.urls] == ["https://example.com/a", "https://example.com/blog/b"]
+        assert parser.urls[0].get("lastmod") == "2024-01-15"
+        assert parser.urls[0].get("changefreq") is None
+
+    def test_parses_gzipped_index(self):
+        data = gzip.compress(_index(["https://example.com/s1.xml", "https://example.com/s2.xml"]))
+        parser = SitemapParser()
+        parser.feed(data[:10])
+        parser.feed(data[10:])
+        parser.close()
+
+        assert parser.is_index
+        assert parser.sitemaps == ["https://example.com/s1.xml", "https://example.com/s2.xml"]
+
+
+class TestSitemapCrawler:
+    """Test crawling sitemap indexes against a local server."""
+
+    def setup_method(self):
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _serve(self, documents, crawler, path):
+        async def handler(request):
+            self.requests.append(request.path)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(0.02)
+                body = documents.get(request.path)
+                if body is None:
+                    return web.Response(status=404)
+                return web.Response(body=body(base) if callable(body) else body)
+            finally:
+                self.in_flight -= 1
+
+        app = web.Application()
+        app.router.add_get("/{path:.*}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        base = f"http://127.0.0.1:{port}"
+        try:
+            return await crawler.crawl(base + path)
+        finally:
+            await runner.cleanup()
+
+    def test_index_children_fetched_concurrently(self):
+        documents = {
+            "/sitemap_index.xml": lambda base: _index(
+                [f"{base}/s{index}.xml.gz" for index in range(4)] + [f"{base}/missing.xml"]
+            ),
+        }
+        for index in range(4):
+            documents[f"/s{index}.xml.gz"] = gzip.compress(_urlset([f"/p{index}-{n}" for n in range(3)]))
+
+        result = asyncio.run(self._serve(documents, SitemapCrawler(per_host_concurrency=3), "/sitemap_index.xml"))
+
+        assert result["total_urls"] == 12
+        assert result["sitemaps_fetched"] == 6
+        assert not result["truncated"]
+        assert [error["sitemap"].rsplit("/", 1)[-1] for error in result["errors"]] == ["missing.xml"]
+        assert 1 < self.max_in_flight <= 3
+
+    def test_url_budget_truncates_crawl(self):
+        documents = {
+            "/sitemap_index.xml": lambda base: _index([f"{base}/s{index}.xml" for index in range(3)]),
+        }
+        for index in range(3):
+            documents[f"/s{index}.xml"] = _urlset([f"/p{index}-{n}" for n in range(10)])
+
+        crawler = SitemapCrawler(max_urls=15, per_host_concurrency=1)
+        result = asyncio.run(self._serve(documents, crawler, "/sitemap_index.xml"))
+
+        assert result["total_urls"] == 15
+        assert result["truncated"]
+        assert len(self.requests) == 3
+
+    def test_root_failure_raises(self):
+        with pytest.raises(Exception, match="HTTP 404"):
+            asyncio.run(self._serve({}, SitemapCrawler(), "/sitemap.xml"))
+
+    def test_cached_root_is_parsed_without_refetching(self):
+        documents = {"/s0.xml": _urlset([f"/p{n}" for n in range(3)])}
+
+        class DocumentCache:
+            async def fetch(self, url):
+                base = url.rsplit("/", 1)[0]
+                return SimpleNamespace(status_code=200, truncated=False, content=_index([f"{base}/s0.xml"]))
+
+        crawler = SitemapCrawler(document_cache=DocumentCache())
+        result = asyncio.run(self._serve(documents, crawler, "/sitemap_index.xml"))
+
+        assert result["total_urls"] == 3
+        assert result["sitemaps_fetched"] == 2
+        assert self.requests == ["/s0.xml"]
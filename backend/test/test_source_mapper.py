@@ -295,6 +295,22 @@ class TestSourceToSectionMapper:
         assert "purchase" in transactional_keywords
         assert "price" in transactional_keywords
     
+    def test_score_matrix_matches_pairwise_scores(self):
+        """Test vectorized scoring reproduces the per-pair scoring methods."""
+        score_matrix = self.mapper._compute_score_matrix(
+            self.sample_sections, self.sample_sources, self.sample_research
+        )
+        
+        assert score_matrix.shape == (len(self.sample_sections), len(self.sample_sources))
+        for i, section in enumerate(self.sample_sections):
+            for j, source in enumerate(self.sample_sources):
+                expected = (
+                    self.mapper._calculate_semantic_similarity(section, source) * self.mapper.weights['semantic'] +
+                    self.mapper._calculate_keyword_relevance(section, source, self.sample_research) * self.mapper.weights['keyword'] +
+                    self.mapper._calculate_contextual_relevance(section, source, self.sample_research) * self.mapper.weights['contextual']
+                )
+                assert score_matrix[i, j] == pytest.approx(expected)
+    
     def test_mapping_statistics(self):
         """Test mapping statistics calculation."""
         mapping_results = self.mapper._algorithmic_source_mapping(self.sample_sections, self.sample_research)
@@ -0,0 +1,36 @@
+"""
+Unit tests for the shared SQLite store helpers.
+"""
+
+import asyncio
+
+from services.content_gap_analyzer.competitor_crawler import CompetitorCrawlCache
+from utils.sqlite_utils import connect, init_database, run_purge_scheduler
+
+
+class TestSQLiteUtils:
+    """Test cases for schema setup and the expiry purge scheduler."""
+
+    def test_init_database_enables_wal_and_is_idempotent(self, tmp_path):
+        db_path = str(tmp_path / "store.db")
+        for _ in range(2):
+            init_database(db_path, "CREATE TABLE IF NOT EXISTS items (key TEXT PRIMARY KEY)")
+
+        with connect(db_path) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+    def test_purge_scheduler_removes_expired_rows(self, tmp_path):
+        db_path = str(tmp_path / "crawls.db")
+        CompetitorCrawlCache(db_path=db_path, ttl_hours=0).put("old.com", {"pages": 1})
+
+        async def run():
+            task = asyncio.create_task(run_purge_scheduler([lambda: CompetitorCrawlCache(db_path=db_path, ttl_hours=0)]))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(run())
+
+        with connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM competitor_crawls").fetchone()[0] == 0
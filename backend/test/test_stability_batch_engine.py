@@ -0,0 +1,224 @@
+"""
+Unit tests for the Stability batch engine.
+
+Batches run against a recording service so no Stability API calls are made.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+
+from fastapi import HTTPException
+
+from services.stability_batch_engine import (
+    SlidingWindowRateLimiter, StabilityBatchEngine, StabilityBatchStore
+)
+
+
+class RecordingService:
+    """Async context manager with the upscale_fast method of StabilityAIService."""
+
+    def __init__(self, failures=None, delay=0.01):
+        self.calls = []
+        self.failures = dict(failures or {})
+        self.delay = delay
+        self.closed = False
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.closed = True
+        return False
+
+    async def upscale_fast(self, image: bytes, **kwargs):
+        self.calls.append(image)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            errors = self.failures.get(image)
+            if errors:
+                raise errors.pop(0)
+            return b"upscaled:" + image
+        finally:
+            self.in_flight -= 1
+
+
+def _images(count):
+    return [(f"image {index}.png", f"img{index}".encode()) for index in range(count)]
+
+
+class TestStabilityBatchEngine:
+    """Test cases for concurrent processing, retries and resuming batches."""
+
+    def setup_method(self):
+        self.service = RecordingService()
+
+    def _engine(self, tmp_path, **kwargs) -> StabilityBatchEngine:
+        store = StabilityBatchStore(db_path=str(tmp_path / "batches.db"), batch_dir=str(tmp_path / "batches"))
+        kwargs.setdefault("concurrency", 3)
+        return StabilityBatchEngine(
+            store=store,
+            service_factory=lambda: self.service,
+            rate_limiter=SlidingWindowRateLimiter(100, 1),
+            retry_base_delay=0,
+            **kwargs
+        )
+
+    def test_items_run_concurrently_and_results_are_persisted(self, tmp_path):
+        engine = self._engine(tmp_path)
+
+        async def run():
+            batch_id = await engine.submit("upscale_fast", {"output_format": "webp"}, _images(6))
+            await engine._running[batch_id]
+            return batch_id
+
+        batch_id = asyncio.run(run())
+        status = engine.get_status(batch_id)
+
+        assert status["status"] == "completed"
+        assert status["progress"]["completed"] == 6
+        assert status["progress"]["percentage"] == 100.0
+        assert 1 < self.service.max_in_flight <= 3
+        result_path = Path(status["items"][2]["result_path"])
+        assert result_path.suffix == ".webp"
+        assert result_path.read_bytes() == b"upscaled:img2"
+
+    def test_retryable_errors_are_retried_and_client_errors_fail(self, tmp_path):
+        self.service.failures = {
+            b"img0": [HTTPException(status_code=503, detail="busy")],
+            b"img1": [HTTPException(status_code=400, detail="bad image")],
+        }
+        engine = self._engine(tmp_path)
+
+        async def run():
+            batch_id = await engine.submit("upscale_fast", {}, _images(3))
+            await engine._running[batch_id]
+            return batch_id
+
+        status = engine.get_status(asyncio.run(run()))
+        items = status["items"]
+
+        assert status["status"] == "completed_with_errors"
+        assert (items[0]["status"], items[0]["attempts"]) == ("completed", 2)
+        assert (items[1]["status"], items[1]["attempts"], items[1]["error"]) == ("failed", 1, "bad image")
+        assert items[2]["status"] == "completed"
+
+    def test_gives_up_after_max_attempts(self, tmp_path):
+        self.service.failures = {b"img0": [RuntimeError("timeout")] * 5}
+        engine = self._engine(tmp_path, max_attempts=2)
+
+        async def run():
+            batch_id = await engine.submit("upscale_fast", {}, _images(1))
+            await engine._running[batch_id]
+            return batch_id
+
+        item = engine.get_status(asyncio.run(run()))["items"][0]
+        assert (item["status"], item["attempts"], item["error"]) == ("failed", 2, "timeout")
+
+    def test_resume_processes_only_unfinished_items(self, tmp_path):
+        engine = self._engine(tmp_path)
+        store = engine.store
+        store.create_batch("batch_resume", "upscale_fast", {}, _images(3))
+        # Item 0 finished before the restart; item 1 was in flight when the worker died
+        store.claim_item("batch_resume", 0, lease_seconds=60)
+        store.complete_item("batch_resume", 0, b"done")
+        store.claim_item("batch_resume", 1, lease_seconds=-1)
+
+        async def run():
+            assert await engine.resume_unfinished() == 1
+            await engine._running["batch_resume"]
+
+        asyncio.run(run())
+
+        assert sorted(self.service.calls) == [b"img1", b"img2"]
+        assert engine.get_status("batch_resume")["progress"]["completed"] == 3
+        assert store.unfinished_batches() == []
+
+    def test_resume_waits_for_lease_held_at_restart(self, tmp_path):
+        engine = self._engine(tmp_path)
+        store = engine.store
+        store.create_batch("batch_restart", "upscale_fast", {}, _images(2))
+        # The worker died right after claiming item 0, and the process restarted before its lease expired
+        store.claim_item("batch_restart", 0, lease_seconds=0.3)
+
+        async def run():
+            assert await engine.resume_unfinished() == 1
+            await asyncio.wait_for(engine._running["batch_restart"], timeout=5)
+
+        asyncio.run(run())
+
+        status = engine.get_status("batch_restart")
+        assert status["status"] == "completed"
+        assert sorted(self.service.calls) == [b"img0", b"img1"]
+        assert status["items"][0]["attempts"] == 2
+
+    def test_validation_errors_are_not_retried(self, tmp_path):
+        self.service.failures = {b"img0": [ValueError("Image dimensions too small")]}
+        engine = self._engine(tmp_path)
+
+        async def run():
+            batch_id = await engine.submit("upscale_fast", {}, _images(1))
+            await engine._running[batch_id]
+            return batch_id
+
+        item = engine.get_status(asyncio.run(run()))["items"][0]
+        assert (item["status"], item["attempts"]) == ("failed", 1)
+
+    def test_lease_is_renewed_while_item_runs(self, tmp_path):
+        self.service.delay = 0.5
+        engine = self._engine(tmp_path, lease_seconds=0.15)
+
+        async def run():
+            batch_id = await engine.submit("upscale_fast", {}, _images(1))
+            await asyncio.sleep(0.3)
+            # Past the original lease, but the running worker keeps it
+            assert engine.store.claim_item(batch_id, 0, lease_seconds=60) is None
+            await engine._running[batch_id]
+            return batch_id
+
+        item = engine.get_status(asyncio.run(run()))["items"][0]
+        assert (item["status"], item["attempts"]) == ("completed", 1)
+        assert self.service.calls == [b"img0"]
+
+    def test_close_stops_batches_and_closes_service(self, tmp_path):
+        self.service.delay = 5
+        engine = self._engine(tmp_path)
+
+        async def run():
+            batch_id = await engine.submit("upscale_fast", {}, _images(1))
+            await asyncio.sleep(0.1)
+            await engine.close()
+            return batch_id
+
+        batch_id = asyncio.run(run())
+        assert self.service.closed
+        assert engine.store.unfinished_batches() == [batch_id]
+
+    def test_live_lease_is_not_claimed_twice(self, tmp_path):
+        store = self._engine(tmp_path).store
+        store.create_batch("batch_lease", "upscale_fast", {}, _images(1))
+        assert store.claim_item("batch_lease", 0, lease_seconds=60) is not None
+        assert store.claim_item("batch_lease", 0, lease_seconds=60) is None
+        assert store.claimable_items("batch_lease") == []
+
+    def test_unknown_batch(self, tmp_path):
+        assert self._engine(tmp_path).get_status("missing") is None
+
+
+class TestSlidingWindowRateLimiter:
+    """Test that the limiter spaces calls to the window."""
+
+    def test_waits_for_window(self):
+        limiter = SlidingWindowRateLimiter(2, 0.2)
+
+        async def acquire_four():
+            start = time.monotonic()
+            for _ in range(4):
+                await limiter.acquire()
+            return time.monotonic() - start
+
+        assert asyncio.run(acquire_four()) >= 0.19
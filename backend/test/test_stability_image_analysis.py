@@ -0,0 +1,70 @@
+"""
+Unit tests for off-loop, reduced-resolution image analysis in stability_utils.
+"""
+
+import asyncio
+import io
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from utils import stability_utils
+from utils.stability_utils import ImageValidator, _analyze_image_bytes
+
+
+def _image_bytes(size=(1600, 1200), fmt="JPEG", mode="RGB") -> bytes:
+    img = Image.new(mode, size, (200, 30, 30) if mode == "RGB" else 128)
+    # Right third blue so there are two dominant colors
+    img.paste((20, 40, 220) if mode == "RGB" else 40, (size[0] * 2 // 3, 0, size[0], size[1]))
+    output = io.BytesIO()
+    img.save(output, format=fmt)
+    return output.getvalue()
+
+
+class TestImageAnalysis:
+    """Test cases for the image analysis worker function and its cache."""
+
+    def setup_method(self):
+        stability_utils._image_analysis_cache.clear()
+
+    def teardown_method(self):
+        stability_utils.shutdown_image_analysis_pool()
+
+    def test_reports_full_size_and_dominant_colors(self):
+        info = _analyze_image_bytes(_image_bytes(), max_side=256)
+
+        assert info["size"] == (1600, 1200)
+        assert info["total_pixels"] == 1600 * 1200
+        assert info["format"] == "JPEG"
+        red, blue = info["dominant_colors"][:2]
+        assert red[0] > 150 and blue[2] > 150
+        assert set(info["quality_assessment"]) == {
+            "sharpness_score", "noise_level", "overall_score", "needs_enhancement"
+        }
+
+    def test_grayscale_png_has_no_color_analysis(self):
+        info = _analyze_image_bytes(_image_bytes(fmt="PNG", mode="L"))
+        assert info["mode"] == "L"
+        assert "dominant_colors" not in info
+        assert "quality_assessment" in info
+
+    def test_analysis_runs_in_pool_and_is_cached(self, monkeypatch):
+        content = _image_bytes(size=(800, 600))
+        first = asyncio.run(ImageValidator.analyze_image_content(content))
+        assert first["width"] == 800
+
+        def fail(*args, **kwargs):
+            raise AssertionError("cached result expected")
+
+        monkeypatch.setattr(stability_utils, "_run_image_analysis", fail)
+        second = asyncio.run(ImageValidator.analyze_image_content(content))
+        assert second == first
+        # Callers get their own copy
+        second["dominant_colors"].clear()
+        assert asyncio.run(ImageValidator.analyze_image_content(content))["dominant_colors"]
+
+    def test_invalid_image_raises_http_400(self):
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(ImageValidator.analyze_image_content(b"not an image"))
+        assert exc_info.value.status_code == 400
@@ -0,0 +1,115 @@
+"""
+Unit tests for the on-disk Stability result cache and the caching middleware.
+"""
+
+from fastapi import FastAPI, File, Form, UploadFile
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from middleware.stability_middleware import CachingMiddleware
+from services.cache.stability_result_cache import StabilityResultCache, iter_file
+
+
+class TestStabilityResultCache:
+    """Test cases for keys, streaming reads and LRU eviction."""
+
+    def test_key_normalizes_params(self, tmp_path):
+        key = StabilityResultCache.build_key("upscale_fast", {"output_format": "PNG ", "prompt": ""}, {"image": "abc"})
+        assert key == StabilityResultCache.build_key("upscale_fast", {"output_format": "png"}, {"image": "abc"})
+        assert key != StabilityResultCache.build_key("upscale_fast", {"output_format": "png"}, {"image": "abd"})
+        assert key != StabilityResultCache.build_key("remove_background", {"output_format": "png"}, {"image": "abc"})
+
+    def test_put_and_stream(self, tmp_path):
+        cache = StabilityResultCache(cache_dir=str(tmp_path))
+        content = b"x" * 200_000
+        cache.put("k1", "upscale_fast", content, "image/png")
+
+        file_obj, size, media_type = cache.open("k1")
+        chunks = list(iter_file(file_obj, chunk_size=65536))
+        assert (size, media_type) == (200_000, "image/png")
+        assert len(chunks) == 4 and b"".join(chunks) == content
+        assert file_obj.closed
+        assert cache.open("missing") is None
+        assert cache.get_stats()["hits"] == 1
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = StabilityResultCache(cache_dir=str(tmp_path), max_bytes=250, max_entries=10)
+        cache.put("a", "op", b"a" * 100, "image/png")
+        cache.put("b", "op", b"b" * 100, "image/png")
+        cache.open("a")[0].close()
+        cache.put("c", "op", b"c" * 100, "image/png")
+
+        assert cache.open("b") is None
+        assert cache.open("a") is not None and cache.open("c") is not None
+        assert cache.get_stats()["size_bytes"] == 200
+
+    def test_aborted_write_is_not_published(self, tmp_path):
+        cache = StabilityResultCache(cache_dir=str(tmp_path))
+        writer = cache.writer("k", "op", "image/png")
+        writer.write(b"partial")
+        writer.abort()
+        assert cache.open("k") is None
+        assert not list(tmp_path.glob(".tmp_*"))
+
+
+class TestCachingMiddleware:
+    """Test that deterministic operations are served from the result cache."""
+
+    def setup_method(self):
+        self.calls = []
+        self.app = FastAPI()
+
+        @self.app.post("/api/stability/upscale/fast")
+        async def upscale_fast(image: UploadFile = File(...), output_format: str = Form("png")):
+            content = await image.read()
+            self.calls.append(content)
+            return Response(content=b"upscaled:" + content, media_type=f"image/{output_format}")
+
+        @self.app.get("/api/stability/models/info")
+        async def models_info():
+            self.calls.append("models")
+            return {"models": ["core", "ultra"]}
+
+        @self.app.post("/api/stability/generate/core")
+        async def generate_core(prompt: str = Form(...), seed: int = Form(0)):
+            self.calls.append(prompt)
+            return Response(content=f"{prompt}:{seed}".encode(), media_type="image/png")
+
+    def _client(self, tmp_path) -> TestClient:
+        middleware = CachingMiddleware(result_cache=StabilityResultCache(cache_dir=str(tmp_path)))
+        self.app.middleware("http")(middleware)
+        return TestClient(self.app)
+
+    def test_repeated_upscale_is_served_from_cache(self, tmp_path):
+        client = self._client(tmp_path)
+
+        first = client.post("/api/stability/upscale/fast", files={"image": ("a.png", b"pixels")})
+        second = client.post("/api/stability/upscale/fast", files={"image": ("b.png", b"pixels")})
+        other = client.post("/api/stability/upscale/fast", files={"image": ("a.png", b"other")})
+
+        assert first.content == second.content == b"upscaled:pixels"
+        assert "x-cache-hit" not in first.headers
+        assert second.headers["x-cache-hit"] == "true"
+        assert second.headers["content-type"] == "image/png"
+        assert other.content == b"upscaled:other"
+        assert self.calls == [b"pixels", b"other"]
+
+    def test_generation_is_cached_only_with_explicit_seed(self, tmp_path):
+        client = self._client(tmp_path)
+
+        for _ in range(2):
+            client.post("/api/stability/generate/core", data={"prompt": "cat", "seed": "0"})
+            client.post("/api/stability/generate/core", data={"prompt": "cat", "seed": "42"})
+
+        assert self.calls == ["cat", "cat", "cat"]
+
+    def test_json_responses_fill_the_in_memory_cache(self, tmp_path):
+        client = self._client(tmp_path)
+
+        first = client.get("/api/stability/models/info")
+        second = client.get("/api/stability/models/info")
+
+        assert first.json() == second.json() == {"models": ["core", "ultra"]}
+        assert "x-cache-hit" not in first.headers
+        assert second.headers["x-cache-hit"] == "true"
+        assert self.calls == ["models"]
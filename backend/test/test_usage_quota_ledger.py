@@ -0,0 +1,125 @@
+"""
+Unit tests for the in-memory usage quota ledger and the provider router.
+
+Runs against an in-memory SQLite database.
+"""
+
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.subscription_models import (
+    Base, APIProvider, SubscriptionPlan, SubscriptionTier, UsageSummary
+)
+from services.pricing_service import PricingService
+from services.usage_quota_ledger import UsageQuotaLedger, current_billing_period
+
+
+def _summary(user_id: str, **counters) -> UsageSummary:
+    values = {column.name: 0 for column in UsageSummary.__table__.columns
+              if column.name.endswith(('_calls', '_tokens', '_cost'))}
+    values.update(counters)
+    return UsageSummary(user_id=user_id, billing_period=current_billing_period(), **values)
+
+
+class TestUsageQuotaLedger:
+    """Test cases for seeding, checking and recording usage in the ledger."""
+
+    def setup_method(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.db.add(SubscriptionPlan(
+            name="Free", tier=SubscriptionTier.FREE,
+            gemini_calls_limit=3, gemini_tokens_limit=1000, monthly_cost_limit=5.0
+        ))
+        self.db.commit()
+        self.ledger = UsageQuotaLedger()
+
+    def teardown_method(self):
+        self.db.close()
+
+    def test_miss_until_loaded(self):
+        assert self.ledger.check("u1", APIProvider.GEMINI) is None
+        assert self.ledger.needs_token_estimate("u1", APIProvider.GEMINI)
+
+        self.ledger.load(self.db, "u1")
+        can_proceed, message, info = self.ledger.check("u1", APIProvider.GEMINI, 10)
+        assert can_proceed
+        assert info['call_limit'] == 3
+        assert not self.ledger.needs_token_estimate("u1", APIProvider.TAVILY)
+
+    def test_matches_pricing_service_decisions(self):
+        self.db.add(_summary("u1", gemini_calls=2, gemini_tokens=900, total_cost=1.0))
+        self.db.commit()
+        self.ledger.load(self.db, "u1")
+        pricing = PricingService(self.db)
+
+        for provider, tokens in [(APIProvider.GEMINI, 50), (APIProvider.GEMINI, 200), (APIProvider.SERPER, 0)]:
+            assert self.ledger.check("u1", provider, tokens) == pricing.check_usage_limits("u1", provider, tokens)
+
+    def test_record_usage_updates_counters(self):
+        self.ledger.load(self.db, "u1")
+        for _ in range(3):
+            self.ledger.record_usage("u1", APIProvider.GEMINI, tokens_used=10, cost=0.01)
+
+        can_proceed, message, info = self.ledger.check("u1", APIProvider.GEMINI)
+        assert not can_proceed
+        assert message == "API call limit reached for gemini"
+        assert info['current_calls'] == 3
+
+        # Usage for users that are not loaded, or for another period, is ignored
+        self.ledger.record_usage("u2", APIProvider.GEMINI, tokens_used=10, cost=0.01)
+        self.ledger.record_usage("u1", APIProvider.OPENAI, tokens_used=10, cost=0.01, billing_period="1999-01")
+        assert self.ledger.check("u2", APIProvider.GEMINI) is None
+        assert self.ledger.check("u1", APIProvider.OPENAI)[2]['current_calls'] == 0
+
+    def test_reload_keeps_local_usage_and_picks_up_remote_usage(self):
+        self.db.add(_summary("u1", gemini_calls=1, total_cost=0.5))
+        self.db.commit()
+        self.ledger.load(self.db, "u1")
+        self.ledger.record_usage("u1", APIProvider.GEMINI, tokens_used=5, cost=0.1)
+
+        summary = self.db.query(UsageSummary).filter(UsageSummary.user_id == "u1").first()
+        summary.openai_calls = 4
+        self.db.commit()
+        self.ledger.load(self.db, "u1")
+
+        assert self.ledger.check("u1", APIProvider.GEMINI)[2]['current_calls'] == 2
+        assert self.ledger.check("u1", APIProvider.OPENAI)[2]['current_calls'] == 4
+
+    def test_stale_entry_schedules_reconcile(self, monkeypatch):
+        entry = self.ledger.load(self.db, "u1")
+        entry.loaded_at -= self.ledger.reconcile_seconds
+        reconciled = []
+        monkeypatch.setattr(self.ledger, "reconcile", reconciled.append)
+
+        async def check_twice():
+            self.ledger.check("u1", APIProvider.GEMINI)
+            self.ledger.check("u1", APIProvider.GEMINI)
+            await asyncio.sleep(0.05)
+
+        asyncio.run(check_twice())
+        assert reconciled == ["u1"]
+
+    def test_invalidate(self):
+        self.ledger.load(self.db, "u1")
+        self.ledger.invalidate("u1")
+        assert self.ledger.check("u1", APIProvider.GEMINI) is None
+
+
+class TestProviderRouter:
+    """Test that the precompiled router keeps the provider detection rules."""
+
+    def test_detect_api_provider(self):
+        from middleware.monitoring_middleware import DatabaseAPIMonitor
+
+        monitor = DatabaseAPIMonitor()
+        assert monitor.detect_api_provider("/api/gemini/generate") == APIProvider.GEMINI
+        assert monitor.detect_api_provider("/api/research/exa/search") == APIProvider.METAPHOR
+        assert monitor.detect_api_provider("/api/content", "openai-python/1.0") == APIProvider.OPENAI
+        # Declaration order wins when several providers match
+        assert monitor.detect_api_provider("/api/tavily/gemini") == APIProvider.GEMINI
+        assert monitor.detect_api_provider("/api/onboarding/gemini") is None
+        assert monitor.detect_api_provider("/api/health") is None
@@ -0,0 +1,245 @@
+"""
+Unit tests for the async Wix client: retries, token caching and the concurrent publish flow.
+
+The Wix API is served by a local aiohttp server, so no external requests are made.
+"""
+
+import asyncio
+import time
+from collections import Counter
+
+from aiohttp import web
+
+from services.integrations.wix.client import WIX_MAX_RETRY_AFTER_SECONDS, AsyncWixClient, WixAPIError, WixTokenCache
+
+IMPORT_DELAY = 0.3
+
+
+class TestAsyncWixClient:
+    """Test the Wix client against a local stand-in of the Wix REST API."""
+
+    def setup_method(self):
+        self.requests = Counter()
+        self.failures = Counter()
+        self.categories = [{"id": "cat-1", "label": "News"}]
+        self.tags = [{"id": "tag-1", "label": "python"}]
+        self.drafts = []
+        self.page_size = 100
+        self.token_expires_in = 3600
+
+    def _app(self):
+        async def token(request):
+            self.requests["token"] += 1
+            data = await request.post()
+            await asyncio.sleep(0.05)
+            return web.json_response({
+                "access_token": f"access-{self.requests['token']}",
+                "refresh_token": data["refresh_token"],
+                "expires_in": self.token_expires_in
+            })
+
+        async def import_file(request):
+            self.requests["import"] += 1
+            body = await request.json()
+            await asyncio.sleep(IMPORT_DELAY)
+            if "broken" in body["url"]:
+                return web.json_response({"message": "bad image"}, status=400)
+            return web.json_response({"file": {"id": f"media-{body['url'].rsplit('/', 1)[-1]}"}})
+
+        async def list_terms(request):
+            kind = request.path.rsplit("/", 1)[-1]
+            self.requests[f"list_{kind}"] += 1
+            terms = self.categories if kind == "categories" else self.tags
+            limit = min(int(request.query["paging.limit"]), self.page_size)
+            offset = int(request.query["paging.offset"])
+            return web.json_response({
+                kind: terms[offset:offset + limit],
+                "metaData": {"count": len(terms[offset:offset + limit]), "offset": offset, "total": len(terms)}
+            })
+
+        async def create_category(request):
+            self.requests["create_categories"] += 1
+            label = (await request.json())["category"]["label"]
+            category = {"id": f"cat-{label.lower()}", "label": label}
+            self.categories.append(category)
+            return web.json_response({"category": category})
+
+        async def create_tag(request):
+            self.requests["create_tags"] += 1
+            label = (await request.json())["label"]
+            tag = {"id": f"tag-{label.lower()}", "label": label}
+            self.tags.append(tag)
+            return web.json_response({"tag": tag})
+
+        async def create_draft(request):
+            self.requests["draft"] += 1
+            # The first attempt is rate limited
+            if self.failures["draft"] == 0:
+                self.failures["draft"] += 1
+                return web.json_response({"message": "rate limited"}, status=429, headers={"Retry-After": "0"})
+            body = await request.json()
+            self.drafts.append((body, request.headers.get("Authorization")))
+            return web.json_response({"draftPost": {"id": "draft-1", "url": "https://site/post"}})
+
+        async def flaky(request):
+            self.requests[f"flaky_{request.method.lower()}"] += 1
+            return web.json_response({"message": "unavailable"}, status=503)
+
+        async def rejected(request):
+            self.requests["rejected"] += 1
+            return web.json_response({"message": "forbidden"}, status=403)
+
+        app = web.Application()
+        app.router.add_post("/oauth2/token", token)
+        app.router.add_post("/media/v1/files/import", import_file)
+        app.router.add_get("/blog/v3/categories", list_terms)
+        app.router.add_get("/blog/v3/tags", list_terms)
+        app.router.add_post("/blog/v3/categories", create_category)
+        app.router.add_post("/blog/v3/tags", create_tag)
+        app.router.add_post("/blog/v3/draft-posts", create_draft)
+        app.router.add_get("/flaky", flaky)
+        app.router.add_post("/flaky", flaky)
+        app.router.add_get("/rejected", rejected)
+        return app
+
+    async def _with_api(self, run, **client_options):
+        runner = web.AppRunner(self._app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        client = AsyncWixClient(base_url=f"http://127.0.0.1:{runner.addresses[0][1]}",
+                                client_id="client-1", retry_backoff=0.01, **client_options)
+        try:
+            return await run(client)
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    def test_publish_imports_images_and_resolves_terms_concurrently(self):
+        image_urls = [f"https://img.example.com/{i}.png" for i in range(4)] + ["https://img.example.com/broken.png"]
+
+        async def run(client):
+            started = time.monotonic()
+            result = await client.publish_post(
+                "token-1", "My post", "# Title\n\nBody text", "member-1",
+                cover_image_url="https://img.example.com/cover.png",
+                image_urls=image_urls,
+                categories=["news", "Guides"],
+                tags=["Python", "asyncio", "python"],
+                tag_ids=["tag-extra"]
+            )
+            return result, time.monotonic() - started
+
+        result, elapsed = asyncio.run(self._with_api(run))
+
+        assert result["draftPost"]["id"] == "draft-1"
+        # Six imports of IMPORT_DELAY each take about as long as one
+        assert self.requests["import"] == 6
+        assert elapsed < IMPORT_DELAY * 3
+        assert self.requests["list_categories"] == 1 and self.requests["create_categories"] == 1
+        assert self.requests["list_tags"] == 1 and self.requests["create_tags"] == 1
+
+        draft = self.drafts[0][0]["draftPost"]
+        assert draft["media"]["wixMedia"]["image"]["id"] == "media-cover.png"
+        assert draft["categoryIds"] == ["cat-1", "cat-guides"]
+        assert draft["tagIds"] == ["tag-extra", "tag-1", "tag-asyncio"]
+        images = [node for node in draft["richContent"]["nodes"] if node["type"] == "IMAGE"]
+        assert [node["imageData"]["image"]["src"]["id"] for node in images] == [f"media-{i}.png" for i in range(4)]
+
+    def test_retries_rate_limits_and_server_errors(self):
+        async def run(client):
+            draft = await client.create_draft_post("token-1", {"draftPost": {"title": "t"}})
+            try:
+                await client.request("GET", "/flaky", "token-1")
+            except WixAPIError as e:
+                flaky_error = e
+            try:
+                await client.request("GET", "/rejected", "token-1")
+            except WixAPIError as e:
+                rejected_error = e
+            return draft, flaky_error, rejected_error
+
+        draft, flaky_error, rejected_error = asyncio.run(self._with_api(run, max_retries=2))
+
+        assert draft["draftPost"]["id"] == "draft-1"
+        assert self.requests["draft"] == 2
+        assert flaky_error.status == 503 and self.requests["flaky_get"] == 3
+        assert rejected_error.status == 403 and self.requests["rejected"] == 1
+
+    def test_non_idempotent_requests_are_not_retried_on_server_errors(self):
+        async def run(client):
+            errors = []
+            for idempotent in (None, True):
+                try:
+                    await client.request("POST", "/flaky", "token-1", idempotent=idempotent, json={})
+                except WixAPIError as e:
+                    errors.append(e.status)
+            return errors
+
+        errors = asyncio.run(self._with_api(run, max_retries=2))
+
+        # One attempt for the plain POST, three when the caller marks it idempotent
+        assert errors == [503, 503]
+        assert self.requests["flaky_post"] == 1 + 3
+
+    def test_access_token_refreshed_once_and_reused_until_near_expiry(self):
+        async def run(client):
+            first = await asyncio.gather(*(client.get_access_token("refresh-1") for _ in range(5)))
+            cached = await client.get_access_token("refresh-1")
+            return first, cached
+
+        first, cached = asyncio.run(self._with_api(run))
+
+        assert set(first) == {"access-1"} and cached == "access-1"
+        assert self.requests["token"] == 1
+
+        # A token inside the refresh margin is refreshed before use
+        self.token_expires_in = 30
+        cache = WixTokenCache(refresh_margin_seconds=60)
+
+        async def run_short(client):
+            return [await client.get_access_token("refresh-2") for _ in range(2)]
+
+        tokens = asyncio.run(self._with_api(run_short, token_cache=cache))
+
+        assert tokens == ["access-2", "access-3"]
+
+    def test_terms_are_listed_across_every_page(self):
+        self.page_size = 2
+        self.tags += [{"id": f"tag-{i}", "label": f"topic {i}"} for i in range(4)]
+
+        async def run(client):
+            return await client.list_tags("token-1"), await client.resolve_tags("token-1", ["Topic 3", "python"])
+
+        tags, ids = asyncio.run(self._with_api(run))
+
+        assert [tag["id"] for tag in tags] == ["tag-1"] + [f"tag-{i}" for i in range(4)]
+        assert ids == ["tag-3", "tag-1"]
+        assert self.requests["list_tags"] == 3 + 3
+        assert self.requests["create_tags"] == 0
+
+    def test_retry_after_is_clamped(self):
+        client = AsyncWixClient(retry_backoff=0.01)
+
+        assert client._retry_delay(0, "3600") == WIX_MAX_RETRY_AFTER_SECONDS
+        assert client._retry_delay(0, "-5") == 0.0
+        assert client._retry_delay(0, "2") == 2.0
+
+    def test_connection_retry_backoff_does_not_hold_a_request_slot(self):
+        async def run():
+            client = AsyncWixClient(base_url="http://127.0.0.1:1", max_concurrency=1,
+                                    max_retries=1, retry_backoff=0.5)
+            task = asyncio.create_task(client.request("GET", "/blog/v3/tags", "token-1"))
+            await asyncio.sleep(0.2)
+            locked = client._semaphore.locked()
+            try:
+                await task
+            except WixAPIError as e:
+                error = e
+            await client.close()
+            return locked, error
+
+        locked, error = asyncio.run(run())
+
+        assert not locked
+        assert "failed" in str(error)
@@ -0,0 +1,165 @@
+"""
+Unit tests for WordPress category/tag resolution and the per-site taxonomy cache.
+
+Runs against a local HTTP server standing in for the WordPress REST API.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from services.integrations.wordpress_content import WordPressContentManager, evict_site_sessions, get_site_session
+from services.integrations.wordpress_taxonomy import wordpress_taxonomy_cache, unique_names
+
+
+class FakeWordPress:
+    """In-memory categories and tags served over the wp/v2 routes."""
+
+    def __init__(self, page_size=2):
+        self.page_size = page_size
+        self.terms = {
+            'categories': [{'id': 1, 'name': 'News'}, {'id': 2, 'name': 'Tips &amp; Tricks'}, {'id': 3, 'name': 'SEO'}],
+            'tags': [{'id': 10, 'name': 'python'}]
+        }
+        self.posts = []
+        self.requests = []
+        self.lock = threading.Lock()
+        self.next_id = 100
+
+    def handler(self):
+        wordpress = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, headers=None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                taxonomy = url.path.rsplit('/', 1)[-1]
+                with wordpress.lock:
+                    wordpress.requests.append(('GET', taxonomy))
+                    terms = list(wordpress.terms[taxonomy])
+                page = int(parse_qs(url.query).get('page', ['1'])[0])
+                size = wordpress.page_size
+                total_pages = max(1, -(-len(terms) // size))
+                self._send(200, terms[(page - 1) * size:page * size], {'X-WP-TotalPages': str(total_pages)})
+
+            def do_POST(self):
+                taxonomy = urlparse(self.path).path.rsplit('/', 1)[-1]
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with wordpress.lock:
+                    wordpress.requests.append(('POST', taxonomy))
+                    if taxonomy == 'posts':
+                        self._send(*wordpress.create_post(body))
+                        return
+                    existing = [t for t in wordpress.terms[taxonomy] if t['name'].lower() == body['name'].lower()]
+                    if existing:
+                        response = (400, {'code': 'term_exists', 'data': {'status': 400, 'term_id': existing[0]['id']}})
+                    else:
+                        term = {'id': wordpress.next_id, 'name': body['name']}
+                        wordpress.next_id += 1
+                        wordpress.terms[taxonomy].append(term)
+                        response = (201, term)
+                self._send(*response)
+
+        return Handler
+
+    def create_post(self, post):
+        invalid = {
+            taxonomy: f"Invalid {taxonomy} ID."
+            for taxonomy in ('categories', 'tags')
+            if not set(post.get(taxonomy, [])) <= {term['id'] for term in self.terms[taxonomy]}
+        }
+        if invalid:
+            return 400, {'code': 'rest_invalid_param', 'data': {'status': 400, 'params': invalid}}
+        self.posts.append(post)
+        return 201, {'id': len(self.posts), 'link': f"/?p={len(self.posts)}"}
+
+    def count(self, method, taxonomy):
+        return sum(1 for request in self.requests if request == (method, taxonomy))
+
+
+class TestWordPressTaxonomy:
+    """Test batched term resolution against one cached listing per taxonomy."""
+
+    def setup_method(self):
+        self.wordpress = FakeWordPress()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.wordpress.handler())
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.site_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.manager = WordPressContentManager(self.site_url, 'admin', 'app-pass')
+        self.manager.api_base = f"{self.site_url}/wp/v2"
+
+    def teardown_method(self):
+        self.server.shutdown()
+        self.server.server_close()
+        wordpress_taxonomy_cache.invalidate(self.site_url)
+
+    def test_resolves_existing_terms_from_one_paginated_listing(self):
+        ids = self.manager.resolve_categories(['seo', 'News', 'Tips & Tricks', 'news'])
+
+        assert ids == [3, 1, 2]
+        assert self.wordpress.count('GET', 'categories') == 2  # both pages of one listing
+        assert self.wordpress.count('POST', 'categories') == 0
+
+    def test_creates_missing_terms_and_caches_them(self):
+        ids = self.manager.resolve_tags(['python', 'fastapi', 'asyncio', 'sqlite'])
+
+        assert ids[0] == 10 and len(set(ids)) == 4
+        assert self.wordpress.count('POST', 'tags') == 3
+
+        # A second post with the same tags is resolved from the cache
+        again = WordPressContentManager(self.site_url, 'admin', 'app-pass')
+        again.api_base = self.manager.api_base
+        assert again.resolve_tags(['SQLite', 'python', 'FastAPI']) == [ids[3], 10, ids[1]]
+        assert self.wordpress.count('GET', 'tags') == 1
+        assert self.wordpress.count('POST', 'tags') == 3
+
+    def test_term_created_elsewhere_resolves_through_term_exists(self):
+        self.manager.resolve_categories(['News'])
+        self.wordpress.terms['categories'].append({'id': 50, 'name': 'Guides'})
+
+        assert self.manager.get_or_create_category('Guides') == 50
+        assert self.wordpress.count('GET', 'categories') == 2
+        assert self.manager.resolve_categories(['guides']) == [50]
+        assert self.wordpress.count('POST', 'categories') == 1
+
+    def test_unique_names_skips_blanks_and_case_duplicates(self):
+        assert unique_names([' AI ', 'ai', '', None, 'ML']) == ['AI', 'ML']
+
+    def test_post_rejected_for_deleted_term_is_retried_after_fresh_listing(self):
+        self.manager.resolve_categories(['SEO'])
+        # The cached term is deleted on the site and recreated under a new ID
+        self.wordpress.terms['categories'] = [t for t in self.wordpress.terms['categories'] if t['id'] != 3]
+        self.wordpress.terms['categories'].append({'id': 60, 'name': 'SEO'})
+
+        post, category_ids, tag_ids = self.manager.create_post_with_terms('Title', 'Body', category_names=['seo'])
+
+        assert post['id'] == 1
+        assert category_ids == [60] and tag_ids == []
+        assert self.wordpress.posts[0]['categories'] == [60]
+        assert self.wordpress.count('POST', 'posts') == 2
+        assert self.wordpress.count('GET', 'categories') == 4
+
+    def test_create_category_goes_through_term_resolution(self):
+        assert self.manager.create_category('News') == {'id': 1, 'name': 'News'}
+        assert self.manager.create_tag('django')['id'] == 100
+
+    def test_evicting_a_site_drops_its_pooled_sessions(self):
+        session = get_site_session(self.site_url, 'admin', 'app-pass')
+        assert session is self.manager.session
+
+        evict_site_sessions(self.site_url + '/')
+
+        assert get_site_session(self.site_url, 'admin', 'app-pass') is not session
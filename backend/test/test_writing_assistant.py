@@ -0,0 +1,217 @@
+"""
+Unit tests for incremental writing-assistant suggestions: the prefix cache,
+per-session debouncing and streamed continuations.
+
+Exa is served by a local aiohttp server and Gemini is replaced by a stub client,
+so no external requests are made.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from aiohttp import web
+
+from services.research.exa_search_client import AsyncExaClient
+from services.writing_assistant import WritingAssistantService
+from services.writing_assistant_cache import SuggestionPrefixCache, current_paragraph
+
+PARAGRAPH = "Solar panels convert sunlight into electricity using photovoltaic cells made of silicon"
+
+
+class StubGeminiModels:
+    def __init__(self, continuation):
+        self.continuation = continuation
+        self.calls = 0
+
+    def generate_content(self, model, contents):
+        self.calls += 1
+        return SimpleNamespace(text=self.continuation)
+
+    def generate_content_stream(self, model, contents):
+        self.calls += 1
+        for word in self.continuation.split(" "):
+            time.sleep(0.05)
+            yield SimpleNamespace(text=word + " ")
+
+
+class TestSuggestionPrefixCache:
+    """Test prefix lookups of sources and suggestions."""
+
+    def setup_method(self):
+        self.cache = SuggestionPrefixCache(source_reuse_chars=40)
+        self.sources = [{"title": "Solar", "url": "https://example.com/solar"}]
+
+    def test_sources_reused_while_paragraph_grows(self):
+        self.cache.put_sources("u1", "Intro.\n\n" + PARAGRAPH, self.sources)
+
+        assert current_paragraph("Intro.\n\n" + PARAGRAPH + " wafers") == PARAGRAPH + " wafers"
+        assert self.cache.get_sources("u1", "Intro.\n\n" + PARAGRAPH + " wafers") == self.sources
+        assert self.cache.get_sources("u1", "Intro.\n\n" + PARAGRAPH + " wafers" * 10) is None
+        assert self.cache.get_sources("u1", "Intro.\n\nWind turbines are different") is None
+
+    def test_suggestion_followed_while_typed_out(self):
+        self.cache.put_suggestion("u1", PARAGRAPH, "that absorb photons and release electrons.", 0.7, self.sources)
+
+        assert self.cache.get_suggestion("u1", PARAGRAPH + " ")[0] == "that absorb photons and release electrons."
+        assert self.cache.get_suggestion("u1", PARAGRAPH + " that abs")[0] == "orb photons and release electrons."
+        assert self.cache.get_suggestion("u1", PARAGRAPH + " that absorb ")[0] == "photons and release electrons."
+        assert self.cache.get_suggestion("u1", PARAGRAPH + " which") is None
+
+    def test_entries_are_scoped_to_their_user(self):
+        self.cache.put_sources("u1", PARAGRAPH, self.sources)
+        self.cache.put_suggestion("u1", PARAGRAPH, "that absorb photons and release electrons.", 0.7, self.sources)
+
+        assert self.cache.get_suggestion("u2", PARAGRAPH) is None
+        assert self.cache.get_suggestion("u2", PARAGRAPH + " that abs") is None
+        assert self.cache.get_sources("u2", PARAGRAPH) is None
+        assert self.cache.get_suggestion(None, PARAGRAPH) is None
+        self.cache.put_suggestion(None, PARAGRAPH + " wafers", "made of sand.", 0.7, [])
+        assert self.cache.get_suggestion("u1", PARAGRAPH + " wafers") is None
+
+
+class TestIncrementalSuggestions:
+    """Test debounced, cached and streamed suggestions against a local Exa endpoint."""
+
+    def setup_method(self):
+        self.exa_queries = []
+
+    def _app(self):
+        async def search(request):
+            payload = await request.json()
+            self.exa_queries.append(payload["query"])
+            await asyncio.sleep(0.05)
+            return web.json_response({"results": [
+                {"title": "Photovoltaics", "url": "https://example.com/pv", "text": "How PV cells work", "score": 0.9}
+            ]})
+
+        app = web.Application()
+        app.router.add_post("/search", search)
+        return app
+
+    def _service(self, base, continuation="that absorb photons and release electrons."):
+        service = WritingAssistantService(
+            exa_client=AsyncExaClient(api_key="test", search_url=base + "/search"),
+            cache=SuggestionPrefixCache()
+        )
+        service.gemini_client = SimpleNamespace(models=StubGeminiModels(continuation))
+        service.debounce_seconds = 0.1
+        return service
+
+    async def _with_exa(self, run):
+        runner = web.AppRunner(self._app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        try:
+            return await run(f"http://127.0.0.1:{runner.addresses[0][1]}")
+        finally:
+            await runner.cleanup()
+
+    def test_growing_paragraph_reuses_sources_and_suggestions(self):
+        async def run(base):
+            service = self._service(base)
+            try:
+                first = await service.suggest(PARAGRAPH, user_id="user-1")
+                typed = await service.suggest(PARAGRAPH + " that abs", user_id="user-1")
+                grown = await service.suggest(PARAGRAPH + " wafers.", user_id="user-1")
+                return service, first, typed, grown
+            finally:
+                await service.exa_client.close()
+
+        service, first, typed, grown = asyncio.run(self._with_exa(run))
+
+        assert first[0].text == "that absorb photons and release electrons."
+        assert typed[0].text == "orb photons and release electrons."
+        assert len(grown) == 1
+        # One Exa search for the paragraph, and no API call for the typed-out suggestion
+        assert len(self.exa_queries) == 1
+        assert service.gemini_client.models.calls == 2
+        assert service.daily_api_calls == 2
+
+    def test_short_text_does_not_count_against_daily_limit(self):
+        async def run(base):
+            service = self._service(base)
+            try:
+                return service, await service.suggest("Solar panels are great")
+            finally:
+                await service.exa_client.close()
+
+        service, suggestions = asyncio.run(self._with_exa(run))
+
+        assert suggestions == []
+        assert service.daily_api_calls == 0
+
+    def test_burst_of_requests_runs_only_the_last(self):
+        async def run(base):
+            service = self._service(base)
+
+            async def typed_after(delay, text):
+                await asyncio.sleep(delay)
+                return await service.suggest_incremental("user-1", "doc-1", text)
+
+            try:
+                return service, await asyncio.gather(
+                    typed_after(0, PARAGRAPH + " wa"),
+                    typed_after(0.02, PARAGRAPH + " waf"),
+                    typed_after(0.04, PARAGRAPH + " wafers"),
+                    service.suggest_incremental("user-2", "doc-1", PARAGRAPH)
+                )
+            finally:
+                await service.exa_client.close()
+
+        service, results = asyncio.run(self._with_exa(run))
+
+        assert results[0] is None and results[1] is None
+        assert results[2][0].text == "that absorb photons and release electrons."
+        assert results[3][0].text == "that absorb photons and release electrons."
+        assert service.gemini_client.models.calls == 2
+        assert service._session_tasks == {}
+
+    def test_caller_cancellation_is_not_reported_as_superseded(self):
+        async def run(base):
+            service = self._service(base)
+            try:
+                request = asyncio.ensure_future(service.suggest_incremental("user-1", "doc-1", PARAGRAPH))
+                await asyncio.sleep(0.01)
+                request.cancel()
+                try:
+                    await request
+                except asyncio.CancelledError:
+                    return service, "cancelled"
+                return service, "completed"
+            finally:
+                await service.exa_client.close()
+
+        service, outcome = asyncio.run(self._with_exa(run))
+
+        assert outcome == "cancelled"
+        assert service._session_tasks == {} and service._superseded_tasks == set()
+
+    def test_stream_yields_chunks_and_superseded_stream_stops(self):
+        async def collect(service, session_id, text, delay=0.0):
+            await asyncio.sleep(delay)
+            return [event async for event in service.stream_suggestion("user-1", session_id, text)]
+
+        async def run(base):
+            service = self._service(base)
+            try:
+                streamed = await collect(service, "doc-1", PARAGRAPH)
+                superseded, latest = await asyncio.gather(
+                    collect(service, "doc-2", "Wind turbines convert the kinetic energy of moving air into power"),
+                    collect(service, "doc-2", "Wind turbines convert the kinetic energy of moving air into electricity", delay=0.25)
+                )
+                return streamed, superseded, latest
+            finally:
+                await service.exa_client.close()
+
+        streamed, superseded, latest = asyncio.run(self._with_exa(run))
+
+        types = [event["type"] for event in streamed]
+        assert types[0] == "sources" and types[-1] == "done"
+        assert types.count("chunk") == 6
+        assert "".join(event["text"] for event in streamed if event["type"] == "chunk").strip() == \
+            "that absorb photons and release electrons."
+        assert streamed[-1]["suggestion"]["text"] == "that absorb photons and release electrons."
+        assert superseded[-1]["type"] == "superseded"
+        assert latest[-1]["type"] == "done"
@@ -0,0 +1,64 @@
+"""Helpers for the local SQLite stores used by services (task store, caches, indexes)."""
+
+import asyncio
+import os
+import sqlite3
+from typing import Any, Callable, Iterable
+
+from loguru import logger
+
+SQLITE_PURGE_INTERVAL_MINUTES = float(os.getenv("SQLITE_PURGE_INTERVAL_MINUTES", "60"))
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Open a connection that waits on locks held by other workers instead of failing.
+
+    Args:
+        db_path: Path to SQLite database file
+
+    Returns:
+        sqlite3 connection
+    """
+    conn = sqlite3.connect(db_path, timeout=10)
+    conn.execute("PRAGMA busy_timeout = 10000")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+def init_database(db_path: str, *statements: str) -> None:
+    """Switch the database to WAL mode and run the schema statements.
+
+    WAL lets readers proceed while another worker writes. The statements should
+    be idempotent (CREATE ... IF NOT EXISTS), as they run on every start.
+
+    Args:
+        db_path: Path to SQLite database file
+        statements: Schema statements to execute in order
+    """
+    with connect(db_path) as conn:
+        conn.execute("PRAGMA journal_mode = WAL")
+        for statement in statements:
+            conn.execute(statement)
+        conn.commit()
+
+
+async def run_purge_scheduler(store_factories: Iterable[Callable[[], Any]],
+                              interval_minutes: float = SQLITE_PURGE_INTERVAL_MINUTES) -> None:
+    """Periodically delete expired rows from TTL caches, off the event loop.
+
+    Args:
+        store_factories: Callables returning stores that expose purge_expired()
+        interval_minutes: Minutes between purges
+    """
+    loop = asyncio.get_running_loop()
+    stores = await loop.run_in_executor(None, lambda: [factory() for factory in store_factories])
+    while True:
+        for store in stores:
+            try:
+                removed = await loop.run_in_executor(None, store.purge_expired)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to purge expired rows from {type(store).__name__}: {e}")
+                continue
+            if removed:
+                logger.debug(f"Purged {removed} expired rows from {type(store).__name__}")
+        await asyncio.sleep(interval_minutes * 60)
@@ -1,10 +1,16 @@
 """Utility functions for Stability AI operations."""
 
 import base64
+import copy
 import io
 import json
 import mimetypes
+import multiprocessing
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, Any, Optional, List, Union, Tuple
 from PIL import Image, ImageStat
 import numpy as np
@@ -51,46 +57,27 @@ class ImageValidator:
     async def analyze_image_content(content: bytes) -> Dict[str, Any]:
         """Analyze image content and characteristics.
         
+        Decoding and pixel statistics run in a worker process on a reduced-resolution
+        copy of the image; results are cached by content hash.
+        
         Args:
             content: Image bytes
             
         Returns:
             Image analysis results
         """
+        content_hash = hashlib.sha256(content).hexdigest()
+        cached = _image_analysis_cache.get(content_hash)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
         try:
-            img = Image.open(io.BytesIO(content))
-            
-            # Basic info
-            info = {
-                "format": img.format,
-                "mode": img.mode,
-                "size": img.size,
-                "width": img.width,
-                "height": img.height,
-                "total_pixels": img.width * img.height,
-                "aspect_ratio": round(img.width / img.height, 3),
-                "file_size": len(content),
-                "has_alpha": img.mode in ("RGBA", "LA") or "transparency" in img.info
-            }
-            
-            # Color analysis
-            if img.mode == "RGB" or img.mode == "RGBA":
-                img_rgb = img.convert("RGB")
-                stat = ImageStat.Stat(img_rgb)
-                
-                info.update({
-                    "brightness": round(sum(stat.mean) / 3, 2),
-                    "color_variance": round(sum(stat.stddev) / 3, 2),
-                    "dominant_colors": _extract_dominant_colors(img_rgb)
-                })
-            
-            # Quality assessment
-            info["quality_assessment"] = _assess_image_quality(img)
-            
-            return info
-            
+            info = await _run_image_analysis(content)
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Error analyzing image: {str(e)}")
+        
+        _image_analysis_cache.put(content_hash, info)
+        return copy.deepcopy(info)
     
     @staticmethod
     def validate_dimensions(width: int, height: int, operation: str) -> None:
@@ -607,6 +594,126 @@ class WorkflowManager:
 
 # ==================== HELPER FUNCTIONS ====================
 
+# Longest side, in pixels, of the copy used for color and quality analysis
+IMAGE_ANALYSIS_MAX_SIDE = int(os.getenv("STABILITY_IMAGE_ANALYSIS_MAX_SIDE", "512"))
+IMAGE_ANALYSIS_WORKERS = int(os.getenv("STABILITY_IMAGE_ANALYSIS_WORKERS", "2"))
+IMAGE_ANALYSIS_CACHE_SIZE = int(os.getenv("STABILITY_IMAGE_ANALYSIS_CACHE_SIZE", "256"))
+
+_image_analysis_pool: Optional[ProcessPoolExecutor] = None
+_image_analysis_pool_lock = threading.Lock()
+
+
+class _ImageAnalysisCache:
+    """Bounded LRU of image analysis results keyed by content hash."""
+    
+    def __init__(self, max_entries: int = IMAGE_ANALYSIS_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_image_analysis_cache = _ImageAnalysisCache()
+
+
+def _get_image_analysis_pool() -> ProcessPoolExecutor:
+    """Process pool for image analysis, created on first use."""
+    global _image_analysis_pool
+    with _image_analysis_pool_lock:
+        if _image_analysis_pool is None:
+            # spawn: workers must not inherit the server's threads and open sockets
+            _image_analysis_pool = ProcessPoolExecutor(
+                max_workers=IMAGE_ANALYSIS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _image_analysis_pool
+
+
+def shutdown_image_analysis_pool() -> None:
+    """Stop the image analysis worker processes."""
+    global _image_analysis_pool
+    with _image_analysis_pool_lock:
+        if _image_analysis_pool is not None:
+            _image_analysis_pool.shutdown(wait=False, cancel_futures=True)
+            _image_analysis_pool = None
+
+
+async def _run_image_analysis(content: bytes) -> Dict[str, Any]:
+    """Run _analyze_image_bytes in the process pool, or a thread if the pool is unusable."""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_image_analysis_pool(), _analyze_image_bytes, content)
+    except BrokenProcessPool:
+        # A crashed worker breaks the whole pool; replace it on the next call
+        shutdown_image_analysis_pool()
+        return await loop.run_in_executor(None, _analyze_image_bytes, content)
+
+
+def _analyze_image_bytes(content: bytes, max_side: int = IMAGE_ANALYSIS_MAX_SIDE) -> Dict[str, Any]:
+    """Decode an image at reduced resolution and compute its analysis.
+    
+    Args:
+        content: Image bytes
+        max_side: Longest side of the analyzed copy
+        
+    Returns:
+        Image analysis results
+    """
+    img = Image.open(io.BytesIO(content))
+    width, height = img.size
+    
+    # Basic info (from the header, before any reduction)
+    info = {
+        "format": img.format,
+        "mode": img.mode,
+        "size": img.size,
+        "width": width,
+        "height": height,
+        "total_pixels": width * height,
+        "aspect_ratio": round(width / height, 3),
+        "file_size": len(content),
+        "has_alpha": img.mode in ("RGBA", "LA") or "transparency" in img.info
+    }
+    is_color = img.mode in ("RGB", "RGBA")
+    
+    # JPEG decodes at 1/2, 1/4 or 1/8 scale via draft(); other formats are reduced after decoding
+    img.draft("RGB" if is_color else img.mode, (max_side, max_side))
+    img.thumbnail((max_side, max_side), reducing_gap=2.0)
+    
+    # Color analysis
+    if is_color:
+        img_rgb = img.convert("RGB")
+        stat = ImageStat.Stat(img_rgb)
+        
+        info.update({
+            "brightness": round(sum(stat.mean) / 3, 2),
+            "color_variance": round(sum(stat.stddev) / 3, 2),
+            "dominant_colors": _extract_dominant_colors(img_rgb)
+        })
+    
+    # Quality assessment
+    info["quality_assessment"] = _assess_image_quality(img)
+    
+    return info
+
+
 def _extract_dominant_colors(img: Image.Image, num_colors: int = 5) -> List[Tuple[int, int, int]]:
     """Extract dominant colors from image.
     
@@ -615,44 +722,38 @@ def _extract_dominant_colors(img: Image.Image, num_colors: int = 5) -> List[Tupl
         num_colors: Number of dominant colors to extract
         
     Returns:
-        List of RGB tuples
+        List of RGB tuples, most frequent first
     """
     # Resize image for faster processing
-    img_small = img.resize((150, 150))
+    img_small = img.convert("RGB").resize((150, 150))
     
-    # Convert to numpy array
-    img_array = np.array(img_small)
-    pixels = img_array.reshape(-1, 3)
+    # Median-cut palette; getcolors() gives the pixel count of each palette entry
+    quantized = img_small.quantize(colors=num_colors, method=Image.Quantize.MEDIANCUT)
+    palette = quantized.getpalette()
+    counts = sorted(quantized.getcolors(num_colors) or [], reverse=True)
     
-    # Use k-means clustering to find dominant colors
-    from sklearn.cluster import KMeans
-    
-    kmeans = KMeans(n_clusters=num_colors, random_state=42, n_init=10)
-    kmeans.fit(pixels)
-    
-    colors = kmeans.cluster_centers_.astype(int)
-    return [tuple(color) for color in colors]
+    return [tuple(palette[index * 3:index * 3 + 3]) for _, index in counts]
 
 
 def _assess_image_quality(img: Image.Image) -> Dict[str, Any]:
     """Assess image quality metrics.
     
     Args:
-        img: PIL Image
+        img: PIL Image (the reduced-resolution copy)
         
     Returns:
         Quality assessment
     """
     # Convert to grayscale for quality analysis
     gray = img.convert('L')
-    gray_array = np.array(gray)
+    gray_array = np.asarray(gray, dtype=np.float32)
     
     # Calculate sharpness using Laplacian variance
-    laplacian_var = np.var(np.gradient(gray_array))
+    laplacian_var = float(np.var(np.gradient(gray_array)))
     sharpness_score = min(100, laplacian_var / 100)
     
     # Calculate noise level
-    noise_level = np.std(gray_array)
+    noise_level = float(np.std(gray_array))
     
     # Overall quality score
     overall_score = (sharpness_score + max(0, 100 - noise_level)) / 2